@@ -4,6 +4,8 @@ Audio Event Annotation Tool - главный файл Flask приложения
 Минимальное Flask приложение для запуска сервера.
 """
 
+import os
+
 from flask import Flask, render_template
 
 # Инициализация Flask приложения
@@ -22,10 +24,61 @@ init_db()
 from src.api.audio_routes import audio_bp
 from src.api.annotation_routes import annotation_bp
 from src.api.export_routes import export_bp
+from src.api.peaks_routes import peaks_bp
+from src.api.metrics_routes import metrics_bp
+from src.api.segment_routes import segment_bp
+from src.api.proxy_routes import proxy_bp
+from src.api.tiles_routes import tiles_bp
+from src.api.spectrogram_data_routes import spectrogram_data_bp
+from src.api.spectrogram_batch_routes import spectrogram_batch_bp
+from src.api.render_job_routes import render_jobs_bp
+from src.api.import_routes import import_bp
+from src.api.import_job_routes import import_jobs_bp
+from src.api.watched_folder_routes import watched_folders_bp
 
 app.register_blueprint(audio_bp)
 app.register_blueprint(annotation_bp)
 app.register_blueprint(export_bp)
+app.register_blueprint(peaks_bp)
+app.register_blueprint(metrics_bp)
+app.register_blueprint(segment_bp)
+app.register_blueprint(proxy_bp)
+app.register_blueprint(tiles_bp)
+app.register_blueprint(spectrogram_data_bp)
+app.register_blueprint(spectrogram_batch_bp)
+app.register_blueprint(render_jobs_bp)
+app.register_blueprint(import_bp)
+app.register_blueprint(import_jobs_bp)
+app.register_blueprint(watched_folders_bp)
+
+# Незавершённые задачи импорта продолжаются после перезапуска.
+# Процесс-наблюдатель reloader'а Flask (debug) задачи не запускает.
+if os.getenv("IMPORT_JOBS_RESUME", "true").lower() == "true" and (
+    __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+):
+    from src.audio.import_jobs import resume_import_jobs
+
+    resume_import_jobs()
+
+# Задачи отрисовки, прерванные перезапуском, выполняются заново
+if os.getenv("RENDER_JOBS_RESUME", "true").lower() == "true" and (
+    __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+):
+    from src.audio.render_jobs import resume_render_jobs
+
+    resume_render_jobs()
+
+# Наблюдение inotify за каталогами с флагом live (LIVE_WATCH_ENABLED)
+if __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+    from src.audio.live_watch import start_live_watches
+
+    start_live_watches()
+
+# Отпечатки записей, добавленных до появления отпечатков (FINGERPRINT_BACKFILL)
+if __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+    from src.audio.fingerprint import schedule_backfill
+
+    schedule_backfill()
 
 
 # Временный HTML шаблон для главной страницы
@@ -11,22 +11,43 @@ API endpoints для работы с аудио-файлами.
 """
 
 import os
-from flask import Blueprint, request, jsonify
+from dataclasses import asdict
+from flask import Blueprint, Response, request, jsonify
 from src.audio.metadata import (
     extract_metadata,
     get_filename,
     validate_file_exists,
     validate_audio_format,
 )
+from src.audio.fingerprint import add_fingerprint, schedule_full_hash
+from src.audio.pcm_cache import get_pcm_cache
+from src.audio.peaks import remove_peaks, schedule_peaks
+from src.audio.proxy import get_ready_proxy, needs_proxy, remove_proxy, schedule_proxy
+from src.audio.freq_scale import DEFAULT_N_MELS, DEFAULT_SCALE
+from src.audio.stft_store import DEFAULT_POOLING, HOP_LENGTH, N_FFT, POOLING_METHODS, remove_stft
+from src.audio.raster import DEFAULT_RENDERER, RENDERER_VERSION, RENDERERS
+from src.audio.render_cache import get_render_cache
+from src.audio.render_jobs import remove_render_jobs
+from src.audio.render_pool import RenderUnavailable, get_render_pool
 from src.audio.streaming import stream_audio_file
 from src.audio.waveform import generate_waveform
-from src.audio.spectrogram import SpectrogramParams, generate_spectrogram
+from src.audio.spectrogram import SpectrogramParams, generate_spectrogram, validate_time_range
 from src.models import get_db, AudioFile, AudioFileStatus
 from src.models.audio_file import AudioFileStatus
+from src.utils.http_cache import (
+    apply_cache_headers,
+    get_file_version,
+    get_validators,
+    is_not_modified,
+    not_modified_response,
+)
 
 # Создаём Blueprint для audio API
 audio_bp = Blueprint("audio", __name__, url_prefix="/api/audio")
 
+# Варианты качества воспроизведения для /stream
+PLAYBACK_QUALITIES = ("original", "proxy")
+
 
 @audio_bp.route("/add", methods=["POST"])
 def add_audio_file():
@@ -79,8 +100,18 @@ def add_audio_file():
             )
 
             session.add(audio_file)
+            session.flush()
+            # Отпечаток содержимого: копии файла узнаются при импорте
+            fingerprint = add_fingerprint(session, audio_file.id, file_path)
             session.commit()
 
+            if fingerprint is not None:
+                schedule_full_hash([fingerprint["id"]])
+            # Пирамида peaks и proxy для больших файлов строятся в фоне
+            schedule_peaks(audio_file.id, file_path)
+            if needs_proxy(audio_file.file_size):
+                schedule_proxy(audio_file.id)
+
             return jsonify(audio_file.to_dict()), 201
 
         except Exception as e:
@@ -126,7 +157,14 @@ def get_audio_file(audio_file_id: str):
             if not audio_file:
                 return jsonify({"error": "Audio file not found"}), 404
 
-            return jsonify(audio_file.to_dict()), 200
+            data = audio_file.to_dict()
+            # Версия файла для построения версионированных URL (?v=...)
+            data["version"] = (
+                get_file_version(audio_file.file_path)
+                if os.path.isfile(audio_file.file_path)
+                else None
+            )
+            return jsonify(data), 200
 
         finally:
             session.close()
@@ -177,9 +215,13 @@ def stream_audio(audio_file_id: str):
     """
     Потоковая загрузка аудио-файла с поддержкой Range requests.
 
-    GET /api/audio/{id}/stream
+    GET /api/audio/{id}/stream?quality=proxy
     Headers: Range: bytes=start-end (опционально)
 
+    Query parameters:
+        quality: original (по умолчанию) или proxy - сжатая копия для
+            воспроизведения, если она построена и актуальна
+
     Args:
         audio_file_id: UUID аудио-файла
 
@@ -196,6 +238,10 @@ def stream_audio(audio_file_id: str):
         except ValueError:
             return jsonify({"error": "Invalid audio file ID format"}), 400
 
+        quality = request.args.get("quality", type=str, default="original")
+        if quality not in PLAYBACK_QUALITIES:
+            return jsonify({"error": f"quality must be one of: {', '.join(PLAYBACK_QUALITIES)}"}), 400
+
         # Получение из БД
         db = get_db()
         session = db.get_session()
@@ -206,8 +252,20 @@ def stream_audio(audio_file_id: str):
             if not audio_file:
                 return jsonify({"error": "Audio file not found"}), 404
 
+            # Proxy отдаётся, только если он готов; иначе - исходный файл
+            stream_path = audio_file.file_path
+            if quality == "proxy":
+                proxy = get_ready_proxy(session, audio_file)
+                if proxy is not None:
+                    stream_path = proxy.file_path
+                else:
+                    quality = "original"
+
             # Потоковая загрузка файла
-            return stream_audio_file(audio_file.file_path, audio_file_id)
+            response = stream_audio_file(stream_path, audio_file_id)
+            if isinstance(response, Response):
+                response.headers["X-Playback-Quality"] = quality
+            return response
 
         finally:
             session.close()
@@ -227,13 +285,16 @@ def get_waveform(audio_file_id: str):
         width: Ширина изображения в пикселях (по умолчанию 1200)
         height: Высота изображения в пикселях (по умолчанию 300)
         color: Цвет waveform в hex формате без # (по умолчанию 1f77b4)
+        start_time: Начало интервала в секундах (по умолчанию 0)
+        end_time: Конец интервала в секундах (по умолчанию весь файл)
+        renderer: raster (NumPy, по умолчанию) или matplotlib
 
     Args:
         audio_file_id: UUID аудио-файла
 
     Returns:
         PNG изображение waveform (200)
-        или ошибка (404, 500)
+        или ошибка (404, 500, 503 с Retry-After)
     """
     try:
         import uuid
@@ -248,12 +309,21 @@ def get_waveform(audio_file_id: str):
         width = request.args.get("width", type=int, default=1200)
         height = request.args.get("height", type=int, default=300)
         color = request.args.get("color", type=str, default="1f77b4")
+        start_time = request.args.get("start_time", default=0.0, type=float)
+        end_time = request.args.get("end_time", type=float)
+        renderer = request.args.get("renderer", type=str, default=DEFAULT_RENDERER)
 
         # Валидация параметров
         if width <= 0 or width > 5000:
             return jsonify({"error": "Width must be between 1 and 5000"}), 400
         if height <= 0 or height > 2000:
             return jsonify({"error": "Height must be between 1 and 2000"}), 400
+        if start_time < 0:
+            return jsonify({"error": "start_time must be non-negative"}), 400
+        if end_time is not None and end_time <= start_time:
+            return jsonify({"error": "end_time must be greater than start_time"}), 400
+        if renderer not in RENDERERS:
+            return jsonify({"error": f"renderer must be one of: {', '.join(RENDERERS)}"}), 400
 
         # Получение из БД
         db = get_db()
@@ -269,20 +339,52 @@ def get_waveform(audio_file_id: str):
             if not os.path.exists(audio_file.file_path):
                 return jsonify({"error": "Audio file not found on disk"}), 404
 
-            # Генерация waveform
+            # Генерация waveform (с дисковым кэшем по параметрам и версии файла)
+            render_params = {
+                "kind": "waveform",
+                "width": width,
+                "height": height,
+                "color": color.lstrip("#").lower(),
+                "start_time": start_time,
+                "end_time": end_time,
+                "renderer": renderer,
+            }
+
+            # Условный запрос проверяется до чтения аудио
+            etag, last_modified, immutable = get_validators(
+                audio_file.file_path, {**render_params, "renderer_version": RENDERER_VERSION}
+            )
+            if is_not_modified(etag, last_modified):
+                return not_modified_response(etag, last_modified, immutable)
+
             try:
-                png_data = generate_waveform(
-                    audio_file.file_path, width=width, height=height, color=color
+                png_data = get_render_cache().get_or_render(
+                    audio_file.file_path,
+                    render_params,
+                    lambda: get_render_pool().run(
+                        generate_waveform,
+                        audio_file.file_path,
+                        width=width,
+                        height=height,
+                        color=color,
+                        audio_file_id=audio_file.id,
+                        start_time=start_time,
+                        end_time=end_time,
+                        renderer=renderer,
+                    ),
                 )
+            except ValueError as value_error:
+                return jsonify({"error": str(value_error)}), 400
+            except RenderUnavailable as unavailable:
+                return jsonify({"error": str(unavailable)}), 503, {"Retry-After": str(unavailable.retry_after)}
             except Exception as e:
                 return jsonify({"error": f"Error generating waveform: {str(e)}"}), 500
 
             # Возвращаем PNG изображение
-            from flask import Response
-
-            return Response(
+            response = Response(
                 png_data, mimetype="image/png", headers={"Content-Type": "image/png"}
             )
+            return apply_cache_headers(response, etag, last_modified, immutable)
 
         finally:
             session.close()
@@ -304,10 +406,16 @@ def get_spectrogram(audio_file_id: str):
         width: Ширина изображения в пикселях (по умолчанию 1024)
         height: Высота изображения в пикселях (по умолчанию 512)
         color_map: Название цветовой карты matplotlib (по умолчанию viridis)
+        renderer: raster (NumPy, по умолчанию) или matplotlib
+        pooling: max (по умолчанию) или mean - свёртка кадров STFT в столбцы изображения
+        scale: linear (по умолчанию), mel, log или cqt - частотная шкала
+        fmin, fmax: Диапазон частот в Гц (по умолчанию весь)
+        n_mels: Количество полос mel и log (по умолчанию 128)
+        n_fft, hop_length: Параметры STFT (по умолчанию 2048 и 512)
 
     Returns:
         PNG изображение спектрограммы (200)
-        или ошибка (400, 404, 500)
+        или ошибка (400, 404, 500, 503 с Retry-After)
     """
     try:
         import uuid
@@ -323,6 +431,14 @@ def get_spectrogram(audio_file_id: str):
         width = request.args.get("width", type=int, default=1024)
         height = request.args.get("height", type=int, default=512)
         color_map = request.args.get("color_map", type=str, default="viridis")
+        renderer = request.args.get("renderer", type=str, default=DEFAULT_RENDERER)
+        pooling = request.args.get("pooling", type=str, default=DEFAULT_POOLING)
+        scale = request.args.get("scale", type=str, default=DEFAULT_SCALE)
+        fmin = request.args.get("fmin", type=float, default=0.0)
+        fmax = request.args.get("fmax", type=float)
+        n_mels = request.args.get("n_mels", type=int, default=DEFAULT_N_MELS)
+        n_fft = request.args.get("n_fft", type=int, default=N_FFT)
+        hop_length = request.args.get("hop_length", type=int, default=HOP_LENGTH)
 
         if start_time < 0:
             return jsonify({"error": "start_time must be non-negative"}), 400
@@ -332,6 +448,10 @@ def get_spectrogram(audio_file_id: str):
             return jsonify({"error": "Width must be between 1 and 5000"}), 400
         if height <= 0 or height > 2000:
             return jsonify({"error": "Height must be between 1 and 2000"}), 400
+        if renderer not in RENDERERS:
+            return jsonify({"error": f"renderer must be one of: {', '.join(RENDERERS)}"}), 400
+        if pooling not in POOLING_METHODS:
+            return jsonify({"error": f"pooling must be one of: {', '.join(POOLING_METHODS)}"}), 400
 
         params = SpectrogramParams(
             start_time=start_time,
@@ -339,7 +459,19 @@ def get_spectrogram(audio_file_id: str):
             width=width,
             height=height,
             color_map=color_map,
+            renderer=renderer,
+            pooling=pooling,
+            scale=scale,
+            fmin=fmin,
+            fmax=fmax,
+            n_mels=n_mels,
+            n_fft=n_fft,
+            hop_length=hop_length,
         )
+        try:
+            params.validate()
+        except ValueError as value_error:
+            return jsonify({"error": str(value_error)}), 400
 
         db = get_db()
         session = db.get_session()
@@ -352,21 +484,43 @@ def get_spectrogram(audio_file_id: str):
             if not os.path.exists(audio_file.file_path):
                 return jsonify({"error": "Audio file not found on disk"}), 404
 
+            # Интервал проверяется по длительности из БД, без повторного разбора файла
+            try:
+                validate_time_range(params, audio_file.duration)
+            except ValueError as value_error:
+                return jsonify({"error": str(value_error)}), 400
+
+            render_params = {"kind": "spectrogram", **asdict(params)}
+
+            # Условный запрос проверяется до чтения аудио
+            etag, last_modified, immutable = get_validators(
+                audio_file.file_path, {**render_params, "renderer_version": RENDERER_VERSION}
+            )
+            if is_not_modified(etag, last_modified):
+                return not_modified_response(etag, last_modified, immutable)
+
             try:
-                png_data = generate_spectrogram(audio_file.file_path, params)
+                png_data = get_render_cache().get_or_render(
+                    audio_file.file_path,
+                    render_params,
+                    lambda: get_render_pool().run(
+                        generate_spectrogram, audio_file.file_path, params, audio_file.id
+                    ),
+                )
             except ValueError as value_error:
                 return jsonify({"error": str(value_error)}), 400
+            except RenderUnavailable as unavailable:
+                return jsonify({"error": str(unavailable)}), 503, {"Retry-After": str(unavailable.retry_after)}
             except Exception as e:
                 return (
                     jsonify({"error": f"Error generating spectrogram: {str(e)}"}),
                     500,
                 )
 
-            from flask import Response
-
-            return Response(
+            response = Response(
                 png_data, mimetype="image/png", headers={"Content-Type": "image/png"}
             )
+            return apply_cache_headers(response, etag, last_modified, immutable)
 
         finally:
             session.close()
@@ -414,8 +568,15 @@ def delete_audio_file(audio_file_id: str):
             # Если нужно удалять и файл, это должно быть явно указано в требованиях.
             # Пока удаляем только метаданные из системы.
 
+            file_path = audio_file.file_path
             session.delete(audio_file)
             session.commit()
+            remove_peaks(audio_file_uuid)
+            remove_proxy(audio_file_uuid)
+            remove_stft(audio_file_uuid)
+            remove_render_jobs(audio_file_uuid)
+            get_render_cache().remove_file(file_path)
+            get_pcm_cache().remove_file(file_path)
 
             return jsonify(
                 {"message": "Audio file deleted successfully", "id": audio_file_id}
@@ -429,89 +590,3 @@ def delete_audio_file(audio_file_id: str):
 
     except Exception as e:
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
-
-
-@audio_bp.route("/import", methods=["POST"])
-def import_audio_folder():
-    """
-    Импортировать все аудио-файлы из директории.
-
-    POST /api/audio/import
-    Body: {"path": "/path/to/folder"}
-
-    Returns:
-        JSON с результатами импорта (200)
-        или ошибка (400, 404)
-    """
-    try:
-        data = request.get_json() or {}
-        folder_path = data.get("path")
-
-        if not folder_path:
-            return jsonify({"error": "path is required"}), 400
-
-        if not os.path.exists(folder_path):
-            return jsonify({"error": "Directory not found"}), 404
-
-        if not os.path.isdir(folder_path):
-            return jsonify({"error": "Path is not a directory"}), 400
-
-        # Поддерживаемые расширения
-        supported_extensions = {".wav", ".mp3", ".flac", ".ogg", ".aiff"}
-
-        imported_count = 0
-        errors = []
-
-        db = get_db()
-        session = db.get_session()
-
-        try:
-            for filename in os.listdir(folder_path):
-                file_ext = os.path.splitext(filename)[1].lower()
-                if file_ext not in supported_extensions:
-                    continue
-
-                file_path = os.path.join(folder_path, filename)
-
-                try:
-                    # Проверяем, не добавлен ли уже файл (по пути)
-                    existing = session.query(AudioFile).filter_by(file_path=file_path).first()
-                    if existing:
-                        continue
-
-                    # Извлекаем метаданные
-                    metadata = extract_metadata(file_path)
-
-                    audio_file = AudioFile(
-                        file_path=file_path,
-                        filename=filename,
-                        duration=metadata["duration"],
-                        sample_rate=metadata["sample_rate"],
-                        channels=metadata["channels"],
-                        file_size=metadata["file_size"],
-                        status=AudioFileStatus.LOADED,
-                    )
-                    session.add(audio_file)
-                    imported_count += 1
-
-                except Exception as e:
-                    errors.append({"file": filename, "error": str(e)})
-
-            session.commit()
-
-            return jsonify(
-                {
-                    "imported_count": imported_count,
-                    "errors": errors,
-                    "message": f"Successfully imported {imported_count} files",
-                }
-            ), 200
-
-        except Exception as e:
-            session.rollback()
-            return jsonify({"error": f"Database error: {str(e)}"}), 500
-        finally:
-            session.close()
-
-    except Exception as e:
-        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
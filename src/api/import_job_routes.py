@@ -0,0 +1,126 @@
+"""
+REST API фоновых задач импорта каталогов.
+
+Импорт большого дерева каталогов ставится в очередь задачей ImportJob;
+клиент опрашивает счётчики и при необходимости отменяет задачу.
+После перезапуска сервера незавершённые задачи продолжаются с курсора.
+"""
+import os
+import uuid
+
+from flask import Blueprint, jsonify, request
+
+from src.api.import_routes import parse_import_options
+from src.audio.import_jobs import cancel_import_job, create_import_job
+from src.models import ImportJob, get_db
+
+import_jobs_bp = Blueprint('import_jobs', __name__, url_prefix='/api/import-jobs')
+
+
+@import_jobs_bp.route('', methods=['POST'])
+def create_job():
+    """
+    Поставить импорт каталога в очередь.
+
+    POST /api/import-jobs
+
+    Request body:
+        {
+            "path": "/path/to/folder",
+            "recursive": true (опционально),
+            "include": ["*.wav"] (опционально),
+            "exclude": ["tmp"] (опционально),
+            "max_depth": 2 (опционально)
+        }
+
+    Returns:
+        202: JSON задачи, заголовок Location
+        400: Неверные параметры
+        404: Директория не найдена
+        500: Ошибка сервера
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be JSON'}), 400
+
+        folder_path = data.get('path')
+        if not folder_path:
+            return jsonify({'error': 'path is required'}), 400
+        if not os.path.exists(folder_path):
+            return jsonify({'error': 'Directory not found'}), 404
+        if not os.path.isdir(folder_path):
+            return jsonify({'error': 'Path is not a directory'}), 400
+
+        try:
+            options = parse_import_options(data)
+        except ValueError as value_error:
+            return jsonify({'error': str(value_error)}), 400
+
+        job = create_import_job(folder_path, options)
+        return jsonify(job.to_dict()), 202, {'Location': f'/api/import-jobs/{job.id}'}
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+
+
+@import_jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Состояние задачи импорта.
+
+    GET /api/import-jobs/{id}
+
+    Returns:
+        200: JSON задачи (status, cursor, счётчики, последние ошибки)
+        400: Неверный формат ID
+        404: Задача не найдена
+    """
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        return jsonify({'error': 'Invalid import job ID format'}), 400
+
+    session = get_db().get_session()
+    try:
+        job = ImportJob.get_by_id(session, job_uuid)
+        if job is None:
+            return jsonify({'error': 'Import job not found'}), 404
+        return jsonify(job.to_dict()), 200
+    except Exception as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    finally:
+        session.close()
+
+
+@import_jobs_bp.route('/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """
+    Отменить задачу импорта.
+
+    POST /api/import-jobs/{id}/cancel
+
+    Выполняемая задача останавливается после текущей пачки;
+    уже импортированные файлы остаются в БД.
+
+    Returns:
+        200: JSON задачи в статусе cancelled
+        400: Неверный формат ID
+        404: Задача не найдена
+        409: Задача уже завершена
+    """
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        return jsonify({'error': 'Invalid import job ID format'}), 400
+
+    try:
+        job = cancel_import_job(job_uuid)
+    except ValueError as value_error:
+        return jsonify({'error': str(value_error)}), 409
+    except Exception as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+
+    if job is None:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job.to_dict()), 200
@@ -0,0 +1,164 @@
+"""
+REST API импорта каталогов с аудио-файлами.
+
+Импорт большого дерева каталогов занимает минуты, поэтому кроме
+единственного JSON ответа в конце поддерживается потоковый режим:
+события прогресса передаются по мере работы как NDJSON (по строке JSON
+на событие) или Server-Sent Events.
+"""
+import json
+import os
+from typing import Dict, List
+
+from flask import Blueprint, Response, jsonify, request
+
+from src.audio.folder_import import FolderImport
+from src.audio.importer import ImportOptions, prepare_playback
+from src.models import get_db
+
+import_bp = Blueprint('import', __name__, url_prefix='/api/audio')
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+SSE_MIMETYPE = 'text/event-stream'
+STREAM_FORMATS = {'ndjson': NDJSON_MIMETYPE, 'sse': SSE_MIMETYPE}
+
+
+def _patterns(value) -> List[str]:
+    """Glob шаблоны из запроса: строка или список строк."""
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else value
+
+
+def parse_import_options(data: Dict) -> ImportOptions:
+    """
+    Параметры обхода каталога из тела запроса.
+
+    Raises:
+        ValueError: Если параметр неверен
+    """
+    include = _patterns(data.get('include'))
+    exclude = _patterns(data.get('exclude'))
+    if not isinstance(include, list) or not isinstance(exclude, list):
+        raise ValueError('include and exclude must be glob patterns')
+    options = ImportOptions(
+        recursive=bool(data.get('recursive', False)),
+        include=tuple(include),
+        exclude=tuple(exclude),
+        max_depth=data.get('max_depth'),
+    )
+    options.validate()
+    return options
+
+
+def _stream_format(data: Dict):
+    """
+    Формат потока событий: поле stream или заголовок Accept.
+
+    Returns:
+        'ndjson', 'sse' или None для обычного JSON ответа
+
+    Raises:
+        ValueError: Если поле stream неверно
+    """
+    stream = data.get('stream')
+    if stream is not None:
+        if stream not in STREAM_FORMATS:
+            raise ValueError(f'stream must be one of: {", ".join(STREAM_FORMATS)}')
+        return stream
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE, SSE_MIMETYPE])
+    return {NDJSON_MIMETYPE: 'ndjson', SSE_MIMETYPE: 'sse'}.get(best)
+
+
+def _encode_event(event: Dict, stream: str) -> str:
+    """Событие в формате потока."""
+    payload = json.dumps(event, ensure_ascii=False)
+    if stream == 'sse':
+        return f"event: {event['event']}\ndata: {payload}\n\n"
+    return payload + '\n'
+
+
+@import_bp.route('/import', methods=['POST'])
+def import_audio_folder():
+    """
+    Импортировать аудио-файлы из директории.
+
+    POST /api/audio/import
+
+    Request body:
+        {
+            "path": "/path/to/folder",
+            "recursive": false (опционально),
+            "include": ["*.wav"] (опционально, glob шаблоны),
+            "exclude": ["tmp", "*_old.*"] (опционально),
+            "max_depth": 2 (опционально, при recursive),
+            "stream": "ndjson" | "sse" (опционально, или заголовок Accept)
+        }
+
+    Returns:
+        200: JSON с результатами импорта или поток событий
+        400: Неверные параметры
+        404: Директория не найдена
+        500: Ошибка сервера
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        folder_path = data.get('path')
+
+        if not folder_path:
+            return jsonify({'error': 'path is required'}), 400
+
+        if not os.path.exists(folder_path):
+            return jsonify({'error': 'Directory not found'}), 404
+
+        if not os.path.isdir(folder_path):
+            return jsonify({'error': 'Path is not a directory'}), 400
+
+        try:
+            options = parse_import_options(data)
+            stream = _stream_format(data)
+        except ValueError as value_error:
+            return jsonify({'error': str(value_error)}), 400
+
+        if stream is not None:
+            return _stream_import(folder_path, options, stream)
+
+        session = get_db().get_session()
+        try:
+            result = FolderImport(session, folder_path, options, on_batch=prepare_playback).run()
+            return jsonify({
+                'imported_count': result.imported_count,
+                'duplicates': result.duplicates,
+                'errors': result.errors,
+                'message': f'Successfully imported {result.imported_count} files',
+            }), 200
+
+        except Exception as e:
+            session.rollback()
+            return jsonify({'error': f'Database error: {str(e)}'}), 500
+        finally:
+            session.close()
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+
+
+def _stream_import(folder_path: str, options: ImportOptions, stream: str) -> Response:
+    """Импорт с передачей событий по мере работы."""
+
+    def generate():
+        session = get_db().get_session()
+        try:
+            for event in FolderImport(session, folder_path, options, on_batch=prepare_playback).events():
+                yield _encode_event(event, stream)
+        except Exception as e:
+            session.rollback()
+            yield _encode_event({'event': 'aborted', 'error': str(e)}, stream)
+        finally:
+            session.close()
+
+    return Response(
+        generate(),
+        mimetype=STREAM_FORMATS[stream],
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
@@ -0,0 +1,35 @@
+"""
+REST API для получения метрик производительности приложения.
+"""
+from flask import Blueprint, jsonify
+
+from src.audio.pcm_cache import get_pcm_cache
+from src.audio.render_cache import get_render_cache
+from src.audio.render_pool import get_render_pool
+from src.audio.single_flight import render_flight
+from src.audio.streaming import stream_metrics
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """
+    Получение счётчиков производительности.
+
+    GET /api/metrics
+
+    Returns:
+        200: JSON со счётчиками по подсистемам
+        500: Ошибка сервера
+    """
+    try:
+        return jsonify({
+            'render_cache': get_render_cache().stats(),
+            'render_pool': get_render_pool().stats(),
+            'single_flight': render_flight.stats(),
+            'pcm_cache': get_pcm_cache().stats(),
+            'streaming': stream_metrics.stats(),
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
@@ -0,0 +1,186 @@
+"""
+REST API для получения peaks (min/max пар) аудио-файла.
+
+Позволяет фронтенду отрисовать waveform без скачивания и декодирования
+всего файла в браузере: WaveSurfer получает готовые peaks и длительность,
+а воспроизведение идёт через media element с Range запросами.
+"""
+import math
+import os
+import uuid
+
+import numpy as np
+from flask import Blueprint, Response, jsonify, request
+
+from src.audio.peaks import PEAK_SCALE, PEAKS_VERSION, PYRAMID_LEVELS, read_envelope
+from src.models import AudioFile, get_db
+from src.utils.http_cache import (
+    apply_cache_headers,
+    get_validators,
+    is_not_modified,
+    not_modified_response,
+)
+
+peaks_bp = Blueprint('peaks', __name__, url_prefix='/api/audio')
+
+# Количество пар min/max по умолчанию, если samples_per_pixel не задан
+DEFAULT_PEAKS_BINS = 8192
+# Ограничение размера ответа
+MAX_PEAKS_BINS = 1_000_000
+PEAKS_FORMATS = ('f32', 'i16', 'json')
+
+
+def interleave_min_max(mins: np.ndarray, maxs: np.ndarray) -> np.ndarray:
+    """
+    Собирает массив [min0, max0, min1, max1, ...] как в формате audiowaveform.
+
+    Args:
+        mins: Минимумы по бинам
+        maxs: Максимумы по бинам
+
+    Returns:
+        np.ndarray: float32 массив длины 2 * bins
+    """
+    pairs = np.empty(len(mins) * 2, dtype=np.float32)
+    pairs[0::2] = mins
+    pairs[1::2] = maxs
+    return pairs
+
+
+@peaks_bp.route('/<audio_file_id>/peaks', methods=['GET'])
+def get_peaks(audio_file_id):
+    """
+    Получение min/max пар для интервала аудио-файла.
+
+    GET /api/audio/{id}/peaks?samples_per_pixel=512&start=0&end=60&channel=0&format=f32
+
+    Query parameters:
+        samples_per_pixel: Сэмплов на пару min/max (по умолчанию так,
+            чтобы на интервал приходилось не больше 8192 пар)
+        start: Начало интервала в секундах (по умолчанию 0)
+        end: Конец интервала в секундах (по умолчанию весь файл)
+        channel: Номер канала (по умолчанию моно микс)
+        format: f32 (Float32 little-endian), i16 (Int16) или json
+
+    Returns:
+        200: Бинарные peaks с метаданными в заголовках X-Peaks-* или JSON
+        400: Неверные параметры
+        404: AudioFile или файл на диске не найден
+        500: Ошибка сервера
+    """
+    try:
+        try:
+            audio_file_uuid = uuid.UUID(audio_file_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid audio file ID format'}), 400
+
+        samples_per_pixel = request.args.get('samples_per_pixel', type=int)
+        start = request.args.get('start', default=0.0, type=float)
+        end = request.args.get('end', type=float)
+        channel = request.args.get('channel', type=int)
+        peaks_format = request.args.get('format', default='f32', type=str).lower()
+
+        if samples_per_pixel is not None and samples_per_pixel <= 0:
+            return jsonify({'error': 'samples_per_pixel must be positive'}), 400
+        if start < 0:
+            return jsonify({'error': 'start must be non-negative'}), 400
+        if end is not None and end <= start:
+            return jsonify({'error': 'end must be greater than start'}), 400
+        if peaks_format not in PEAKS_FORMATS:
+            return jsonify({'error': f'format must be one of: {", ".join(PEAKS_FORMATS)}'}), 400
+
+        db = get_db()
+        session = db.get_session()
+
+        try:
+            audio_file = AudioFile.get_by_id(session, audio_file_uuid)
+            if not audio_file:
+                return jsonify({'error': 'Audio file not found'}), 404
+
+            if not os.path.exists(audio_file.file_path):
+                return jsonify({'error': 'Audio file not found on disk'}), 404
+
+            if channel is not None and not 0 <= channel < audio_file.channels:
+                return jsonify({'error': f'channel must be between 0 and {audio_file.channels - 1}'}), 400
+
+            end_time = min(end, audio_file.duration) if end is not None else audio_file.duration
+            range_frames = max(1, int((end_time - start) * audio_file.sample_rate))
+            if samples_per_pixel is None:
+                samples_per_pixel = max(
+                    PYRAMID_LEVELS[0], math.ceil(range_frames / DEFAULT_PEAKS_BINS)
+                )
+            if math.ceil(range_frames / samples_per_pixel) > MAX_PEAKS_BINS:
+                return jsonify({'error': f'Too many peaks requested, maximum is {MAX_PEAKS_BINS}'}), 400
+
+            etag, last_modified, immutable = get_validators(audio_file.file_path, {
+                'kind': 'peaks',
+                'version': PEAKS_VERSION,
+                'samples_per_pixel': samples_per_pixel,
+                'start': start,
+                'end': end,
+                'channel': channel,
+                'format': peaks_format,
+            })
+            if is_not_modified(etag, last_modified):
+                return not_modified_response(etag, last_modified, immutable)
+
+            try:
+                envelope = read_envelope(
+                    audio_file.file_path,
+                    audio_file_id=audio_file.id,
+                    start_time=start,
+                    end_time=end,
+                    mono=channel is None,
+                    samples_per_bin=samples_per_pixel
+                )
+            except ValueError as value_error:
+                return jsonify({'error': str(value_error)}), 400
+            except Exception as e:
+                return jsonify({'error': f'Error reading peaks: {str(e)}'}), 500
+
+            channel_index = channel if channel is not None else 0
+            pairs = interleave_min_max(
+                envelope.mins[:, channel_index], envelope.maxs[:, channel_index]
+            )
+            duration = envelope.frames / envelope.sample_rate
+
+            if peaks_format == 'json':
+                response = jsonify({
+                    'version': 2,
+                    'channels': 1,
+                    'channel': channel,
+                    'sample_rate': envelope.sample_rate,
+                    'samples_per_pixel': samples_per_pixel,
+                    'start_time': start,
+                    'duration': duration,
+                    'total_duration': audio_file.duration,
+                    'length': len(pairs) // 2,
+                    'data': pairs.tolist()
+                })
+                return apply_cache_headers(response, etag, last_modified, immutable)
+
+            if peaks_format == 'i16':
+                body = np.round(np.clip(pairs, -1.0, 1.0) * PEAK_SCALE).astype('<i2').tobytes()
+            else:
+                body = pairs.astype('<f4').tobytes()
+
+            response = Response(
+                body,
+                mimetype='application/octet-stream',
+                headers={
+                    'X-Peaks-Format': peaks_format,
+                    'X-Peaks-Length': str(len(pairs) // 2),
+                    'X-Peaks-Sample-Rate': str(envelope.sample_rate),
+                    'X-Peaks-Samples-Per-Pixel': str(samples_per_pixel),
+                    'X-Peaks-Start-Time': str(start),
+                    'X-Peaks-Duration': str(duration),
+                    'X-Audio-Duration': str(audio_file.duration),
+                }
+            )
+            return apply_cache_headers(response, etag, last_modified, immutable)
+
+        finally:
+            session.close()
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
@@ -0,0 +1,104 @@
+"""
+REST API для proxy воспроизведения аудио-файла.
+
+Proxy строится в фоне после импорта больших файлов; через этот API
+можно узнать его состояние или запустить построение вручную.
+"""
+import os
+import uuid
+
+from flask import Blueprint, jsonify, request
+
+from src.audio.proxy import PLAYBACK_PROXY_FORMAT, PROXY_FORMATS, schedule_proxy
+from src.models import AudioFile, PlaybackProxy, get_db
+
+proxy_bp = Blueprint('proxy', __name__, url_prefix='/api/audio')
+
+
+@proxy_bp.route('/<audio_file_id>/proxy', methods=['GET'])
+def get_proxy(audio_file_id):
+    """
+    Состояние proxy аудио-файла.
+
+    GET /api/audio/{id}/proxy
+
+    Returns:
+        200: JSON PlaybackProxy
+        400: Неверный формат ID
+        404: AudioFile не найден или proxy не создавался
+        500: Ошибка сервера
+    """
+    try:
+        try:
+            audio_file_uuid = uuid.UUID(audio_file_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid audio file ID format'}), 400
+
+        db = get_db()
+        session = db.get_session()
+
+        try:
+            audio_file = AudioFile.get_by_id(session, audio_file_uuid)
+            if not audio_file:
+                return jsonify({'error': 'Audio file not found'}), 404
+
+            proxy = PlaybackProxy.get_by_audio_file(session, audio_file_uuid)
+            if not proxy:
+                return jsonify({'error': 'Playback proxy not found'}), 404
+
+            return jsonify(proxy.to_dict()), 200
+
+        finally:
+            session.close()
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+
+
+@proxy_bp.route('/<audio_file_id>/proxy', methods=['POST'])
+def create_proxy(audio_file_id):
+    """
+    Запустить (пере)построение proxy в фоне.
+
+    POST /api/audio/{id}/proxy
+    Body (опционально): {"format": "opus"}
+
+    Returns:
+        202: Построение поставлено в очередь
+        400: Неверный формат ID или формата proxy
+        404: AudioFile или файл на диске не найден
+        500: Ошибка сервера
+    """
+    try:
+        try:
+            audio_file_uuid = uuid.UUID(audio_file_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid audio file ID format'}), 400
+
+        data = request.get_json(silent=True) or {}
+        proxy_format = data.get('format', PLAYBACK_PROXY_FORMAT)
+        if proxy_format not in PROXY_FORMATS:
+            return jsonify({'error': f'format must be one of: {", ".join(PROXY_FORMATS)}'}), 400
+
+        db = get_db()
+        session = db.get_session()
+
+        try:
+            audio_file = AudioFile.get_by_id(session, audio_file_uuid)
+            if not audio_file:
+                return jsonify({'error': 'Audio file not found'}), 404
+
+            if not os.path.exists(audio_file.file_path):
+                return jsonify({'error': 'Audio file not found on disk'}), 404
+        finally:
+            session.close()
+
+        schedule_proxy(audio_file_uuid, proxy_format)
+        return jsonify({
+            'audio_file_id': audio_file_id,
+            'format': proxy_format,
+            'status': 'pending'
+        }), 202
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
@@ -0,0 +1,149 @@
+"""
+REST API фоновых задач отрисовки.
+
+Отрисовка, которая не укладывается в таймаут HTTP запроса (полная
+спектрограмма многочасовой записи, постер высокого разрешения),
+ставится в очередь; клиент опрашивает прогресс и скачивает готовый PNG.
+"""
+import os
+import uuid
+
+from flask import Blueprint, jsonify, request, send_file
+
+from src.audio.render_jobs import create_render_job, normalize_job_params
+from src.models import AudioFile, RenderJob, RenderJobStatus, get_db
+
+render_jobs_bp = Blueprint('render_jobs', __name__, url_prefix='/api/render-jobs')
+
+
+@render_jobs_bp.route('', methods=['POST'])
+def create_job():
+    """
+    Поставить отрисовку в очередь.
+
+    POST /api/render-jobs
+
+    Request body:
+        {
+            "audio_file_id": "uuid",
+            "kind": "waveform" | "spectrogram",
+            "params": {"width": 16000, "height": 1024, ...} (опционально)
+        }
+
+    Returns:
+        202: JSON задачи, заголовок Location
+        400: Неверные параметры
+        404: AudioFile или файл на диске не найден
+        500: Ошибка сервера
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be JSON'}), 400
+
+        try:
+            audio_file_uuid = uuid.UUID(str(data.get('audio_file_id')))
+        except ValueError:
+            return jsonify({'error': 'Invalid audio file ID format'}), 400
+
+        kind = str(data.get('kind', ''))
+        try:
+            params = normalize_job_params(kind, data.get('params'))
+        except ValueError as value_error:
+            return jsonify({'error': str(value_error)}), 400
+
+        session = get_db().get_session()
+        try:
+            audio_file = AudioFile.get_by_id(session, audio_file_uuid)
+            if not audio_file:
+                return jsonify({'error': 'Audio file not found'}), 404
+
+            if not os.path.exists(audio_file.file_path):
+                return jsonify({'error': 'Audio file not found on disk'}), 404
+        finally:
+            session.close()
+
+        job = create_render_job(audio_file_uuid, kind, params)
+        return jsonify(job.to_dict()), 202, {'Location': f'/api/render-jobs/{job.id}'}
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+
+
+@render_jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Состояние и прогресс задачи.
+
+    GET /api/render-jobs/{id}
+
+    Returns:
+        200: JSON задачи (status, progress в процентах)
+        400: Неверный формат ID
+        404: Задача не найдена
+        500: Ошибка сервера
+    """
+    try:
+        try:
+            job_uuid = uuid.UUID(job_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid render job ID format'}), 400
+
+        session = get_db().get_session()
+        try:
+            job = RenderJob.get_by_id(session, job_uuid)
+            if not job:
+                return jsonify({'error': 'Render job not found'}), 404
+            return jsonify(job.to_dict()), 200
+        finally:
+            session.close()
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+
+
+@render_jobs_bp.route('/<job_id>/download', methods=['GET'])
+def download_job(job_id):
+    """
+    Скачать готовое изображение задачи.
+
+    GET /api/render-jobs/{id}/download
+
+    Returns:
+        200: PNG изображение
+        400: Неверный формат ID
+        404: Задача или файл результата не найден
+        409: Задача ещё не завершена или завершилась ошибкой
+        500: Ошибка сервера
+    """
+    try:
+        try:
+            job_uuid = uuid.UUID(job_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid render job ID format'}), 400
+
+        session = get_db().get_session()
+        try:
+            job = RenderJob.get_by_id(session, job_uuid)
+            if not job:
+                return jsonify({'error': 'Render job not found'}), 404
+            if job.status != RenderJobStatus.DONE:
+                return jsonify({
+                    'error': 'Render job is not finished',
+                    'status': job.status.value,
+                    'progress': round(job.progress, 1),
+                }), 409
+            if not job.file_path or not os.path.isfile(job.file_path):
+                return jsonify({'error': 'Render job result not found'}), 404
+
+            return send_file(
+                job.file_path,
+                mimetype='image/png',
+                as_attachment=True,
+                download_name=f'{job.kind}_{job.id}.png'
+            )
+        finally:
+            session.close()
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
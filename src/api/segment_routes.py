@@ -0,0 +1,120 @@
+"""
+REST API для получения временного интервала аудио-файла.
+
+Клиент запрашивает интервал по времени, а сервер отдаёт корректный
+WAV (или FLAC) ровно этого интервала, поэтому воспроизведение региона
+не требует скачивания и декодирования всего файла.
+"""
+import os
+import uuid
+
+from flask import Blueprint, Response, jsonify, request
+
+from src.audio.segment import (
+    SEGMENT_FORMATS,
+    SEGMENT_MIMETYPES,
+    WAV_HEADER_SIZE,
+    encode_flac,
+    plan_segment,
+    stream_wav,
+)
+from src.models import AudioFile, get_db
+from src.utils.http_cache import (
+    apply_cache_headers,
+    get_validators,
+    is_not_modified,
+    not_modified_response,
+)
+
+segment_bp = Blueprint('segment', __name__, url_prefix='/api/audio')
+
+
+@segment_bp.route('/<audio_file_id>/segment', methods=['GET'])
+def get_segment(audio_file_id):
+    """
+    Получение интервала аудио-файла как отдельного аудио-файла.
+
+    GET /api/audio/{id}/segment?start=1.5&end=4.5&channels=1&sr=16000&format=wav
+
+    Query parameters:
+        start: Начало интервала в секундах (по умолчанию 0)
+        end: Конец интервала в секундах (по умолчанию конец файла)
+        channels: 1 (моно микс) или исходное количество каналов
+        sr: Частота дискретизации результата, не выше исходной
+        format: wav (PCM 16 бит, по умолчанию) или flac
+
+    Returns:
+        200: Аудио интервала
+        304: Интервал не изменился (If-None-Match)
+        400: Неверные параметры
+        404: AudioFile или файл на диске не найден
+        500: Ошибка сервера
+    """
+    try:
+        try:
+            audio_file_uuid = uuid.UUID(audio_file_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid audio file ID format'}), 400
+
+        start = request.args.get('start', default=0.0, type=float)
+        end = request.args.get('end', type=float)
+        channels = request.args.get('channels', type=int)
+        sample_rate = request.args.get('sr', type=int)
+        output_format = request.args.get('format', default='wav', type=str).lower()
+
+        if start < 0:
+            return jsonify({'error': 'start must be non-negative'}), 400
+        if end is not None and end <= start:
+            return jsonify({'error': 'end must be greater than start'}), 400
+        if output_format not in SEGMENT_FORMATS:
+            return jsonify({'error': f'format must be one of: {", ".join(SEGMENT_FORMATS)}'}), 400
+
+        db = get_db()
+        session = db.get_session()
+
+        try:
+            audio_file = AudioFile.get_by_id(session, audio_file_uuid)
+            if not audio_file:
+                return jsonify({'error': 'Audio file not found'}), 404
+
+            file_path = audio_file.file_path
+            if not os.path.exists(file_path):
+                return jsonify({'error': 'Audio file not found on disk'}), 404
+        finally:
+            session.close()
+
+        try:
+            plan = plan_segment(file_path, start, end, channels, sample_rate, output_format)
+        except ValueError as value_error:
+            return jsonify({'error': str(value_error)}), 400
+
+        etag, last_modified, immutable = get_validators(file_path, {
+            'kind': 'segment',
+            'start_frame': plan.start_frame,
+            'end_frame': plan.end_frame,
+            'channels': plan.channels,
+            'sample_rate': plan.sample_rate,
+            'format': output_format,
+        })
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified, immutable)
+
+        headers = {
+            'Content-Disposition': f'inline; filename="{audio_file_id}_segment.{output_format}"',
+            'X-Segment-Start': str(plan.start_frame / plan.source_rate),
+            'X-Segment-Duration': str(plan.duration),
+            'X-Segment-Sample-Rate': str(plan.sample_rate),
+            'X-Segment-Channels': str(plan.channels),
+        }
+        if output_format == 'wav':
+            # Размер известен заранее - отдаём потоково с Content-Length
+            body = stream_wav(plan)
+            headers['Content-Length'] = str(WAV_HEADER_SIZE + plan.data_bytes)
+        else:
+            body = encode_flac(plan)
+
+        response = Response(body, mimetype=SEGMENT_MIMETYPES[output_format], headers=headers)
+        return apply_cache_headers(response, etag, last_modified, immutable)
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
@@ -0,0 +1,179 @@
+"""
+REST API пакетной генерации миниатюр спектрограмм.
+
+Один запрос на все аннотации списка: файл открывается один раз,
+миниатюры возвращаются спрайтом с картой смещений или ZIP архивом.
+"""
+import base64
+import os
+import uuid
+from dataclasses import asdict
+
+from flask import Blueprint, Response, jsonify, request
+
+from src.audio.raster import RENDERER_VERSION
+from src.audio.render_cache import get_render_cache
+from src.audio.render_pool import RenderUnavailable, get_render_pool
+from src.audio.spectrogram import DEFAULT_COLOR_MAP
+from src.audio.spectrogram_batch import (
+    BATCH_FORMATS,
+    DEFAULT_THUMBNAIL_HEIGHT,
+    DEFAULT_THUMBNAIL_WIDTH,
+    MAX_BATCH_INTERVALS,
+    MAX_THUMBNAIL_HEIGHT,
+    MAX_THUMBNAIL_WIDTH,
+    SPRITE_MAX_COLUMNS,
+    ThumbnailInterval,
+    render_batch,
+    sprite_layout,
+)
+from src.models import AudioFile, get_db
+
+spectrogram_batch_bp = Blueprint('spectrogram_batch', __name__, url_prefix='/api/audio')
+
+
+def parse_intervals(items):
+    """
+    Валидация списка интервалов запроса.
+
+    Returns:
+        tuple: (list ThumbnailInterval или None, error_message)
+    """
+    if not isinstance(items, list) or not items:
+        return None, 'intervals must be a non-empty list'
+    if len(items) > MAX_BATCH_INTERVALS:
+        return None, f'Too many intervals, maximum is {MAX_BATCH_INTERVALS}'
+
+    intervals = []
+    for item in items:
+        if not isinstance(item, dict):
+            return None, 'Each interval must be an object with start_time and end_time'
+        try:
+            start_time = float(item['start_time'])
+            end_time = float(item['end_time'])
+        except (KeyError, ValueError, TypeError):
+            return None, 'start_time and end_time must be numbers'
+        if start_time < 0:
+            return None, 'start_time must be non-negative'
+        if start_time >= end_time:
+            return None, 'start_time must be less than end_time'
+        interval_id = item.get('id')
+        intervals.append(ThumbnailInterval(
+            start_time=start_time,
+            end_time=end_time,
+            id=str(interval_id) if interval_id is not None else None,
+        ))
+    return intervals, None
+
+
+@spectrogram_batch_bp.route('/<audio_file_id>/spectrogram/batch', methods=['POST'])
+def get_spectrogram_batch(audio_file_id):
+    """
+    Миниатюры спектрограмм нескольких интервалов одним запросом.
+
+    POST /api/audio/{id}/spectrogram/batch
+
+    Request body:
+        {
+            "intervals": [{"id": "...", "start_time": 1.5, "end_time": 3.2}, ...],
+            "width": 200 (опционально),
+            "height": 64 (опционально),
+            "color_map": "viridis" (опционально),
+            "format": "sprite" | "zip" (опционально, по умолчанию sprite)
+        }
+
+    Returns:
+        200: JSON со спрайтом (data URL PNG) и картой смещений или application/zip
+        400: Неверные параметры или интервал вне длительности файла
+        404: AudioFile или файл на диске не найден
+        500: Ошибка сервера
+        503: Пул отрисовки занят (заголовок Retry-After)
+    """
+    try:
+        try:
+            audio_file_uuid = uuid.UUID(audio_file_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid audio file ID format'}), 400
+
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be JSON'}), 400
+
+        intervals, error_message = parse_intervals(data.get('intervals'))
+        if error_message:
+            return jsonify({'error': error_message}), 400
+
+        try:
+            width = int(data.get('width', DEFAULT_THUMBNAIL_WIDTH))
+            height = int(data.get('height', DEFAULT_THUMBNAIL_HEIGHT))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'width and height must be integers'}), 400
+        color_map = str(data.get('color_map', DEFAULT_COLOR_MAP))
+        batch_format = str(data.get('format', 'sprite')).lower()
+
+        if width <= 0 or width > MAX_THUMBNAIL_WIDTH:
+            return jsonify({'error': f'Width must be between 1 and {MAX_THUMBNAIL_WIDTH}'}), 400
+        if height <= 0 or height > MAX_THUMBNAIL_HEIGHT:
+            return jsonify({'error': f'Height must be between 1 and {MAX_THUMBNAIL_HEIGHT}'}), 400
+        if batch_format not in BATCH_FORMATS:
+            return jsonify({'error': f'format must be one of: {", ".join(BATCH_FORMATS)}'}), 400
+
+        session = get_db().get_session()
+        try:
+            audio_file = AudioFile.get_by_id(session, audio_file_uuid)
+            if not audio_file:
+                return jsonify({'error': 'Audio file not found'}), 404
+
+            if not os.path.exists(audio_file.file_path):
+                return jsonify({'error': 'Audio file not found on disk'}), 404
+
+            render_params = {
+                'kind': f'spectrogram_{batch_format}',
+                'intervals': [asdict(interval) for interval in intervals],
+                'width': width,
+                'height': height,
+                'color_map': color_map,
+                'renderer_version': RENDERER_VERSION,
+            }
+
+            try:
+                body = get_render_cache().get_or_render(
+                    audio_file.file_path,
+                    render_params,
+                    lambda: get_render_pool().run(
+                        render_batch, audio_file.file_path, intervals, width, height,
+                        color_map, audio_file.id, batch_format
+                    ),
+                )
+            except ValueError as value_error:
+                return jsonify({'error': str(value_error)}), 400
+            except RenderUnavailable as unavailable:
+                return jsonify({'error': str(unavailable)}), 503, {'Retry-After': str(unavailable.retry_after)}
+            except Exception as e:
+                return jsonify({'error': f'Error generating thumbnails: {str(e)}'}), 500
+
+            if batch_format == 'zip':
+                return Response(
+                    body,
+                    mimetype='application/zip',
+                    headers={'Content-Disposition': f'attachment; filename="{audio_file_id}_thumbnails.zip"'}
+                )
+
+            items = [
+                {**asdict(interval), **position}
+                for interval, position in zip(intervals, sprite_layout(len(intervals), width, height))
+            ]
+            return jsonify({
+                'audio_file_id': audio_file_id,
+                'width': width,
+                'height': height,
+                'columns': min(len(intervals), SPRITE_MAX_COLUMNS),
+                'sprite': 'data:image/png;base64,' + base64.b64encode(body).decode('ascii'),
+                'items': items,
+            }), 200
+
+        finally:
+            session.close()
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
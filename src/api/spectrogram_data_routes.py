@@ -0,0 +1,154 @@
+"""
+REST API данных спектрограммы для отрисовки на клиенте.
+
+Клиент получает матрицу dBFS интервала в компактном бинарном виде
+(uint8 с scale/offset или float16) и рисует её на canvas сам: палитра,
+контраст и частотный диапазон меняются без повторных запросов.
+"""
+import os
+import uuid
+
+from flask import Blueprint, Response, jsonify, request
+
+from src.audio.render_cache import make_cache_key
+from src.audio.render_pool import RenderUnavailable, get_render_pool
+from src.audio.single_flight import render_flight
+from src.audio.spectrogram import DEFAULT_WIDTH, SpectrogramParams, validate_time_range
+from src.audio.spectrogram_data import (
+    DATA_FORMATS,
+    DATA_VERSION,
+    DEFAULT_DATA_FORMAT,
+    load_spectrogram_data,
+)
+from src.audio.stft_store import DEFAULT_POOLING, POOLING_METHODS
+from src.models import AudioFile, get_db
+from src.utils.http_cache import (
+    apply_cache_headers,
+    get_validators,
+    is_not_modified,
+    not_modified_response,
+)
+
+spectrogram_data_bp = Blueprint('spectrogram_data', __name__, url_prefix='/api/audio')
+
+# Ограничение количества столбцов ответа
+MAX_DATA_COLUMNS = 5000
+
+
+@spectrogram_data_bp.route('/<audio_file_id>/spectrogram/data', methods=['GET'])
+def get_spectrogram_data(audio_file_id):
+    """
+    Матрица dBFS спектрограммы интервала.
+
+    GET /api/audio/{id}/spectrogram/data?start_time=0&end_time=5&width=1024&format=uint8
+
+    Query parameters:
+        start_time: Начало интервала в секундах (по умолчанию 0)
+        end_time: Конец интервала в секундах (по умолчанию весь файл)
+        width: Максимальное количество столбцов (по умолчанию 1024)
+        format: uint8 (по умолчанию) или float16
+        pooling: max (по умолчанию) или mean
+
+    Returns:
+        200: Бинарная матрица (freq_bins, columns) с осями в заголовках X-Spectrogram-*
+        304: Данные не изменились
+        400: Неверные параметры
+        404: AudioFile или файл на диске не найден
+        500: Ошибка сервера
+        503: Пул отрисовки занят (заголовок Retry-After)
+    """
+    try:
+        try:
+            audio_file_uuid = uuid.UUID(audio_file_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid audio file ID format'}), 400
+
+        start_time = request.args.get('start_time', default=0.0, type=float)
+        end_time = request.args.get('end_time', type=float)
+        width = request.args.get('width', type=int, default=DEFAULT_WIDTH)
+        data_format = request.args.get('format', default=DEFAULT_DATA_FORMAT, type=str).lower()
+        pooling = request.args.get('pooling', type=str, default=DEFAULT_POOLING)
+
+        if start_time < 0:
+            return jsonify({'error': 'start_time must be non-negative'}), 400
+        if end_time is not None and end_time <= 0:
+            return jsonify({'error': 'end_time must be positive'}), 400
+        if width <= 0 or width > MAX_DATA_COLUMNS:
+            return jsonify({'error': f'Width must be between 1 and {MAX_DATA_COLUMNS}'}), 400
+        if data_format not in DATA_FORMATS:
+            return jsonify({'error': f'format must be one of: {", ".join(DATA_FORMATS)}'}), 400
+        if pooling not in POOLING_METHODS:
+            return jsonify({'error': f'pooling must be one of: {", ".join(POOLING_METHODS)}'}), 400
+
+        params = SpectrogramParams(
+            start_time=start_time, end_time=end_time, width=width, pooling=pooling
+        )
+
+        session = get_db().get_session()
+        try:
+            audio_file = AudioFile.get_by_id(session, audio_file_uuid)
+            if not audio_file:
+                return jsonify({'error': 'Audio file not found'}), 404
+
+            if not os.path.exists(audio_file.file_path):
+                return jsonify({'error': 'Audio file not found on disk'}), 404
+
+            # Интервал проверяется по длительности из БД, без повторного разбора файла
+            try:
+                validate_time_range(params, audio_file.duration)
+            except ValueError as value_error:
+                return jsonify({'error': str(value_error)}), 400
+
+            data_params = {
+                'kind': 'spectrogram_data',
+                'version': DATA_VERSION,
+                'start_time': start_time,
+                'end_time': end_time,
+                'width': width,
+                'format': data_format,
+                'pooling': pooling,
+            }
+            etag, last_modified, immutable = get_validators(audio_file.file_path, data_params)
+            if is_not_modified(etag, last_modified):
+                return not_modified_response(etag, last_modified, immutable)
+
+            try:
+                # Одинаковые одновременные запросы ждут одного расчёта
+                data = render_flight.do(
+                    make_cache_key(audio_file.file_path, data_params),
+                    lambda: get_render_pool().run(
+                        load_spectrogram_data, audio_file.file_path, params, audio_file.id
+                    ),
+                )
+            except ValueError as value_error:
+                return jsonify({'error': str(value_error)}), 400
+            except RenderUnavailable as unavailable:
+                return jsonify({'error': str(unavailable)}), 503, {'Retry-After': str(unavailable.retry_after)}
+            except Exception as e:
+                return jsonify({'error': f'Error computing spectrogram: {str(e)}'}), 500
+
+            body, scale, offset = data.encode(data_format)
+            response = Response(
+                body,
+                mimetype='application/octet-stream',
+                headers={
+                    'X-Spectrogram-Format': data_format,
+                    'X-Spectrogram-Bins': str(data.freq_bins),
+                    'X-Spectrogram-Columns': str(data.columns),
+                    'X-Spectrogram-Scale': repr(scale),
+                    'X-Spectrogram-Offset': repr(offset),
+                    'X-Spectrogram-Sample-Rate': str(data.sample_rate),
+                    'X-Spectrogram-Freq-Step': repr(data.freq_step),
+                    'X-Spectrogram-Start-Time': repr(data.start_time),
+                    'X-Spectrogram-End-Time': repr(data.end_time),
+                    'X-Spectrogram-Time-Step': repr(data.time_step),
+                    'X-Audio-Duration': str(audio_file.duration),
+                }
+            )
+            return apply_cache_headers(response, etag, last_modified, immutable)
+
+        finally:
+            session.close()
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
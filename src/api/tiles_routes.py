@@ -0,0 +1,162 @@
+"""
+REST API тайлов спектрограммы.
+
+Клиент выбирает уровень, ближайший к текущему масштабу, и собирает
+видимую часть спектрограммы из тайлов фиксированного размера. Набор
+URL не зависит от позиции прокрутки, поэтому повторный просмотр
+обслуживается кэшем браузера и дисковым кэшем отрисовок.
+"""
+import os
+import uuid
+
+from flask import Blueprint, Response, jsonify, request
+
+from src.audio.raster import RENDERER_VERSION
+from src.audio.render_cache import get_render_cache
+from src.audio.render_pool import RenderUnavailable, get_render_pool
+from src.audio.spectrogram import DEFAULT_COLOR_MAP
+from src.audio.tiles import (
+    DEFAULT_TILE_HEIGHT,
+    MAX_TILE_HEIGHT,
+    TILE_WIDTH,
+    generate_spectrogram_tile,
+    tile_bounds,
+    zoom_levels,
+)
+from src.models import AudioFile, get_db
+from src.utils.http_cache import (
+    apply_cache_headers,
+    get_file_version,
+    get_validators,
+    is_not_modified,
+    not_modified_response,
+)
+
+tiles_bp = Blueprint('tiles', __name__, url_prefix='/api/audio')
+
+
+def _get_audio_file(audio_file_id):
+    """
+    AudioFile по строковому ID.
+
+    Returns:
+        Tuple (AudioFile или None, ответ с ошибкой или None)
+    """
+    try:
+        audio_file_uuid = uuid.UUID(audio_file_id)
+    except ValueError:
+        return None, (jsonify({'error': 'Invalid audio file ID format'}), 400)
+
+    session = get_db().get_session()
+    try:
+        audio_file = AudioFile.get_by_id(session, audio_file_uuid)
+        if not audio_file:
+            return None, (jsonify({'error': 'Audio file not found'}), 404)
+        if not os.path.exists(audio_file.file_path):
+            return None, (jsonify({'error': 'Audio file not found on disk'}), 404)
+        session.expunge(audio_file)
+        return audio_file, None
+    finally:
+        session.close()
+
+
+@tiles_bp.route('/<audio_file_id>/spectrogram/tiles', methods=['GET'])
+def get_tile_levels(audio_file_id):
+    """
+    Описание уровней тайлов спектрограммы.
+
+    GET /api/audio/{id}/spectrogram/tiles
+
+    Returns:
+        200: JSON с размером тайла, версией файла и уровнями
+        400: Неверный формат ID
+        404: AudioFile или файл на диске не найден
+        500: Ошибка сервера
+    """
+    try:
+        audio_file, error = _get_audio_file(audio_file_id)
+        if error:
+            return error
+
+        return jsonify({
+            'audio_file_id': audio_file_id,
+            'duration': audio_file.duration,
+            'version': get_file_version(audio_file.file_path),
+            'tile_width': TILE_WIDTH,
+            'tile_height': DEFAULT_TILE_HEIGHT,
+            'url_template': f'/api/audio/{audio_file_id}/spectrogram/tiles/{{zoom}}/{{index}}.png',
+            'levels': zoom_levels(audio_file.duration),
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+
+
+@tiles_bp.route('/<audio_file_id>/spectrogram/tiles/<int:zoom>/<int:index>.png', methods=['GET'])
+def get_tile(audio_file_id, zoom, index):
+    """
+    PNG тайла спектрограммы.
+
+    GET /api/audio/{id}/spectrogram/tiles/{zoom}/{index}.png?height=256&color_map=viridis&v=...
+
+    Query parameters:
+        height: Высота тайла в пикселях (по умолчанию 256)
+        color_map: Название палитры matplotlib (по умолчанию viridis)
+        v: Версия файла; при совпадении тайл отдаётся как immutable
+
+    Returns:
+        200: PNG тайла
+        304: Тайл не изменился
+        400: Неверные параметры
+        404: AudioFile не найден или тайл вне длительности файла
+        500: Ошибка сервера
+        503: Пул отрисовки занят (заголовок Retry-After)
+    """
+    try:
+        height = request.args.get('height', type=int, default=DEFAULT_TILE_HEIGHT)
+        color_map = request.args.get('color_map', type=str, default=DEFAULT_COLOR_MAP)
+        if height <= 0 or height > MAX_TILE_HEIGHT:
+            return jsonify({'error': f'Height must be between 1 and {MAX_TILE_HEIGHT}'}), 400
+
+        audio_file, error = _get_audio_file(audio_file_id)
+        if error:
+            return error
+
+        try:
+            tile_bounds(zoom, index, audio_file.duration)
+        except ValueError as value_error:
+            return jsonify({'error': str(value_error)}), 404
+
+        render_params = {
+            'kind': 'spectrogram_tile',
+            'zoom': zoom,
+            'index': index,
+            'height': height,
+            'color_map': color_map,
+        }
+        etag, last_modified, immutable = get_validators(
+            audio_file.file_path, {**render_params, 'renderer_version': RENDERER_VERSION}
+        )
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified, immutable)
+
+        try:
+            png_data = get_render_cache().get_or_render(
+                audio_file.file_path,
+                render_params,
+                lambda: get_render_pool().run(
+                    generate_spectrogram_tile,
+                    audio_file.file_path, zoom, index, audio_file.duration,
+                    height=height, color_map=color_map, audio_file_id=audio_file.id
+                ),
+            )
+        except ValueError as value_error:
+            return jsonify({'error': str(value_error)}), 400
+        except RenderUnavailable as unavailable:
+            return jsonify({'error': str(unavailable)}), 503, {'Retry-After': str(unavailable.retry_after)}
+
+        response = Response(png_data, mimetype='image/png')
+        return apply_cache_headers(response, etag, last_modified, immutable)
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
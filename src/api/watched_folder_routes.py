@@ -0,0 +1,190 @@
+"""
+REST API наблюдаемых каталогов.
+
+Каталог регистрируется один раз; повторные импорты заменяются
+инкрементальным пересканированием по манифесту (размер, mtime, inode),
+которое обрабатывает только новые, изменённые, переименованные и
+исчезнувшие файлы. С флагом live изменения отслеживаются через inotify.
+"""
+import os
+import uuid
+
+from flask import Blueprint, jsonify, request
+
+from src.api.import_routes import parse_import_options
+from src.audio.live_watch import get_live_watch, start_live_watch, stop_live_watch
+from src.audio.watch import create_watched_folder, delete_watched_folder, rescan_folder
+from src.models import WatchedFolder, get_db
+
+watched_folders_bp = Blueprint('watched_folders', __name__, url_prefix='/api/watched-folders')
+
+
+def _folder_dict(folder: WatchedFolder) -> dict:
+    """JSON каталога с признаком работающего live-наблюдения."""
+    data = folder.to_dict()
+    data['live_active'] = get_live_watch(folder.id) is not None
+    return data
+
+
+@watched_folders_bp.route('', methods=['POST'])
+def add_folder():
+    """
+    Добавить наблюдаемый каталог (первое сканирование ставится в очередь).
+
+    POST /api/watched-folders
+
+    Request body:
+        {
+            "path": "/path/to/folder",
+            "recursive": true (опционально),
+            "include": ["*.wav"] (опционально),
+            "exclude": ["tmp"] (опционально),
+            "max_depth": 2 (опционально),
+            "live": true (опционально, отслеживание через inotify)
+        }
+
+    Returns:
+        201: JSON каталога
+        400: Неверные параметры
+        404: Директория не найдена
+        409: Каталог уже наблюдается
+        500: Ошибка сервера
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be JSON'}), 400
+
+        folder_path = data.get('path')
+        if not folder_path:
+            return jsonify({'error': 'path is required'}), 400
+        if not os.path.exists(folder_path):
+            return jsonify({'error': 'Directory not found'}), 404
+        if not os.path.isdir(folder_path):
+            return jsonify({'error': 'Path is not a directory'}), 400
+
+        live = data.get('live', False)
+        if not isinstance(live, bool):
+            return jsonify({'error': 'live must be a boolean'}), 400
+        try:
+            options = parse_import_options(data)
+        except ValueError as value_error:
+            return jsonify({'error': str(value_error)}), 400
+
+        try:
+            folder = create_watched_folder(folder_path, options, live)
+        except ValueError as value_error:
+            return jsonify({'error': str(value_error)}), 409
+        if live:
+            start_live_watch(folder)
+        return jsonify(_folder_dict(folder)), 201, {'Location': f'/api/watched-folders/{folder.id}'}
+
+    except Exception as e:
+        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+
+
+@watched_folders_bp.route('', methods=['GET'])
+def list_folders():
+    """
+    Список наблюдаемых каталогов.
+
+    GET /api/watched-folders
+
+    Returns:
+        200: {"folders": [...]}
+    """
+    session = get_db().get_session()
+    try:
+        folders = session.query(WatchedFolder).order_by(WatchedFolder.created_at).all()
+        return jsonify({'folders': [_folder_dict(folder) for folder in folders]}), 200
+    except Exception as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    finally:
+        session.close()
+
+
+@watched_folders_bp.route('/<folder_id>', methods=['GET'])
+def get_folder(folder_id):
+    """
+    Наблюдаемый каталог с итогом последнего сканирования.
+
+    GET /api/watched-folders/{id}
+
+    Returns:
+        200: JSON каталога
+        400: Неверный формат ID
+        404: Каталог не найден
+    """
+    try:
+        folder_uuid = uuid.UUID(folder_id)
+    except ValueError:
+        return jsonify({'error': 'Invalid watched folder ID format'}), 400
+
+    session = get_db().get_session()
+    try:
+        folder = WatchedFolder.get_by_id(session, folder_uuid)
+        if folder is None:
+            return jsonify({'error': 'Watched folder not found'}), 404
+        return jsonify(_folder_dict(folder)), 200
+    except Exception as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    finally:
+        session.close()
+
+
+@watched_folders_bp.route('/<folder_id>/rescan', methods=['POST'])
+def rescan(folder_id):
+    """
+    Пересканировать каталог по манифесту.
+
+    POST /api/watched-folders/{id}/rescan
+
+    Returns:
+        200: {"new", "copies", "changed", "moved", "vanished", "unchanged", "failed", "errors", "elapsed"}
+        400: Неверный формат ID
+        404: Каталог не найден
+        500: Ошибка сканирования
+    """
+    try:
+        folder_uuid = uuid.UUID(folder_id)
+    except ValueError:
+        return jsonify({'error': 'Invalid watched folder ID format'}), 400
+
+    try:
+        result = rescan_folder(folder_uuid)
+    except Exception as e:
+        return jsonify({'error': f'Rescan failed: {str(e)}'}), 500
+
+    if result is None:
+        return jsonify({'error': 'Watched folder not found'}), 404
+    return jsonify(result.to_dict()), 200
+
+
+@watched_folders_bp.route('/<folder_id>', methods=['DELETE'])
+def remove_folder(folder_id):
+    """
+    Прекратить наблюдение за каталогом.
+
+    DELETE /api/watched-folders/{id}
+
+    Импортированные файлы и их аннотации остаются в БД.
+
+    Returns:
+        200: {"deleted": id}
+        400: Неверный формат ID
+        404: Каталог не найден
+    """
+    try:
+        folder_uuid = uuid.UUID(folder_id)
+    except ValueError:
+        return jsonify({'error': 'Invalid watched folder ID format'}), 400
+
+    stop_live_watch(folder_uuid)
+    try:
+        deleted = delete_watched_folder(folder_uuid)
+    except Exception as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+
+    if not deleted:
+        return jsonify({'error': 'Watched folder not found'}), 404
+    return jsonify({'deleted': folder_id}), 200
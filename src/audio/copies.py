@@ -0,0 +1,155 @@
+"""
+Модуль связи путей файлов с записями AudioFile при импорте и пересканировании.
+
+Одна запись AudioFile может иметь несколько путей: основной file_path
+и копии с тем же отпечатком содержимого (см. fingerprint). Функции модуля
+решают, какой путь новый файл, копия известной записи или переименование,
+и переводят записи на оставшуюся копию, когда основной путь исчез.
+"""
+import os
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, update
+
+from src.audio.fingerprint import QUERY_CHUNK_SIZE, fingerprint_row, resolve_copies
+from src.audio.import_probe import ProbeResult
+from src.models import AudioFile, AudioFileStatus, AudioFingerprint, WatchedFile
+
+
+def chunks(items: List, size: int = QUERY_CHUNK_SIZE):
+    """Делит список на части по size элементов."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def manifest_path(root_path: str, relative_path: str) -> str:
+    """Абсолютный путь файла манифеста (relative_path через "/")."""
+    return os.path.join(root_path, *relative_path.split('/'))
+
+
+def split_copies(session, rows: List[Dict], probes: Dict[str, ProbeResult]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Отделяет копии уже известных записей от новых строк audio_files.
+
+    Args:
+        session: SQLAlchemy сессия
+        rows: Строки audio_files с id и file_path
+        probes: Путь -> ProbeResult с отпечатком
+
+    Returns:
+        (строки новых записей, строки audio_fingerprints для всех файлов)
+    """
+    owners = resolve_copies(session, [
+        (row['file_path'], probes[row['file_path']].fingerprint, row['id'])
+        for row in rows if probes[row['file_path']].fingerprint is not None
+    ])
+    fingerprints = [
+        fingerprint_row(path, probes[path].metadata['file_size'], probes[path].fingerprint, owner)
+        for path, owner in owners.items()
+    ]
+    new_rows = [row for row in rows if owners.get(row['file_path'], row['id']) == row['id']]
+    return new_rows, fingerprints
+
+
+def split_changed_copies(session, changed: List[Tuple]) -> Tuple[List[Tuple], List[Tuple]]:
+    """
+    Делит изменённые файлы манифеста на основные пути записей и их копии.
+
+    Изменённая копия больше не копия: её отпечаток удаляется,
+    и файл импортируется заново.
+
+    Args:
+        session: SQLAlchemy сессия
+        changed: Пары (строка WatchedFile, состояние файла с path)
+
+    Returns:
+        (основные пути, копии)
+    """
+    if not changed:
+        return changed, []
+    paths = {}
+    for ids in chunks(list({row.audio_file_id for row, _ in changed})):
+        paths.update(session.query(AudioFile.id, AudioFile.file_path).filter(AudioFile.id.in_(ids)))
+    own, copies = [], []
+    for row, stat in changed:
+        (own if paths.get(row.audio_file_id) == stat.path else copies).append((row, stat))
+    for batch in chunks([stat.path for _, stat in copies]):
+        session.execute(delete(AudioFingerprint).where(AudioFingerprint.file_path.in_(batch)))
+    return own, copies
+
+
+def apply_moves(session, root_path: str, new: List, vanished: List) -> Tuple[List, List, int]:
+    """
+    Исчезнувший путь и новый с тем же файлом (inode, размер, mtime) - переименование.
+
+    Путь меняется в манифесте, в отпечатке и, если переименован основной
+    путь записи, в AudioFile.
+
+    Returns:
+        (оставшиеся новые файлы, оставшиеся исчезнувшие строки, число переименований)
+    """
+    if not new or not vanished:
+        return new, vanished, 0
+    by_identity = {(row.inode, row.size, row.mtime_ns): row for row in vanished}
+    remaining = []
+    moved_ids = set()
+    for stat in new:
+        row = by_identity.pop((stat.inode, stat.size, stat.mtime_ns), None)
+        if row is None:
+            remaining.append(stat)
+            continue
+        moved_ids.add(row.id)
+        session.execute(
+            update(WatchedFile).where(WatchedFile.id == row.id).values(relative_path=stat.relative_path)
+        )
+        old_path = manifest_path(root_path, row.relative_path)
+        if row.audio_file_id is not None:
+            # Переименована копия - основной путь записи не меняется
+            session.execute(
+                update(AudioFile).where(
+                    AudioFile.id == row.audio_file_id, AudioFile.file_path == old_path
+                ).values(file_path=stat.path, filename=os.path.basename(stat.path))
+            )
+        session.execute(
+            update(AudioFingerprint).where(AudioFingerprint.file_path == old_path).values(file_path=stat.path)
+        )
+    session.commit()
+    return remaining, [row for row in vanished if row.id not in moved_ids], len(moved_ids)
+
+
+def apply_vanished(session, root_path: str, vanished: List) -> None:
+    """
+    Файлы исчезли: записи переходят на оставшуюся копию или помечаются MISSING.
+
+    Исчезнувшая копия только удаляется из манифеста и отпечатков.
+    """
+    if not vanished:
+        return
+    for batch in chunks(vanished):
+        paths = [manifest_path(root_path, row.relative_path) for row in batch]
+        audio_ids = [row.audio_file_id for row in batch if row.audio_file_id is not None]
+        session.execute(delete(AudioFingerprint).where(AudioFingerprint.file_path.in_(paths)))
+        session.execute(delete(WatchedFile).where(WatchedFile.id.in_([row.id for row in batch])))
+        if not audio_ids:
+            continue
+        lost = [
+            file_id for (file_id,) in session.query(AudioFile.id).filter(
+                AudioFile.id.in_(audio_ids), AudioFile.file_path.in_(paths)
+            )
+        ]
+        survivors = {}
+        for file_id, file_path in session.query(
+            AudioFingerprint.audio_file_id, AudioFingerprint.file_path
+        ).filter(AudioFingerprint.audio_file_id.in_(lost)):
+            survivors.setdefault(file_id, file_path)
+        missing = [file_id for file_id in lost if file_id not in survivors]
+        if missing:
+            session.execute(
+                update(AudioFile).where(AudioFile.id.in_(missing)).values(status=AudioFileStatus.MISSING)
+            )
+        if survivors:
+            session.execute(update(AudioFile), [
+                {'id': file_id, 'file_path': file_path, 'filename': os.path.basename(file_path)}
+                for file_id, file_path in survivors.items()
+            ])
+    session.commit()
@@ -0,0 +1,120 @@
+"""
+Модуль для потокового вычисления огибающей аудио-сигнала.
+
+Файл читается крупными блоками через AudioReader, каждый блок
+сворачивается в min/max/RMS по бинам средствами NumPy. Используется
+для генерации waveform и построения пирамиды peaks.
+"""
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.audio.reader import get_audio_reader
+
+# Размер блока чтения в фреймах (~6 секунд при 44.1 kHz)
+BLOCK_FRAMES = 1 << 18
+
+
+@dataclass
+class Envelope:
+    """
+    Огибающая сигнала, посчитанная по бинам.
+
+    Attributes:
+        mins: Минимумы по бинам, shape (bins, channels)
+        maxs: Максимумы по бинам, shape (bins, channels)
+        rms: Среднеквадратичное значение по бинам, shape (bins, channels)
+        sample_rate: Частота дискретизации исходного файла
+        frames: Количество исходных фреймов, покрытых огибающей
+    """
+
+    mins: np.ndarray
+    maxs: np.ndarray
+    rms: np.ndarray
+    sample_rate: int
+    frames: int
+
+
+def compute_envelope(
+    file_path: str,
+    bins: int,
+    start_frame: int = 0,
+    end_frame: Optional[int] = None,
+    mono: bool = True,
+    block_frames: int = BLOCK_FRAMES,
+    progress: Optional[Callable[[float], None]] = None
+) -> Envelope:
+    """
+    Вычисляет min/max/RMS огибающую потоковым чтением файла.
+
+    Файл читается крупными блоками через AudioReader, каждый блок
+    сворачивается в бины векторно (reduceat), поэтому весь сигнал
+    никогда не находится в памяти целиком.
+
+    Args:
+        file_path: Путь к аудио-файлу
+        bins: Количество бинов (обычно ширина изображения в пикселях)
+        start_frame: Первый фрейм интервала
+        end_frame: Фрейм конца интервала (не включительно), None - до конца файла
+        mono: Сводить каналы в моно (среднее значение) перед свёрткой
+        block_frames: Размер блока чтения в фреймах
+        progress: Вызывается после каждого блока с долей прочитанных фреймов (0..1)
+
+    Returns:
+        Envelope с массивами формы (bins, channels).
+        Если фреймов меньше чем bins, количество бинов уменьшается до числа фреймов.
+    """
+    reader = get_audio_reader(file_path)
+    start = max(0, start_frame)
+    end = reader.frames if end_frame is None else min(end_frame, reader.frames)
+    total = max(0, end - start)
+    channels = 1 if mono else reader.channels
+
+    bins = max(1, min(bins, total))
+    mins = np.full((bins, channels), np.inf, dtype=np.float32)
+    maxs = np.full((bins, channels), -np.inf, dtype=np.float32)
+    squares = np.zeros((bins, channels), dtype=np.float64)
+    counts = np.zeros(bins, dtype=np.int64)
+
+    position = 0
+    with reader:
+        for block in reader.blocks(block_frames, start, end):
+            if mono:
+                block = block.mean(axis=1, keepdims=True)
+            size = block.shape[0]
+
+            # Фрейм s принадлежит бину s * bins // total; бин k начинается
+            # с фрейма ceil(k * total / bins). Границы считаем по бинам, а не по фреймам.
+            first_bin = position * bins // total
+            last_bin = (position + size - 1) * bins // total
+            segment_bins = np.arange(first_bin, last_bin + 1, dtype=np.int64)
+            starts = -(-segment_bins * total // bins) - position
+            starts[0] = 0
+
+            mins[segment_bins] = np.minimum(
+                mins[segment_bins], np.minimum.reduceat(block, starts, axis=0)
+            )
+            maxs[segment_bins] = np.maximum(
+                maxs[segment_bins], np.maximum.reduceat(block, starts, axis=0)
+            )
+            squares[segment_bins] += np.add.reduceat(
+                np.square(block, dtype=np.float64), starts, axis=0
+            )
+            counts[segment_bins] += np.diff(np.append(starts, size))
+            position += size
+            if progress is not None:
+                progress(min(1.0, position / total))
+
+    empty = counts == 0
+    mins[empty] = 0.0
+    maxs[empty] = 0.0
+    rms = np.sqrt(squares / np.maximum(counts, 1)[:, None]).astype(np.float32)
+
+    return Envelope(
+        mins=mins,
+        maxs=maxs,
+        rms=rms,
+        sample_rate=reader.samplerate,
+        frames=position
+    )
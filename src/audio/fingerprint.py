@@ -0,0 +1,278 @@
+"""
+Модуль отпечатков содержимого для поиска копий записей при импорте.
+
+Одна и та же запись часто лежит по нескольким путям (копии на разных
+дисках), а импорт сравнивает только пути. Быстрый отпечаток - размер
+и BLAKE2b начального, среднего и конечного блоков по
+FINGERPRINT_BLOCK_SIZE байт - читает не больше трёх блоков независимо
+от размера файла и вычисляется вместе с метаданными в процессах пула
+импорта. По индексу quick_hash в audio_fingerprints копия находится
+одним запросом на пачку; она не создаёт новый AudioFile, а становится
+ещё одним путём существующей записи - аннотации у копий общие.
+
+Полный SHA-256 содержимого вычисляется только в фоне потоковым чтением
+по FULL_HASH_CHUNK_SIZE. Если полный хэш копии расходится с хэшем
+основного файла записи (совпали только проверенные блоки), копия
+отделяется в собственный AudioFile. Проверка по умолчанию выключена
+(FINGERPRINT_FULL_HASH=true включает): она читает каждый файл целиком
+и пишет в ту же SQLite, что и импорт.
+
+Записи, у которых отпечатка нет (добавлены до появления отпечатков),
+дозаполняются в фоне при старте сервера (FINGERPRINT_BACKFILL).
+"""
+import hashlib
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from src.audio.metadata import extract_metadata
+from src.models import AudioFile, AudioFileStatus, AudioFingerprint, WatchedFile, WatchedFolder, get_db
+
+# Конфигурация
+FINGERPRINT_BLOCK_SIZE = int(os.getenv('FINGERPRINT_BLOCK_SIZE', str(64 * 1024)))
+FULL_HASH_ENABLED = os.getenv('FINGERPRINT_FULL_HASH', 'false').lower() == 'true'
+BACKFILL_ENABLED = os.getenv('FINGERPRINT_BACKFILL', 'true').lower() == 'true'
+FULL_HASH_CHUNK_SIZE = 1024 * 1024  # Байт за одно чтение полного хэша
+QUERY_CHUNK_SIZE = 500  # Значений в одном IN (...)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fingerprint')
+_pending: List[Future] = []
+_pending_lock = threading.Lock()
+
+
+def quick_fingerprint(file_path: str) -> str:
+    """
+    Быстрый отпечаток: размер и хэш начального, среднего и конечного блоков.
+
+    Файлы не больше трёх блоков хэшируются целиком.
+
+    Raises:
+        OSError: Если файл не удалось прочитать
+    """
+    block = FINGERPRINT_BLOCK_SIZE
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(size.to_bytes(8, 'little'))
+        if size <= 3 * block:
+            digest.update(f.read())
+        else:
+            for offset in (0, (size - block) // 2, size - block):
+                f.seek(offset)
+                digest.update(f.read(block))
+    return f'{size:x}-{digest.hexdigest()}'
+
+
+def full_content_hash(file_path: str) -> str:
+    """SHA-256 всего содержимого, потоковым чтением."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(FULL_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def resolve_copies(session, candidates: Iterable[Tuple[str, str, object]]) -> Dict[str, object]:
+    """
+    Находит записи, копиями которых являются файлы.
+
+    Отпечатки ищутся по индексу одним запросом на QUERY_CHUNK_SIZE значений;
+    совпадения внутри самих кандидатов тоже учитываются.
+
+    Args:
+        session: SQLAlchemy сессия
+        candidates: (путь, быстрый отпечаток, ID нового AudioFile)
+
+    Returns:
+        dict: путь -> ID AudioFile (существующей записи для копии, иначе собственный)
+    """
+    candidates = list(candidates)
+    hashes = list({quick_hash for _, quick_hash, _ in candidates})
+    known: Dict[str, object] = {}
+    for start in range(0, len(hashes), QUERY_CHUNK_SIZE):
+        rows = session.query(AudioFingerprint.quick_hash, AudioFingerprint.audio_file_id).filter(
+            AudioFingerprint.quick_hash.in_(hashes[start:start + QUERY_CHUNK_SIZE])
+        )
+        for quick_hash, audio_file_id in rows:
+            known.setdefault(quick_hash, audio_file_id)
+    return {path: known.setdefault(quick_hash, file_id) for path, quick_hash, file_id in candidates}
+
+
+def insert_fingerprints(session, rows: List[Dict]) -> None:
+    """
+    Вставляет отпечатки одним executemany (без commit).
+
+    Args:
+        rows: Словари с id, audio_file_id, file_path, file_size, quick_hash
+    """
+    if rows:
+        session.execute(insert(AudioFingerprint), rows)
+
+
+def fingerprint_row(file_path: str, file_size: int, quick_hash: str, audio_file_id) -> Dict:
+    """Строка audio_fingerprints для insert_fingerprints."""
+    return {
+        'id': uuid.uuid4(),
+        'audio_file_id': audio_file_id,
+        'file_path': file_path,
+        'file_size': file_size,
+        'quick_hash': quick_hash,
+    }
+
+
+def add_fingerprint(session, audio_file_id, file_path: str) -> Optional[Dict]:
+    """
+    Отпечаток файла, добавленного вне импорта (без commit).
+
+    Returns:
+        dict: Вставленная строка audio_fingerprints или None, если файл не прочитать
+    """
+    try:
+        row = fingerprint_row(file_path, os.path.getsize(file_path), quick_fingerprint(file_path), audio_file_id)
+    except OSError:
+        return None
+    insert_fingerprints(session, [row])
+    return row
+
+
+def backfill_fingerprints() -> int:
+    """
+    Добавляет отпечатки записям, у которых их нет.
+
+    Записи читаются пачками по QUERY_CHUNK_SIZE в порядке id, каждая пачка -
+    отдельная транзакция. Недоступные файлы пропускаются.
+
+    Returns:
+        int: Число добавленных отпечатков
+    """
+    session = get_db().get_session()
+    added = 0
+    last_id = None
+    try:
+        while True:
+            query = session.query(AudioFile.id, AudioFile.file_path).filter(~AudioFile.fingerprints.any())
+            if last_id is not None:
+                query = query.filter(AudioFile.id > last_id)
+            chunk = query.order_by(AudioFile.id).limit(QUERY_CHUNK_SIZE).all()
+            if not chunk:
+                return added
+            rows = []
+            for audio_file_id, file_path in chunk:
+                try:
+                    rows.append(fingerprint_row(
+                        file_path, os.path.getsize(file_path), quick_fingerprint(file_path), audio_file_id
+                    ))
+                except OSError:
+                    continue
+            insert_fingerprints(session, rows)
+            session.commit()
+            schedule_full_hash([row['id'] for row in rows])
+            added += len(rows)
+            last_id = chunk[-1].id
+    finally:
+        session.close()
+
+
+def schedule_backfill() -> Optional[Future]:
+    """Ставит дозаполнение отпечатков в фоновую очередь (при старте сервера)."""
+    if not BACKFILL_ENABLED:
+        return None
+    return _executor.submit(backfill_fingerprints)
+
+
+def _split_copy(session, fingerprint: AudioFingerprint) -> None:
+    """Копия с другим содержимым получает собственный AudioFile."""
+    try:
+        metadata = extract_metadata(fingerprint.file_path)
+    except Exception:
+        return
+    previous_id = fingerprint.audio_file_id
+    audio_file = AudioFile(
+        file_path=fingerprint.file_path,
+        filename=os.path.basename(fingerprint.file_path),
+        status=AudioFileStatus.LOADED,
+        **metadata
+    )
+    session.add(audio_file)
+    session.flush()
+    fingerprint.audio_file_id = audio_file.id
+
+    # Манифест наблюдаемого каталога тоже указывает на запись по пути копии
+    manifest = session.query(WatchedFile, WatchedFolder.root_path).join(
+        WatchedFolder, WatchedFile.folder_id == WatchedFolder.id
+    ).filter(WatchedFile.audio_file_id == previous_id)
+    for watched_file, root_path in manifest:
+        if os.path.join(root_path, *watched_file.relative_path.split('/')) == fingerprint.file_path:
+            watched_file.audio_file_id = audio_file.id
+    session.commit()
+
+    from src.audio.importer import prepare_playback
+
+    prepare_playback([{'id': audio_file.id, 'file_path': audio_file.file_path, 'file_size': metadata['file_size']}])
+
+
+def _check_copies(session, audio_file_id) -> None:
+    """Отделяет копии, полный хэш которых расходится с основным файлом записи."""
+    audio_file = AudioFile.get_by_id(session, audio_file_id)
+    if audio_file is None:
+        return
+    fingerprints = list(audio_file.fingerprints)
+    primary = next((fp for fp in fingerprints if fp.file_path == audio_file.file_path), None)
+    if primary is None or primary.full_hash is None:
+        return  # Проверка выполнится, когда будет вычислен хэш основного файла
+    for fingerprint in fingerprints:
+        if fingerprint.full_hash is not None and fingerprint.full_hash != primary.full_hash:
+            _split_copy(session, fingerprint)
+
+
+def verify_fingerprints(fingerprint_ids: List) -> int:
+    """
+    Вычисляет полные хэши и отделяет ошибочно объединённые копии.
+
+    Файл, изменившийся после импорта (другой размер), пропускается.
+
+    Returns:
+        int: Число вычисленных хэшей
+    """
+    session = get_db().get_session()
+    hashed = 0
+    try:
+        for fingerprint_id in fingerprint_ids:
+            fingerprint = session.query(AudioFingerprint).filter_by(id=fingerprint_id).first()
+            if fingerprint is None or fingerprint.full_hash is not None:
+                continue
+            try:
+                if os.path.getsize(fingerprint.file_path) != fingerprint.file_size:
+                    continue
+                fingerprint.full_hash = full_content_hash(fingerprint.file_path)
+            except OSError:
+                continue
+            session.commit()
+            hashed += 1
+            _check_copies(session, fingerprint.audio_file_id)
+        return hashed
+    finally:
+        session.close()
+
+
+def schedule_full_hash(fingerprint_ids: List) -> Optional[Future]:
+    """Ставит вычисление полных хэшей в фоновую очередь (если включено)."""
+    if not FULL_HASH_ENABLED or not fingerprint_ids:
+        return None
+    future = _executor.submit(verify_fingerprints, list(fingerprint_ids))
+    with _pending_lock:
+        _pending[:] = [f for f in _pending if not f.done()]
+        _pending.append(future)
+    return future
+
+
+def wait_for_full_hashes(timeout: Optional[float] = None) -> None:
+    """Дождаться поставленных в очередь вычислений полных хэшей."""
+    with _pending_lock:
+        futures = list(_pending)
+    for future in futures:
+        future.result(timeout)
@@ -0,0 +1,219 @@
+"""
+Модуль импорта каталога с событиями прогресса.
+
+Уже добавленные пути каталога (AudioFile и копии) читаются из БД одним
+запросом, дерево обходится по мере импорта (см. importer), метаданные
+новых файлов читаются в пуле процессов, строки вставляются пачками
+по IMPORT_BATCH_SIZE (см. import_probe), копии известных записей
+добавляются ещё одним путём существующей записи (см. copies).
+
+Ход импорта описывается событиями (progress, error, done), которые API
+передаёт клиенту по мере работы. Ошибка чтения отдельного файла не
+прерывает импорт, а попадает в список ошибок с путём относительно каталога.
+"""
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.audio.copies import split_copies
+from src.audio.fingerprint import schedule_full_hash
+from src.audio.import_probe import IMPORT_WORKERS, ProbeQueue, ProbeResult, insert_rows
+from src.audio.importer import IMPORT_BATCH_SIZE, ImportOptions, relative_import_path, walk_audio_files
+from src.models import AudioFile, AudioFileStatus, AudioFingerprint
+
+PROGRESS_INTERVAL = float(os.getenv('IMPORT_PROGRESS_INTERVAL', '0.5'))  # Секунд между событиями
+
+
+@dataclass
+class ImportResult:
+    """Итог импорта каталога."""
+
+    imported: List[Dict] = field(default_factory=list)  # Вставленные строки audio_files
+    errors: List[Dict] = field(default_factory=list)
+    duplicates: List[Dict] = field(default_factory=list)  # Копии уже импортированных записей
+    skipped: int = 0  # Файлы, уже добавленные ранее
+    discovered: int = 0  # Аудио-файлы, прошедшие фильтры
+
+    @property
+    def imported_count(self) -> int:
+        return len(self.imported)
+
+
+def get_existing_paths(session, folder_path: str) -> Set[str]:
+    """Пути AudioFile и их копий внутри каталога - одним запросом."""
+    prefix = os.path.join(folder_path, '')
+    rows = session.query(AudioFile.file_path).filter(
+        AudioFile.file_path.startswith(prefix, autoescape=True)
+    ).union(
+        session.query(AudioFingerprint.file_path).filter(
+            AudioFingerprint.file_path.startswith(prefix, autoescape=True)
+        )
+    )
+    return {file_path for (file_path,) in rows}
+
+
+class FolderImport:
+    """
+    Импорт каталога с событиями прогресса.
+
+    События - словари с полем "event":
+    - progress: счётчики discovered, imported, skipped, failed и rate
+      (обработано файлов в секунду), не чаще PROGRESS_INTERVAL и после
+      каждой вставленной пачки;
+    - error: файл (путь относительно каталога) и текст ошибки;
+    - done: итоговые счётчики.
+
+    Счётчик duplicates - файлы, оказавшиеся копиями известных записей.
+    """
+
+    def __init__(
+        self,
+        session,
+        folder_path: str,
+        options: ImportOptions = ImportOptions(),
+        workers: int = IMPORT_WORKERS,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        on_batch: Optional[Callable[[List[Dict]], None]] = None
+    ):
+        self.session = session
+        self.folder_path = folder_path
+        self.options = options
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.on_batch = on_batch
+        self.result = ImportResult()
+        self._rows: List[Dict] = []
+        self._probes: Dict[str, ProbeResult] = {}
+        self._errors: List[Dict] = []
+        self._started_at = 0.0
+        self._reported_at = 0.0
+
+    def run(self) -> ImportResult:
+        """Выполняет импорт без событий."""
+        for _ in self.events():
+            pass
+        return self.result
+
+    def events(self) -> Iterator[Dict]:
+        """Выполняет импорт, возвращая события по мере работы."""
+        self._started_at = self._reported_at = time.monotonic()
+        existing = get_existing_paths(self.session, self.folder_path)
+        queue = ProbeQueue(self.workers)
+        try:
+            for path in walk_audio_files(self.folder_path, self.options, self._walk_error):
+                self.result.discovered += 1
+                if path in existing:
+                    self.result.skipped += 1
+                else:
+                    yield from self._handle(queue.put(path))
+                yield from self._pending_events()
+            for probes in queue.finish():
+                yield from self._handle(probes)
+            yield from self._pending_events()
+            if self._rows:
+                yield from self._insert()
+        finally:
+            queue.close()
+        yield self._counters('done')
+
+    def _handle(self, probes: Iterable[ProbeResult]) -> Iterator[Dict]:
+        for probe in probes:
+            if probe.error is not None:
+                self._record_error(relative_import_path(probe.file_path, self.folder_path), probe.error)
+                continue
+            metadata = probe.metadata
+            self._rows.append({
+                'id': uuid.uuid4(),
+                'file_path': probe.file_path,
+                'filename': os.path.basename(probe.file_path),
+                'duration': metadata['duration'],
+                'sample_rate': metadata['sample_rate'],
+                'channels': metadata['channels'],
+                'file_size': metadata['file_size'],
+                'created_at': datetime.utcnow(),
+                'status': AudioFileStatus.LOADED,
+            })
+            self._probes[probe.file_path] = probe
+            if len(self._rows) >= self.batch_size:
+                yield from self._insert()
+
+    def _insert(self) -> Iterator[Dict]:
+        rows, self._rows = self._rows, []
+        probes, self._probes = self._probes, {}
+        new_rows, fingerprints = split_copies(self.session, rows, probes)
+        insert_rows(self.session, new_rows, fingerprints)
+        schedule_full_hash([row['id'] for row in fingerprints])
+
+        owners = {row['file_path']: row['audio_file_id'] for row in fingerprints}
+        for row in rows:
+            owner = owners.get(row['file_path'], row['id'])
+            if owner != row['id']:
+                self.result.duplicates.append({
+                    'file': relative_import_path(row['file_path'], self.folder_path),
+                    'duplicate_of': str(owner),
+                })
+        self.result.imported.extend(new_rows)
+        if self.on_batch is not None and new_rows:
+            self.on_batch(new_rows)
+        self._reported_at = time.monotonic()
+        yield self._counters('progress')
+
+    def _walk_error(self, relative_path: str, error: OSError) -> None:
+        self._record_error(relative_path, error.strerror or str(error))
+
+    def _record_error(self, relative_path: str, message: str) -> None:
+        error = {'file': relative_path, 'error': message}
+        self.result.errors.append(error)
+        self._errors.append(error)
+
+    def _pending_events(self) -> Iterator[Dict]:
+        for error in self._errors:
+            yield {'event': 'error', **error}
+        self._errors = []
+        now = time.monotonic()
+        if now - self._reported_at >= PROGRESS_INTERVAL:
+            self._reported_at = now
+            yield self._counters('progress')
+
+    def _counters(self, event: str) -> Dict:
+        result = self.result
+        processed = result.imported_count + len(result.duplicates) + result.skipped + len(result.errors)
+        elapsed = max(time.monotonic() - self._started_at, 1e-6)
+        return {
+            'event': event,
+            'discovered': result.discovered,
+            'imported': result.imported_count,
+            'duplicates': len(result.duplicates),
+            'skipped': result.skipped,
+            'failed': len(result.errors),
+            'rate': round(processed / elapsed, 1),
+            'elapsed': round(elapsed, 3),
+        }
+
+
+def import_folder(
+    session,
+    folder_path: str,
+    workers: int = IMPORT_WORKERS,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    options: ImportOptions = ImportOptions(),
+    on_batch: Optional[Callable[[List[Dict]], None]] = None
+) -> ImportResult:
+    """
+    Импортирует аудио-файлы каталога, ещё не добавленные в БД.
+
+    Args:
+        session: SQLAlchemy сессия
+        folder_path: Каталог с аудио-файлами
+        workers: Число процессов для чтения метаданных
+        batch_size: Строк в одной транзакции вставки
+        options: Рекурсия, глубина и фильтры
+        on_batch: Вызывается со строками каждой вставленной пачки
+
+    Returns:
+        ImportResult со вставленными строками и ошибками по файлам
+    """
+    return FolderImport(session, folder_path, options, workers, batch_size, on_batch).run()
@@ -0,0 +1,190 @@
+"""
+Модуль частотных шкал спектрограммы.
+
+Поддерживаемые шкалы:
+- linear: бины STFT как есть (с обрезкой по fmin/fmax)
+- mel: треугольные фильтры mel (librosa.filters.mel), n_mels полос
+- log: треугольные фильтры с логарифмическим шагом центров, n_mels полос
+- cqt: упрощённый CQT по STFT - полосы постоянной добротности,
+  CQT_BINS_PER_OCTAVE на октаву от fmin до fmax
+
+Матрицы фильтров кэшируются по (шкала, sample_rate, n_fft, полосы,
+fmin, fmax), поэтому запрос платит только одно умножение матрицы
+свёрнутых кадров на фильтры. Линейные бины вне полос фильтров
+отбрасываются до свёртки и перевода в dB: узкая полоса дешевле полной.
+"""
+import math
+import warnings
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import librosa
+import numpy as np
+
+from src.audio.stft_store import AMIN
+
+# Шкалы
+SCALE_LINEAR = 'linear'
+SCALE_MEL = 'mel'
+SCALE_LOG = 'log'
+SCALE_CQT = 'cqt'
+SCALES = (SCALE_LINEAR, SCALE_MEL, SCALE_LOG, SCALE_CQT)
+DEFAULT_SCALE = SCALE_LINEAR
+
+# Параметры полос
+DEFAULT_N_MELS = 128
+MAX_N_MELS = 512
+LOG_FMIN = 32.70  # Нота C1 - нижняя частота log и cqt по умолчанию
+CQT_BINS_PER_OCTAVE = 24
+
+# Допустимые параметры STFT
+N_FFT_CHOICES = (256, 512, 1024, 2048, 4096, 8192)
+MIN_HOP_LENGTH = 64
+
+
+@dataclass(frozen=True)
+class FrequencyBands:
+    """Линейные бины STFT шкалы и матрица фильтров."""
+
+    bins: slice  # Бины STFT, участвующие в расчёте
+    weights: Optional[np.ndarray]  # (bands, bins) для нелинейных шкал, None для linear
+
+
+def validate_scale_params(
+    scale: str, n_fft: int, hop_length: int, n_mels: int, fmin: float, fmax: Optional[float]
+) -> None:
+    """
+    Проверяет параметры шкалы и STFT.
+
+    Raises:
+        ValueError: Если параметр вне допустимого диапазона
+    """
+    if scale not in SCALES:
+        raise ValueError(f'scale must be one of: {", ".join(SCALES)}')
+    if n_fft not in N_FFT_CHOICES:
+        raise ValueError(f'n_fft must be one of: {", ".join(map(str, N_FFT_CHOICES))}')
+    if not MIN_HOP_LENGTH <= hop_length <= n_fft:
+        raise ValueError(f'hop_length must be between {MIN_HOP_LENGTH} and n_fft')
+    if not 1 <= n_mels <= MAX_N_MELS:
+        raise ValueError(f'n_mels must be between 1 and {MAX_N_MELS}')
+    if fmin < 0:
+        raise ValueError('fmin must be non-negative')
+    if fmax is not None and fmax <= fmin:
+        raise ValueError('fmax must be greater than fmin')
+
+
+def resolve_frequency_range(
+    scale: str, sample_rate: int, fmin: float, fmax: Optional[float]
+) -> Tuple[float, float]:
+    """
+    Границы частот шкалы: fmax не выше Nyquist, для log и cqt fmin > 0.
+
+    Raises:
+        ValueError: Если диапазон пуст для данной частоты дискретизации
+    """
+    nyquist = sample_rate / 2
+    fmax = nyquist if fmax is None else min(fmax, nyquist)
+    if scale in (SCALE_LOG, SCALE_CQT) and fmin <= 0:
+        fmin = LOG_FMIN
+    if fmin >= fmax:
+        raise ValueError(f'fmin must be below {fmax:g} Hz for this file')
+    return float(fmin), float(fmax)
+
+
+def _log_triangles(freqs: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Треугольные фильтры на логарифмической оси частот с вершинами в centers."""
+    log_freqs = np.log2(np.maximum(freqs, 1e-3))
+    log_centers = np.log2(centers)
+    step = np.diff(log_centers).mean() if len(centers) > 1 else 1.0
+    edges = np.concatenate(([log_centers[0] - step], log_centers, [log_centers[-1] + step]))
+    lower = (log_freqs[None, :] - edges[:-2, None]) / (edges[1:-1, None] - edges[:-2, None])
+    upper = (edges[2:, None] - log_freqs[None, :]) / (edges[2:, None] - edges[1:-1, None])
+    return np.maximum(0.0, np.minimum(lower, upper))
+
+
+def _finalize(weights: np.ndarray, freqs: np.ndarray, centers: np.ndarray) -> FrequencyBands:
+    """
+    Нормирует фильтры и обрезает неиспользуемые бины.
+
+    Полоса уже шага бинов STFT (низкие частоты) не содержит ни одного бина,
+    такой полосе назначается ближайший бин. Строки нормируются на сумму 1,
+    поэтому полоса - взвешенное среднее амплитуд своих бинов.
+    """
+    empty = weights.sum(axis=1) <= 0
+    if empty.any():
+        nearest = np.abs(freqs[None, :] - centers[empty, None]).argmin(axis=1)
+        weights[np.flatnonzero(empty), nearest] = 1.0
+    weights /= weights.sum(axis=1, keepdims=True)
+
+    used = np.flatnonzero(weights.any(axis=0))
+    first, last = int(used[0]), int(used[-1]) + 1
+    cropped = np.ascontiguousarray(weights[:, first:last], dtype=np.float32)
+    cropped.setflags(write=False)
+    return FrequencyBands(bins=slice(first, last), weights=cropped)
+
+
+@lru_cache(maxsize=64)
+def get_frequency_bands(
+    scale: str, sample_rate: int, n_fft: int, n_mels: int, fmin: float, fmax: Optional[float]
+) -> FrequencyBands:
+    """
+    Бины STFT и фильтры шкалы (кэшируется).
+
+    Args:
+        scale: linear, mel, log или cqt
+        sample_rate: Частота дискретизации файла
+        n_fft: Размер окна STFT
+        n_mels: Количество полос mel и log (для cqt не используется)
+        fmin: Нижняя частота в Гц
+        fmax: Верхняя частота в Гц (None - Nyquist)
+
+    Raises:
+        ValueError: Если шкала неизвестна или диапазон частот пуст
+    """
+    if scale not in SCALES:
+        raise ValueError(f'scale must be one of: {", ".join(SCALES)}')
+    fmin, fmax = resolve_frequency_range(scale, sample_rate, fmin, fmax)
+    freqs = librosa.fft_frequencies(sr=sample_rate, n_fft=n_fft)
+
+    if scale == SCALE_LINEAR:
+        step = sample_rate / n_fft
+        first = min(int(math.floor(fmin / step)), len(freqs) - 1)
+        last = min(len(freqs), int(math.ceil(fmax / step)) + 1)
+        return FrequencyBands(bins=slice(first, max(first + 1, last)), weights=None)
+
+    if scale == SCALE_MEL:
+        # Пустые узкие полосы librosa предупреждает, _finalize назначает им ближайший бин
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            weights = librosa.filters.mel(
+                sr=sample_rate, n_fft=n_fft, n_mels=n_mels, fmin=fmin, fmax=fmax, norm=None
+            ).astype(np.float64)
+        centers = librosa.mel_frequencies(n_mels=n_mels + 2, fmin=fmin, fmax=fmax)[1:-1]
+        return _finalize(weights, freqs, centers)
+
+    if scale == SCALE_LOG:
+        centers = np.geomspace(fmin, fmax, n_mels)
+    else:
+        octaves = math.log2(fmax / fmin)
+        count = max(1, int(math.floor(octaves * CQT_BINS_PER_OCTAVE)) + 1)
+        centers = fmin * 2.0 ** (np.arange(count) / CQT_BINS_PER_OCTAVE)
+    return _finalize(_log_triangles(freqs, centers), freqs, centers)
+
+
+def apply_bands(stft_db: np.ndarray, bands: FrequencyBands) -> np.ndarray:
+    """
+    Переводит кадры линейных бинов в полосы шкалы.
+
+    Args:
+        stft_db: Кадры (frames, bins) в dB, уже обрезанные по bands.bins
+        bands: Результат get_frequency_bands
+
+    Returns:
+        np.ndarray: float32 (frames, bands) в dB; для linear - stft_db без изменений
+    """
+    if bands.weights is None:
+        return stft_db
+    amplitude = np.power(np.float32(10.0), stft_db.astype(np.float32) / np.float32(20.0))
+    banded = amplitude @ bands.weights.T
+    return (20.0 * np.log10(np.maximum(banded, AMIN))).astype(np.float32)
@@ -0,0 +1,323 @@
+"""
+Модуль фоновых задач импорта каталогов с сохранением состояния.
+
+Синхронный импорт теряет весь прогресс при перезапуске сервера.
+Задача ImportJob выполняется фоновым потоком пачками по
+IMPORT_JOB_BATCH_SIZE файлов:
+
+1. новые пути пачки вставляются в audio_files со статусом PENDING -
+   файлы сразу видны в списке;
+2. метаданные читаются в пуле процессов (ProbeQueue импорта);
+3. строки получают статус LOADED с метаданными или ERROR, и в той же
+   транзакции в задаче сохраняются счётчики и курсор - последний
+   обработанный путь.
+
+Обход каталога идёт в порядке компонент пути, поэтому после перезапуска
+задача продолжает обход после курсора, не читая уже обработанные каталоги.
+Строки PENDING, оставшиеся от прерванной пачки, дочитываются повторно.
+Строка PENDING копии уже известной записи (тот же отпечаток содержимого)
+удаляется, а путь копии добавляется к существующей записи; такие файлы
+учитываются в skipped.
+Отмена сохраняется в статусе задачи и проверяется между пачками.
+"""
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, insert, update
+
+from src.audio.copies import split_copies
+from src.audio.fingerprint import insert_fingerprints, schedule_full_hash
+from src.audio.import_probe import IMPORT_WORKERS, ProbeQueue
+from src.audio.importer import ImportOptions, prepare_playback, relative_import_path, walk_audio_files
+from src.models import AudioFile, AudioFileStatus, AudioFingerprint, ImportJob, ImportJobStatus, get_db
+
+# Конфигурация
+IMPORT_JOB_WORKERS = int(os.getenv('IMPORT_JOB_WORKERS', '1'))
+IMPORT_JOB_BATCH_SIZE = int(os.getenv('IMPORT_JOB_BATCH_SIZE', '200'))
+MAX_JOB_ERRORS = 100  # Последних ошибок в записи задачи
+
+_executor = ThreadPoolExecutor(max_workers=IMPORT_JOB_WORKERS, thread_name_prefix='import-job')
+_futures: Dict[str, Future] = {}
+_futures_lock = threading.Lock()
+
+
+def _known_files(session, root_path: str) -> Dict[str, tuple]:
+    """Файлы каталога в БД: путь -> (id, статус); копии записей - с их статусом."""
+    prefix = os.path.join(root_path, '')
+    rows = session.query(AudioFile.file_path, AudioFile.id, AudioFile.status).filter(
+        AudioFile.file_path.startswith(prefix, autoescape=True)
+    )
+    known = {file_path: (file_id, status) for file_path, file_id, status in rows}
+    copies = session.query(AudioFingerprint.file_path, AudioFile.id, AudioFile.status).join(
+        AudioFile, AudioFingerprint.audio_file_id == AudioFile.id
+    ).filter(AudioFingerprint.file_path.startswith(prefix, autoescape=True))
+    for file_path, file_id, status in copies:
+        known.setdefault(file_path, (file_id, status))
+    return known
+
+
+class _JobRunner:
+    """Выполнение одной задачи импорта в сессии фонового потока."""
+
+    def __init__(self, session, job: ImportJob, workers: int, batch_size: int):
+        self.session = session
+        self.job = job
+        self.root_path = job.root_path
+        self.options = ImportOptions(**job.get_options())
+        self.batch_size = max(1, batch_size)
+        self.queue = ProbeQueue(workers)
+        self.known = _known_files(session, self.root_path)
+        self.errors: List[Dict] = []
+
+    def run(self) -> None:
+        """Обрабатывает пачки, пока обход не закончится или задачу не отменят."""
+        paths = walk_audio_files(
+            self.root_path, self.options,
+            lambda path, error: self._record_error(path, error.strerror or str(error)),
+            self.job.cursor
+        )
+        try:
+            while True:
+                batch = [path for _, path in zip(range(self.batch_size), paths)]
+                if not batch and not self.errors:
+                    break
+                self._process(batch)
+                if self._cancelled():
+                    return
+        finally:
+            self.queue.close()
+
+    def _process(self, batch: List[str]) -> None:
+        job = self.job
+        job.discovered += len(batch)
+        targets = []  # (id, путь) файлов, метаданные которых нужно прочитать
+        new_rows = []
+        for path in batch:
+            known = self.known.get(path)
+            if known is None:
+                file_id = uuid.uuid4()
+                new_rows.append({
+                    'id': file_id,
+                    'file_path': path,
+                    'filename': os.path.basename(path),
+                    'duration': 0.0,
+                    'sample_rate': 0,
+                    'channels': 0,
+                    'file_size': 0,
+                    'status': AudioFileStatus.PENDING,
+                })
+                targets.append((file_id, path))
+            elif known[1] == AudioFileStatus.PENDING:
+                targets.append((known[0], path))  # Остаток прерванной пачки
+            else:
+                job.skipped += 1
+
+        # Новые файлы сразу видны в списке со статусом PENDING
+        if new_rows:
+            self.session.execute(insert(AudioFile), new_rows)
+            self.session.commit()
+
+        updates = []
+        probes = {}
+        for (file_id, path), probe in zip(targets, self._probe([path for _, path in targets])):
+            if probe.error is not None:
+                updates.append({'id': file_id, 'status': AudioFileStatus.ERROR})
+                self._record_error(relative_import_path(path, self.root_path), probe.error)
+                continue
+            updates.append({'id': file_id, 'status': AudioFileStatus.LOADED, **probe.metadata})
+            probes[path] = probe
+
+        # Копии известных записей: строка PENDING заменяется путём копии
+        records, fingerprints = split_copies(
+            self.session, [{'id': file_id, 'file_path': path} for file_id, path in targets if path in probes], probes
+        )
+        kept = {row['id'] for row in records}
+        copies = {file_id for file_id, path in targets if path in probes and file_id not in kept}
+        targets = [(file_id, path) for file_id, path in targets if file_id not in copies]
+        updates = [row for row in updates if row['id'] not in copies]
+        job.skipped += len(copies)
+
+        # Статусы файлов, отпечатки и курсор сохраняются одной транзакцией
+        if copies:
+            self.session.execute(delete(AudioFile).where(AudioFile.id.in_(list(copies))))
+        insert_fingerprints(self.session, fingerprints)
+        if updates:
+            self.session.execute(update(AudioFile), updates)
+        loaded = [
+            {'id': row['id'], 'file_path': path, 'file_size': row['file_size']}
+            for row, (_, path) in zip(updates, targets)
+            if row['status'] == AudioFileStatus.LOADED
+        ]
+        job.imported += len(loaded)
+        job.failed += len(self.errors)
+        job.errors = json.dumps((job.get_errors() + self.errors)[-MAX_JOB_ERRORS:])
+        self.errors = []
+        if batch:
+            job.cursor = relative_import_path(batch[-1], self.root_path)
+        self.session.commit()
+        schedule_full_hash([row['id'] for row in fingerprints])
+        prepare_playback(loaded)
+
+    def _probe(self, paths: List[str]) -> List:
+        results = []
+        for path in paths:
+            results.extend(self.queue.put(path))
+        for probes in self.queue.finish():
+            results.extend(probes)
+        return results
+
+    def _record_error(self, relative_path: str, message: str) -> None:
+        self.errors.append({'file': relative_path, 'error': message})
+
+    def _cancelled(self) -> bool:
+        """Отмена записывается другой сессией - перечитываем статус."""
+        self.session.refresh(self.job)
+        return self.job.status == ImportJobStatus.CANCELLED
+
+
+def run_import_job(
+    job_id,
+    workers: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> Optional[ImportJob]:
+    """
+    Выполняет (или продолжает после курсора) задачу импорта.
+
+    Ошибка импорта сохраняется в статусе ERROR и не пробрасывается.
+
+    Args:
+        job_id: UUID задачи
+        workers: Процессов для чтения метаданных (по умолчанию IMPORT_WORKERS)
+        batch_size: Файлов в пачке (по умолчанию IMPORT_JOB_BATCH_SIZE)
+
+    Returns:
+        ImportJob или None, если задача не найдена
+    """
+    workers = IMPORT_WORKERS if workers is None else workers
+    batch_size = IMPORT_JOB_BATCH_SIZE if batch_size is None else batch_size
+    session = get_db().get_session()
+    try:
+        job = ImportJob.get_by_id(session, job_id)
+        if job is None:
+            return None
+        if job.is_active:
+            job.status = ImportJobStatus.RUNNING
+            job.error_message = None
+            session.commit()
+            try:
+                _JobRunner(session, job, workers, batch_size).run()
+            except Exception as e:
+                session.rollback()
+                session.refresh(job)
+                job.status = ImportJobStatus.ERROR
+                job.error_message = str(e)
+            else:
+                session.refresh(job)
+                if job.status == ImportJobStatus.RUNNING:
+                    job.status = ImportJobStatus.DONE
+            session.commit()
+        session.refresh(job)
+        session.expunge(job)
+        return job
+    finally:
+        session.close()
+
+
+def create_import_job(root_path: str, options: ImportOptions) -> ImportJob:
+    """
+    Создаёт задачу импорта и ставит её в фоновую очередь.
+
+    Args:
+        root_path: Каталог с аудио-файлами
+        options: Проверенные параметры обхода
+
+    Returns:
+        ImportJob в статусе PENDING
+    """
+    session = get_db().get_session()
+    try:
+        job = ImportJob(
+            root_path=root_path,
+            options=json.dumps({
+                'recursive': options.recursive,
+                'include': list(options.include),
+                'exclude': list(options.exclude),
+                'max_depth': options.max_depth,
+            }),
+        )
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        session.expunge(job)
+    finally:
+        session.close()
+    schedule_import_job(job.id)
+    return job
+
+
+def cancel_import_job(job_id) -> Optional[ImportJob]:
+    """
+    Отменяет незавершённую задачу (выполняемая остановится после текущей пачки).
+
+    Returns:
+        ImportJob или None, если задача не найдена
+
+    Raises:
+        ValueError: Если задача уже завершена
+    """
+    session = get_db().get_session()
+    try:
+        job = ImportJob.get_by_id(session, job_id)
+        if job is None:
+            return None
+        if not job.is_active:
+            raise ValueError(f'Import job is already {job.status.value}')
+        job.status = ImportJobStatus.CANCELLED
+        session.commit()
+        session.refresh(job)
+        session.expunge(job)
+        return job
+    finally:
+        session.close()
+
+
+def schedule_import_job(job_id) -> Future:
+    """Ставит задачу в фоновую очередь (повторный вызов возвращает запущенную)."""
+    key = str(job_id)
+    with _futures_lock:
+        # Завершённые задачи хранят состояние в БД, их Future больше не нужны
+        for done_key in [k for k, f in _futures.items() if f.done() and k != key]:
+            del _futures[done_key]
+        future = _futures.get(key)
+        if future is None or future.done():
+            future = _executor.submit(run_import_job, job_id)
+            _futures[key] = future
+        return future
+
+
+def wait_for_import_job(job_id, timeout: Optional[float] = None) -> Optional[ImportJob]:
+    """Дождаться выполнения задачи (если она поставлена в очередь)."""
+    with _futures_lock:
+        future = _futures.get(str(job_id))
+    return future.result(timeout) if future is not None else None
+
+
+def resume_import_jobs() -> List[str]:
+    """
+    Ставит в очередь задачи, прерванные перезапуском сервера.
+
+    Returns:
+        list: ID возобновлённых задач
+    """
+    session = get_db().get_session()
+    try:
+        job_ids = [job.id for job in ImportJob.get_active(session)]
+    finally:
+        session.close()
+    for job_id in job_ids:
+        schedule_import_job(job_id)
+    return [str(job_id) for job_id in job_ids]
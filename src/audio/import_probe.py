@@ -0,0 +1,125 @@
+"""
+Модуль чтения метаданных и пакетной вставки для импорта каталогов.
+
+Метаданные новых файлов извлекаются в пуле процессов (IMPORT_WORKERS)
+пачками по PROBE_CHUNK_SIZE с ограниченным окном задач, небольшие
+каталоги обрабатываются в потоке запроса без запуска пула. Строки
+AudioFile вставляются одним INSERT ... executemany на пачку, каждая
+пачка - отдельная транзакция.
+"""
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterator, List, Optional
+
+from sqlalchemy import insert
+
+from src.audio.fingerprint import insert_fingerprints, quick_fingerprint
+from src.audio.metadata import extract_metadata
+from src.models import AudioFile
+
+# Конфигурация
+IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', str(os.cpu_count() or 1)))
+# Меньше файлов - метаданные читаются без пула: запуск процессов дороже
+PARALLEL_IMPORT_MIN_FILES = int(os.getenv('PARALLEL_IMPORT_MIN_FILES', '64'))
+PROBE_CHUNK_SIZE = 16  # Файлов в одной задаче процесса пула
+PROBE_WINDOW = 4  # Задач в очереди на процесс пула
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """Метаданные и быстрый отпечаток одного файла или текст ошибки их чтения."""
+
+    file_path: str
+    metadata: Optional[Dict] = None
+    error: Optional[str] = None
+    fingerprint: Optional[str] = None
+
+
+def probe_file(file_path: str) -> ProbeResult:
+    """Извлекает метаданные и быстрый отпечаток файла."""
+    try:
+        metadata = extract_metadata(file_path)
+        return ProbeResult(file_path, metadata=metadata, fingerprint=quick_fingerprint(file_path))
+    except Exception as e:
+        return ProbeResult(file_path, error=str(e))
+
+
+def probe_chunk(paths: List[str]) -> List[ProbeResult]:
+    """Метаданные пачки файлов; выполняется в процессе пула."""
+    return [probe_file(path) for path in paths]
+
+
+class ProbeQueue:
+    """
+    Очередь чтения метаданных для потока путей неизвестной длины.
+
+    Пути накапливаются до PARALLEL_IMPORT_MIN_FILES; если их меньше,
+    метаданные читаются в текущем потоке. Иначе запускается пул процессов,
+    и в нём одновременно находится не больше PROBE_WINDOW задач на процесс -
+    обход дерева не уходит далеко вперёд чтения заголовков.
+    Результаты возвращаются в порядке путей.
+    """
+
+    def __init__(self, workers: int = IMPORT_WORKERS):
+        self.workers = workers
+        self._paths: List[str] = []
+        self._pending: Deque = deque()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started = False
+
+    def put(self, path: str) -> List[ProbeResult]:
+        """Добавляет путь; возвращает готовые к этому моменту результаты."""
+        self._paths.append(path)
+        limit = PROBE_CHUNK_SIZE if self._started else max(1, PARALLEL_IMPORT_MIN_FILES)
+        if len(self._paths) < limit:
+            return []
+        self._started = True
+        return self._submit()
+
+    def finish(self) -> Iterator[List[ProbeResult]]:
+        """Отправляет оставшиеся пути и возвращает все результаты."""
+        if self._paths:
+            if self._started:
+                yield self._submit()
+            else:
+                paths, self._paths = self._paths, []
+                yield probe_chunk(paths)
+        while self._pending:
+            yield self._pending.popleft().result()
+
+    def close(self) -> None:
+        """Останавливает пул, отменяя ещё не начатые задачи."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _submit(self) -> List[ProbeResult]:
+        paths, self._paths = self._paths, []
+        if self.workers <= 1:
+            return probe_chunk(paths)
+        if self._executor is None:
+            context = multiprocessing.get_context('spawn')
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+        results = []
+        for start in range(0, len(paths), PROBE_CHUNK_SIZE):
+            chunk = paths[start:start + PROBE_CHUNK_SIZE]
+            self._pending.append(self._executor.submit(probe_chunk, chunk))
+            while len(self._pending) > self.workers * PROBE_WINDOW:
+                results.extend(self._pending.popleft().result())
+        return results
+
+
+def insert_rows(session, rows: List[Dict], fingerprints: List[Dict] = ()) -> None:
+    """Вставляет пачку строк audio_files и отпечатков одной транзакцией (executemany)."""
+    try:
+        if rows:
+            session.execute(insert(AudioFile), rows)
+        insert_fingerprints(session, list(fingerprints))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
@@ -0,0 +1,156 @@
+"""
+Модуль обхода каталогов для массового импорта аудио-файлов.
+
+Импорт десятков тысяч файлов упирается не в БД, а в чтение заголовков
+и поштучные запросы. Поэтому дерево каталогов обходится os.scandir
+по мере импорта (рекурсивно с ограничением глубины и фильтрами
+include/exclude, если нужно), а не собирается заранее. Сам импорт
+с событиями прогресса - в folder_import, чтение метаданных и пакетная
+вставка - в import_probe.
+"""
+import fnmatch
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.audio.peaks import schedule_peaks
+from src.audio.proxy import needs_proxy, schedule_proxy
+
+# Конфигурация
+IMPORT_EXTENSIONS = {'.wav', '.mp3', '.flac', '.ogg', '.aiff'}
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+
+
+@dataclass(frozen=True)
+class ImportOptions:
+    """Какие файлы каталога импортировать."""
+
+    recursive: bool = False
+    include: Sequence[str] = ()  # Glob шаблоны; пусто - все аудио-файлы
+    exclude: Sequence[str] = ()  # Glob шаблоны файлов и каталогов
+    max_depth: Optional[int] = None  # Уровней вложенности при recursive (None - без ограничения)
+
+    def validate(self) -> None:
+        """
+        Проверяет параметры.
+
+        Raises:
+            ValueError: Если параметр неверен
+        """
+        for name in ('include', 'exclude'):
+            patterns = getattr(self, name)
+            if isinstance(patterns, str) or not all(isinstance(p, str) for p in patterns):
+                raise ValueError(f'{name} must be a list of glob patterns')
+        if self.max_depth is not None and (
+            isinstance(self.max_depth, bool) or not isinstance(self.max_depth, int) or self.max_depth < 0
+        ):
+            raise ValueError('max_depth must be a non-negative integer')
+
+    @property
+    def depth_limit(self) -> Optional[int]:
+        """Максимальная глубина каталогов (0 - только сам каталог)."""
+        return self.max_depth if self.recursive else 0
+
+    def accepts_file(self, relative_path: str) -> bool:
+        """Проходит ли файл фильтры (шаблоны сравниваются с путём и с именем)."""
+        if self.include and not _matches(relative_path, self.include):
+            return False
+        return not _matches(relative_path, self.exclude)
+
+    def accepts_dir(self, relative_path: str) -> bool:
+        """Обходить ли вложенный каталог."""
+        return not _matches(relative_path, self.exclude)
+
+
+def _matches(relative_path: str, patterns: Sequence[str]) -> bool:
+    """Совпадает ли путь или имя с одним из glob шаблонов."""
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatch(relative_path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def walk_audio_entries(
+    folder_path: str,
+    options: ImportOptions = ImportOptions(),
+    on_error: Optional[Callable[[str, OSError], None]] = None,
+    start_after: Optional[str] = None
+) -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    Обходит каталог и возвращает аудио-файлы по мере обнаружения.
+
+    Записи каждого каталога обходятся в порядке имён, вложенный каталог -
+    целиком на месте своего имени, поэтому порядок путей совпадает
+    с порядком кортежей их компонент. Это позволяет продолжить обход
+    после start_after, не заходя в уже обработанные каталоги.
+    Символические ссылки на каталоги не обходятся (защита от циклов).
+
+    Args:
+        folder_path: Корневой каталог
+        options: Рекурсия, глубина и фильтры
+        on_error: Вызывается для каталогов, которые не удалось прочитать
+        start_after: Путь относительно корня (через "/"), после которого продолжить
+
+    Yields:
+        (путь относительно корня через "/", os.DirEntry файла)
+    """
+    depth_limit = options.depth_limit
+    resume = tuple(start_after.split('/')) if start_after else None
+
+    def walk(directory: str, prefix: str, depth: int) -> Iterator[Tuple[str, os.DirEntry]]:
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            if on_error is not None:
+                on_error(prefix.rstrip('/') or '.', e)
+            return
+
+        for entry in entries:
+            relative_path = prefix + entry.name
+            parts = tuple(relative_path.split('/'))
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if resume is not None and parts < resume[:len(parts)]:
+                        continue  # Каталог целиком до точки продолжения
+                    if (depth_limit is None or depth < depth_limit) and options.accepts_dir(relative_path):
+                        yield from walk(entry.path, relative_path + '/', depth + 1)
+                elif (
+                    os.path.splitext(entry.name)[1].lower() in IMPORT_EXTENSIONS
+                    and (resume is None or parts > resume)
+                    and entry.is_file()
+                    and options.accepts_file(relative_path)
+                ):
+                    yield relative_path, entry
+            except OSError as e:
+                if on_error is not None:
+                    on_error(relative_path, e)
+
+    yield from walk(folder_path, '', 0)
+
+
+def walk_audio_files(
+    folder_path: str,
+    options: ImportOptions = ImportOptions(),
+    on_error: Optional[Callable[[str, OSError], None]] = None,
+    start_after: Optional[str] = None
+) -> Iterator[str]:
+    """Пути аудио-файлов каталога в порядке обхода walk_audio_entries."""
+    for _, entry in walk_audio_entries(folder_path, options, on_error, start_after):
+        yield entry.path
+
+
+def relative_import_path(file_path: str, folder_path: str) -> str:
+    """Путь файла относительно каталога импорта (через "/")."""
+    return os.path.relpath(file_path, folder_path).replace(os.sep, '/')
+
+
+def list_audio_files(folder_path: str, options: ImportOptions = ImportOptions()) -> List[str]:
+    """Пути аудио-файлов каталога в порядке обхода."""
+    return list(walk_audio_files(folder_path, options))
+
+
+def prepare_playback(rows: List[Dict]) -> None:
+    """Ставит в фоновые очереди пирамиды peaks и proxy импортированных файлов (строки audio_files)."""
+    for row in rows:
+        schedule_peaks(row['id'], row['file_path'])
+        if needs_proxy(row['file_size']):
+            schedule_proxy(row['id'])
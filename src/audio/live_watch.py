@@ -0,0 +1,234 @@
+"""
+Модуль отслеживания изменений наблюдаемых каталогов через inotify (Linux).
+
+Вместо периодического пересканирования каталог с флагом live
+отслеживается inotify: события создания, записи, удаления и
+переименования аудио-файлов (и каталогов) откладываются на
+LIVE_WATCH_DEBOUNCE секунд, затем ставится одно инкрементальное
+пересканирование - запись десятков файлов рекордером даёт один проход.
+
+inotify не рекурсивен: наблюдение ставится на каждый каталог дерева,
+новые каталоги добавляются по событиям. Используется libc через ctypes,
+сторонние библиотеки не нужны. На других ОС и при исчерпании лимита
+наблюдений (fs.inotify.max_user_watches) live-наблюдение недоступно,
+пересканирование по запросу продолжает работать.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.audio.importer import IMPORT_EXTENSIONS, ImportOptions
+from src.audio.watch import schedule_rescan
+from src.models import WatchedFolder, get_db
+
+# Конфигурация
+LIVE_WATCH_ENABLED = os.getenv('LIVE_WATCH_ENABLED', 'true').lower() == 'true'
+LIVE_WATCH_DEBOUNCE = float(os.getenv('LIVE_WATCH_DEBOUNCE', '2'))  # Секунд тишины до пересканирования
+POLL_INTERVAL = 0.5  # Секунд ожидания событий за один цикл
+
+# Флаги inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+_watchers: Dict[str, 'FolderWatcher'] = {}
+_watchers_lock = threading.Lock()
+
+
+def live_watch_supported() -> bool:
+    """Доступно ли отслеживание через inotify."""
+    return sys.platform.startswith('linux') and ctypes.util.find_library('c') is not None
+
+
+class Inotify:
+    """Минимальная обёртка над inotify_init1 / inotify_add_watch."""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """Наблюдение за каталогом; возвращает дескриптор наблюдения."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), path)
+        return wd
+
+    def read(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """События за время ожидания: (wd, mask, имя)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FolderWatcher(threading.Thread):
+    """Поток, отслеживающий дерево одного наблюдаемого каталога."""
+
+    def __init__(self, folder_id, root_path: str, options: ImportOptions):
+        super().__init__(name=f'live-watch-{folder_id}', daemon=True)
+        self.folder_id = folder_id
+        self.root_path = root_path
+        self.options = options
+        self.inotify = Inotify()
+        self._directories: Dict[int, Tuple[str, int]] = {}  # wd -> (каталог, глубина)
+        self._stopped = threading.Event()
+        self.last_event_at: Optional[float] = None
+        self.rescans = 0
+        self.add_tree(root_path, 0)
+
+    def add_tree(self, directory: str, depth: int) -> None:
+        """Наблюдение за каталогом и вложенными каталогами в пределах глубины."""
+        try:
+            wd = self.inotify.add_watch(directory)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise  # Лимит наблюдений исчерпан - live-наблюдение невозможно
+            return  # Каталог удалён или недоступен
+        self._directories[wd] = (directory, depth)
+
+        limit = self.options.depth_limit
+        if limit is not None and depth >= limit:
+            return
+        try:
+            with os.scandir(directory) as it:
+                subdirs = [e for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for entry in subdirs:
+            relative_path = os.path.relpath(entry.path, self.root_path).replace(os.sep, '/')
+            if self.options.accepts_dir(relative_path):
+                self.add_tree(entry.path, depth + 1)
+
+    def relevant(self, wd: int, mask: int, name: str) -> bool:
+        """Затрагивает ли событие аудио-файлы каталога."""
+        if mask & IN_Q_OVERFLOW:
+            return True
+        if mask & IN_IGNORED:
+            self._directories.pop(wd, None)
+            return False
+        if mask & (IN_ISDIR | IN_DELETE_SELF):
+            if mask & (IN_CREATE | IN_MOVED_TO) and wd in self._directories:
+                directory, depth = self._directories[wd]
+                self.add_tree(os.path.join(directory, name), depth + 1)
+            return True
+        return os.path.splitext(name)[1].lower() in IMPORT_EXTENSIONS
+
+    def run(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                for wd, mask, name in self.inotify.read(POLL_INTERVAL):
+                    try:
+                        if self.relevant(wd, mask, name):
+                            self.last_event_at = time.monotonic()
+                    except OSError:
+                        self.last_event_at = time.monotonic()
+                if self.last_event_at is not None and time.monotonic() - self.last_event_at >= LIVE_WATCH_DEBOUNCE:
+                    self.last_event_at = None
+                    self.rescans += 1
+                    schedule_rescan(self.folder_id)
+        finally:
+            self.inotify.close()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+def start_live_watch(folder: WatchedFolder) -> Optional[FolderWatcher]:
+    """
+    Запускает отслеживание каталога (повторный вызов возвращает запущенное).
+
+    Returns:
+        FolderWatcher или None, если inotify недоступен или лимит наблюдений исчерпан
+    """
+    if not live_watch_supported():
+        return None
+    key = str(folder.id)
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is not None and watcher.is_alive():
+            return watcher
+        try:
+            watcher = FolderWatcher(folder.id, folder.root_path, ImportOptions(**folder.get_options()))
+        except OSError:
+            return None
+        watcher.start()
+        _watchers[key] = watcher
+        return watcher
+
+
+def stop_live_watch(folder_id) -> None:
+    """Останавливает отслеживание каталога."""
+    with _watchers_lock:
+        watcher = _watchers.pop(str(folder_id), None)
+    if watcher is not None:
+        watcher.stop()
+        watcher.join(timeout=POLL_INTERVAL * 4)
+
+
+def get_live_watch(folder_id) -> Optional[FolderWatcher]:
+    """Запущенное отслеживание каталога."""
+    with _watchers_lock:
+        watcher = _watchers.get(str(folder_id))
+    return watcher if watcher is not None and watcher.is_alive() else None
+
+
+def start_live_watches() -> List[str]:
+    """
+    Запускает отслеживание всех каталогов с флагом live (при старте сервера).
+
+    Returns:
+        list: ID каталогов, за которыми началось наблюдение
+    """
+    if not LIVE_WATCH_ENABLED:
+        return []
+    session = get_db().get_session()
+    try:
+        folders = session.query(WatchedFolder).filter_by(live=True).all()
+        for folder in folders:
+            session.expunge(folder)
+    finally:
+        session.close()
+    return [str(folder.id) for folder in folders if start_live_watch(folder) is not None]
@@ -1,14 +1,26 @@
 """
 Модуль для извлечения метаданных из аудио-файлов.
 
-Использует librosa и soundfile для чтения метаданных без загрузки всего файла в память.
+Метаданные читаются из заголовка без загрузки и декодирования файла:
+- длительность - info.frames / info.samplerate из soundfile;
+- для MP3 - по заголовкам фреймов (mp3_header), без полного декодирования;
+- librosa.get_duration - только запасной путь для форматов без числа фреймов.
+Результат кэшируется по (путь, размер, mtime), поэтому повторный импорт
+и отрисовка не разбирают файл заново.
 """
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict
 import soundfile as sf
 import librosa
 
+from src.audio.mp3_header import scan_mp3
+
+# Записей в кэше метаданных
+METADATA_CACHE_SIZE = int(os.getenv('METADATA_CACHE_SIZE', '4096'))
+
 
 # Поддерживаемые форматы
 SUPPORTED_FORMATS = {'.wav', '.mp3', '.flac', '.ogg', '.m4a', '.aac'}
@@ -61,11 +73,61 @@ def validate_audio_format(file_path: str) -> None:
         )
 
 
+@dataclass(frozen=True)
+class AudioInfo:
+    """Параметры аудио из заголовка файла."""
+
+    duration: float
+    sample_rate: int
+    channels: int
+    frames: int
+
+
+def read_audio_info(file_path: str) -> AudioInfo:
+    """
+    Читает параметры аудио из заголовка без декодирования.
+
+    Args:
+        file_path: Путь к аудио-файлу
+
+    Returns:
+        AudioInfo
+
+    Raises:
+        Exception: Если формат не читается ни одним из способов
+    """
+    if Path(file_path).suffix.lower() == '.mp3':
+        mp3 = scan_mp3(file_path)
+        if mp3 is not None and mp3.frames > 0:
+            return AudioInfo(mp3.duration, mp3.sample_rate, mp3.channels, mp3.frames)
+
+    info = sf.info(file_path)
+    if info.frames > 0 and info.samplerate > 0:
+        return AudioInfo(info.frames / info.samplerate, int(info.samplerate), int(info.channels), int(info.frames))
+
+    # Формат без числа фреймов в заголовке: длительность через librosa
+    duration = float(librosa.get_duration(path=file_path))
+    return AudioInfo(duration, int(info.samplerate), int(info.channels), int(round(duration * info.samplerate)))
+
+
+@lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _cached_audio_info(path: str, size: int, mtime_ns: int) -> AudioInfo:
+    """Кэш read_audio_info; размер и mtime в ключе делают устаревшие записи недоступными."""
+    return read_audio_info(path)
+
+
+def get_audio_info(file_path: str) -> AudioInfo:
+    """Параметры аудио из кэша по (путь, размер, mtime) или из заголовка файла."""
+    stat = os.stat(file_path)
+    return _cached_audio_info(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
 def extract_metadata(file_path: str) -> Dict[str, any]:
     """
     Извлекает метаданные из аудио-файла.
     
-    Не загружает весь файл в память, только читает заголовок.
+    Не загружает весь файл в память, только читает заголовок
+    (для MP3 - заголовки фреймов). Результат кэшируется по (путь, размер, mtime).
     
     Args:
         file_path: Путь к аудио-файлу
@@ -90,17 +152,10 @@ def extract_metadata(file_path: str) -> Dict[str, any]:
     file_size = os.path.getsize(file_path)
     
     try:
-        # Используем soundfile для чтения метаданных (быстрее чем librosa)
-        # soundfile.read() с frames=0 читает только заголовок
-        info = sf.info(file_path)
-        
-        # Для получения длительности нужно прочитать файл, но можно использовать librosa
-        # librosa.get_duration() эффективно читает только метаданные
-        duration = librosa.get_duration(path=file_path)
-        
+        info = get_audio_info(file_path)
         return {
-            'duration': float(duration),
-            'sample_rate': int(info.samplerate),
+            'duration': float(info.duration),
+            'sample_rate': int(info.sample_rate),
             'channels': int(info.channels),
             'file_size': int(file_size)
         }
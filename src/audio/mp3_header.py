@@ -0,0 +1,188 @@
+"""
+Модуль для определения длительности MP3 по заголовкам фреймов.
+
+librosa.get_duration и декодеры без индекса для MP3 декодируют файл
+целиком. Длительность известна без декодирования:
+- если первый фрейм содержит заголовок Xing/Info или VBRI (VBR и
+  большинство CBR файлов от LAME), число фреймов берётся из него;
+- иначе заголовки фреймов просматриваются по порядку: из 4 байт
+  заголовка известна длина фрейма, данные фрейма пропускаются.
+Файл отображается в память (mmap), читаются только заголовки.
+"""
+import mmap
+from dataclasses import dataclass
+from typing import Optional
+
+# Битрейты (кбит/с) по (MPEG-1?, слой) и индексу битрейта
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Частоты дискретизации по версии MPEG (биты 19-20 заголовка)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+MAX_RESYNC_BYTES = 64 * 1024  # Сколько байт мусора пропускается в поисках следующего фрейма
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    """Разобранный заголовок фрейма MPEG audio."""
+
+    mpeg1: bool
+    layer: int
+    sample_rate: int
+    channels: int
+    length: int  # Байт во фрейме вместе с заголовком
+    samples: int  # Сэмплов на канал во фрейме
+
+
+@dataclass(frozen=True)
+class Mp3Info:
+    """Параметры MP3, полученные из заголовков."""
+
+    duration: float
+    sample_rate: int
+    channels: int
+    frames: int  # Сэмплов на канал
+
+
+def parse_frame_header(data: bytes, offset: int = 0) -> Optional[FrameHeader]:
+    """Разбирает 4 байта заголовка фрейма; None, если это не заголовок."""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset:offset + 4]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x01
+    channels = 1 if (b3 >> 6) == 3 else 2
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and not mpeg1:
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+    else:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    return FrameHeader(mpeg1, layer, sample_rate, channels, length, samples)
+
+
+def _skip_id3v2(data) -> int:
+    """Смещение первого байта после тега ID3v2 (0, если тега нет)."""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)  # synchsafe integer
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _find_frame(data, offset: int) -> Optional[int]:
+    """Ближайшее смещение с корректным заголовком, за которым следует ещё один."""
+    limit = min(len(data) - 4, offset + MAX_RESYNC_BYTES)
+    while offset <= limit:
+        offset = data.find(b'\xff', offset, limit + 4)
+        if offset < 0:
+            return None
+        header = parse_frame_header(data, offset)
+        if header is not None and header.length > 4:
+            following = offset + header.length
+            if following + 4 > len(data) or parse_frame_header(data, following) is not None:
+                return offset
+        offset += 1
+    return None
+
+
+def _vbr_samples(data, offset: int, header: FrameHeader) -> Optional[int]:
+    """
+    Количество сэмплов из заголовка Xing/Info или VBRI первого фрейма.
+
+    Если за Xing/Info следует тег LAME, из результата вычитаются задержка
+    и заполнение энкодера - так длительность совпадает с декодированной.
+    """
+    if header.mpeg1:
+        side_info = 17 if header.channels == 1 else 32
+    else:
+        side_info = 9 if header.channels == 1 else 17
+    xing_offset = offset + 4 + side_info
+    xing = data[xing_offset:xing_offset + 12]
+    if len(xing) == 12 and xing[:4] in (b'Xing', b'Info') and xing[7] & 0x01:
+        samples = int.from_bytes(xing[8:12], 'big') * header.samples
+        flags = xing[7]
+        # Поля после флагов: фреймы, байты, TOC, качество - затем тег LAME
+        lame_offset = xing_offset + 8 + 4 * bool(flags & 0x01) + 4 * bool(flags & 0x02)
+        lame_offset += 100 * bool(flags & 0x04) + 4 * bool(flags & 0x08)
+        lame = data[lame_offset:lame_offset + 24]
+        if len(lame) == 24 and lame[:4] == b'LAME':
+            gap = int.from_bytes(lame[21:24], 'big')
+            samples -= (gap >> 12) + (gap & 0xFFF)
+        return max(0, samples)
+    vbri = data[offset + 36:offset + 54]
+    if len(vbri) == 18 and vbri[:4] == b'VBRI':
+        return int.from_bytes(vbri[14:18], 'big') * header.samples
+    return None
+
+
+def scan_mp3(file_path: str) -> Optional[Mp3Info]:
+    """
+    Длительность и параметры MP3 без декодирования.
+
+    Args:
+        file_path: Путь к MP3 файлу
+
+    Returns:
+        Mp3Info или None, если корректные фреймы MPEG audio не найдены
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Пустой файл
+            return None
+
+    with data:
+        first = _find_frame(data, _skip_id3v2(data))
+        if first is None:
+            return None
+        header = parse_frame_header(data, first)
+
+        samples = _vbr_samples(data, first, header)
+        if samples is None:
+            samples = 0
+            offset = first
+            while True:
+                current = parse_frame_header(data, offset)
+                if current is None:
+                    offset = _find_frame(data, offset + 1)
+                    if offset is None:
+                        break
+                    continue
+                if offset + current.length > len(data):
+                    break
+                samples += current.samples
+                offset += current.length
+
+    return Mp3Info(
+        duration=samples / header.sample_rate,
+        sample_rate=header.sample_rate,
+        channels=header.channels,
+        frames=samples,
+    )
@@ -0,0 +1,385 @@
+"""
+Модуль дискового кэша декодированного PCM для сжатых форматов.
+
+Чтобы прочитать интервал MP3/M4A/AAC/OGG с середины, декодер проходит
+файл с начала. Поэтому при первом обращении сжатый файл декодируется
+один раз целиком в int16 массив на диске, а дальше читается через
+np.memmap с произвольным доступом по номеру сэмпла.
+
+Запись кэша - пара файлов <key>.pcm (int16 little-endian, каналы
+чередуются) и <key>.json (sample_rate, channels, frames). Ключ - хэш
+пути исходного файла и хэш его размера и mtime, поэтому записи всех
+версий файла удаляются по префиксу (remove_file). Общий объём ограничен
+PCM_CACHE_MAX_BYTES с вытеснением LRU.
+
+Индекс, бюджет и счётчики кэша ведёт только основной процесс. Процессы
+пула отрисовки (см. render_pool) не декодируют: они открывают готовые
+записи (PcmNotDecoded, если записи нет) и сообщают основному процессу,
+какие записи прочитали, чтобы тот учёл их в LRU и метриках.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from src.utils.storage import get_data_dir
+
+# Константы
+PCM_CACHE_DIR_NAME = 'pcm_cache'
+PCM_CACHE_MAX_BYTES = int(os.getenv('PCM_CACHE_MAX_BYTES', str(8 * 1024 * 1024 * 1024)))
+# Форматы, которые нельзя дёшево позиционировать по сэмплам
+PCM_CACHED_EXTENSIONS = {'.mp3', '.m4a', '.aac', '.ogg', '.opus'}
+PCM_DTYPE = '<i2'
+PCM_SCALE = 32768.0  # int16 -> float32, как в soundfile
+DECODE_BLOCK_FRAMES = 1 << 16
+DECODE_LOCK_STRIPES = 64  # Блокировок декодирования на кэш (по хэшу ключа)
+
+
+class PcmNotDecoded(RuntimeError):
+    """Сжатый файл ещё не декодирован в кэш (процесс пула отрисовки не декодирует сам)."""
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self.file_path = file_path
+
+
+@dataclass
+class PcmEntry:
+    """Декодированный файл: int16 memmap формы (frames, channels)."""
+
+    data: np.ndarray
+    sample_rate: int
+    channels: int
+    frames: int
+
+
+def needs_pcm_cache(file_path: str) -> bool:
+    """Нужно ли декодировать файл в кэш для произвольного доступа."""
+    return Path(file_path).suffix.lower() in PCM_CACHED_EXTENSIONS
+
+
+def pcm_key_prefix(file_path: str) -> str:
+    """Префикс ключей всех версий файла (хэш абсолютного пути)."""
+    return hashlib.sha256(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+
+
+def make_pcm_key(file_path: str) -> str:
+    """Ключ кэша из пути, размера и mtime исходного файла."""
+    stat = os.stat(file_path)
+    identity = f'{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}'
+    return pcm_key_prefix(file_path) + hashlib.sha256(identity.encode('utf-8')).hexdigest()[:24]
+
+
+def _iter_decoded(file_path: str) -> Tuple[int, int, Iterator[np.ndarray]]:
+    """
+    Потоковое декодирование в int16 блоки формы (frames, channels).
+
+    libsndfile читает MP3/OGG/Opus; остальные форматы (M4A/AAC)
+    декодируются через audioread, как это делает librosa.
+
+    Returns:
+        Tuple (sample_rate, channels, итератор блоков)
+    """
+    try:
+        info = sf.info(file_path)
+    except RuntimeError:
+        info = None
+
+    if info is not None:
+        blocks = sf.blocks(
+            file_path, blocksize=DECODE_BLOCK_FRAMES, dtype='int16', always_2d=True
+        )
+        return int(info.samplerate), int(info.channels), blocks
+
+    import audioread
+
+    try:
+        source = audioread.audio_open(file_path)
+    except audioread.DecodeError as exc:
+        raise RuntimeError(f'Error decoding {file_path}: {exc!r}') from exc
+    channels = source.channels
+
+    def blocks():
+        with source:
+            for buffer in source:
+                yield np.frombuffer(buffer, dtype=PCM_DTYPE).reshape(-1, channels)
+
+    return int(source.samplerate), channels, blocks()
+
+
+def _open_entry(pcm_path: Path) -> Optional[PcmEntry]:
+    """Открывает запись через memmap и отмечает её использование (mtime)."""
+    try:
+        meta = json.loads(pcm_path.with_suffix('.json').read_text())
+        os.utime(pcm_path)
+    except (OSError, ValueError):
+        return None
+
+    shape = (meta['frames'], meta['channels'])
+    if meta['frames'] == 0:
+        data = np.zeros(shape, dtype=PCM_DTYPE)
+    else:
+        data = np.memmap(pcm_path, dtype=PCM_DTYPE, mode='r', shape=shape)
+    return PcmEntry(
+        data=data,
+        sample_rate=meta['sample_rate'],
+        channels=meta['channels'],
+        frames=meta['frames']
+    )
+
+
+def decode_to_pcm(file_path: str, pcm_path: Path) -> Dict:
+    """
+    Декодирует файл в raw int16 и атомарно сохраняет рядом метаданные.
+
+    Args:
+        file_path: Путь к сжатому аудио-файлу
+        pcm_path: Путь к файлу .pcm результата
+
+    Returns:
+        dict: sample_rate, channels, frames
+    """
+    sample_rate, channels, blocks = _iter_decoded(file_path)
+    tmp_path = pcm_path.with_name(f'{pcm_path.name}.{os.getpid()}.tmp')
+    frames = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            for block in blocks:
+                f.write(np.ascontiguousarray(block, dtype=PCM_DTYPE).tobytes())
+                frames += block.shape[0]
+        os.replace(tmp_path, pcm_path)
+    except BaseException:
+        # Недописанный PCM не учитывается бюджетом - удаляем его сразу
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    meta = {'sample_rate': sample_rate, 'channels': channels, 'frames': frames}
+    pcm_path.with_suffix('.json').write_text(json.dumps(meta))
+    return meta
+
+
+class PcmCache:
+    """Дисковый LRU кэш декодированного PCM с бюджетом по байтам."""
+
+    def __init__(self, directory: Path, max_bytes: int = PCM_CACHE_MAX_BYTES):
+        """
+        Инициализация кэша.
+
+        Args:
+            directory: Каталог хранения
+            max_bytes: Бюджет в байтах
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Полосы блокировок вместо блокировки на ключ: словарь не растёт с числом файлов
+        self._key_locks = [threading.Lock() for _ in range(DECODE_LOCK_STRIPES)]
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _pcm_path(self, key: str) -> Path:
+        return self.directory / f'{key}.pcm'
+
+    def _load_index(self) -> None:
+        """Восстанавливает индекс LRU по mtime файлов на диске."""
+        found = []
+        for path in self.directory.glob('*.pcm'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.with_suffix('.json').exists():
+                found.append((stat.st_mtime_ns, path.stem, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _load_entry(self, key: str) -> Optional[PcmEntry]:
+        """Открывает запись через memmap."""
+        return _open_entry(self._pcm_path(key))
+
+    def _remove(self, key: str) -> None:
+        pcm_path = self._pcm_path(key)
+        pcm_path.unlink(missing_ok=True)
+        pcm_path.with_suffix('.json').unlink(missing_ok=True)
+
+    def get_or_decode(self, file_path: str) -> PcmEntry:
+        """
+        Получить декодированный файл, декодируя его при первом обращении.
+
+        Параллельные запросы одного файла ждут единственного декодирования.
+
+        Args:
+            file_path: Путь к сжатому аудио-файлу
+
+        Returns:
+            PcmEntry
+        """
+        key = make_pcm_key(file_path)
+        key_lock = self._key_locks[int(key[:8], 16) % DECODE_LOCK_STRIPES]
+
+        with key_lock:
+            with self._lock:
+                cached = key in self._entries
+                if cached:
+                    self._entries.move_to_end(key)
+            if cached:
+                entry = self._load_entry(key)
+                if entry is not None:
+                    with self._lock:
+                        self.hits += 1
+                    return entry
+                with self._lock:
+                    self._total_bytes -= self._entries.pop(key, 0)
+
+            with self._lock:
+                self.misses += 1
+            self.directory.mkdir(parents=True, exist_ok=True)
+            decode_to_pcm(file_path, self._pcm_path(key))
+            self._register(key, self._pcm_path(key).stat().st_size)
+            return self._load_entry(key)
+
+    def record_reads(self, file_paths: List[str]) -> None:
+        """
+        Учитывает чтения записей процессами пула отрисовки (LRU и попадания).
+
+        Args:
+            file_paths: Пути сжатых файлов, записи которых были прочитаны
+        """
+        keys = []
+        for file_path in file_paths:
+            try:
+                keys.append(make_pcm_key(file_path))
+            except OSError:
+                continue
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+
+    def _register(self, key: str, size: int) -> None:
+        """Добавить запись в индекс и вытеснить старые при превышении бюджета."""
+        with self._lock:
+            self._entries[key] = size
+            self._total_bytes += size
+            evicted = []
+            # Только что декодированную запись не вытесняем, даже если она больше бюджета
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                self.evictions += 1
+                evicted.append(old_key)
+
+        # Открытые memmap продолжают работать после удаления файла
+        for old_key in evicted:
+            self._remove(old_key)
+
+    def clear(self) -> None:
+        """Удалить все записи."""
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        for key in keys:
+            self._remove(key)
+
+    def remove_file(self, file_path: str) -> int:
+        """
+        Удалить записи всех версий файла (при удалении AudioFile).
+
+        Returns:
+            int: Количество удалённых записей
+        """
+        prefix = pcm_key_prefix(file_path)
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._total_bytes -= self._entries.pop(key)
+        # Открытые memmap продолжают работать после удаления файла
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def stats(self) -> Dict:
+        """Счётчики кэша для метрик."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+_pcm_cache: Optional[PcmCache] = None
+_pcm_cache_lock = threading.Lock()
+
+
+def get_pcm_cache() -> PcmCache:
+    """
+    Получить глобальный кэш PCM.
+
+    Кэш пересоздаётся, если каталог данных изменился (например, сменилась БД).
+
+    Returns:
+        PcmCache: Экземпляр кэша
+    """
+    global _pcm_cache
+    directory = get_data_dir(PCM_CACHE_DIR_NAME)
+    with _pcm_cache_lock:
+        if _pcm_cache is None or _pcm_cache.directory != directory:
+            _pcm_cache = PcmCache(directory)
+        return _pcm_cache
+
+
+# Пути прочитанных записей в процессе пула отрисовки (None - процесс сам ведёт кэш)
+_worker_reads: Optional[List[str]] = None
+
+
+def use_parent_cache() -> None:
+    """Процесс только читает записи, декодированные основным процессом (процессы пула)."""
+    global _worker_reads
+    _worker_reads = []
+
+
+def pop_worker_reads() -> List[str]:
+    """Пути записей, прочитанных процессом пула с прошлого вызова."""
+    if _worker_reads is None:
+        return []
+    reads = list(_worker_reads)
+    _worker_reads.clear()
+    return reads
+
+
+def get_pcm_entry(file_path: str) -> PcmEntry:
+    """
+    Декодированный файл для чтения.
+
+    В основном процессе файл при необходимости декодируется в кэш,
+    в процессе пула отрисовки открывается только готовая запись.
+
+    Raises:
+        PcmNotDecoded: Процесс пула, а записи файла в кэше нет
+    """
+    if _worker_reads is None:
+        return get_pcm_cache().get_or_decode(file_path)
+    entry = _open_entry(get_data_dir(PCM_CACHE_DIR_NAME) / f'{make_pcm_key(file_path)}.pcm')
+    if entry is None:
+        raise PcmNotDecoded(file_path)
+    _worker_reads.append(file_path)
+    return entry
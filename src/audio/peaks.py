@@ -0,0 +1,396 @@
+"""
+Модуль для хранения многоуровневой пирамиды peaks аудио-файла.
+
+Пирамида строится один раз в фоне после добавления файла: для каждого канала
+сохраняются min/max/RMS на нескольких уровнях (256, 1024, 4096, 16384
+сэмплов на бин). У многоканального файла добавляется моно сведение
+(среднее каналов до свёртки, как в compute_envelope), поэтому моно
+огибающая из пирамиды и по файлу совпадает. Данные лежат в компактном бинарном файле
+<AudioFile.id>.peaks рядом с БД и читаются через np.memmap, поэтому
+рендеринг waveform стоит O(пикселей), а не O(сэмплов).
+
+Формат файла (little-endian):
+- Заголовок: magic, версия, число уровней, sample_rate, channels,
+  frames, размер и mtime исходного файла
+- Таблица уровней: samples_per_bin, количество бинов, смещение данных
+- Данные уровней: int16 массивы формы (bins, planes, 3) = min/max/RMS,
+  planes - каналы и моно сведение (для многоканального файла)
+
+Пока пирамида строится, waveform и peaks считаются по исходному файлу.
+"""
+import os
+import struct
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.audio.envelope import Envelope, compute_envelope
+from src.audio.reader import AudioReader, get_audio_reader
+from src.utils.storage import get_data_dir
+
+# Константы
+PEAKS_DIR_NAME = 'peaks'
+PEAKS_MAGIC = b'AEPK'
+PEAKS_VERSION = 2
+PYRAMID_LEVELS = (256, 1024, 4096, 16384)  # Сэмплов на бин
+BUILD_BLOCK_BINS = 1024  # Бинов самого детального уровня на блок чтения
+PEAK_SCALE = 32767.0  # Масштаб квантования float -> int16
+PEAKS_WORKERS = int(os.getenv('PEAKS_WORKERS', '2'))  # Потоков фонового построения
+
+_HEADER = struct.Struct('<4sHHIIQQq')
+_LEVEL = struct.Struct('<IQQ')
+
+_executor = ThreadPoolExecutor(max_workers=PEAKS_WORKERS, thread_name_prefix='peaks')
+_futures: Dict[str, Future] = {}
+_futures_lock = threading.Lock()
+
+
+@dataclass
+class PeakLevel:
+    """Один уровень пирамиды: int16 массив (bins, planes, 3)."""
+
+    samples_per_bin: int
+    data: np.ndarray
+
+
+@dataclass
+class PeaksPyramid:
+    """Загруженная пирамида peaks."""
+
+    sample_rate: int
+    channels: int
+    frames: int
+    levels: List[PeakLevel]
+
+    def select_level(self, samples_per_pixel: float) -> Optional[PeakLevel]:
+        """
+        Выбирает самый грубый уровень, который не грубее запрошенного разрешения.
+
+        Args:
+            samples_per_pixel: Сколько исходных сэмплов приходится на пиксель
+
+        Returns:
+            PeakLevel или None, если нужно разрешение детальнее всех уровней
+        """
+        suitable = [
+            level for level in self.levels
+            if level.samples_per_bin <= samples_per_pixel
+        ]
+        return suitable[-1] if suitable else None
+
+    def read_envelope(
+        self,
+        bins: int,
+        start_frame: int = 0,
+        end_frame: Optional[int] = None,
+        mono: bool = True
+    ) -> Optional[Envelope]:
+        """
+        Строит огибающую интервала из ближайшего подходящего уровня.
+
+        Args:
+            bins: Количество бинов результата
+            start_frame: Первый фрейм интервала
+            end_frame: Фрейм конца интервала (не включительно)
+            mono: Моно сведение вместо отдельных каналов
+
+        Returns:
+            Envelope или None, если пирамида недостаточно детальна для запроса
+        """
+        start = max(0, start_frame)
+        end = self.frames if end_frame is None else min(end_frame, self.frames)
+        total = end - start
+        if total <= 0:
+            return None
+
+        bins = max(1, min(bins, total))
+        level = self.select_level(total / bins)
+        if level is None:
+            return None
+
+        spb = level.samples_per_bin
+        first = start // spb
+        last = min(-(-end // spb), level.data.shape[0])
+        # Моно сведение - последний план (у моно файла это единственный канал)
+        planes = slice(-1, None) if mono else slice(0, self.channels)
+        values = level.data[first:last, planes].astype(np.float32) / PEAK_SCALE
+
+        # Каждый бин уровня относим к пикселю по первому фрейму бина
+        bin_frames = np.maximum(np.arange(first, last, dtype=np.int64) * spb, start)
+        pixel_ids = (bin_frames - start) * bins // total
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(pixel_ids)) + 1))
+
+        mins = np.minimum.reduceat(values[:, :, 0], starts, axis=0)
+        maxs = np.maximum.reduceat(values[:, :, 1], starts, axis=0)
+        counts = np.diff(np.append(starts, len(values)))[:, None]
+        rms = np.sqrt(np.add.reduceat(np.square(values[:, :, 2]), starts, axis=0) / counts)
+
+        return Envelope(
+            mins=mins.astype(np.float32),
+            maxs=maxs.astype(np.float32),
+            rms=rms.astype(np.float32),
+            sample_rate=self.sample_rate,
+            frames=total
+        )
+
+
+def get_peaks_path(audio_file_id) -> Path:
+    """Путь к файлу пирамиды для AudioFile."""
+    return get_data_dir(PEAKS_DIR_NAME) / f'{audio_file_id}.peaks'
+
+
+def _file_identity(file_path: str) -> Tuple[int, int]:
+    """Размер и mtime (нс) исходного файла для проверки актуальности."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _plane_count(channels: int) -> int:
+    """Каналы и моно сведение (у моно файла сведение совпадает с каналом)."""
+    return channels + 1 if channels > 1 else channels
+
+
+def _reduce_finest_level(reader: AudioReader) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Один проход по файлу: min/max/сумма квадратов/число сэмплов самого детального уровня."""
+    spb = PYRAMID_LEVELS[0]
+    mins, maxs, squares, counts = [], [], [], []
+
+    for block in reader.blocks(spb * BUILD_BLOCK_BINS):
+        if block.shape[1] > 1:
+            block = np.concatenate([block, block.mean(axis=1, keepdims=True)], axis=1)
+        full = (block.shape[0] // spb) * spb
+        parts = [block[:full].reshape(-1, spb, block.shape[1])]
+        if full < block.shape[0]:
+            parts.append(block[full:][None, :, :])
+
+        for part in parts:
+            mins.append(part.min(axis=1))
+            maxs.append(part.max(axis=1))
+            squares.append(np.square(part, dtype=np.float64).sum(axis=1))
+            counts.append(np.full(part.shape[0], part.shape[1], dtype=np.int64))
+
+    return (
+        np.concatenate(mins),
+        np.concatenate(maxs),
+        np.concatenate(squares),
+        np.concatenate(counts)
+    )
+
+
+def _quantize(mins, maxs, squares, counts) -> np.ndarray:
+    """Упаковывает уровень в int16 массив (bins, planes, 3)."""
+    rms = np.sqrt(squares / counts[:, None])
+    stacked = np.stack([mins, maxs, rms], axis=-1)
+    return np.round(np.clip(stacked, -1.0, 1.0) * PEAK_SCALE).astype('<i2')
+
+
+def build_peaks(audio_file_id, file_path: str) -> Path:
+    """
+    Строит пирамиду peaks и атомарно сохраняет её на диск.
+
+    Args:
+        audio_file_id: UUID AudioFile
+        file_path: Путь к аудио-файлу
+
+    Returns:
+        Path: Путь к файлу пирамиды
+    """
+    file_size, mtime_ns = _file_identity(file_path)
+
+    with get_audio_reader(file_path) as reader:
+        sample_rate, channels, frames = reader.samplerate, reader.channels, reader.frames
+        finest = _reduce_finest_level(reader) if frames > 0 else None
+
+    levels = []
+    if finest is not None:
+        mins, maxs, squares, counts = finest
+        levels.append((PYRAMID_LEVELS[0], _quantize(mins, maxs, squares, counts)))
+
+        # Каждый следующий уровень сворачивается из предыдущего
+        for previous_spb, spb in zip(PYRAMID_LEVELS, PYRAMID_LEVELS[1:]):
+            starts = np.arange(0, len(counts), spb // previous_spb)
+            mins = np.minimum.reduceat(mins, starts, axis=0)
+            maxs = np.maximum.reduceat(maxs, starts, axis=0)
+            squares = np.add.reduceat(squares, starts, axis=0)
+            counts = np.add.reduceat(counts, starts)
+            levels.append((spb, _quantize(mins, maxs, squares, counts)))
+
+    header = _HEADER.pack(
+        PEAKS_MAGIC, PEAKS_VERSION, len(levels), sample_rate,
+        channels, frames, file_size, mtime_ns
+    )
+    offset = _HEADER.size + _LEVEL.size * len(levels)
+    table = b''
+    for spb, data in levels:
+        table += _LEVEL.pack(spb, data.shape[0], offset)
+        offset += data.nbytes
+
+    peaks_path = get_peaks_path(audio_file_id)
+    tmp_path = peaks_path.with_name(f'{peaks_path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(table)
+        for _, data in levels:
+            f.write(data.tobytes())
+    os.replace(tmp_path, peaks_path)
+    return peaks_path
+
+
+def load_peaks(audio_file_id, file_path: str) -> Optional[PeaksPyramid]:
+    """
+    Загружает пирамиду, если она существует и соответствует текущему файлу.
+
+    Args:
+        audio_file_id: UUID AudioFile
+        file_path: Путь к аудио-файлу (для проверки размера и mtime)
+
+    Returns:
+        PeaksPyramid или None, если пирамиды нет или она устарела
+    """
+    peaks_path = get_peaks_path(audio_file_id)
+    try:
+        with open(peaks_path, 'rb') as f:
+            raw_header = f.read(_HEADER.size)
+            magic, version, level_count, sample_rate, channels, frames, size, mtime_ns = \
+                _HEADER.unpack(raw_header)
+            if magic != PEAKS_MAGIC or version != PEAKS_VERSION:
+                return None
+            if (size, mtime_ns) != _file_identity(file_path):
+                return None
+            table = [_LEVEL.unpack(f.read(_LEVEL.size)) for _ in range(level_count)]
+    except (OSError, struct.error):
+        return None
+
+    levels = [
+        PeakLevel(
+            samples_per_bin=spb,
+            data=np.memmap(
+                peaks_path, dtype='<i2', mode='r', offset=offset, shape=(bins, _plane_count(channels), 3)
+            )
+        )
+        for spb, bins, offset in table
+    ]
+    return PeaksPyramid(
+        sample_rate=sample_rate, channels=channels, frames=frames, levels=levels
+    )
+
+
+def ensure_peaks(audio_file_id, file_path: str) -> Optional[Path]:
+    """
+    Строит пирамиду, если её нет или она устарела.
+
+    Пирамида - только ускорение: при ошибке построения рендеринг
+    продолжит работать по исходному файлу, поэтому ошибка не пробрасывается.
+
+    Returns:
+        Path к пирамиде или None при ошибке
+    """
+    if load_peaks(audio_file_id, file_path) is not None:
+        return get_peaks_path(audio_file_id)
+    try:
+        return build_peaks(audio_file_id, file_path)
+    except Exception:
+        return None
+
+
+def _forget(key: str, future: Future) -> None:
+    """Завершённое построение больше не держим (импорт ставит тысячи файлов)."""
+    with _futures_lock:
+        if _futures.get(key) is future:
+            del _futures[key]
+
+
+def schedule_peaks(audio_file_id, file_path: str) -> Future:
+    """
+    Ставит построение пирамиды (ensure_peaks) в фоновую очередь.
+
+    Повторный вызов для файла, пирамида которого ещё строится,
+    возвращает уже запущенную задачу.
+
+    Returns:
+        Future с результатом ensure_peaks
+    """
+    key = str(audio_file_id)
+    with _futures_lock:
+        future = _futures.get(key)
+        if future is not None:
+            return future
+        future = _executor.submit(ensure_peaks, audio_file_id, file_path)
+        _futures[key] = future
+    future.add_done_callback(lambda done: _forget(key, done))
+    return future
+
+
+def wait_for_peaks(audio_file_id, timeout: Optional[float] = None) -> Optional[Path]:
+    """Дождаться фонового построения пирамиды (если оно запущено)."""
+    with _futures_lock:
+        future = _futures.get(str(audio_file_id))
+    return future.result(timeout) if future is not None else None
+
+
+def read_envelope(
+    file_path: str,
+    bins: Optional[int] = None,
+    audio_file_id=None,
+    start_time: float = 0.0,
+    end_time: Optional[float] = None,
+    mono: bool = True,
+    samples_per_bin: Optional[int] = None,
+    progress: Optional[Callable[[float], None]] = None
+) -> Envelope:
+    """
+    Получает огибающую интервала с нужным разрешением.
+
+    Если для AudioFile есть актуальная пирамида, читается только
+    ближайший по разрешению уровень; иначе огибающая считается по файлу.
+    Разрешение задаётся либо количеством бинов, либо samples_per_bin.
+
+    Args:
+        file_path: Путь к аудио-файлу
+        bins: Количество бинов (пикселей)
+        audio_file_id: UUID AudioFile для поиска пирамиды (опционально)
+        start_time: Начало интервала в секундах
+        end_time: Конец интервала в секундах (None - до конца файла)
+        mono: Сводить каналы в моно
+        samples_per_bin: Сэмплов на бин (альтернатива bins)
+        progress: Доля выполнения (0..1) при расчёте по файлу (compute_envelope)
+
+    Returns:
+        Envelope с массивами формы (bins, channels)
+
+    Raises:
+        ValueError: Если интервал пуст или вне длительности файла
+    """
+    pyramid = load_peaks(audio_file_id, file_path) if audio_file_id else None
+    if pyramid is not None:
+        sample_rate, total_frames = pyramid.sample_rate, pyramid.frames
+    else:
+        with get_audio_reader(file_path) as reader:
+            sample_rate, total_frames = reader.samplerate, reader.frames
+
+    start_frame = int(max(0.0, start_time) * sample_rate)
+    end_frame = total_frames if end_time is None else min(int(end_time * sample_rate), total_frames)
+    if start_frame >= end_frame and total_frames > 0:
+        raise ValueError('start_time must be less than end_time and inside audio duration')
+
+    if bins is None:
+        bins = -(-(end_frame - start_frame) // max(1, samples_per_bin or 1))
+
+    if pyramid is not None:
+        envelope = pyramid.read_envelope(bins, start_frame, end_frame, mono=mono)
+        if envelope is not None:
+            return envelope
+    return compute_envelope(file_path, bins, start_frame, end_frame, mono=mono, progress=progress)
+
+
+def remove_peaks(audio_file_id) -> None:
+    """Удаляет файл пирамиды AudioFile и отменяет ещё не начатое построение."""
+    with _futures_lock:
+        future = _futures.pop(str(audio_file_id), None)
+    if future is not None:
+        future.cancel()
+    get_peaks_path(audio_file_id).unlink(missing_ok=True)
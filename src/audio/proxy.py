@@ -0,0 +1,221 @@
+"""
+Модуль фонового построения proxy для воспроизведения больших файлов.
+
+Многоканальные WAV на 96 кГц размером в гигабайты плохо проигрываются
+по сети. Для таких файлов после импорта в фоне строится сжатая копия:
+сведение в моно, ресемплинг и кодирование в Ogg/Opus (или Vorbis, FLAC).
+Длительность proxy совпадает с исходной (ресемплинг без задержки через
+segment.iter_segment_blocks), поэтому временные метки аннотаций общие.
+
+Proxy лежат в каталоге proxies рядом с БД, состояние хранится
+в таблице playback_proxies.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+import soundfile as sf
+
+from src.audio.reader import get_audio_reader
+from src.audio.segment import SegmentPlan, iter_segment_blocks
+from src.models import PlaybackProxy, PlaybackProxyStatus, get_db
+from src.utils.storage import get_data_dir
+
+# Константы
+PROXY_DIR_NAME = 'proxies'
+PLAYBACK_PROXY_ENABLED = os.getenv('PLAYBACK_PROXY_ENABLED', 'true').lower() == 'true'
+# Proxy строятся только для файлов не меньше этого размера
+PLAYBACK_PROXY_MIN_BYTES = int(os.getenv('PLAYBACK_PROXY_MIN_BYTES', str(256 * 1024 * 1024)))
+PLAYBACK_PROXY_FORMAT = os.getenv('PLAYBACK_PROXY_FORMAT', 'opus')
+PLAYBACK_PROXY_SAMPLE_RATE = int(os.getenv('PLAYBACK_PROXY_SAMPLE_RATE', '48000'))
+
+# Формат proxy: (формат soundfile, subtype, расширение, MIME тип)
+PROXY_FORMATS = {
+    'opus': ('OGG', 'OPUS', '.opus', 'audio/ogg'),
+    'vorbis': ('OGG', 'VORBIS', '.ogg', 'audio/ogg'),
+    'flac': ('FLAC', 'PCM_16', '.flac', 'audio/flac'),
+}
+# Opus кодирует только на этих частотах
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='playback-proxy')
+_futures: Dict[str, Future] = {}
+_futures_lock = threading.Lock()
+
+
+def needs_proxy(file_size: int) -> bool:
+    """Нужен ли proxy файлу такого размера."""
+    return PLAYBACK_PROXY_ENABLED and file_size >= PLAYBACK_PROXY_MIN_BYTES
+
+
+def proxy_sample_rate(proxy_format: str, source_rate: int) -> int:
+    """
+    Частота дискретизации proxy.
+
+    Не выше исходной, кроме Opus, который поддерживает только
+    фиксированный набор частот и всегда кодируется на 48 кГц.
+    """
+    if proxy_format == 'opus':
+        return OPUS_SAMPLE_RATES[-1]
+    return min(PLAYBACK_PROXY_SAMPLE_RATE, source_rate)
+
+
+def get_proxy_path(audio_file_id, proxy_format: str = PLAYBACK_PROXY_FORMAT) -> Path:
+    """Путь к файлу proxy для AudioFile."""
+    extension = PROXY_FORMATS[proxy_format][2]
+    return get_data_dir(PROXY_DIR_NAME) / f'{audio_file_id}{extension}'
+
+
+def transcode_proxy(file_path: str, proxy_path: Path, proxy_format: str = PLAYBACK_PROXY_FORMAT) -> Dict:
+    """
+    Перекодирует файл в моно proxy и атомарно сохраняет его.
+
+    Args:
+        file_path: Путь к исходному аудио-файлу
+        proxy_path: Путь к результату
+        proxy_format: opus, vorbis или flac
+
+    Returns:
+        dict: sample_rate, channels, file_size proxy
+    """
+    if proxy_format not in PROXY_FORMATS:
+        raise ValueError(f'proxy format must be one of: {", ".join(PROXY_FORMATS)}')
+    sf_format, subtype, _, _ = PROXY_FORMATS[proxy_format]
+
+    with get_audio_reader(file_path) as reader:
+        plan = SegmentPlan(
+            file_path=file_path,
+            start_frame=0,
+            end_frame=reader.frames,
+            source_rate=reader.samplerate,
+            source_channels=reader.channels,
+            sample_rate=proxy_sample_rate(proxy_format, reader.samplerate),
+            channels=1
+        )
+
+    tmp_path = proxy_path.with_name(proxy_path.name + '.tmp')
+    try:
+        with sf.SoundFile(
+            tmp_path, 'w', samplerate=plan.sample_rate, channels=1,
+            format=sf_format, subtype=subtype
+        ) as out:
+            for block in iter_segment_blocks(plan):
+                out.write(block)
+        os.replace(tmp_path, proxy_path)
+    except BaseException:
+        # Недописанный proxy не нужен: следующее построение начнёт заново
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return {
+        'sample_rate': plan.sample_rate,
+        'channels': 1,
+        'file_size': proxy_path.stat().st_size,
+    }
+
+
+def build_proxy(audio_file_id, proxy_format: str = PLAYBACK_PROXY_FORMAT) -> Optional[PlaybackProxy]:
+    """
+    Строит proxy для AudioFile и обновляет запись PlaybackProxy.
+
+    Ошибка кодирования сохраняется в статусе ERROR и не пробрасывается:
+    без proxy воспроизведение продолжит работать по исходному файлу.
+
+    Returns:
+        PlaybackProxy или None, если AudioFile не найден
+    """
+    from src.models import AudioFile
+
+    session = get_db().get_session()
+    try:
+        audio_file = AudioFile.get_by_id(session, audio_file_id)
+        if audio_file is None:
+            return None
+
+        proxy_path = get_proxy_path(audio_file.id, proxy_format)
+        proxy = PlaybackProxy.get_by_audio_file(session, audio_file.id)
+        if proxy is None:
+            proxy = PlaybackProxy(audio_file_id=audio_file.id)
+            session.add(proxy)
+        proxy.file_path = str(proxy_path)
+        proxy.format = proxy_format
+        proxy.sample_rate = proxy_sample_rate(proxy_format, audio_file.sample_rate)
+        proxy.channels = 1
+        proxy.status = PlaybackProxyStatus.PENDING
+        proxy.error_message = None
+        session.commit()
+
+        try:
+            stat = os.stat(audio_file.file_path)
+            result = transcode_proxy(audio_file.file_path, proxy_path, proxy_format)
+        except Exception as e:
+            proxy.status = PlaybackProxyStatus.ERROR
+            proxy.error_message = str(e)
+        else:
+            proxy.sample_rate = result['sample_rate']
+            proxy.file_size = result['file_size']
+            proxy.source_size = stat.st_size
+            proxy.source_mtime_ns = stat.st_mtime_ns
+            proxy.status = PlaybackProxyStatus.READY
+        session.commit()
+        session.refresh(proxy)
+        session.expunge(proxy)
+        return proxy
+    finally:
+        session.close()
+
+
+def schedule_proxy(audio_file_id, proxy_format: str = PLAYBACK_PROXY_FORMAT) -> Future:
+    """
+    Ставит построение proxy в фоновую очередь.
+
+    Повторный вызов для файла, proxy которого ещё строится,
+    возвращает уже запущенную задачу.
+
+    Returns:
+        Future с результатом build_proxy
+    """
+    key = str(audio_file_id)
+    with _futures_lock:
+        future = _futures.get(key)
+        if future is None or future.done():
+            future = _executor.submit(build_proxy, audio_file_id, proxy_format)
+            _futures[key] = future
+        return future
+
+
+def wait_for_proxy(audio_file_id, timeout: Optional[float] = None) -> Optional[PlaybackProxy]:
+    """Дождаться фонового построения proxy (если оно запущено)."""
+    with _futures_lock:
+        future = _futures.get(str(audio_file_id))
+    return future.result(timeout) if future is not None else None
+
+
+def get_ready_proxy(session, audio_file) -> Optional[PlaybackProxy]:
+    """
+    Готовый и актуальный proxy для AudioFile.
+
+    Returns:
+        PlaybackProxy или None, если proxy нет, он не готов
+        или исходный файл изменился после построения
+    """
+    proxy = PlaybackProxy.get_by_audio_file(session, audio_file.id)
+    if proxy is None or proxy.status != PlaybackProxyStatus.READY:
+        return None
+    try:
+        stat = os.stat(audio_file.file_path)
+    except OSError:
+        return None
+    if (stat.st_size, stat.st_mtime_ns) != (proxy.source_size, proxy.source_mtime_ns):
+        return None
+    if not os.path.isfile(proxy.file_path):
+        return None
+    return proxy
+
+
+def remove_proxy(audio_file_id) -> None:
+    """Удаляет файлы proxy AudioFile всех форматов."""
+    for proxy_format in PROXY_FORMATS:
+        get_proxy_path(audio_file_id, proxy_format).unlink(missing_ok=True)
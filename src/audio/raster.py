@@ -0,0 +1,185 @@
+"""
+Модуль для быстрой растеризации waveform и спектрограмм без matplotlib.
+
+Изображение рисуется напрямую в uint8 RGBA массив NumPy:
+- waveform: каждый столбец закрашивается между min и max огибающей
+- спектрограмма: значения dB отображаются через 256-цветную LUT палитры
+Кодирование в PNG выполняется Pillow с настраиваемым уровнем zlib.
+Размер результата всегда ровно width x height пикселей.
+"""
+import io
+import os
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+# Доступные способы рендеринга
+RENDERER_RASTER = 'raster'
+RENDERER_MATPLOTLIB = 'matplotlib'
+RENDERERS = (RENDERER_RASTER, RENDERER_MATPLOTLIB)
+DEFAULT_RENDERER = RENDERER_RASTER
+# Версия рендеринга: увеличивается при любом изменении вида изображений,
+# чтобы ранее закэшированные PNG перестали использоваться
+RENDERER_VERSION = 3
+
+# Уровень сжатия zlib для PNG (0-9): меньше - быстрее, больше - компактнее
+PNG_COMPRESS_LEVEL = int(os.getenv('PNG_COMPRESS_LEVEL', '1'))
+
+BACKGROUND_RGBA = (255, 255, 255, 255)  # Белый фон, как у matplotlib
+WAVEFORM_FILL_ALPHA = 0.7  # Прозрачность заливки, как в matplotlib рендере
+
+
+def validate_renderer(renderer: str) -> None:
+    """
+    Проверяет название способа рендеринга.
+
+    Raises:
+        ValueError: Если renderer не поддерживается
+    """
+    if renderer not in RENDERERS:
+        raise ValueError(f'renderer must be one of: {", ".join(RENDERERS)}')
+
+
+def parse_hex_color(color: str) -> np.ndarray:
+    """
+    Преобразует hex цвет (#RGB, #RRGGBB, #RRGGBBAA, можно без #) в RGBA.
+
+    Raises:
+        ValueError: Если цвет задан неверно
+    """
+    value = color.lstrip('#')
+    if len(value) == 3:
+        value = ''.join(ch * 2 for ch in value)
+    if len(value) == 6:
+        value += 'ff'
+    try:
+        if len(value) != 8:
+            raise ValueError
+        return np.array([int(value[i:i + 2], 16) for i in range(0, 8, 2)], dtype=np.uint8)
+    except ValueError:
+        raise ValueError(f'Invalid color: {color}') from None
+
+
+@lru_cache(maxsize=32)
+def get_colormap_lut(color_map: str) -> np.ndarray:
+    """
+    Возвращает 256-цветную RGBA LUT палитры matplotlib.
+
+    LUT считается один раз на палитру и кэшируется в памяти процесса,
+    поэтому matplotlib импортируется только при первом обращении.
+
+    Raises:
+        ValueError: Если палитра не существует
+    """
+    from matplotlib import colormaps
+
+    try:
+        cmap = colormaps[color_map]
+    except KeyError as exc:
+        raise ValueError(f'Invalid color_map: {color_map}') from exc
+
+    lut = np.round(cmap(np.linspace(0.0, 1.0, 256)) * 255).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+
+def encode_png(rgba: np.ndarray, compress_level: int = PNG_COMPRESS_LEVEL) -> bytes:
+    """
+    Кодирует RGBA массив (height, width, 4) в PNG.
+
+    Args:
+        rgba: uint8 массив изображения
+        compress_level: Уровень zlib (0-9)
+
+    Returns:
+        PNG изображение в виде bytes
+    """
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, 'RGBA').save(buffer, format='PNG', compress_level=compress_level)
+    return buffer.getvalue()
+
+
+def render_waveform(
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    width: int,
+    height: int,
+    color: str
+) -> np.ndarray:
+    """
+    Рисует waveform в RGBA массив.
+
+    Args:
+        mins: Минимумы огибающей по бинам (значения в [-1, 1])
+        maxs: Максимумы огибающей по бинам
+        width: Ширина изображения в пикселях
+        height: Высота изображения в пикселях
+        color: Цвет waveform в hex формате
+
+    Returns:
+        np.ndarray: uint8 массив (height, width, 4)
+    """
+    rgba = parse_hex_color(color)
+    background = np.array(BACKGROUND_RGBA, dtype=np.float32)
+    fill = np.round(
+        rgba * WAVEFORM_FILL_ALPHA + background * (1 - WAVEFORM_FILL_ALPHA)
+    ).astype(np.uint8)
+
+    # Каждому столбцу соответствует бин огибающей
+    columns = np.arange(width) * len(mins) // width
+    lower = np.clip(mins[columns], -1.0, 1.0)
+    upper = np.clip(maxs[columns], -1.0, 1.0)
+
+    # Значение 1.0 - верхняя строка, -1.0 - нижняя
+    top = np.round((1.0 - upper) / 2 * (height - 1)).astype(np.int64)
+    bottom = np.round((1.0 - lower) / 2 * (height - 1)).astype(np.int64)
+
+    image = np.empty((height, width, 4), dtype=np.uint8)
+    image[:] = BACKGROUND_RGBA
+    rows = np.arange(height)[:, None]
+    image[(rows >= top) & (rows <= bottom)] = fill
+
+    # Контур огибающей полным цветом
+    x = np.arange(width)
+    image[top, x] = rgba
+    image[bottom, x] = rgba
+    return image
+
+
+def render_spectrogram(
+    spectrogram_db: np.ndarray,
+    width: int,
+    height: int,
+    color_map: str,
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None
+) -> np.ndarray:
+    """
+    Рисует спектрограмму в RGBA массив через LUT палитры.
+
+    Args:
+        spectrogram_db: Матрица dB (freq_bins, frames), низкие частоты в строке 0
+        width: Ширина изображения в пикселях
+        height: Высота изображения в пикселях
+        color_map: Название палитры matplotlib
+        vmin: dB нижнего цвета палитры (None - минимум матрицы)
+        vmax: dB верхнего цвета палитры (None - максимум матрицы)
+
+    Returns:
+        np.ndarray: uint8 массив (height, width, 4), низкие частоты внизу
+    """
+    lut = get_colormap_lut(color_map)
+    n_bins, n_frames = spectrogram_db.shape
+
+    # Ближайший сосед по обеим осям; частоты переворачиваем
+    rows = (np.arange(height)[::-1] * n_bins) // height
+    columns = (np.arange(width) * n_frames) // width
+    sampled = spectrogram_db[rows[:, None], columns[None, :]]
+
+    vmin = float(np.min(spectrogram_db)) if vmin is None else vmin
+    vmax = float(np.max(spectrogram_db)) if vmax is None else vmax
+    scale = 255.0 / (vmax - vmin) if vmax > vmin else 0.0
+    indices = np.clip((sampled - vmin) * scale, 0, 255).astype(np.uint8)
+    return lut[indices]
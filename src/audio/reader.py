@@ -0,0 +1,126 @@
+"""
+Общий API чтения аудио с произвольным доступом по фреймам.
+
+Waveform, spectrogram, peaks и segment читают файлы через AudioReader,
+а не напрямую через soundfile или librosa:
+
+- WAV/FLAC/AIFF читаются soundfile с позиционированием (seek);
+- сжатые форматы (MP3/M4A/AAC/OGG) один раз декодируются в кэш PCM
+  (см. pcm_cache) и дальше читаются из memmap без повторного декодирования.
+
+Все чтения возвращают float32 массив формы (frames, channels).
+"""
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+import numpy as np
+import soundfile as sf
+
+from src.audio.pcm_cache import PCM_SCALE, PcmEntry, get_pcm_entry, needs_pcm_cache
+
+
+class AudioReader(ABC):
+    """Базовый читатель: метаданные и чтение интервалов фреймов."""
+
+    samplerate: int
+    channels: int
+    frames: int
+
+    @property
+    def duration(self) -> float:
+        """Длительность в секундах."""
+        return self.frames / self.samplerate if self.samplerate else 0.0
+
+    @abstractmethod
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        """Читает фреймы [start, stop) внутри границ файла."""
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Читает фреймы [start, stop), обрезая интервал по границам файла.
+
+        Args:
+            start: Первый фрейм
+            stop: Фрейм конца (не включительно), None - до конца файла
+
+        Returns:
+            np.ndarray: float32 формы (frames, channels)
+        """
+        start = min(max(0, start), self.frames)
+        stop = self.frames if stop is None else min(max(start, stop), self.frames)
+        return self._read(start, stop)
+
+    def read_padded(self, start: int, stop: int) -> np.ndarray:
+        """Читает фреймы [start, stop), дополняя нулями участки вне файла."""
+        data = self.read(start, stop)
+        before = max(0, start) - start
+        return np.pad(data, ((before, stop - start - before - len(data)), (0, 0)))
+
+    def blocks(self, blocksize: int, start: int = 0, stop: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Последовательное чтение интервала блоками по blocksize фреймов.
+
+        Yields:
+            np.ndarray: float32 формы (frames, channels)
+        """
+        start = min(max(0, start), self.frames)
+        stop = self.frames if stop is None else min(max(start, stop), self.frames)
+        for position in range(start, stop, blocksize):
+            yield self._read(position, min(position + blocksize, stop))
+
+    def close(self) -> None:
+        """Освобождает ресурсы читателя."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SoundFileReader(AudioReader):
+    """Чтение форматов с точным seek (WAV, FLAC, AIFF) через soundfile."""
+
+    def __init__(self, file_path: str):
+        self._file = sf.SoundFile(file_path)
+        self.samplerate = int(self._file.samplerate)
+        self.channels = int(self._file.channels)
+        self.frames = int(self._file.frames)
+
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        self._file.seek(start)
+        return self._file.read(stop - start, dtype='float32', always_2d=True)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class PcmReader(AudioReader):
+    """Чтение декодированного PCM из кэша (memmap int16)."""
+
+    def __init__(self, entry: PcmEntry):
+        self._data = entry.data
+        self.samplerate = entry.sample_rate
+        self.channels = entry.channels
+        self.frames = entry.frames
+
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        return self._data[start:stop].astype(np.float32) / np.float32(PCM_SCALE)
+
+
+def get_audio_reader(file_path: str) -> AudioReader:
+    """
+    Читатель для аудио-файла.
+
+    Сжатые форматы при первом обращении декодируются в кэш PCM;
+    остальные файлы читаются напрямую.
+
+    Args:
+        file_path: Путь к аудио-файлу
+
+    Returns:
+        AudioReader (используется как контекстный менеджер)
+    """
+    if needs_pcm_cache(file_path):
+        return PcmReader(get_pcm_entry(file_path))
+    return SoundFileReader(file_path)
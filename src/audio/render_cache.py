@@ -0,0 +1,234 @@
+"""
+Модуль дискового кэша отрисованных waveform и спектрограмм.
+
+Ключ кэша - хэш от (путь к файлу, размер, mtime, версия рендерера,
+нормализованные параметры запроса), поэтому изменение исходного файла
+или рендерера автоматически делает старые записи недоступными.
+Ключ начинается с хэша пути файла: при удалении AudioFile все его
+записи удаляются по этому префиксу (remove_file).
+PNG хранятся рядом с БД в каталоге render_cache, общий объём
+ограничен бюджетом RENDER_CACHE_MAX_BYTES с вытеснением LRU.
+Одновременные одинаковые отрисовки выполняются один раз (single_flight).
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src.audio.raster import RENDERER_VERSION
+from src.audio.single_flight import render_flight
+from src.utils.storage import get_data_dir
+
+# Константы
+RENDER_CACHE_DIR_NAME = 'render_cache'
+RENDER_CACHE_MAX_BYTES = int(os.getenv('RENDER_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+CACHE_FILE_SUFFIX = '.png'
+FILE_PREFIX_LENGTH = 16  # Символов хэша пути в начале ключа
+
+
+def file_key_prefix(file_path: str) -> str:
+    """Префикс ключей всех записей файла (хэш абсолютного пути)."""
+    digest = hashlib.sha256(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+    return digest[:FILE_PREFIX_LENGTH]
+
+
+def make_cache_key(file_path: str, params: Dict) -> str:
+    """
+    Вычисляет ключ кэша для отрисовки файла с заданными параметрами.
+
+    Args:
+        file_path: Путь к исходному аудио-файлу
+        params: Параметры отрисовки (тип изображения, размеры, интервал...)
+
+    Returns:
+        str: 64 hex символа - префикс пути файла и sha256 параметров
+    """
+    stat = os.stat(file_path)
+    identity = {
+        'path': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'renderer_version': RENDERER_VERSION,
+        'params': params,
+    }
+    payload = json.dumps(identity, sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return file_key_prefix(file_path) + digest[FILE_PREFIX_LENGTH:]
+
+
+class RenderCache:
+    """Дисковый LRU кэш PNG изображений с бюджетом по байтам."""
+
+    def __init__(self, directory: Path, max_bytes: int = RENDER_CACHE_MAX_BYTES):
+        """
+        Инициализация кэша.
+
+        Args:
+            directory: Каталог хранения
+            max_bytes: Бюджет в байтах (0 - кэш отключён)
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _path_for(self, key: str) -> Path:
+        """Путь к файлу записи (двухсимвольный подкаталог по префиксу ключа)."""
+        return self.directory / key[:2] / f'{key}{CACHE_FILE_SUFFIX}'
+
+    def _load_index(self) -> None:
+        """Восстанавливает индекс LRU по mtime файлов на диске."""
+        found = []
+        for path in self.directory.glob(f'*/*{CACHE_FILE_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime_ns, path.stem, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Получить запись из кэша.
+
+        Returns:
+            bytes или None при промахе
+        """
+        path = self._path_for(key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            data = path.read_bytes()
+            # mtime сохраняет порядок LRU между перезапусками
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._total_bytes -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Сохранить запись и вытеснить старые при превышении бюджета."""
+        if self.max_bytes <= 0 or len(data) > self.max_bytes:
+            return
+
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            evicted = []
+            while self._total_bytes > self.max_bytes and self._entries:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                self.evictions += 1
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            self._path_for(old_key).unlink(missing_ok=True)
+
+    def get_or_render(self, file_path: str, params: Dict, render: Callable[[], bytes]) -> bytes:
+        """
+        Вернуть изображение из кэша или отрисовать и сохранить его.
+
+        Одновременные промахи с одним ключом объединяются (render_flight):
+        отрисовывает первый запрос, остальные ждут его результат.
+
+        Args:
+            file_path: Путь к исходному аудио-файлу
+            params: Нормализованные параметры отрисовки
+            render: Функция отрисовки без аргументов
+
+        Returns:
+            bytes: PNG изображение
+        """
+        key = make_cache_key(file_path, params)
+        data = self.get(key)
+        if data is None:
+            data = render_flight.do(key, lambda: self._render_and_put(key, render))
+        return data
+
+    def _render_and_put(self, key: str, render: Callable[[], bytes]) -> bytes:
+        data = render()
+        self.put(key, data)
+        return data
+
+    def clear(self) -> None:
+        """Удалить все записи."""
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        for key in keys:
+            self._path_for(key).unlink(missing_ok=True)
+
+    def remove_file(self, file_path: str) -> int:
+        """
+        Удалить все записи отрисовок файла (при удалении AudioFile).
+
+        Returns:
+            int: Количество удалённых записей
+        """
+        prefix = file_key_prefix(file_path)
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._total_bytes -= self._entries.pop(key)
+        for key in keys:
+            self._path_for(key).unlink(missing_ok=True)
+        return len(keys)
+
+    def stats(self) -> Dict:
+        """Счётчики кэша для метрик."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """
+    Получить глобальный кэш отрисовок.
+
+    Кэш пересоздаётся, если каталог данных изменился (например, сменилась БД).
+
+    Returns:
+        RenderCache: Экземпляр кэша
+    """
+    global _render_cache
+    directory = get_data_dir(RENDER_CACHE_DIR_NAME)
+    with _render_cache_lock:
+        if _render_cache is None or _render_cache.directory != directory:
+            _render_cache = RenderCache(directory)
+        return _render_cache
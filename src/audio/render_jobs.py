@@ -0,0 +1,274 @@
+"""
+Модуль фоновых задач отрисовки больших изображений.
+
+Полноразмерные спектрограммы многочасовых записей и постеры высокого
+разрешения считаются дольше таймаута HTTP запроса. Такая отрисовка
+ставится в очередь задачей RenderJob и выполняется фоновым потоком теми
+же generate_waveform / generate_spectrogram, что и синхронные запросы.
+Функции расчёта сообщают долю обработанных блоков, задача сохраняет её
+в БД как процент выполнения; готовый PNG лежит в каталоге render_jobs
+рядом с БД.
+"""
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.audio.freq_scale import DEFAULT_N_MELS, DEFAULT_SCALE
+from src.audio.raster import DEFAULT_RENDERER, parse_hex_color, validate_renderer
+from src.audio.spectrogram import DEFAULT_COLOR_MAP, SpectrogramParams, generate_spectrogram
+from src.audio.stft_store import DEFAULT_POOLING, HOP_LENGTH, N_FFT, POOLING_METHODS
+from src.audio.waveform import DEFAULT_COLOR, generate_waveform
+from src.models import RenderJob, RenderJobStatus, get_db
+from src.utils.storage import get_data_dir
+
+# Константы
+RENDER_JOBS_DIR_NAME = 'render_jobs'
+RENDER_JOB_WORKERS = int(os.getenv('RENDER_JOB_WORKERS', '1'))
+JOB_KIND_WAVEFORM = 'waveform'
+JOB_KIND_SPECTROGRAM = 'spectrogram'
+JOB_KINDS = (JOB_KIND_WAVEFORM, JOB_KIND_SPECTROGRAM)
+MAX_JOB_WIDTH = 16384
+MAX_JOB_HEIGHT = 4096
+# Расчёт (чтение и STFT) - до 90%, отрисовка и PNG - остаток
+COMPUTE_PROGRESS_SHARE = 90.0
+PROGRESS_SAVE_STEP = 1.0  # Процент, после которого прогресс сохраняется в БД
+
+_executor = ThreadPoolExecutor(max_workers=RENDER_JOB_WORKERS, thread_name_prefix='render-job')
+_futures: Dict[str, Future] = {}
+_futures_lock = threading.Lock()
+
+
+def _number(params: Dict, name: str, cast, default):
+    """Числовой параметр задачи с понятной ошибкой."""
+    value = params.get(name, default)
+    if value is None:
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a number') from None
+
+
+def normalize_job_params(kind: str, params: Optional[Dict]) -> Dict:
+    """
+    Проверяет параметры задачи и дополняет их значениями по умолчанию.
+
+    Args:
+        kind: waveform или spectrogram
+        params: Параметры из запроса (как у GET /waveform и /spectrogram)
+
+    Returns:
+        dict: Нормализованные параметры (сохраняются в RenderJob.params)
+
+    Raises:
+        ValueError: Если тип задачи или параметр неверны
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f'kind must be one of: {", ".join(JOB_KINDS)}')
+    params = params or {}
+    if not isinstance(params, dict):
+        raise ValueError('params must be an object')
+
+    width = _number(params, 'width', int, 4096)
+    height = _number(params, 'height', int, 512)
+    start_time = _number(params, 'start_time', float, 0.0)
+    end_time = _number(params, 'end_time', float, None)
+    renderer = str(params.get('renderer', DEFAULT_RENDERER))
+
+    if width <= 0 or width > MAX_JOB_WIDTH:
+        raise ValueError(f'Width must be between 1 and {MAX_JOB_WIDTH}')
+    if height <= 0 or height > MAX_JOB_HEIGHT:
+        raise ValueError(f'Height must be between 1 and {MAX_JOB_HEIGHT}')
+    if start_time < 0:
+        raise ValueError('start_time must be non-negative')
+    if end_time is not None and end_time <= start_time:
+        raise ValueError('end_time must be greater than start_time')
+    validate_renderer(renderer)
+
+    normalized = {
+        'width': width,
+        'height': height,
+        'start_time': start_time,
+        'end_time': end_time,
+        'renderer': renderer,
+    }
+
+    if kind == JOB_KIND_WAVEFORM:
+        color = str(params.get('color', DEFAULT_COLOR)).lstrip('#').lower()
+        parse_hex_color(color)
+        normalized['color'] = color
+        return normalized
+
+    pooling = str(params.get('pooling', DEFAULT_POOLING))
+    if pooling not in POOLING_METHODS:
+        raise ValueError(f'pooling must be one of: {", ".join(POOLING_METHODS)}')
+    normalized.update({
+        'color_map': str(params.get('color_map', DEFAULT_COLOR_MAP)),
+        'pooling': pooling,
+        'scale': str(params.get('scale', DEFAULT_SCALE)),
+        'fmin': _number(params, 'fmin', float, 0.0),
+        'fmax': _number(params, 'fmax', float, None),
+        'n_mels': _number(params, 'n_mels', int, DEFAULT_N_MELS),
+        'n_fft': _number(params, 'n_fft', int, N_FFT),
+        'hop_length': _number(params, 'hop_length', int, HOP_LENGTH),
+    })
+    SpectrogramParams(**normalized).validate()
+    return normalized
+
+
+def get_job_path(audio_file_id, job_id) -> Path:
+    """Путь к PNG результата задачи."""
+    directory = get_data_dir(RENDER_JOBS_DIR_NAME) / str(audio_file_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f'{job_id}.png'
+
+
+def render_job_image(kind: str, file_path: str, params: Dict, audio_file_id=None, progress=None) -> bytes:
+    """
+    Отрисовывает изображение задачи синхронными функциями генерации.
+
+    Args:
+        kind: waveform или spectrogram
+        file_path: Путь к аудио-файлу
+        params: Результат normalize_job_params
+        audio_file_id: UUID AudioFile (пирамида peaks, STFT матрица)
+        progress: Вызывается с долей выполнения расчёта (0..1)
+
+    Returns:
+        PNG изображение в виде bytes
+    """
+    if kind == JOB_KIND_WAVEFORM:
+        return generate_waveform(
+            file_path, params['width'], params['height'], params['color'],
+            audio_file_id=audio_file_id, start_time=params['start_time'],
+            end_time=params['end_time'], renderer=params['renderer'], progress=progress
+        )
+    return generate_spectrogram(file_path, SpectrogramParams(**params), audio_file_id, progress)
+
+
+def run_render_job(job_id) -> Optional[RenderJob]:
+    """
+    Выполняет задачу отрисовки и обновляет её статус и прогресс.
+
+    Ошибка отрисовки сохраняется в статусе ERROR и не пробрасывается.
+
+    Returns:
+        RenderJob или None, если задача не найдена
+    """
+    session = get_db().get_session()
+    try:
+        job = RenderJob.get_by_id(session, job_id)
+        if job is None:
+            return None
+        audio_file = job.audio_file
+        job.status = RenderJobStatus.RUNNING
+        job.progress = 0.0
+        job.error_message = None
+        session.commit()
+
+        saved_percent = 0.0
+
+        def report(fraction: float) -> None:
+            nonlocal saved_percent
+            percent = COMPUTE_PROGRESS_SHARE * min(1.0, max(0.0, fraction))
+            if percent - saved_percent >= PROGRESS_SAVE_STEP:
+                saved_percent = percent
+                job.progress = percent
+                session.commit()
+
+        try:
+            data = render_job_image(
+                job.kind, audio_file.file_path, job.get_params(), audio_file.id, report
+            )
+            job_path = get_job_path(audio_file.id, job.id)
+            tmp_path = job_path.with_name(f'{job_path.name}.{os.getpid()}.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, job_path)
+        except Exception as e:
+            job.status = RenderJobStatus.ERROR
+            job.error_message = str(e)
+        else:
+            job.file_path = str(job_path)
+            job.file_size = len(data)
+            job.progress = 100.0
+            job.status = RenderJobStatus.DONE
+        session.commit()
+        session.refresh(job)
+        session.expunge(job)
+        return job
+    finally:
+        session.close()
+
+
+def create_render_job(audio_file_id, kind: str, params: Dict) -> RenderJob:
+    """
+    Создаёт задачу отрисовки и ставит её в фоновую очередь.
+
+    Args:
+        audio_file_id: UUID AudioFile
+        kind: waveform или spectrogram
+        params: Результат normalize_job_params
+
+    Returns:
+        RenderJob в статусе PENDING
+    """
+    session = get_db().get_session()
+    try:
+        job = RenderJob(audio_file_id=audio_file_id, kind=kind, params=json.dumps(params))
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        session.expunge(job)
+    finally:
+        session.close()
+    schedule_render_job(job.id)
+    return job
+
+
+def schedule_render_job(job_id) -> Future:
+    """Ставит задачу в фоновую очередь (повторный вызов возвращает запущенную)."""
+    key = str(job_id)
+    with _futures_lock:
+        # Завершённые задачи хранят статус в БД, их Future больше не нужны
+        for done_key in [k for k, f in _futures.items() if f.done() and k != key]:
+            del _futures[done_key]
+        future = _futures.get(key)
+        if future is None or future.done():
+            future = _executor.submit(run_render_job, job_id)
+            _futures[key] = future
+        return future
+
+
+def wait_for_render_job(job_id, timeout: Optional[float] = None) -> Optional[RenderJob]:
+    """Дождаться выполнения задачи (если она поставлена в очередь)."""
+    with _futures_lock:
+        future = _futures.get(str(job_id))
+    return future.result(timeout) if future is not None else None
+
+
+def resume_render_jobs() -> List[str]:
+    """
+    Ставит в очередь задачи, прерванные перезапуском сервера.
+
+    Задача в статусе RUNNING выполняется заново с нулевым прогрессом.
+
+    Returns:
+        list: ID возобновлённых задач
+    """
+    session = get_db().get_session()
+    try:
+        job_ids = [job.id for job in RenderJob.get_active(session)]
+    finally:
+        session.close()
+    for job_id in job_ids:
+        schedule_render_job(job_id)
+    return [str(job_id) for job_id in job_ids]
+
+
+def remove_render_jobs(audio_file_id) -> None:
+    """Удаляет результаты всех задач AudioFile."""
+    shutil.rmtree(get_data_dir(RENDER_JOBS_DIR_NAME) / str(audio_file_id), ignore_errors=True)
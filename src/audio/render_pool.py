@@ -0,0 +1,228 @@
+"""
+Модуль пула процессов для CPU-тяжёлой отрисовки (waveform, спектрограммы).
+
+Отрисовка в потоке запроса Flask упирается в GIL и в глобальное
+состояние pyplot. Пул выполняет функции отрисовки в отдельных процессах:
+
+- RENDER_POOL_PROCESSES процессов (0 - отрисовка в потоке запроса, без пула);
+- очередь ограничена RENDER_QUEUE_SIZE задачами сверх числа процессов,
+  при заполнении новая задача сразу отклоняется (RenderPoolBusy, HTTP 503);
+- ожидание результата ограничено RENDER_TIMEOUT секунд (RenderTimeout).
+
+Процессы запускаются методом spawn: форк процесса с фоновыми потоками
+(построение peaks, STFT, прокси) может унаследовать захваченные блокировки.
+Функции и аргументы задач должны сериализоваться pickle.
+
+Общее состояние ведёт только основной процесс. Процессы пула не декодируют
+сжатые файлы: если записи в кэше PCM нет, задача возвращает PcmNotDecoded,
+основной процесс декодирует файл в свой кэш и повторяет задачу. Прочитанные
+записи и отложенные построения STFT возвращаются вместе с результатом -
+основной процесс учитывает их в LRU и метриках кэша и ставит построения
+в свою ограниченную очередь.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.audio.pcm_cache import PcmNotDecoded, get_pcm_cache, get_pcm_entry, pop_worker_reads, use_parent_cache
+from src.audio.stft_queue import defer_scheduling, pop_deferred_stft, schedule_stft
+from src.utils.storage import get_data_root
+
+# Конфигурация
+RENDER_POOL_PROCESSES = int(os.getenv('RENDER_POOL_PROCESSES', str(min(4, os.cpu_count() or 1))))
+RENDER_QUEUE_SIZE = int(os.getenv('RENDER_QUEUE_SIZE', '16'))
+RENDER_TIMEOUT = float(os.getenv('RENDER_TIMEOUT', '60'))
+RENDER_RETRY_AFTER = int(os.getenv('RENDER_RETRY_AFTER', '2'))  # Секунд в заголовке Retry-After
+
+
+class RenderUnavailable(RuntimeError):
+    """Отрисовка сейчас невозможна, запрос стоит повторить позже."""
+
+    def __init__(self, message: str, retry_after: int = RENDER_RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RenderPoolBusy(RenderUnavailable):
+    """Очередь пула заполнена."""
+
+
+class RenderTimeout(RenderUnavailable):
+    """Задача не завершилась за RENDER_TIMEOUT секунд."""
+
+
+def _init_worker() -> None:
+    """Процесс пула только читает кэши основного процесса и не запускает построения."""
+    use_parent_cache()
+    defer_scheduling()
+
+
+def _run_task(data_root: str, func: Callable[..., Any], args: tuple, kwargs: dict) -> Tuple[Any, List[str], List]:
+    """
+    Выполняет задачу в процессе пула.
+
+    Returns:
+        Tuple (результат, прочитанные записи кэша PCM, отложенные построения STFT)
+    """
+    # Каталог данных основного процесса (тестовая БД, AUDIO_DATA_DIR)
+    os.environ['AUDIO_DATA_DIR'] = data_root
+    pop_worker_reads()
+    pop_deferred_stft()
+    result = func(*args, **kwargs)
+    return result, pop_worker_reads(), pop_deferred_stft()
+
+
+class RenderPool:
+    """Пул процессов отрисовки с ограниченной очередью и таймаутом."""
+
+    def __init__(
+        self,
+        processes: int = RENDER_POOL_PROCESSES,
+        queue_size: int = RENDER_QUEUE_SIZE,
+        timeout: float = RENDER_TIMEOUT,
+        retry_after: int = RENDER_RETRY_AFTER
+    ):
+        self.processes = max(0, processes)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Выполняются ли задачи в отдельных процессах."""
+        return self.processes > 0
+
+    @property
+    def capacity(self) -> int:
+        """Максимум задач в работе и в очереди одновременно."""
+        return self.processes + self.queue_size
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Процессы создаются при первой задаче (вызывать под self._lock)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        """Сбрасывает сломанный пул (процесс завершился аварийно)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+
+    def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Выполняет func(*args, **kwargs) в пуле и возвращает результат.
+
+        Исключения задачи (например, ValueError на неверные параметры)
+        пробрасываются вызывающему коду. Сжатый файл, которого нет в кэше PCM,
+        декодируется в этом процессе, после чего задача повторяется.
+
+        Raises:
+            RenderPoolBusy: Очередь заполнена, задача не принята
+            RenderTimeout: Результат не получен за timeout секунд
+        """
+        if not self.enabled:
+            return func(*args, **kwargs)
+
+        data_root = str(get_data_root())
+        try:
+            result, reads, deferred = self._submit(_run_task, data_root, func, args, kwargs)
+        except PcmNotDecoded as missing:
+            get_pcm_entry(missing.file_path)
+            try:
+                result, reads, deferred = self._submit(_run_task, data_root, func, args, kwargs)
+            except PcmNotDecoded:
+                # Запись вытеснена между декодированием и чтением
+                raise RenderUnavailable('Decoded audio was evicted, retry later', self.retry_after)
+
+        if reads:
+            get_pcm_cache().record_reads(reads)
+        for audio_file_id, file_path in deferred:
+            schedule_stft(audio_file_id, file_path)
+        return result
+
+    def _submit(self, func: Callable[..., Any], *args) -> Any:
+        """Отправляет задачу в пул с учётом очереди и ждёт результат."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise RenderPoolBusy('Render queue is full, retry later', self.retry_after)
+            executor = self._get_executor()
+            self._in_flight += 1
+            self._submitted += 1
+
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                self._in_flight -= 1
+            self._reset_executor()
+            raise
+        # Задача освобождает место в очереди, только когда процесс её закончил
+        future.add_done_callback(self._on_done)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timeouts += 1
+            raise RenderTimeout(f'Rendering did not finish in {self.timeout:g} s', self.retry_after)
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Счётчики пула для /api/metrics."""
+        with self._lock:
+            return {
+                'processes': self.processes,
+                'queue_size': self.queue_size,
+                'timeout': self.timeout,
+                'in_flight': self._in_flight,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timeouts': self._timeouts,
+            }
+
+    def shutdown(self) -> None:
+        """Останавливает процессы пула."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_render_pool: Optional[RenderPool] = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> RenderPool:
+    """Глобальный пул отрисовки."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = RenderPool()
+        return _render_pool
@@ -0,0 +1,217 @@
+"""
+Модуль для потоковой выдачи временного интервала аудио-файла.
+
+Интервал читается блоками с позиционированием по фреймам через AudioReader
+(сжатые форматы - из кэша декодированного PCM), поэтому время ответа
+не зависит от длины исходного файла. На лету
+поддерживаются сведение каналов в моно и понижение частоты
+дискретизации (полифазный фильтр scipy.signal.resample_poly).
+
+WAV (PCM 16 бит) отдаётся потоково: размер известен заранее, поэтому
+заголовок формируется до чтения данных. FLAC кодируется целиком в памяти,
+так как libsndfile дописывает заголовок FLAC при закрытии файла.
+"""
+import io
+import math
+import struct
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Iterator, Optional
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+from src.audio.reader import get_audio_reader
+
+# Константы
+SEGMENT_FORMATS = ('wav', 'flac')
+SEGMENT_MIMETYPES = {'wav': 'audio/wav', 'flac': 'audio/flac'}
+SEGMENT_BLOCK_FRAMES = 1 << 16  # Фреймов исходного файла на блок чтения
+WAV_HEADER_SIZE = 44
+WAV_MAX_DATA_BYTES = 0xFFFFFFFF - WAV_HEADER_SIZE  # Ограничение 32-битного RIFF
+PCM16_SCALE = 32767.0
+# Полуширина фильтра resample_poly в отсчётах на повышенной частоте: 10 * max(up, down)
+RESAMPLE_HALF_LEN_FACTOR = 10
+
+
+@dataclass
+class SegmentPlan:
+    """Параметры выдаваемого интервала."""
+
+    file_path: str
+    start_frame: int
+    end_frame: int
+    source_rate: int
+    source_channels: int
+    sample_rate: int
+    channels: int
+    output_format: str = 'wav'
+
+    @property
+    def ratio(self) -> Fraction:
+        """Отношение выходной частоты к исходной (up / down)."""
+        return Fraction(self.sample_rate, self.source_rate)
+
+    @property
+    def output_frames(self) -> int:
+        """Количество фреймов результата."""
+        return math.ceil((self.end_frame - self.start_frame) * self.ratio)
+
+    @property
+    def data_bytes(self) -> int:
+        """Размер PCM 16 бит данных WAV."""
+        return self.output_frames * self.channels * 2
+
+    @property
+    def duration(self) -> float:
+        """Длительность интервала в секундах."""
+        return self.output_frames / self.sample_rate
+
+
+def plan_segment(
+    file_path: str,
+    start_time: float,
+    end_time: Optional[float] = None,
+    channels: Optional[int] = None,
+    sample_rate: Optional[int] = None,
+    output_format: str = 'wav'
+) -> SegmentPlan:
+    """
+    Проверяет параметры и вычисляет границы интервала в фреймах.
+
+    Args:
+        file_path: Путь к аудио-файлу
+        start_time: Начало интервала в секундах
+        end_time: Конец интервала в секундах (None - до конца файла)
+        channels: 1 (моно микс) или исходное количество каналов (None - исходное)
+        sample_rate: Частота результата, не выше исходной (None - исходная)
+        output_format: wav или flac
+
+    Returns:
+        SegmentPlan
+
+    Raises:
+        ValueError: Если параметры некорректны или формат не читается
+    """
+    if output_format not in SEGMENT_FORMATS:
+        raise ValueError(f'format must be one of: {", ".join(SEGMENT_FORMATS)}')
+
+    try:
+        with get_audio_reader(file_path) as reader:
+            source_rate, source_channels, total_frames = reader.samplerate, reader.channels, reader.frames
+    except RuntimeError as exc:
+        raise ValueError(f'Segment streaming is not supported for this file: {exc}') from exc
+
+    channels = source_channels if channels is None else channels
+    sample_rate = source_rate if sample_rate is None else sample_rate
+
+    if channels not in (1, source_channels):
+        raise ValueError(f'channels must be 1 or {source_channels}')
+    if sample_rate <= 0 or sample_rate > source_rate:
+        raise ValueError(f'sr must be between 1 and {source_rate}')
+
+    start_frame = int(round(max(0.0, start_time) * source_rate))
+    end_frame = total_frames if end_time is None else min(int(round(end_time * source_rate)), total_frames)
+    if start_frame >= end_frame:
+        raise ValueError('start must be less than end and inside audio duration')
+
+    plan = SegmentPlan(
+        file_path=file_path,
+        start_frame=start_frame,
+        end_frame=end_frame,
+        source_rate=source_rate,
+        source_channels=source_channels,
+        sample_rate=sample_rate,
+        channels=channels,
+        output_format=output_format
+    )
+    if output_format == 'wav' and plan.data_bytes > WAV_MAX_DATA_BYTES:
+        raise ValueError('Segment is too long for WAV, request a shorter interval')
+    return plan
+
+
+def wav_header(sample_rate: int, channels: int, data_bytes: int) -> bytes:
+    """Заголовок WAV (PCM 16 бит) для данных известного размера."""
+    block_align = channels * 2
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_bytes, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, 16,
+        b'data', data_bytes
+    )
+
+
+def iter_segment_blocks(plan: SegmentPlan, block_frames: int = SEGMENT_BLOCK_FRAMES) -> Iterator[np.ndarray]:
+    """
+    Блоки результата float32 формы (frames, channels).
+
+    При понижении частоты каждый блок читается с контекстом по краям,
+    кратным down, поэтому границы блоков совпадают с отсчётами результата
+    и стыки не отличаются от обработки интервала целиком.
+    """
+    up, down = plan.ratio.numerator, plan.ratio.denominator
+    resampling = up != down
+    if resampling:
+        half_len = math.ceil(RESAMPLE_HALF_LEN_FACTOR * max(up, down) / up) + 1
+        context = down * math.ceil(half_len / down)
+        block_frames = max(down, block_frames // down * down)
+    else:
+        context = 0
+
+    remaining = plan.output_frames
+    with get_audio_reader(plan.file_path) as reader:
+        for block_start in range(plan.start_frame, plan.end_frame, block_frames):
+            block_end = min(block_start + block_frames, plan.end_frame)
+            data = reader.read_padded(block_start - context, block_end + context)
+
+            if plan.channels == 1 and data.shape[1] > 1:
+                data = data.mean(axis=1, keepdims=True)
+
+            if resampling:
+                out_frames = min(remaining, math.ceil((block_end - block_start) * up / down))
+                skip = context * up // down
+                data = resample_poly(data, up, down, axis=0)[skip:skip + out_frames]
+
+            remaining -= len(data)
+            yield data
+
+
+def _to_pcm16(block: np.ndarray) -> bytes:
+    """float32 -> PCM 16 бит little-endian с чередованием каналов."""
+    return np.round(np.clip(block, -1.0, 1.0) * PCM16_SCALE).astype('<i2').tobytes()
+
+
+def stream_wav(plan: SegmentPlan) -> Iterator[bytes]:
+    """
+    Потоковый WAV интервала: заголовок, затем PCM блоки.
+
+    Args:
+        plan: Результат plan_segment
+
+    Yields:
+        bytes: Заголовок и блоки данных
+    """
+    yield wav_header(plan.sample_rate, plan.channels, plan.data_bytes)
+    for block in iter_segment_blocks(plan):
+        yield _to_pcm16(block)
+
+
+def encode_flac(plan: SegmentPlan) -> bytes:
+    """
+    FLAC интервала.
+
+    Args:
+        plan: Результат plan_segment
+
+    Returns:
+        bytes: FLAC файл
+    """
+    buffer = io.BytesIO()
+    with sf.SoundFile(
+        buffer, 'w', samplerate=plan.sample_rate, channels=plan.channels,
+        format='FLAC', subtype='PCM_16'
+    ) as out:
+        for block in iter_segment_blocks(plan):
+            out.write(block)
+    return buffer.getvalue()
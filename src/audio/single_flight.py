@@ -0,0 +1,94 @@
+"""
+Модуль объединения одинаковых одновременных запросов отрисовки (single-flight).
+
+При открытии страницы основной плеер, миникарта и плеер региона, а также
+несколько разметчиков одного файла запрашивают одинаковые waveform и
+спектрограммы одновременно. Пока первый запрос (ведущий) считает
+результат, остальные запросы с тем же ключом ждут его и получают тот же
+результат или то же исключение, не запуская повторное декодирование.
+
+Объединение работает внутри одного процесса сервера; между перезапусками
+и процессами результат переиспользуется через дисковый кэш отрисовок.
+"""
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class _Call:
+    """Вычисление в процессе: результат ждут все запросы с тем же ключом."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Группа одновременных вычислений по ключу."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Обнулить счётчики."""
+        with self._lock:
+            self.leaders = 0
+            self.coalesced = 0
+
+    def do(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Вернуть результат compute() для ключа, вычисляя его один раз на группу.
+
+        Args:
+            key: Ключ нормализованных параметров (например, make_cache_key)
+            compute: Функция без аргументов
+
+        Returns:
+            Результат compute() ведущего запроса
+
+        Raises:
+            Исключение compute() ведущего запроса - всем ожидающим
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict:
+        """Счётчики для метрик."""
+        with self._lock:
+            return {
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+                'waiting': sum(call.waiters for call in self._calls.values()),
+            }
+
+
+render_flight = SingleFlight()
@@ -4,30 +4,54 @@
 Поддерживаемый функционал:
 - Генерация спектрограммы выбранного временного интервала
 - Настраиваемые параметры изображения (width, height, color_map)
-- STFT с параметрами n_fft=2048, hop_length=512
+- STFT с параметрами n_fft=2048, hop_length=512 (или заданными в запросе);
+  срез предвычисленной матрицы из stft_store, если она уже построена для файла
+- Частотные шкалы linear, mel, log и cqt с обрезкой по fmin/fmax (freq_scale)
+- Выбор рендерера: быстрый NumPy raster с LUT палитры (по умолчанию) или matplotlib
 """
 from __future__ import annotations
 
 import io
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, List, Optional
 
-import librosa
-import librosa.display
-import matplotlib
-matplotlib.use('Agg')  # Неинтерактивный backend для генерации изображений
-import matplotlib.pyplot as plt
 import numpy as np
 
+from src.audio.raster import (
+    DEFAULT_RENDERER,
+    PNG_COMPRESS_LEVEL,
+    RENDERER_RASTER,
+    encode_png,
+    render_spectrogram,
+    validate_renderer,
+)
+from src.audio.freq_scale import (
+    DEFAULT_N_MELS,
+    DEFAULT_SCALE,
+    apply_bands,
+    get_frequency_bands,
+    validate_scale_params,
+)
+from src.audio.reader import AudioReader, get_audio_reader
+from src.audio.stft_queue import schedule_stft
+from src.audio.stft_store import (
+    DEFAULT_POOLING,
+    HOP_LENGTH,
+    N_FFT,
+    StftMatrix,
+    frame_range,
+    iter_stft_db,
+    load_stft,
+    pool_frames,
+    stft_frame_count,
+    to_relative_db,
+)
+
 # Константы
 DEFAULT_WIDTH = 1024
 DEFAULT_HEIGHT = 512
 DEFAULT_COLOR_MAP = 'viridis'
 
-# STFT параметры
-N_FFT = 2048
-HOP_LENGTH = 512
-
 
 @dataclass
 class SpectrogramParams:
@@ -38,6 +62,29 @@ class SpectrogramParams:
     width: int = DEFAULT_WIDTH
     height: int = DEFAULT_HEIGHT
     color_map: str = DEFAULT_COLOR_MAP
+    renderer: str = DEFAULT_RENDERER
+    compress_level: int = PNG_COMPRESS_LEVEL
+    pooling: str = DEFAULT_POOLING
+    scale: str = DEFAULT_SCALE
+    fmin: float = 0.0
+    fmax: Optional[float] = None
+    n_mels: int = DEFAULT_N_MELS
+    n_fft: int = N_FFT
+    hop_length: int = HOP_LENGTH
+
+    def validate(self) -> None:
+        """
+        Проверяет параметры шкалы и STFT.
+
+        Raises:
+            ValueError: Если параметр вне допустимого диапазона
+        """
+        validate_scale_params(self.scale, self.n_fft, self.hop_length, self.n_mels, self.fmin, self.fmax)
+
+    @property
+    def uses_stft_store(self) -> bool:
+        """Совпадают ли параметры STFT с хранилищем (можно читать срез матрицы)."""
+        return self.n_fft == N_FFT and self.hop_length == HOP_LENGTH
 
 
 def validate_time_range(params: SpectrogramParams, audio_duration: float) -> None:
@@ -55,52 +102,142 @@ def validate_time_range(params: SpectrogramParams, audio_duration: float) -> Non
     params.end_time = end
 
 
-def load_audio_segment(file_path: str, params: SpectrogramParams) -> tuple[np.ndarray, int]:
-    """Загружает указанную часть аудио файла."""
-    # Сначала получаем длительность
-    total_duration = librosa.get_duration(path=file_path)
-    validate_time_range(params, total_duration)
+def _bands_for(params: SpectrogramParams, sample_rate: int):
+    """Бины и фильтры шкалы запроса (кэшируются в freq_scale)."""
+    return get_frequency_bands(
+        params.scale, sample_rate, params.n_fft, params.n_mels, params.fmin, params.fmax
+    )
+
+
+def _pool_stored(stored: StftMatrix, params: SpectrogramParams, progress=None) -> np.ndarray:
+    """Свёрнутые кадры интервала из STFT матрицы файла."""
+    validate_time_range(params, stored.duration)
+    bands = _bands_for(params, stored.sample_rate)
+    first, last = stored.frame_range(params.start_time, params.end_time)
+    chunks = (chunk[:, bands.bins] for chunk in stored.iter_frames(first, last))
+    return apply_bands(pool_frames(chunks, last - first, params.width, params.pooling, progress), bands)
 
-    offset = params.start_time
-    duration = params.end_time - params.start_time if params.end_time else None
 
-    audio_data, sample_rate = librosa.load(
-        file_path,
-        sr=None,
-        mono=True,
-        offset=offset,
-        duration=duration
+def _pool_reader(reader: AudioReader, params: SpectrogramParams, progress=None) -> np.ndarray:
+    """Свёрнутые кадры интервала, посчитанные по аудио."""
+    validate_time_range(params, reader.duration)
+    bands = _bands_for(params, reader.samplerate)
+    total = stft_frame_count(reader.frames, params.hop_length)
+    first, last = frame_range(
+        params.start_time, params.end_time, reader.samplerate, total, params.hop_length
     )
-    return audio_data, sample_rate
+    chunks = iter_stft_db(
+        reader, first, last, n_fft=params.n_fft, hop_length=params.hop_length, bins=bands.bins
+    )
+    return apply_bands(pool_frames(chunks, last - first, params.width, params.pooling, progress), bands)
 
 
-def generate_spectrogram_image(file_path: str, params: SpectrogramParams) -> bytes:
-    """Генерирует PNG изображение спектрограммы."""
-    audio_data, sample_rate = load_audio_segment(file_path, params)
+def _interval_progress(progress: Optional[Callable[[float], None]], index: int, count: int):
+    """Доля выполнения интервала index пересчитывается в долю всего списка."""
+    if progress is None:
+        return None
+    return lambda fraction: progress((index + fraction) / count)
+
+
+def load_stft_frames_many(
+    file_path: str,
+    params_list: List[SpectrogramParams],
+    audio_file_id=None,
+    progress: Optional[Callable[[float], None]] = None
+) -> tuple[List[np.ndarray], int]:
+    """
+    Кадры STFT нескольких интервалов в dB, каждый свёрнут до params.width столбцов.
+
+    Источник открывается один раз на все интервалы. Если для AudioFile
+    уже построена STFT матрица и параметры STFT запроса совпадают с ней,
+    кадры читаются из матрицы. Иначе STFT интервалов считается по аудио,
+    а построение матрицы всего файла ставится в фоновую очередь.
+    Интервалы обрабатываются блоками и сразу сворачиваются (params.pooling),
+    поэтому память не зависит от их длины. Частотные бины вне fmin/fmax
+    отбрасываются до свёртки, нелинейные шкалы применяются к свёрнутым кадрам.
+    progress (если задан) вызывается после каждого блока с долей выполнения
+    всего списка (0..1).
+
+    Returns:
+        Tuple (list float32 массивов (columns, bands) в порядке params_list, sample_rate)
+    """
+    for params in params_list:
+        params.validate()
+
+    use_store = audio_file_id and any(params.uses_stft_store for params in params_list)
+    stored = load_stft(audio_file_id, file_path) if use_store else None
+
+    pooled = []
+    reader = None
+    try:
+        for index, params in enumerate(params_list):
+            interval_progress = _interval_progress(progress, index, len(params_list))
+            if stored is not None and params.uses_stft_store:
+                pooled.append(_pool_stored(stored, params, interval_progress))
+                continue
+            if reader is None:
+                reader = get_audio_reader(file_path)
+            pooled.append(_pool_reader(reader, params, interval_progress))
+        sample_rate = stored.sample_rate if stored is not None else reader.samplerate
+    finally:
+        if reader is not None:
+            reader.close()
+
+    if audio_file_id and stored is None:
+        schedule_stft(audio_file_id, file_path)
+    return pooled, sample_rate
+
+
+def load_stft_frames(
+    file_path: str, params: SpectrogramParams, audio_file_id=None, progress=None
+) -> tuple[np.ndarray, int]:
+    """
+    Кадры STFT интервала в dB, свёрнутые до params.width столбцов.
+
+    Returns:
+        Tuple (float32 массив (columns, freq_bins), sample_rate)
+    """
+    pooled, sample_rate = load_stft_frames_many(file_path, [params], audio_file_id, progress)
+    return pooled[0], sample_rate
+
+
+def load_spectrogram_db(
+    file_path: str, params: SpectrogramParams, audio_file_id=None, progress=None
+) -> tuple[np.ndarray, int]:
+    """Матрица dB интервала (freq_bins, frames) относительно его максимума."""
+    stft_db, sample_rate = load_stft_frames(file_path, params, audio_file_id, progress)
+    return to_relative_db(stft_db), sample_rate
 
-    # Вычисляем STFT
-    stft_result = librosa.stft(audio_data, n_fft=N_FFT, hop_length=HOP_LENGTH)
-    spectrogram = np.abs(stft_result)
-    spectrogram_db = librosa.amplitude_to_db(spectrogram, ref=np.max)
 
-    # Создаём фигуру
-    fig = plt.figure(figsize=(params.width / 100, params.height / 100), dpi=100)
+def render_spectrogram_matplotlib(
+    spectrogram_db: np.ndarray, sample_rate: int, params: SpectrogramParams
+) -> bytes:
+    """Рисует спектрограмму через matplotlib (медленнее, сохранён для совместимости)."""
+    import librosa.display
+    import matplotlib
+    matplotlib.use('Agg')  # Неинтерактивный backend для генерации изображений
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # Фигура без глобального состояния pyplot: рендер безопасен в потоках запросов
+    fig = Figure(figsize=(params.width / 100, params.height / 100), dpi=100)
+    FigureCanvasAgg(fig)
     ax = fig.add_subplot(111)
     fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
 
     # Колор мап
     try:
-        cmap = plt.get_cmap(params.color_map)
-    except ValueError as exc:
+        cmap = matplotlib.colormaps[params.color_map]
+    except KeyError as exc:
         raise ValueError(f'Invalid color_map: {params.color_map}') from exc
 
     # Отображаем спектрограмму
     librosa.display.specshow(
         spectrogram_db,
         sr=sample_rate,
-        hop_length=HOP_LENGTH,
+        hop_length=params.hop_length,
         x_axis='time',
-        y_axis='hz',
+        y_axis='hz' if params.scale == 'linear' else None,
         cmap=cmap,
         ax=ax
     )
@@ -113,11 +250,29 @@ def generate_spectrogram_image(file_path: str, params: SpectrogramParams) -> byt
     buffer.seek(0)
     png_data = buffer.read()
     buffer.close()
-
-    plt.close(fig)
     return png_data
 
 
-def generate_spectrogram(file_path: str, params: SpectrogramParams) -> bytes:
-    """Генерирует спектрограмму без использования кэша."""
-    return generate_spectrogram_image(file_path, params)
+def generate_spectrogram_image(
+    file_path: str, params: SpectrogramParams, audio_file_id=None, progress=None
+) -> bytes:
+    """Генерирует PNG изображение спектрограммы."""
+    validate_renderer(params.renderer)
+    spectrogram_db, sample_rate = load_spectrogram_db(file_path, params, audio_file_id, progress)
+
+    if params.renderer == RENDERER_RASTER:
+        image = render_spectrogram(spectrogram_db, params.width, params.height, params.color_map)
+        return encode_png(image, params.compress_level)
+    return render_spectrogram_matplotlib(spectrogram_db, sample_rate, params)
+
+
+def generate_spectrogram(
+    file_path: str, params: SpectrogramParams, audio_file_id=None, progress=None
+) -> bytes:
+    """
+    Генерирует спектрограмму без использования кэша.
+
+    progress (опционально) вызывается с долей выполнения расчёта (0..1),
+    его используют фоновые задачи отрисовки.
+    """
+    return generate_spectrogram_image(file_path, params, audio_file_id, progress)
@@ -0,0 +1,148 @@
+"""
+Модуль пакетной генерации миниатюр спектрограмм.
+
+Список аннотаций файла показывает превью каждого интервала. Вместо
+отдельного запроса /spectrogram на каждую аннотацию (с открытием и
+декодированием файла каждый раз) все интервалы обрабатываются за один
+проход: источник открывается один раз, интервалы читаются в порядке
+возрастания начала, миниатюры собираются в один спрайт PNG или ZIP.
+"""
+import io
+import json
+import math
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.audio.raster import PNG_COMPRESS_LEVEL, encode_png, render_spectrogram
+from src.audio.spectrogram import DEFAULT_COLOR_MAP, SpectrogramParams, load_stft_frames_many
+from src.audio.stft_store import to_relative_db
+
+# Константы
+DEFAULT_THUMBNAIL_WIDTH = 200
+DEFAULT_THUMBNAIL_HEIGHT = 64
+MAX_THUMBNAIL_WIDTH = 1000
+MAX_THUMBNAIL_HEIGHT = 500
+MAX_BATCH_INTERVALS = 1000
+SPRITE_MAX_COLUMNS = 16  # Миниатюр в строке спрайта
+BATCH_FORMATS = ('sprite', 'zip')
+
+
+@dataclass
+class ThumbnailInterval:
+    """Интервал миниатюры."""
+
+    start_time: float
+    end_time: float
+    id: Optional[str] = None
+
+
+def render_thumbnails(
+    file_path: str,
+    intervals: List[ThumbnailInterval],
+    width: int = DEFAULT_THUMBNAIL_WIDTH,
+    height: int = DEFAULT_THUMBNAIL_HEIGHT,
+    color_map: str = DEFAULT_COLOR_MAP,
+    audio_file_id=None
+) -> List[np.ndarray]:
+    """
+    RGBA миниатюры интервалов за один проход по файлу.
+
+    Интервалы обрабатываются в порядке возрастания начала (последовательное
+    чтение файла), результат возвращается в исходном порядке.
+
+    Returns:
+        List uint8 массивов (height, width, 4)
+
+    Raises:
+        ValueError: Если интервал вне длительности файла или палитра неизвестна
+    """
+    order = sorted(range(len(intervals)), key=lambda i: intervals[i].start_time)
+    params_list = [
+        SpectrogramParams(
+            start_time=intervals[i].start_time,
+            end_time=intervals[i].end_time,
+            width=width,
+            height=height,
+            color_map=color_map,
+        )
+        for i in order
+    ]
+    pooled, _ = load_stft_frames_many(file_path, params_list, audio_file_id)
+
+    images: List[Optional[np.ndarray]] = [None] * len(intervals)
+    for index, stft_db in zip(order, pooled):
+        images[index] = render_spectrogram(to_relative_db(stft_db), width, height, color_map)
+    return images
+
+
+def sprite_layout(count: int, width: int, height: int) -> List[Dict[str, int]]:
+    """Позиции миниатюр в спрайте: сетка по SPRITE_MAX_COLUMNS в строке."""
+    columns = max(1, min(count, SPRITE_MAX_COLUMNS))
+    return [
+        {'x': (i % columns) * width, 'y': (i // columns) * height, 'width': width, 'height': height}
+        for i in range(count)
+    ]
+
+
+def build_sprite(
+    images: List[np.ndarray], width: int, height: int, compress_level: int = PNG_COMPRESS_LEVEL
+) -> bytes:
+    """Собирает миниатюры в один PNG по sprite_layout."""
+    columns = max(1, min(len(images), SPRITE_MAX_COLUMNS))
+    rows = max(1, math.ceil(len(images) / columns))
+    sheet = np.zeros((rows * height, columns * width, 4), dtype=np.uint8)
+    for image, position in zip(images, sprite_layout(len(images), width, height)):
+        sheet[position['y']:position['y'] + height, position['x']:position['x'] + width] = image
+    return encode_png(sheet, compress_level)
+
+
+def build_zip(
+    images: List[np.ndarray],
+    intervals: List[ThumbnailInterval],
+    compress_level: int = PNG_COMPRESS_LEVEL
+) -> bytes:
+    """
+    ZIP с PNG каждой миниатюры (<номер>.png) и manifest.json.
+
+    PNG уже сжаты, поэтому архив собирается без повторного сжатия (ZIP_STORED).
+    """
+    buffer = io.BytesIO()
+    manifest = []
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for index, (image, interval) in enumerate(zip(images, intervals)):
+            name = f'{index:04d}.png'
+            archive.writestr(name, encode_png(image, compress_level))
+            manifest.append({
+                'file': name,
+                'id': interval.id,
+                'start_time': interval.start_time,
+                'end_time': interval.end_time,
+            })
+        archive.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False))
+    return buffer.getvalue()
+
+
+def render_batch(
+    file_path: str,
+    intervals: List[ThumbnailInterval],
+    width: int = DEFAULT_THUMBNAIL_WIDTH,
+    height: int = DEFAULT_THUMBNAIL_HEIGHT,
+    color_map: str = DEFAULT_COLOR_MAP,
+    audio_file_id=None,
+    batch_format: str = 'sprite'
+) -> bytes:
+    """
+    Спрайт PNG или ZIP миниатюр интервалов (задача для пула отрисовки).
+
+    Raises:
+        ValueError: Если формат неизвестен или интервал некорректен
+    """
+    if batch_format not in BATCH_FORMATS:
+        raise ValueError(f'format must be one of: {", ".join(BATCH_FORMATS)}')
+    images = render_thumbnails(file_path, intervals, width, height, color_map, audio_file_id)
+    if batch_format == 'zip':
+        return build_zip(images, intervals)
+    return build_sprite(images, width, height)
@@ -0,0 +1,112 @@
+"""
+Модуль данных спектрограммы для отрисовки на клиенте.
+
+Вместо PNG клиент получает матрицу dBFS интервала (свёрнутую до width
+столбцов так же, как для изображения) и сам раскрашивает её на canvas:
+смена палитры, контраста и частотного диапазона не требует повторного
+запроса к серверу.
+
+Бинарный формат (little-endian, строки - частотные бины от 0 Гц вверх):
+- uint8: значение dBFS = offset + q * scale
+- float16: значение dBFS без квантования
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.audio.spectrogram import SpectrogramParams, load_stft_frames
+from src.audio.stft_store import FULL_SCALE_DB, N_FFT
+
+# Константы
+DATA_VERSION = 1  # Увеличивается при изменении расчёта или формата данных
+DATA_FORMATS = ('uint8', 'float16')
+DEFAULT_DATA_FORMAT = 'uint8'
+DATA_FLOOR_DB = -120.0  # Нижняя граница dBFS, тише - тишина
+UINT8_LEVELS = 255
+
+
+@dataclass
+class SpectrogramData:
+    """Матрица dBFS интервала и её оси."""
+
+    values: np.ndarray  # float32 (freq_bins, columns)
+    sample_rate: int
+    start_time: float
+    end_time: float
+    n_fft: int = N_FFT
+
+    @property
+    def freq_bins(self) -> int:
+        """Количество частотных бинов (строк)."""
+        return self.values.shape[0]
+
+    @property
+    def columns(self) -> int:
+        """Количество столбцов по времени."""
+        return self.values.shape[1]
+
+    @property
+    def freq_step(self) -> float:
+        """Шаг частотной оси в Гц (бин k - частота k * freq_step)."""
+        return self.sample_rate / self.n_fft
+
+    @property
+    def time_step(self) -> float:
+        """Длительность одного столбца в секундах."""
+        return (self.end_time - self.start_time) / self.columns
+
+    def encode(self, data_format: str = DEFAULT_DATA_FORMAT) -> tuple[bytes, float, float]:
+        """
+        Сериализует матрицу.
+
+        Args:
+            data_format: uint8 (квантование) или float16
+
+        Returns:
+            Tuple (bytes, scale, offset); для float16 scale=1, offset=0
+
+        Raises:
+            ValueError: Если формат не поддерживается
+        """
+        if data_format not in DATA_FORMATS:
+            raise ValueError(f'format must be one of: {", ".join(DATA_FORMATS)}')
+        if data_format == 'float16':
+            return self.values.astype('<f2').tobytes(), 1.0, 0.0
+        quantized, scale, offset = quantize_uint8(self.values)
+        return quantized.tobytes(), scale, offset
+
+
+def quantize_uint8(values: np.ndarray) -> tuple[np.ndarray, float, float]:
+    """
+    Линейно квантует значения в диапазон 0..255.
+
+    Returns:
+        Tuple (uint8 массив, scale, offset): values ~= offset + q * scale
+    """
+    offset = float(values.min()) if values.size else 0.0
+    span = float(values.max()) - offset if values.size else 0.0
+    scale = span / UINT8_LEVELS if span > 0 else 1.0
+    quantized = np.round((values - offset) / scale)
+    return np.clip(quantized, 0, UINT8_LEVELS).astype(np.uint8), scale, offset
+
+
+def load_spectrogram_data(file_path: str, params: SpectrogramParams, audio_file_id=None) -> SpectrogramData:
+    """
+    Матрица dBFS интервала, свёрнутая до params.width столбцов.
+
+    Args:
+        file_path: Путь к аудио-файлу
+        params: Интервал, ширина и метод свёртки (height и палитра не используются)
+        audio_file_id: UUID AudioFile для чтения STFT матрицы (опционально)
+
+    Raises:
+        ValueError: Если интервал некорректен
+    """
+    stft_db, sample_rate = load_stft_frames(file_path, params, audio_file_id)
+    values = np.maximum(stft_db.T - np.float32(FULL_SCALE_DB), np.float32(DATA_FLOOR_DB))
+    return SpectrogramData(
+        values=np.ascontiguousarray(values, dtype=np.float32),
+        sample_rate=sample_rate,
+        start_time=params.start_time,
+        end_time=params.end_time,
+    )
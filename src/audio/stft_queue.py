@@ -0,0 +1,99 @@
+"""
+Модуль фоновой очереди построения STFT матриц (см. stft_store).
+
+Построения выполняются одним потоком и только в основном процессе:
+процессы пула отрисовки после defer_scheduling лишь запоминают
+schedule_stft, а основной процесс ставит их в свою очередь после
+завершения задачи (см. render_pool).
+
+Завершённые задачи не хранятся. Неудачное построение (ошибка чтения
+или матрица больше бюджета хранилища) запоминается по размеру и mtime
+файла: пока файл не изменился, schedule_stft его не повторяет.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.audio import stft_store
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stft-store')
+_futures: Dict[str, Future] = {}
+_futures_lock = threading.Lock()
+# Размер и mtime файлов, матрица которых не построилась
+_failed: Dict[str, Tuple[int, int]] = {}
+# Отложенные построения в процессе пула отрисовки (None - процесс строит сам)
+_deferred: Optional[List[Tuple[object, str]]] = None
+
+
+def schedule_stft(audio_file_id, file_path: str) -> Optional[Future]:
+    """
+    Ставит построение STFT матрицы в фоновую очередь.
+
+    Повторный вызов для файла, матрица которого ещё строится,
+    возвращает уже запущенную задачу.
+
+    Returns:
+        Future с результатом build_stft или None, если хранилище отключено,
+        построение отложено (процесс пула отрисовки) или уже не удалось
+        для текущей версии файла
+    """
+    if not stft_store.STFT_STORE_ENABLED:
+        return None
+    if _deferred is not None:
+        _deferred.append((audio_file_id, file_path))
+        return None
+    key = str(audio_file_id)
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    identity = (stat.st_size, stat.st_mtime_ns)
+    with _futures_lock:
+        future = _futures.get(key)
+        if future is not None and not future.done():
+            return future
+        if _failed.get(key) == identity:
+            return None
+        future = _executor.submit(stft_store.build_stft, audio_file_id, file_path)
+        _futures[key] = future
+    future.add_done_callback(lambda done: _forget(key, identity, done))
+    return future
+
+
+def _forget(key: str, identity: Tuple[int, int], future: Future) -> None:
+    """Завершённое построение больше не держим, неудачное запоминаем."""
+    failed = not future.cancelled() and (future.exception() is not None or future.result() is None)
+    with _futures_lock:
+        if _futures.get(key) is future:
+            del _futures[key]
+        if failed:
+            _failed[key] = identity
+        else:
+            _failed.pop(key, None)
+
+
+def defer_scheduling() -> None:
+    """schedule_stft только запоминает построения (процессы пула отрисовки)."""
+    global _deferred
+    _deferred = []
+
+
+def pop_deferred_stft() -> List[Tuple[object, str]]:
+    """Отложенные построения (audio_file_id, file_path) с прошлого вызова."""
+    if _deferred is None:
+        return []
+    deferred = list(_deferred)
+    _deferred.clear()
+    return deferred
+
+
+def wait_for_stft(audio_file_id, timeout: Optional[float] = None) -> Optional[Path]:
+    """Дождаться фонового построения STFT матрицы (если оно запущено или уже завершилось)."""
+    with _futures_lock:
+        future = _futures.get(str(audio_file_id))
+    if future is not None:
+        return future.result(timeout)
+    stft_path = stft_store.get_stft_path(audio_file_id)
+    return stft_path if stft_path.exists() else None
@@ -0,0 +1,361 @@
+"""
+Модуль хранилища предвычисленной STFT матрицы аудио-файла.
+
+Панорамирование спектрограммы запрашивает перекрывающиеся интервалы,
+и каждый раз пересчитывать декодирование и FFT дорого. Для файла
+один раз (в фоне, после первого запроса спектрограммы) считается
+STFT всего сигнала блоками и сохраняется матрица амплитуд в dB
+float16 формы (frames, freq_bins). Спектрограмма любого интервала
+после этого - срез memmap плюс палитра.
+
+Кадры STFT выровнены по всему файлу (кадр f центрирован на сэмпле
+f * HOP_LENGTH, края дополнены нулями), поэтому расчёт интервала
+напрямую (compute_stft_db) и срез хранилища дают одинаковый результат.
+
+Формат файла <AudioFile.id>.stft (little-endian):
+- Заголовок: magic, версия, n_fft, hop_length, sample_rate, число
+  частотных бинов, число кадров, число сэмплов, размер и mtime
+  исходного файла
+- Данные: float16 массив (frames, freq_bins), dB относительно амплитуды 1.0
+
+Общий объём хранилища ограничен STFT_STORE_MAX_BYTES, при нехватке
+места удаляются давно не читавшиеся матрицы.
+
+Фоновая очередь построений - в stft_queue.
+"""
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+import librosa
+import numpy as np
+
+from src.audio.reader import AudioReader, get_audio_reader
+from src.utils.storage import get_data_dir
+
+# STFT параметры
+N_FFT = 2048
+HOP_LENGTH = 512
+AMIN = 1e-5  # Минимальная амплитуда перед логарифмом, как в librosa.amplitude_to_db
+TOP_DB = 80.0  # Динамический диапазон изображения, как в librosa.amplitude_to_db
+# Амплитуда STFT синуса полной шкалы с окном Ханна: sum(window) / 2 = N_FFT / 4
+FULL_SCALE_DB = 20.0 * np.log10(N_FFT / 4)
+
+# Константы хранилища
+STFT_DIR_NAME = 'stft'
+STFT_MAGIC = b'AEST'
+STFT_VERSION = 1
+STFT_STORE_ENABLED = os.getenv('STFT_STORE_ENABLED', 'true').lower() == 'true'
+STFT_STORE_MAX_BYTES = int(os.getenv('STFT_STORE_MAX_BYTES', str(4 * 1024 * 1024 * 1024)))
+BUILD_CHUNK_FRAMES = 2048  # Кадров STFT на блок построения и чтения
+# Свёртка кадров в столбцы изображения
+POOLING_METHODS = ('max', 'mean')
+DEFAULT_POOLING = 'max'
+
+_HEADER = struct.Struct('<4sHIIIIQQQq')
+
+
+@dataclass
+class StftMatrix:
+    """Загруженная STFT матрица файла."""
+
+    sample_rate: int
+    samples: int
+    data: np.ndarray
+
+    @property
+    def duration(self) -> float:
+        """Длительность исходного сигнала в секундах."""
+        return self.samples / self.sample_rate
+
+    def frame_range(self, start_time: float, end_time: float) -> Tuple[int, int]:
+        """Кадры, центры которых попадают в интервал."""
+        return frame_range(start_time, end_time, self.sample_rate, self.data.shape[0])
+
+    def iter_frames(self, first: int, last: int, chunk_frames: int = BUILD_CHUNK_FRAMES) -> Iterator[np.ndarray]:
+        """Кадры [first, last) блоками по chunk_frames."""
+        for start in range(first, last, chunk_frames):
+            yield self.data[start:min(start + chunk_frames, last)]
+
+
+def stft_frame_count(samples: int, hop_length: int = HOP_LENGTH) -> int:
+    """Количество кадров STFT с центрированием для сигнала длины samples."""
+    return 1 + samples // hop_length
+
+
+def frame_range(
+    start_time: float,
+    end_time: float,
+    sample_rate: int,
+    total_frames: int,
+    hop_length: int = HOP_LENGTH
+) -> Tuple[int, int]:
+    """
+    Кадры STFT [first, last), центры которых лежат в [start_time, end_time].
+
+    Всегда возвращает хотя бы один кадр.
+    """
+    first = -(-int(round(start_time * sample_rate)) // hop_length)
+    last = int(round(end_time * sample_rate)) // hop_length + 1
+    first = min(max(0, first), total_frames - 1)
+    last = min(max(first + 1, last), total_frames)
+    return first, last
+
+
+def compute_stft_db(
+    reader: AudioReader,
+    first: int,
+    last: int,
+    n_fft: int = N_FFT,
+    hop_length: int = HOP_LENGTH,
+    bins: Optional[slice] = None
+) -> np.ndarray:
+    """
+    Считает кадры STFT [first, last) моно сигнала в dB.
+
+    Читается только нужный интервал сигнала с запасом n_fft / 2 по краям.
+    Если задан bins, остальные частотные бины отбрасываются до перевода в dB.
+
+    Returns:
+        np.ndarray: float16 (frames, freq_bins), dB относительно амплитуды 1.0
+    """
+    offset = first * hop_length - n_fft // 2
+    stop = (last - 1) * hop_length - n_fft // 2 + n_fft
+    signal = reader.read_padded(offset, stop).mean(axis=1)
+    spectrum = librosa.stft(signal, n_fft=n_fft, hop_length=hop_length, center=False)
+    magnitude = np.abs(spectrum[bins or slice(None)])
+    spectrum = None  # Комплексный спектр больше не нужен, не держим его до конца функции
+    return (20.0 * np.log10(np.maximum(magnitude, AMIN))).T.astype(np.float16)
+
+
+def iter_stft_db(
+    reader: AudioReader,
+    first: int,
+    last: int,
+    chunk_frames: int = BUILD_CHUNK_FRAMES,
+    n_fft: int = N_FFT,
+    hop_length: int = HOP_LENGTH,
+    bins: Optional[slice] = None
+) -> Iterator[np.ndarray]:
+    """
+    Кадры STFT [first, last) блоками по chunk_frames.
+
+    Блоки перекрываются по сигналу на n_fft, поэтому результат совпадает
+    с compute_stft_db(reader, first, last), а память не зависит от длины интервала.
+    """
+    for start in range(first, last, chunk_frames):
+        yield compute_stft_db(reader, start, min(start + chunk_frames, last), n_fft, hop_length, bins)
+
+
+def pool_frames(
+    chunks: Iterable[np.ndarray],
+    total: int,
+    columns: int,
+    method: str = DEFAULT_POOLING,
+    progress: Optional[Callable[[float], None]] = None
+) -> np.ndarray:
+    """
+    Сворачивает поток кадров в столбцы изображения.
+
+    Кадр s относится к столбцу s * columns // total. Каждый блок сворачивается
+    векторно (reduceat), поэтому в памяти только блок и результат.
+    Если кадров не больше столбцов, кадры возвращаются без свёртки.
+
+    Args:
+        chunks: Блоки кадров (frames, freq_bins) подряд, всего total кадров
+        total: Общее количество кадров
+        columns: Количество столбцов (ширина изображения)
+        method: max (сохраняет короткие события) или mean
+        progress: Вызывается после каждого блока с долей обработанных кадров (0..1)
+
+    Returns:
+        np.ndarray: float32 (min(columns, total), freq_bins)
+    """
+    if method not in POOLING_METHODS:
+        raise ValueError(f'pooling must be one of: {", ".join(POOLING_METHODS)}')
+    columns = max(1, min(columns, total))
+    pooled = None
+    counts = np.zeros(columns, dtype=np.int64)
+
+    position = 0
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float32)
+        size = chunk.shape[0]
+        if size == 0:
+            continue
+        if pooled is None:
+            fill = -np.inf if method == 'max' else 0.0
+            pooled = np.full((columns, chunk.shape[1]), fill, dtype=np.float32)
+
+        # Границы считаем по столбцам, как в envelope.compute_envelope
+        first_column = position * columns // total
+        last_column = (position + size - 1) * columns // total
+        column_ids = np.arange(first_column, last_column + 1, dtype=np.int64)
+        starts = -(-column_ids * total // columns) - position
+        starts[0] = 0
+
+        if method == 'max':
+            pooled[column_ids] = np.maximum(pooled[column_ids], np.maximum.reduceat(chunk, starts, axis=0))
+        else:
+            pooled[column_ids] += np.add.reduceat(chunk, starts, axis=0)
+            counts[column_ids] += np.diff(np.append(starts, size))
+        position += size
+        if progress is not None:
+            progress(min(1.0, position / total))
+
+    if method == 'mean':
+        pooled /= np.maximum(counts, 1)[:, None]
+    return pooled
+
+
+def to_relative_db(stft_db: np.ndarray) -> np.ndarray:
+    """
+    Переводит кадры в dB относительно максимума интервала.
+
+    Эквивалент librosa.amplitude_to_db(S, ref=np.max) с top_db=80.
+
+    Args:
+        stft_db: Кадры (frames, freq_bins) в dB, например результат pool_frames
+
+    Returns:
+        np.ndarray: float32 (freq_bins, frames) для рендереров
+    """
+    spectrogram_db = stft_db.astype(np.float32).T
+    spectrogram_db -= spectrogram_db.max()
+    return np.maximum(spectrogram_db, -TOP_DB)
+
+
+def to_dbfs(stft_db: np.ndarray) -> np.ndarray:
+    """
+    Переводит кадры в dB относительно полной шкалы (0 dBFS - синус амплитуды 1.0).
+
+    В отличие от to_relative_db шкала не зависит от интервала, поэтому
+    соседние фрагменты (тайлы) раскрашиваются одинаково.
+
+    Returns:
+        np.ndarray: float32 (freq_bins, frames) в диапазоне [-TOP_DB, 0]
+    """
+    spectrogram_db = stft_db.astype(np.float32).T - FULL_SCALE_DB
+    return np.clip(spectrogram_db, -TOP_DB, 0.0)
+
+
+def get_stft_path(audio_file_id) -> Path:
+    """Путь к STFT матрице AudioFile."""
+    return get_data_dir(STFT_DIR_NAME) / f'{audio_file_id}.stft'
+
+
+def _file_identity(file_path: str) -> Tuple[int, int]:
+    """Размер и mtime (нс) исходного файла для проверки актуальности."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _make_room(needed: int, keep: Path) -> bool:
+    """
+    Освобождает место в хранилище, удаляя давно не читавшиеся матрицы.
+
+    Returns:
+        bool: Помещается ли матрица размера needed в бюджет
+    """
+    if needed > STFT_STORE_MAX_BYTES:
+        return False
+
+    entries = []
+    for path in keep.parent.glob('*.stft'):
+        if path == keep:
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total + needed <= STFT_STORE_MAX_BYTES:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+    return True
+
+
+def build_stft(audio_file_id, file_path: str) -> Optional[Path]:
+    """
+    Считает STFT всего файла блоками и атомарно сохраняет матрицу.
+
+    Args:
+        audio_file_id: UUID AudioFile
+        file_path: Путь к аудио-файлу
+
+    Returns:
+        Path к матрице или None, если она не помещается в бюджет хранилища
+    """
+    file_size, mtime_ns = _file_identity(file_path)
+    stft_path = get_stft_path(audio_file_id)
+    n_bins = 1 + N_FFT // 2
+
+    with get_audio_reader(file_path) as reader:
+        frames = stft_frame_count(reader.frames)
+        if not _make_room(frames * n_bins * 2, stft_path):
+            return None
+
+        header = _HEADER.pack(
+            STFT_MAGIC, STFT_VERSION, N_FFT, HOP_LENGTH, reader.samplerate,
+            n_bins, frames, reader.frames, file_size, mtime_ns
+        )
+        tmp_path = stft_path.with_name(f'{stft_path.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                for chunk in iter_stft_db(reader, 0, frames):
+                    f.write(chunk.astype('<f2').tobytes())
+            os.replace(tmp_path, stft_path)
+        except BaseException:
+            # Недописанная матрица не учитывается бюджетом - удаляем её сразу
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    return stft_path
+
+
+def load_stft(audio_file_id, file_path: str) -> Optional[StftMatrix]:
+    """
+    Загружает STFT матрицу, если она существует и соответствует текущему файлу.
+
+    Args:
+        audio_file_id: UUID AudioFile
+        file_path: Путь к аудио-файлу (для проверки размера и mtime)
+
+    Returns:
+        StftMatrix или None, если хранилище отключено, матрицы нет или она устарела
+    """
+    if not STFT_STORE_ENABLED:
+        return None
+    stft_path = get_stft_path(audio_file_id)
+    try:
+        with open(stft_path, 'rb') as f:
+            magic, version, n_fft, hop_length, sample_rate, n_bins, frames, samples, size, mtime_ns = \
+                _HEADER.unpack(f.read(_HEADER.size))
+        if magic != STFT_MAGIC or version != STFT_VERSION:
+            return None
+        if (n_fft, hop_length) != (N_FFT, HOP_LENGTH):
+            return None
+        if (size, mtime_ns) != _file_identity(file_path):
+            return None
+        # mtime матрицы - время последнего чтения для вытеснения
+        os.utime(stft_path)
+    except (OSError, struct.error):
+        return None
+
+    data = np.memmap(
+        stft_path, dtype='<f2', mode='r', offset=_HEADER.size, shape=(frames, n_bins)
+    )
+    return StftMatrix(sample_rate=sample_rate, samples=samples, data=data)
+
+
+def remove_stft(audio_file_id) -> None:
+    """Удаляет STFT матрицу AudioFile, если она существует."""
+    get_stft_path(audio_file_id).unlink(missing_ok=True)
@@ -2,18 +2,210 @@
 Модуль для потоковой загрузки больших аудио-файлов.
 
 Обеспечивает chunked-загрузку файлов размером до нескольких ГБ
-без загрузки всего файла в память.
+без загрузки всего файла в память. Range ответы под gunicorn/uWSGI
+отдаются через wsgi.file_wrapper (os.sendfile), пропускная способность
+соединений учитывается в stream_metrics.
 """
 
 import os
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 from flask import Response, request, send_file
 import mimetypes
 
+from src.utils.http_cache import (
+    apply_cache_headers,
+    get_validators,
+    if_range_matches,
+    is_not_modified,
+    not_modified_response,
+)
+
 
 # Размер чанка: 1MB
 CHUNK_SIZE = 1024 * 1024  # 1MB
+# Сколько последних соединений учитывать в статистике пропускной способности
+THROUGHPUT_WINDOW = 100
+
+# Способы отдачи диапазона
+MODE_FILE_WRAPPER = "file_wrapper"
+MODE_GENERATOR = "generator"
+
+
+class StreamConnection:
+    """Учёт переданных байт и времени одного Range ответа."""
+
+    def __init__(self, metrics: "StreamMetrics", mode: str):
+        self.metrics = metrics
+        self.mode = mode
+        self.bytes_sent = 0
+        # False - данные передал сервер (os.sendfile), объём неизвестен
+        self.measured = True
+        self.started = time.perf_counter()
+        self._finished = False
+
+    def finish(self) -> None:
+        """Вызывается сервером при закрытии ответа."""
+        if self._finished:
+            return
+        self._finished = True
+        self.metrics.finish(self, time.perf_counter() - self.started)
+
+
+class StreamMetrics:
+    """Счётчики Range ответов и пропускной способности по соединениям."""
+
+    def __init__(self, window: int = THROUGHPUT_WINDOW):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.reset()
+
+    def reset(self) -> None:
+        """Обнулить счётчики."""
+        with self._lock:
+            self._recent.clear()
+            self.active = 0
+            self.responses = {MODE_FILE_WRAPPER: 0, MODE_GENERATOR: 0}
+            self.unmeasured = 0
+            self.bytes_sent = 0
+
+    def start(self, mode: str) -> StreamConnection:
+        """Регистрирует новый Range ответ."""
+        with self._lock:
+            self.active += 1
+            self.responses[mode] += 1
+        return StreamConnection(self, mode)
+
+    def finish(self, connection: StreamConnection, seconds: float) -> None:
+        """Фиксирует завершённый ответ (без учёта объёма, если он неизвестен)."""
+        with self._lock:
+            self.active -= 1
+            if not connection.measured:
+                self.unmeasured += 1
+                return
+            self.bytes_sent += connection.bytes_sent
+            self._recent.append((connection.bytes_sent, seconds))
+
+    def stats(self) -> Dict:
+        """Счётчики для метрик; пропускная способность в МБ/с по последним соединениям."""
+        with self._lock:
+            throughputs = [
+                sent / seconds / (1024 * 1024)
+                for sent, seconds in self._recent
+                if seconds > 0
+            ]
+            return {
+                "active": self.active,
+                "responses": dict(self.responses),
+                "unmeasured": self.unmeasured,
+                "bytes_sent": self.bytes_sent,
+                "recent_connections": len(self._recent),
+                "throughput_mbps_mean": (
+                    sum(throughputs) / len(throughputs) if throughputs else 0.0
+                ),
+                "throughput_mbps_min": min(throughputs, default=0.0),
+                "throughput_mbps_max": max(throughputs, default=0.0),
+            }
+
+
+stream_metrics = StreamMetrics()
+
+
+class _MeteredFile:
+    """
+    Файл диапазона для wsgi.file_wrapper, фиксирующий завершение ответа при закрытии.
+
+    Сервер обращается к fileno() для os.sendfile(), поэтому обёртка
+    не мешает отдаче без копирования. Сколько байт передал sendfile,
+    знает только сервер - такой ответ учитывается без объёма. Если сервер
+    читает файл сам, учитываются прочитанные байты (не дальше конца диапазона).
+    """
+
+    def __init__(self, f, connection: StreamConnection, length: int):
+        self._file = f
+        self._connection = connection
+        self._remaining = length
+
+    def fileno(self) -> int:
+        self._connection.measured = False
+        return self._file.fileno()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        self._connection.bytes_sent += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+        self._connection.finish()
+
+
+def _read_range(file_path: str, start: int, length: int, connection: StreamConnection) -> Iterable[bytes]:
+    """Генератор чанков диапазона - запасной путь без wsgi.file_wrapper."""
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = length
+
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            connection.bytes_sent += len(chunk)
+            yield chunk
+            remaining -= len(chunk)
+
+
+def range_response(file_path: str, start: int, length: int, headers: Dict) -> Response:
+    """
+    Ответ 206 для диапазона [start, start + length).
+
+    Если WSGI сервер предоставляет wsgi.file_wrapper (gunicorn, uWSGI),
+    файл отдаётся через него: сервер передаёт данные os.sendfile() от
+    текущей позиции файла, ограничиваясь Content-Length (PEP 3333),
+    без копирования через Python. Иначе (dev-сервер Werkzeug) данные
+    читаются генератором по CHUNK_SIZE.
+
+    Args:
+        file_path: Путь к файлу
+        start: Первый байт диапазона
+        length: Длина диапазона в байтах
+        headers: Заголовки ответа (Content-Length, Content-Range, ...)
+
+    Returns:
+        Flask Response со статусом 206
+    """
+    file_wrapper = request.environ.get("wsgi.file_wrapper")
+    if file_wrapper is not None:
+        connection = stream_metrics.start(MODE_FILE_WRAPPER)
+        f = open(file_path, "rb")
+        f.seek(start)
+        return Response(
+            file_wrapper(_MeteredFile(f, connection, length), CHUNK_SIZE),
+            status=206,
+            headers=headers,
+            direct_passthrough=True,
+        )
+
+    connection = stream_metrics.start(MODE_GENERATOR)
+    response = Response(
+        _read_range(file_path, start, length, connection),
+        status=206,
+        headers=headers,
+    )
+    response.call_on_close(connection.finish)
+    return response
 
 
 def parse_range_header(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
@@ -60,6 +252,10 @@ def stream_audio_file(file_path: str, audio_file_id: str) -> Response:
     """
     Потоковая загрузка аудио-файла с поддержкой Range requests.
 
+    Ответ содержит строгий ETag (inode, размер, mtime) и Last-Modified;
+    условные запросы If-None-Match / If-Modified-Since получают 304,
+    а Range с несовпадающим If-Range обслуживается целиком.
+
     Args:
         file_path: Путь к аудио-файлу
         audio_file_id: UUID аудио-файла (для логирования)
@@ -79,6 +275,10 @@ def stream_audio_file(file_path: str, audio_file_id: str) -> Response:
         return jsonify({"error": "Path is not a file"}), 400
 
     file_size = os.path.getsize(file_path)
+    etag, last_modified, immutable = get_validators(file_path)
+
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified, immutable)
 
     # Определяем MIME тип
     mime_type, _ = mimetypes.guess_type(file_path)
@@ -88,6 +288,10 @@ def stream_audio_file(file_path: str, audio_file_id: str) -> Response:
     # Проверяем Range заголовок
     range_header = request.headers.get("Range")
 
+    # Диапазон устаревшей версии файла не отдаём - клиент получит файл целиком
+    if range_header and not if_range_matches(etag, last_modified):
+        range_header = None
+
     if range_header:
         # Парсим Range
         range_result = parse_range_header(range_header, file_size)
@@ -96,24 +300,11 @@ def stream_audio_file(file_path: str, audio_file_id: str) -> Response:
             start, end = range_result
             content_length = end - start + 1
 
-            # Создаём generator для чтения чанками
-            def generate():
-                with open(file_path, "rb") as f:
-                    f.seek(start)
-                    remaining = content_length
-
-                    while remaining > 0:
-                        chunk_size = min(CHUNK_SIZE, remaining)
-                        chunk = f.read(chunk_size)
-                        if not chunk:
-                            break
-                        yield chunk
-                        remaining -= len(chunk)
-
             # Возвращаем 206 Partial Content
-            response = Response(
-                generate(),
-                status=206,
+            response = range_response(
+                file_path,
+                start,
+                content_length,
                 headers={
                     "Content-Type": mime_type,
                     "Content-Length": str(content_length),
@@ -121,7 +312,7 @@ def stream_audio_file(file_path: str, audio_file_id: str) -> Response:
                     "Accept-Ranges": "bytes",
                 },
             )
-            return response
+            return apply_cache_headers(response, etag, last_modified, immutable)
 
     # Полная загрузка файла (без Range)
     # Используем send_file с conditional=True для поддержки Range
@@ -130,8 +321,10 @@ def stream_audio_file(file_path: str, audio_file_id: str) -> Response:
         mimetype=mime_type,
         as_attachment=False,
         conditional=True,  # Включает поддержку Range requests
-        etag=False,  # Не используем ETag на этом этапе
+        etag=etag,
+        last_modified=last_modified,
     )
+    apply_cache_headers(response, etag, last_modified, immutable)
 
     # Убеждаемся что заголовок Accept-Ranges установлен
     response.headers["Accept-Ranges"] = "bytes"
@@ -0,0 +1,112 @@
+"""
+Модуль тайлов спектрограммы (по аналогии с тайлами карт).
+
+Спектрограмма файла нарезается на тайлы фиксированной ширины TILE_WIDTH.
+На уровне zoom каждый тайл покрывает seconds_per_tile(zoom) секунд:
+уровень 0 - самый крупный (TILE_MAX_SECONDS на тайл), каждый следующий
+уровень вдвое детальнее. Тайл с индексом i покрывает интервал
+[i * seconds_per_tile, (i + 1) * seconds_per_tile), последний тайл файла
+уже остальных пропорционально оставшейся длительности.
+
+Тайлы раскрашиваются в абсолютной шкале dBFS, а не относительно
+максимума интервала, поэтому соседние тайлы стыкуются без скачков
+яркости, а набор тайлов не зависит от позиции просмотра и кэшируется.
+"""
+import math
+from typing import Dict, List, Tuple
+
+from src.audio.raster import encode_png, render_spectrogram
+from src.audio.spectrogram import DEFAULT_COLOR_MAP, SpectrogramParams, load_stft_frames
+from src.audio.stft_store import TOP_DB, to_dbfs
+
+# Константы
+TILE_WIDTH = 256
+DEFAULT_TILE_HEIGHT = 256
+MAX_TILE_HEIGHT = 2000
+TILE_MAX_SECONDS = 1024.0  # Секунд на тайл на уровне 0
+TILE_MAX_ZOOM = 14  # 1024 / 2**14 = 0.0625 с на тайл
+
+
+def seconds_per_tile(zoom: int) -> float:
+    """Длительность одного тайла на уровне zoom."""
+    return TILE_MAX_SECONDS / (1 << zoom)
+
+
+def tile_count(duration: float, zoom: int) -> int:
+    """Количество тайлов файла на уровне zoom."""
+    return max(1, math.ceil(duration / seconds_per_tile(zoom)))
+
+
+def tile_bounds(zoom: int, index: int, duration: float) -> Tuple[float, float, int]:
+    """
+    Интервал и ширина тайла.
+
+    Args:
+        zoom: Уровень от 0 до TILE_MAX_ZOOM
+        index: Номер тайла на уровне
+        duration: Длительность файла в секундах
+
+    Returns:
+        Tuple (start_time, end_time, width в пикселях)
+
+    Raises:
+        ValueError: Если уровень или номер тайла вне допустимого диапазона
+    """
+    if not 0 <= zoom <= TILE_MAX_ZOOM:
+        raise ValueError(f'zoom must be between 0 and {TILE_MAX_ZOOM}')
+    if not 0 <= index < tile_count(duration, zoom):
+        raise ValueError('tile index is outside audio duration')
+
+    span = seconds_per_tile(zoom)
+    start = index * span
+    end = min(start + span, duration)
+    width = max(1, math.ceil(TILE_WIDTH * (end - start) / span))
+    return start, end, width
+
+
+def zoom_levels(duration: float) -> List[Dict]:
+    """Описание уровней для клиента: длительность тайла и их количество."""
+    return [
+        {
+            'zoom': zoom,
+            'seconds_per_tile': seconds_per_tile(zoom),
+            'tiles': tile_count(duration, zoom),
+        }
+        for zoom in range(TILE_MAX_ZOOM + 1)
+    ]
+
+
+def generate_spectrogram_tile(
+    file_path: str,
+    zoom: int,
+    index: int,
+    duration: float,
+    height: int = DEFAULT_TILE_HEIGHT,
+    color_map: str = DEFAULT_COLOR_MAP,
+    audio_file_id=None
+) -> bytes:
+    """
+    Генерирует PNG тайла спектрограммы.
+
+    Args:
+        file_path: Путь к аудио-файлу
+        zoom: Уровень
+        index: Номер тайла на уровне
+        duration: Длительность файла в секундах (AudioFile.duration)
+        height: Высота тайла в пикселях
+        color_map: Название палитры matplotlib
+        audio_file_id: UUID AudioFile для чтения STFT матрицы (опционально)
+
+    Returns:
+        bytes: PNG изображение
+
+    Raises:
+        ValueError: Если параметры тайла некорректны
+    """
+    start, end, width = tile_bounds(zoom, index, duration)
+    params = SpectrogramParams(
+        start_time=start, end_time=end, width=width, height=height, color_map=color_map
+    )
+    stft_db, _ = load_stft_frames(file_path, params, audio_file_id)
+    image = render_spectrogram(to_dbfs(stft_db), width, height, color_map, vmin=-TOP_DB, vmax=0.0)
+    return encode_png(image, params.compress_level)
@@ -0,0 +1,382 @@
+"""
+Модуль инкрементального пересканирования наблюдаемых каталогов.
+
+Ночные импорты одних и тех же каталогов рекордеров не должны заново
+запрашивать каждый путь и читать каждый заголовок. Для наблюдаемого
+каталога хранится манифест WatchedFile: (путь, размер, mtime, inode).
+Пересканирование обходит каталог (один stat на файл), сравнивает его
+с манифестом, загруженным одним запросом, и обращается к БД и к файлам
+только для разницы:
+
+- новый путь - метаданные читаются, добавляется AudioFile (уже
+  импортированный по тому же пути LOADED файл только связывается);
+- изменились размер, mtime или inode - метаданные AudioFile обновляются;
+  peaks, STFT и proxy проверяют размер и mtime сами и перестраиваются;
+- путь исчез - AudioFile получает статус MISSING (аннотации сохраняются),
+  а если у записи осталась копия по другому пути - переходит на неё;
+- исчезнувший и новый путь с тем же inode, размером и mtime -
+  переименование: у AudioFile меняется только путь;
+- новый файл с отпечатком известной записи (см. fingerprint) -
+  копия: связывается с записью без нового AudioFile.
+
+Пересканирования выполняются по очереди одним фоновым потоком.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, update
+
+from src.audio.copies import apply_moves, apply_vanished, chunks, split_changed_copies
+from src.audio.fingerprint import fingerprint_row, insert_fingerprints, resolve_copies, schedule_full_hash
+from src.audio.import_probe import IMPORT_WORKERS, ProbeQueue
+from src.audio.importer import IMPORT_BATCH_SIZE, ImportOptions, prepare_playback, walk_audio_entries
+from src.models import AudioFile, AudioFileStatus, AudioFingerprint, WatchedFile, WatchedFolder, get_db
+
+MAX_SCAN_ERRORS = 100  # Ошибок в итоге сканирования
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='folder-rescan')
+_futures: Dict[str, Future] = {}
+_futures_lock = threading.Lock()
+
+
+@dataclass
+class RescanResult:
+    """Итог пересканирования каталога."""
+
+    new: int = 0
+    copies: int = 0  # Из new - копии уже известных записей
+    changed: int = 0
+    moved: int = 0
+    vanished: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    errors: List[Dict] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class _Stat:
+    """Состояние файла на диске."""
+
+    relative_path: str
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+class _Rescan:
+    """Одно пересканирование в сессии фонового потока."""
+
+    def __init__(self, session, folder: WatchedFolder, workers: int, batch_size: int):
+        self.session = session
+        self.folder = folder
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.result = RescanResult()
+        self.loaded: List[Dict] = []  # Строки для prepare_playback
+        self.fingerprint_ids: List = []  # Отпечатки для полного хэша
+
+    def run(self) -> RescanResult:
+        started = time.monotonic()
+        manifest = {
+            row.relative_path: row
+            for row in self.session.query(
+                WatchedFile.id, WatchedFile.relative_path, WatchedFile.size,
+                WatchedFile.mtime_ns, WatchedFile.inode, WatchedFile.audio_file_id
+            ).filter(WatchedFile.folder_id == self.folder.id)
+        }
+
+        new: List[_Stat] = []
+        changed: List[Tuple] = []
+        stale = []  # Записи манифеста без AudioFile: изменённый файл импортируется заново
+        seen = set()
+        options = ImportOptions(**self.folder.get_options())
+        for relative_path, entry in walk_audio_entries(self.folder.root_path, options, self._walk_error):
+            try:
+                st = entry.stat()
+            except OSError as e:
+                self._walk_error(relative_path, e)
+                continue
+            stat = _Stat(relative_path, entry.path, st.st_size, st.st_mtime_ns, st.st_ino)
+            seen.add(relative_path)
+            known = manifest.get(relative_path)
+            if known is None:
+                new.append(stat)
+            elif (known.size, known.mtime_ns, known.inode) != (stat.size, stat.mtime_ns, stat.inode):
+                if known.audio_file_id is None:
+                    stale.append(known.id)
+                    new.append(stat)
+                else:
+                    changed.append((known, stat))
+            else:
+                self.result.unchanged += 1
+        vanished = [row for relative_path, row in manifest.items() if relative_path not in seen]
+
+        # Изменённая копия записи больше не копия: импортируется заново
+        changed, changed_copies = split_changed_copies(self.session, changed)
+        for row, stat in changed_copies:
+            stale.append(row.id)
+            new.append(stat)
+        for ids in chunks(stale):
+            self.session.execute(delete(WatchedFile).where(WatchedFile.id.in_(ids)))
+        new, vanished, self.result.moved = apply_moves(self.session, self.folder.root_path, new, vanished)
+        apply_vanished(self.session, self.folder.root_path, vanished)
+        self.result.vanished += len(vanished)
+        for batch in chunks(changed, self.batch_size):
+            self._apply_changed(batch)
+        for batch in chunks(new, self.batch_size):
+            self._apply_new(batch)
+
+        self.result.elapsed = round(time.monotonic() - started, 3)
+        self.folder.file_count = len(seen)
+        self.folder.last_scan_at = datetime.utcnow()
+        self.folder.last_scan = json.dumps(self.result.to_dict())
+        self.session.commit()
+        schedule_full_hash(self.fingerprint_ids)
+        prepare_playback(self.loaded)
+        return self.result
+
+    def _apply_changed(self, batch: List[Tuple]) -> None:
+        """Файлы изменились: метаданные перечитываются."""
+        probes = self._probe([stat.path for _, stat in batch])
+        manifest_updates, audio_updates, fingerprints = [], [], []
+        for (row, stat), probe in zip(batch, probes):
+            manifest_updates.append({'id': row.id, 'size': stat.size, 'mtime_ns': stat.mtime_ns, 'inode': stat.inode})
+            if probe.error is not None:
+                self._record_error(stat.relative_path, probe.error)
+                audio_updates.append({'id': row.audio_file_id, 'status': AudioFileStatus.ERROR})
+            else:
+                audio_updates.append({'id': row.audio_file_id, 'status': AudioFileStatus.LOADED, **probe.metadata})
+                self.loaded.append({'id': row.audio_file_id, 'file_path': stat.path, **probe.metadata})
+                fingerprints.append(
+                    fingerprint_row(stat.path, probe.metadata['file_size'], probe.fingerprint, row.audio_file_id)
+                )
+        self.session.execute(update(WatchedFile), manifest_updates)
+        self.session.execute(
+            delete(AudioFingerprint).where(AudioFingerprint.file_path.in_([stat.path for _, stat in batch]))
+        )
+        insert_fingerprints(self.session, fingerprints)
+        self.fingerprint_ids.extend(fp['id'] for fp in fingerprints)
+        if audio_updates:
+            self.session.execute(update(AudioFile), audio_updates)
+        self.result.changed += len(batch)
+        self.session.commit()
+
+    def _apply_new(self, batch: List[_Stat]) -> None:
+        """Новые пути: связываются с известными записями и копиями или импортируются."""
+        existing, copies = {}, {}
+        for paths in chunks([stat.path for stat in batch]):
+            rows = self.session.query(AudioFile.file_path, AudioFile.id, AudioFile.status).filter(
+                AudioFile.file_path.in_(paths)
+            )
+            existing.update({file_path: (file_id, status) for file_path, file_id, status in rows})
+            copies.update(self.session.query(AudioFingerprint.file_path, AudioFingerprint.audio_file_id).filter(
+                AudioFingerprint.file_path.in_(paths)
+            ))
+
+        def linked(stat: _Stat) -> bool:
+            return existing.get(stat.path, (None, None))[1] == AudioFileStatus.LOADED or stat.path in copies
+
+        to_probe = [s for s in batch if not linked(s)]
+        probes = dict(zip([s.path for s in to_probe], self._probe([s.path for s in to_probe])))
+        own_ids = {
+            s.path: uuid.uuid4() for s in to_probe
+            if s.path not in existing and probes[s.path].error is None
+        }
+        owners = resolve_copies(
+            self.session, [(path, probes[path].fingerprint, file_id) for path, file_id in own_ids.items()]
+        )
+
+        manifest_rows, audio_inserts, audio_updates, fingerprints = [], [], [], []
+        for stat in batch:
+            file_id, status = existing.get(stat.path, (None, None))
+            probe = probes.get(stat.path)
+            if probe is None:
+                file_id = file_id if status == AudioFileStatus.LOADED else copies[stat.path]
+            elif probe.error is not None:
+                self._record_error(stat.relative_path, probe.error)
+                if file_id is not None:
+                    audio_updates.append({'id': file_id, 'status': AudioFileStatus.ERROR})
+            else:
+                if file_id is None:
+                    file_id = owners[stat.path]
+                    if file_id == own_ids[stat.path]:
+                        audio_inserts.append({
+                            'id': file_id,
+                            'file_path': stat.path,
+                            'filename': os.path.basename(stat.path),
+                            'status': AudioFileStatus.LOADED,
+                            **probe.metadata,
+                        })
+                        self.loaded.append({'id': file_id, 'file_path': stat.path, **probe.metadata})
+                    else:
+                        self.result.copies += 1
+                else:
+                    audio_updates.append({'id': file_id, 'status': AudioFileStatus.LOADED, **probe.metadata})
+                    self.loaded.append({'id': file_id, 'file_path': stat.path, **probe.metadata})
+                fingerprints.append(fingerprint_row(stat.path, probe.metadata['file_size'], probe.fingerprint, file_id))
+            manifest_rows.append({
+                'id': uuid.uuid4(),
+                'folder_id': self.folder.id,
+                'relative_path': stat.relative_path,
+                'size': stat.size,
+                'mtime_ns': stat.mtime_ns,
+                'inode': stat.inode,
+                'audio_file_id': file_id,
+            })
+
+        if audio_inserts:
+            self.session.execute(insert(AudioFile), audio_inserts)
+        if audio_updates:
+            self.session.execute(update(AudioFile), audio_updates)
+        insert_fingerprints(self.session, fingerprints)
+        self.session.execute(insert(WatchedFile), manifest_rows)
+        self.fingerprint_ids.extend(fp['id'] for fp in fingerprints)
+        self.result.new += len(batch)
+        self.session.commit()
+
+    def _probe(self, paths: List[str]) -> List:
+        if not paths:
+            return []
+        queue = ProbeQueue(self.workers)
+        try:
+            results = []
+            for path in paths:
+                results.extend(queue.put(path))
+            for probes in queue.finish():
+                results.extend(probes)
+            return results
+        finally:
+            queue.close()
+
+    def _walk_error(self, relative_path: str, error: OSError) -> None:
+        self._record_error(relative_path, error.strerror or str(error))
+
+    def _record_error(self, relative_path: str, message: str) -> None:
+        self.result.failed += 1
+        if len(self.result.errors) < MAX_SCAN_ERRORS:
+            self.result.errors.append({'file': relative_path, 'error': message})
+
+
+def rescan_folder(
+    folder_id,
+    workers: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> Optional[RescanResult]:
+    """
+    Пересканирует наблюдаемый каталог по манифесту.
+
+    Args:
+        folder_id: UUID WatchedFolder
+        workers: Процессов для чтения метаданных (по умолчанию IMPORT_WORKERS)
+        batch_size: Файлов в транзакции (по умолчанию IMPORT_BATCH_SIZE)
+
+    Returns:
+        RescanResult или None, если каталог не найден
+    """
+    workers = IMPORT_WORKERS if workers is None else workers
+    batch_size = IMPORT_BATCH_SIZE if batch_size is None else batch_size
+    session = get_db().get_session()
+    try:
+        folder = WatchedFolder.get_by_id(session, folder_id)
+        if folder is None:
+            return None
+        try:
+            return _Rescan(session, folder, workers, batch_size).run()
+        except Exception:
+            session.rollback()
+            raise
+    finally:
+        session.close()
+
+
+def create_watched_folder(root_path: str, options: ImportOptions, live: bool = False) -> WatchedFolder:
+    """
+    Добавляет наблюдаемый каталог и ставит первое сканирование в очередь.
+
+    Args:
+        root_path: Каталог с аудио-файлами
+        options: Проверенные параметры обхода
+        live: Отслеживать изменения через inotify
+
+    Returns:
+        WatchedFolder
+
+    Raises:
+        ValueError: Если каталог уже наблюдается
+    """
+    root_path = os.path.abspath(root_path)
+    session = get_db().get_session()
+    try:
+        if session.query(WatchedFolder.id).filter_by(root_path=root_path).first() is not None:
+            raise ValueError('Folder is already watched')
+        folder = WatchedFolder(
+            root_path=root_path,
+            live=live,
+            options=json.dumps({
+                'recursive': options.recursive,
+                'include': list(options.include),
+                'exclude': list(options.exclude),
+                'max_depth': options.max_depth,
+            }),
+        )
+        session.add(folder)
+        session.commit()
+        session.refresh(folder)
+        session.expunge(folder)
+    finally:
+        session.close()
+    schedule_rescan(folder.id)
+    return folder
+
+
+def delete_watched_folder(folder_id) -> bool:
+    """
+    Удаляет наблюдаемый каталог и его манифест (AudioFile и аннотации остаются).
+
+    Returns:
+        bool: False, если каталог не найден
+    """
+    session = get_db().get_session()
+    try:
+        folder = WatchedFolder.get_by_id(session, folder_id)
+        if folder is None:
+            return False
+        session.execute(delete(WatchedFile).where(WatchedFile.folder_id == folder.id))
+        session.delete(folder)
+        session.commit()
+        return True
+    finally:
+        session.close()
+
+
+def schedule_rescan(folder_id) -> Future:
+    """Ставит пересканирование в очередь (пока оно не началось, повторный вызов возвращает его же)."""
+    key = str(folder_id)
+    with _futures_lock:
+        for done_key in [k for k, f in _futures.items() if f.done() and k != key]:
+            del _futures[done_key]
+        future = _futures.get(key)
+        # Уже выполняемое сканирование могло не увидеть последние изменения
+        if future is None or future.done() or future.running():
+            future = _executor.submit(rescan_folder, folder_id)
+            _futures[key] = future
+        return future
+
+
+def wait_for_rescan(folder_id, timeout: Optional[float] = None) -> Optional[RescanResult]:
+    """Дождаться пересканирования (если оно поставлено в очередь)."""
+    with _futures_lock:
+        future = _futures.get(str(folder_id))
+    return future.result(timeout) if future is not None else None
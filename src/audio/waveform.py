@@ -4,29 +4,39 @@
 Генерирует PNG изображения waveform с поддержкой:
 - Настраиваемых размеров (width, height)
 - Настраиваемого цвета
-- Downsampling для больших файлов
+- Downsampling для больших файлов (потоковая min/max/RMS огибающая,
+  файл читается крупными блоками без загрузки в память целиком)
+- Выбора рендерера: быстрый NumPy raster (по умолчанию) или matplotlib
 """
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 import numpy as np
-import soundfile as sf
-import matplotlib
-matplotlib.use('Agg')  # Неинтерактивный backend
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
 import io
 
+from src.audio.envelope import BLOCK_FRAMES
+from src.audio.peaks import read_envelope
+from src.audio.raster import (
+    DEFAULT_RENDERER,
+    PNG_COMPRESS_LEVEL,
+    RENDERER_RASTER,
+    encode_png,
+    render_waveform,
+    validate_renderer,
+)
+from src.audio.reader import get_audio_reader
 
 # Константы
 DEFAULT_WIDTH = 1200
 DEFAULT_HEIGHT = 300
 DEFAULT_COLOR = '#1f77b4'  # Синий цвет matplotlib
-MAX_SAMPLES_PER_PIXEL = 1000  # Для downsampling
 
 
 def load_audio_samples(file_path: str, max_samples: Optional[int] = None) -> Tuple[np.ndarray, int]:
     """
     Загружает аудио-данные с downsampling если нужно.
     
+    Downsampling выполняется прореживанием блоков, прочитанных
+    через AudioReader, без посэмплового seek/read.
+    
     Args:
         file_path: Путь к аудио-файлу
         max_samples: Максимальное количество сэмплов для загрузки (для downsampling)
@@ -34,30 +44,22 @@ def load_audio_samples(file_path: str, max_samples: Optional[int] = None) -> Tup
     Returns:
         Tuple (audio_data, sample_rate)
     """
-    # Загружаем метаданные для определения размера
-    info = sf.info(file_path)
-    total_samples = info.frames
-    
-    # Если нужен downsampling
-    if max_samples and total_samples > max_samples:
-        # Вычисляем шаг для downsampling
-        step = max(1, total_samples // max_samples)
+    with get_audio_reader(file_path) as reader:
+        total_samples = reader.frames
         
-        # Загружаем только нужные сэмплы
-        with sf.SoundFile(file_path, 'r') as f:
-            # Читаем каждый N-й сэмпл
-            samples = []
-            for i in range(0, total_samples, step):
-                f.seek(i)
-                sample = f.read(1)
-                if len(sample) > 0:
-                    samples.append(sample[0])
+        # Если нужен downsampling
+        if max_samples and total_samples > max_samples:
+            # Вычисляем шаг для downsampling
+            step = max(1, total_samples // max_samples)
+            # Размер блока кратен шагу, чтобы прореживание было равномерным
+            blocksize = max(step, (BLOCK_FRAMES // step) * step)
             
-            audio_data = np.array(samples)
-            sample_rate = info.samplerate // step  # Уменьшаем sample_rate пропорционально
-    else:
-        # Загружаем весь файл
-        audio_data, sample_rate = sf.read(file_path)
+            parts = [block[::step].mean(axis=1) for block in reader.blocks(blocksize)]
+            audio_data = np.concatenate(parts) if parts else np.zeros(0)
+            sample_rate = reader.samplerate // step  # Уменьшаем sample_rate пропорционально
+        else:
+            # Загружаем весь файл
+            audio_data, sample_rate = reader.read(), reader.samplerate
     
     # Если стерео, конвертируем в моно (среднее значение каналов)
     if len(audio_data.shape) > 1:
@@ -66,64 +68,45 @@ def load_audio_samples(file_path: str, max_samples: Optional[int] = None) -> Tup
     return audio_data, sample_rate
 
 
-def generate_waveform_image(
-    audio_file_path: str,
-    width: int = DEFAULT_WIDTH,
-    height: int = DEFAULT_HEIGHT,
-    color: str = DEFAULT_COLOR
+def render_waveform_matplotlib(
+    lower: np.ndarray,
+    upper: np.ndarray,
+    width: int,
+    height: int,
+    color: str
 ) -> bytes:
     """
-    Генерирует PNG изображение waveform.
+    Рисует waveform через matplotlib (медленнее, сохранён для совместимости).
     
     Args:
-        audio_file_path: Путь к аудио-файлу
+        lower: Минимумы огибающей по бинам
+        upper: Максимумы огибающей по бинам
         width: Ширина изображения в пикселях
         height: Высота изображения в пикселях
-        color: Цвет waveform (hex формат, например '#FF5733')
+        color: Цвет waveform (hex формат)
     
     Returns:
         PNG изображение в виде bytes
     """
-    # Вычисляем максимальное количество сэмплов для downsampling
-    max_samples = width * MAX_SAMPLES_PER_PIXEL
+    import matplotlib
+    matplotlib.use('Agg')  # Неинтерактивный backend
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
     
-    # Загружаем аудио-данные
-    audio_data, sample_rate = load_audio_samples(audio_file_path, max_samples)
-    
-    # Создаём фигуру matplotlib
+    # Фигура с собственным Agg-холстом, без pyplot и его глобального состояния
     fig = Figure(figsize=(width / 100, height / 100), dpi=100)
+    FigureCanvasAgg(fig)
     ax = fig.add_subplot(111)
     
     # Убираем отступы
     fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
     ax.axis('off')
     
-    # Генерируем waveform
-    # Если данных больше чем ширина, делаем downsampling для визуализации
-    if len(audio_data) > width:
-        # Разбиваем на сегменты по ширине
-        segment_size = len(audio_data) // width
-        waveform = []
-        for i in range(width):
-            start = i * segment_size
-            end = min((i + 1) * segment_size, len(audio_data))
-            segment = audio_data[start:end]
-            # Берем максимум и минимум для каждого сегмента
-            waveform.append([np.min(segment), np.max(segment)])
-        waveform = np.array(waveform)
-        
-        # Создаём x координаты
-        x = np.arange(width)
-        
-        # Рисуем waveform как заполненную область
-        ax.fill_between(x, waveform[:, 0], waveform[:, 1], color=color, alpha=0.7)
-        ax.plot(x, waveform[:, 0], color=color, linewidth=0.5)
-        ax.plot(x, waveform[:, 1], color=color, linewidth=0.5)
-    else:
-        # Если данных меньше ширины, просто рисуем
-        x = np.linspace(0, width, len(audio_data))
-        ax.plot(x, audio_data, color=color, linewidth=0.5)
-        ax.fill_between(x, audio_data, 0, color=color, alpha=0.7)
+    # Рисуем waveform как заполненную область между минимумом и максимумом
+    x = np.arange(len(lower)) * (width / len(lower))
+    ax.fill_between(x, lower, upper, color=color, alpha=0.7)
+    ax.plot(x, lower, color=color, linewidth=0.5)
+    ax.plot(x, upper, color=color, linewidth=0.5)
     
     # Устанавливаем пределы
     ax.set_xlim(0, width)
@@ -136,17 +119,72 @@ def generate_waveform_image(
     png_data = buf.read()
     buf.close()
     
-    # Закрываем фигуру для освобождения памяти
-    plt.close(fig)
-    
     return png_data
 
 
+def generate_waveform_image(
+    audio_file_path: str,
+    width: int = DEFAULT_WIDTH,
+    height: int = DEFAULT_HEIGHT,
+    color: str = DEFAULT_COLOR,
+    audio_file_id=None,
+    start_time: float = 0.0,
+    end_time: Optional[float] = None,
+    renderer: str = DEFAULT_RENDERER,
+    compress_level: int = PNG_COMPRESS_LEVEL,
+    progress: Optional[Callable[[float], None]] = None
+) -> bytes:
+    """
+    Генерирует PNG изображение waveform.
+    
+    Args:
+        audio_file_path: Путь к аудио-файлу
+        width: Ширина изображения в пикселях
+        height: Высота изображения в пикселях
+        color: Цвет waveform (hex формат, например '#FF5733')
+        audio_file_id: UUID AudioFile для чтения пирамиды peaks (опционально)
+        start_time: Начало интервала в секундах
+        end_time: Конец интервала в секундах (None - до конца файла)
+        renderer: 'raster' (NumPy, точный размер) или 'matplotlib'
+        compress_level: Уровень zlib для PNG (только для raster)
+        progress: Вызывается с долей выполнения чтения огибающей (0..1)
+    
+    Returns:
+        PNG изображение в виде bytes
+    
+    Raises:
+        ValueError: При неверном интервале, цвете или рендерере
+    """
+    validate_renderer(renderer)
+    
+    # Огибающая по одному бину на пиксель
+    envelope = read_envelope(
+        audio_file_path,
+        bins=width,
+        audio_file_id=audio_file_id,
+        start_time=start_time,
+        end_time=end_time,
+        progress=progress
+    )
+    lower = envelope.mins[:, 0]
+    upper = envelope.maxs[:, 0]
+    
+    if renderer == RENDERER_RASTER:
+        image = render_waveform(lower, upper, width, height, color)
+        return encode_png(image, compress_level)
+    return render_waveform_matplotlib(lower, upper, width, height, color)
+
+
 def generate_waveform(
     audio_file_path: str,
     width: int = DEFAULT_WIDTH,
     height: int = DEFAULT_HEIGHT,
-    color: str = DEFAULT_COLOR
+    color: str = DEFAULT_COLOR,
+    audio_file_id=None,
+    start_time: float = 0.0,
+    end_time: Optional[float] = None,
+    renderer: str = DEFAULT_RENDERER,
+    progress: Optional[Callable[[float], None]] = None
 ) -> bytes:
     """
     Генерирует waveform без использования кэша.
@@ -156,10 +194,19 @@ def generate_waveform(
         width: Ширина изображения
         height: Высота изображения
         color: Цвет waveform в hex формате (можно без символа #)
+        audio_file_id: UUID AudioFile для чтения пирамиды peaks (опционально)
+        start_time: Начало интервала в секундах
+        end_time: Конец интервала в секундах (None - до конца файла)
+        renderer: 'raster' (по умолчанию) или 'matplotlib'
+        progress: Вызывается с долей выполнения (0..1), для фоновых задач
     
     Returns:
         PNG изображение в виде bytes
     """
     normalized_color = color if color.startswith('#') else f"#{color}"
-    return generate_waveform_image(audio_file_path, width, height, normalized_color)
+    return generate_waveform_image(
+        audio_file_path, width, height, normalized_color,
+        audio_file_id=audio_file_id, start_time=start_time, end_time=end_time,
+        renderer=renderer, progress=progress
+    )
 
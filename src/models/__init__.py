@@ -4,6 +4,11 @@ from .audio_file import AudioFile, AudioFileStatus
 from .annotation import Annotation
 from .event_type import EventType
 from .project import Project
+from .playback_proxy import PlaybackProxy, PlaybackProxyStatus
+from .render_job import RenderJob, RenderJobStatus
+from .import_job import ImportJob, ImportJobStatus
+from .watched_folder import WatchedFolder, WatchedFile
+from .audio_fingerprint import AudioFingerprint
 
 __all__ = [
     'Base',
@@ -15,5 +20,14 @@ __all__ = [
     'Annotation',
     'EventType',
     'Project',
+    'PlaybackProxy',
+    'PlaybackProxyStatus',
+    'RenderJob',
+    'RenderJobStatus',
+    'ImportJob',
+    'ImportJobStatus',
+    'WatchedFolder',
+    'WatchedFile',
+    'AudioFingerprint',
 ]
 
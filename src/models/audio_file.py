@@ -16,6 +16,7 @@ class AudioFileStatus(enum.Enum):
     PENDING = "pending"
     LOADED = "loaded"
     ERROR = "error"
+    MISSING = "missing"  # Файл исчез из наблюдаемого каталога
 
 
 class AudioFile(Base):
@@ -33,6 +34,9 @@ class AudioFile(Base):
         created_at: Дата и время создания записи
         status: Статус обработки файла
         annotations: Список аннотаций для этого файла
+        playback_proxy: Сжатая копия для воспроизведения (если построена)
+        render_jobs: Фоновые задачи отрисовки
+        fingerprints: Отпечатки копий записи (пути с тем же содержимым)
     """
     
     __tablename__ = 'audio_files'
@@ -70,6 +74,28 @@ class AudioFile(Base):
         back_populates="audio_file",
         cascade="all, delete-orphan"
     )
+
+    # Proxy для воспроизведения (cascade delete)
+    playback_proxy = relationship(
+        "PlaybackProxy",
+        back_populates="audio_file",
+        uselist=False,
+        cascade="all, delete-orphan"
+    )
+
+    # Фоновые задачи отрисовки (cascade delete)
+    render_jobs = relationship(
+        "RenderJob",
+        back_populates="audio_file",
+        cascade="all, delete-orphan"
+    )
+
+    # Копии записи по отпечатку содержимого (cascade delete)
+    fingerprints = relationship(
+        "AudioFingerprint",
+        back_populates="audio_file",
+        cascade="all, delete-orphan"
+    )
     
     def __repr__(self):
         """Строковое представление модели."""
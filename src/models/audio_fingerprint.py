@@ -0,0 +1,87 @@
+"""
+Модель AudioFingerprint - отпечаток содержимого копии аудио-файла.
+"""
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+
+from .database import Base
+from .types import GUID
+
+
+class AudioFingerprint(Base):
+    """
+    Отпечаток содержимого одной копии записи.
+
+    Одна и та же запись часто лежит по нескольким путям (копии на разных
+    дисках). Копии с одинаковым отпечатком ссылаются на один AudioFile,
+    поэтому аннотации у них общие. Быстрый отпечаток (размер и хэши
+    начального, среднего и конечного блоков) вычисляется при импорте,
+    полный хэш содержимого - в фоне.
+
+    Attributes:
+        id: Уникальный идентификатор (UUID)
+        audio_file_id: ID записи, копией которой является файл
+        file_path: Путь к копии
+        file_size: Размер копии в байтах
+        quick_hash: Быстрый отпечаток (индекс для поиска дубликатов)
+        full_hash: SHA-256 всего содержимого (None, пока не вычислен)
+        created_at: Дата и время создания
+        audio_file: Связь с AudioFile
+    """
+
+    __tablename__ = 'audio_fingerprints'
+
+    id = Column(
+        GUID,
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        nullable=False
+    )
+
+    audio_file_id = Column(
+        GUID,
+        ForeignKey('audio_files.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+
+    file_path = Column(String(500), nullable=False, index=True)
+    file_size = Column(BigInteger, nullable=False)
+    quick_hash = Column(String(64), nullable=False, index=True)
+    full_hash = Column(String(64), nullable=True, index=True)
+
+    created_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False
+    )
+
+    # Связь с AudioFile
+    audio_file = relationship("AudioFile", back_populates="fingerprints")
+
+    def __repr__(self):
+        """Строковое представление модели."""
+        return (
+            f"<AudioFingerprint(audio_file_id={self.audio_file_id}, "
+            f"file_path='{self.file_path}', "
+            f"quick_hash='{self.quick_hash}')>"
+        )
+
+    def to_dict(self):
+        """
+        Преобразовать модель в словарь.
+
+        Returns:
+            dict: Словарь с данными модели
+        """
+        return {
+            'audio_file_id': str(self.audio_file_id),
+            'file_path': self.file_path,
+            'file_size': self.file_size,
+            'quick_hash': self.quick_hash,
+            'full_hash': self.full_hash,
+            'created_at': self.created_at.isoformat()
+        }
@@ -0,0 +1,159 @@
+"""
+Модель ImportJob для фоновых задач импорта каталогов.
+"""
+from sqlalchemy import Column, String, Integer, Text, DateTime, Enum
+from datetime import datetime
+import json
+import uuid
+import enum
+
+from .database import Base
+from .types import GUID
+
+
+class ImportJobStatus(enum.Enum):
+    """Статусы фоновой задачи импорта."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    ERROR = "error"
+    CANCELLED = "cancelled"
+
+
+class ImportJob(Base):
+    """
+    Модель фоновой задачи импорта каталога.
+
+    Задача обходит каталог пачками и после каждой пачки сохраняет
+    курсор - последний обработанный путь, поэтому после перезапуска
+    сервера импорт продолжается с места остановки.
+
+    Attributes:
+        id: Уникальный идентификатор (UUID)
+        root_path: Импортируемый каталог
+        options: Параметры обхода (JSON: recursive, include, exclude, max_depth)
+        cursor: Последний обработанный путь относительно root_path
+        discovered: Найдено аудио-файлов
+        imported: Импортировано (статус LOADED)
+        skipped: Пропущено (уже были в БД)
+        failed: Ошибок (файлы со статусом ERROR и нечитаемые каталоги)
+        errors: Последние ошибки (JSON список {file, error})
+        status: Статус задачи
+        error_message: Текст ошибки, остановившей задачу
+        created_at: Дата и время создания
+        updated_at: Дата и время последнего обновления
+    """
+
+    __tablename__ = 'import_jobs'
+
+    id = Column(
+        GUID,
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        nullable=False
+    )
+
+    root_path = Column(String(500), nullable=False)
+    options = Column(Text, nullable=False, default='{}')
+    cursor = Column(String(1000), nullable=True)
+
+    discovered = Column(Integer, default=0, nullable=False)
+    imported = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    errors = Column(Text, nullable=False, default='[]')
+
+    status = Column(
+        Enum(ImportJobStatus),
+        default=ImportJobStatus.PENDING,
+        nullable=False
+    )
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False
+    )
+
+    updated_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False
+    )
+
+    def __repr__(self):
+        """Строковое представление модели."""
+        return (
+            f"<ImportJob(id={self.id}, "
+            f"root_path='{self.root_path}', "
+            f"status={self.status.value}, "
+            f"imported={self.imported})>"
+        )
+
+    @property
+    def is_active(self):
+        """Задача ещё не завершена (ждёт очереди или выполняется)."""
+        return self.status in (ImportJobStatus.PENDING, ImportJobStatus.RUNNING)
+
+    def get_options(self):
+        """Параметры обхода в виде словаря."""
+        return json.loads(self.options or '{}')
+
+    def get_errors(self):
+        """Последние ошибки в виде списка."""
+        return json.loads(self.errors or '[]')
+
+    def to_dict(self):
+        """
+        Преобразовать модель в словарь.
+
+        Returns:
+            dict: Словарь с данными модели
+        """
+        return {
+            'id': str(self.id),
+            'root_path': self.root_path,
+            'options': self.get_options(),
+            'cursor': self.cursor,
+            'discovered': self.discovered,
+            'imported': self.imported,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': self.get_errors(),
+            'status': self.status.value,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+    @classmethod
+    def get_by_id(cls, session, job_id):
+        """
+        Получить задачу по ID.
+
+        Args:
+            session: SQLAlchemy сессия
+            job_id: UUID задачи
+
+        Returns:
+            ImportJob или None
+        """
+        return session.query(cls).filter_by(id=job_id).first()
+
+    @classmethod
+    def get_active(cls, session):
+        """
+        Незавершённые задачи в порядке создания.
+
+        Args:
+            session: SQLAlchemy сессия
+
+        Returns:
+            list: ImportJob в статусах PENDING и RUNNING
+        """
+        return session.query(cls).filter(
+            cls.status.in_([ImportJobStatus.PENDING, ImportJobStatus.RUNNING])
+        ).order_by(cls.created_at).all()
@@ -0,0 +1,132 @@
+"""
+Модель PlaybackProxy для хранения облегчённых копий аудио для воспроизведения.
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, Text, DateTime, Enum, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+import enum
+
+from .database import Base
+from .types import GUID
+
+
+class PlaybackProxyStatus(enum.Enum):
+    """Статусы построения proxy."""
+    PENDING = "pending"
+    READY = "ready"
+    ERROR = "error"
+
+
+class PlaybackProxy(Base):
+    """
+    Модель для хранения сжатой копии аудио-файла для воспроизведения.
+
+    Proxy имеет ту же длительность, что и исходный файл, поэтому
+    временные метки аннотаций одинаковы для обоих.
+
+    Attributes:
+        id: Уникальный идентификатор (UUID)
+        audio_file_id: ID исходного аудио-файла (один proxy на файл)
+        file_path: Путь к файлу proxy
+        format: Кодек proxy (opus, vorbis, flac)
+        sample_rate: Частота дискретизации proxy
+        channels: Количество каналов proxy
+        file_size: Размер файла proxy в байтах
+        source_size: Размер исходного файла на момент построения
+        source_mtime_ns: mtime исходного файла на момент построения
+        status: Статус построения
+        error_message: Текст ошибки построения
+        created_at: Дата и время создания
+        updated_at: Дата и время последнего обновления
+        audio_file: Связь с AudioFile
+    """
+
+    __tablename__ = 'playback_proxies'
+
+    id = Column(
+        GUID,
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        nullable=False
+    )
+
+    audio_file_id = Column(
+        GUID,
+        ForeignKey('audio_files.id', ondelete='CASCADE'),
+        unique=True,
+        nullable=False
+    )
+
+    file_path = Column(String(500), nullable=False)
+    format = Column(String(16), nullable=False)
+    sample_rate = Column(Integer, nullable=False)
+    channels = Column(Integer, nullable=False)
+    file_size = Column(BigInteger, nullable=True)
+    source_size = Column(BigInteger, nullable=True)
+    source_mtime_ns = Column(BigInteger, nullable=True)
+
+    status = Column(
+        Enum(PlaybackProxyStatus),
+        default=PlaybackProxyStatus.PENDING,
+        nullable=False
+    )
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False
+    )
+
+    updated_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False
+    )
+
+    # Связь с AudioFile
+    audio_file = relationship("AudioFile", back_populates="playback_proxy")
+
+    def __repr__(self):
+        """Строковое представление модели."""
+        return (
+            f"<PlaybackProxy(audio_file_id={self.audio_file_id}, "
+            f"format='{self.format}', "
+            f"status={self.status.value})>"
+        )
+
+    def to_dict(self):
+        """
+        Преобразовать модель в словарь.
+
+        Returns:
+            dict: Словарь с данными модели
+        """
+        return {
+            'audio_file_id': str(self.audio_file_id),
+            'format': self.format,
+            'sample_rate': self.sample_rate,
+            'channels': self.channels,
+            'file_size': self.file_size,
+            'status': self.status.value,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+    @classmethod
+    def get_by_audio_file(cls, session, audio_file_id):
+        """
+        Получить proxy для аудио-файла.
+
+        Args:
+            session: SQLAlchemy сессия
+            audio_file_id: UUID аудио-файла
+
+        Returns:
+            PlaybackProxy или None
+        """
+        return session.query(cls).filter_by(audio_file_id=audio_file_id).first()
@@ -0,0 +1,147 @@
+"""
+Модель RenderJob для фоновых задач отрисовки больших изображений.
+"""
+from sqlalchemy import Column, String, Float, BigInteger, Text, DateTime, Enum, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import json
+import uuid
+import enum
+
+from .database import Base
+from .types import GUID
+
+
+class RenderJobStatus(enum.Enum):
+    """Статусы фоновой задачи отрисовки."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    ERROR = "error"
+
+
+class RenderJob(Base):
+    """
+    Модель фоновой задачи отрисовки waveform или спектрограммы.
+
+    Attributes:
+        id: Уникальный идентификатор (UUID)
+        audio_file_id: ID аудио-файла
+        kind: Тип изображения (waveform, spectrogram)
+        params: Параметры отрисовки (JSON)
+        status: Статус задачи
+        progress: Выполнено, проценты (0-100)
+        file_path: Путь к готовому PNG
+        file_size: Размер готового PNG в байтах
+        error_message: Текст ошибки отрисовки
+        created_at: Дата и время создания
+        updated_at: Дата и время последнего обновления
+        audio_file: Связь с AudioFile
+    """
+
+    __tablename__ = 'render_jobs'
+
+    id = Column(
+        GUID,
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        nullable=False
+    )
+
+    audio_file_id = Column(
+        GUID,
+        ForeignKey('audio_files.id', ondelete='CASCADE'),
+        nullable=False
+    )
+
+    kind = Column(String(32), nullable=False)
+    params = Column(Text, nullable=False, default='{}')
+
+    status = Column(
+        Enum(RenderJobStatus),
+        default=RenderJobStatus.PENDING,
+        nullable=False
+    )
+    progress = Column(Float, default=0.0, nullable=False)
+    file_path = Column(String(500), nullable=True)
+    file_size = Column(BigInteger, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False
+    )
+
+    updated_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False
+    )
+
+    # Связь с AudioFile
+    audio_file = relationship("AudioFile", back_populates="render_jobs")
+
+    def __repr__(self):
+        """Строковое представление модели."""
+        return (
+            f"<RenderJob(id={self.id}, "
+            f"kind='{self.kind}', "
+            f"status={self.status.value}, "
+            f"progress={self.progress:.0f}%)>"
+        )
+
+    def get_params(self):
+        """Параметры отрисовки в виде словаря."""
+        return json.loads(self.params or '{}')
+
+    def to_dict(self):
+        """
+        Преобразовать модель в словарь.
+
+        Returns:
+            dict: Словарь с данными модели
+        """
+        return {
+            'id': str(self.id),
+            'audio_file_id': str(self.audio_file_id),
+            'kind': self.kind,
+            'params': self.get_params(),
+            'status': self.status.value,
+            'progress': round(self.progress, 1),
+            'file_size': self.file_size,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+    @classmethod
+    def get_by_id(cls, session, job_id):
+        """
+        Получить задачу по ID.
+
+        Args:
+            session: SQLAlchemy сессия
+            job_id: UUID задачи
+
+        Returns:
+            RenderJob или None
+        """
+        return session.query(cls).filter_by(id=job_id).first()
+
+    @classmethod
+    def get_active(cls, session):
+        """
+        Незавершённые задачи в порядке создания.
+
+        Args:
+            session: SQLAlchemy сессия
+
+        Returns:
+            list: RenderJob в статусах PENDING и RUNNING
+        """
+        return session.query(cls).filter(
+            cls.status.in_([RenderJobStatus.PENDING, RenderJobStatus.RUNNING])
+        ).order_by(cls.created_at).all()
@@ -0,0 +1,148 @@
+"""
+Модели WatchedFolder и WatchedFile для наблюдаемых каталогов.
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, Text, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime
+import json
+import uuid
+
+from .database import Base
+from .types import GUID
+
+
+class WatchedFolder(Base):
+    """
+    Модель наблюдаемого каталога.
+
+    Каталог периодически пересканируется: по манифесту WatchedFile
+    обрабатываются только новые, изменённые и исчезнувшие файлы.
+
+    Attributes:
+        id: Уникальный идентификатор (UUID)
+        root_path: Наблюдаемый каталог
+        options: Параметры обхода (JSON: recursive, include, exclude, max_depth)
+        live: Отслеживать изменения через inotify (Linux)
+        file_count: Файлов в манифесте после последнего сканирования
+        last_scan: Итог последнего сканирования (JSON)
+        last_scan_at: Дата и время последнего сканирования
+        created_at: Дата и время создания
+    """
+
+    __tablename__ = 'watched_folders'
+
+    id = Column(
+        GUID,
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        nullable=False
+    )
+
+    root_path = Column(String(500), nullable=False, unique=True)
+    options = Column(Text, nullable=False, default='{}')
+    live = Column(Boolean, default=False, nullable=False)
+    file_count = Column(Integer, default=0, nullable=False)
+    last_scan = Column(Text, nullable=True)
+    last_scan_at = Column(DateTime, nullable=True)
+
+    created_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False
+    )
+
+    def __repr__(self):
+        """Строковое представление модели."""
+        return (
+            f"<WatchedFolder(id={self.id}, "
+            f"root_path='{self.root_path}', "
+            f"file_count={self.file_count})>"
+        )
+
+    def get_options(self):
+        """Параметры обхода в виде словаря."""
+        return json.loads(self.options or '{}')
+
+    def to_dict(self):
+        """
+        Преобразовать модель в словарь.
+
+        Returns:
+            dict: Словарь с данными модели
+        """
+        return {
+            'id': str(self.id),
+            'root_path': self.root_path,
+            'options': self.get_options(),
+            'live': self.live,
+            'file_count': self.file_count,
+            'last_scan': json.loads(self.last_scan) if self.last_scan else None,
+            'last_scan_at': self.last_scan_at.isoformat() if self.last_scan_at else None,
+            'created_at': self.created_at.isoformat()
+        }
+
+    @classmethod
+    def get_by_id(cls, session, folder_id):
+        """
+        Получить каталог по ID.
+
+        Args:
+            session: SQLAlchemy сессия
+            folder_id: UUID каталога
+
+        Returns:
+            WatchedFolder или None
+        """
+        return session.query(cls).filter_by(id=folder_id).first()
+
+
+class WatchedFile(Base):
+    """
+    Запись манифеста наблюдаемого каталога.
+
+    По размеру, mtime и inode файла сканирование определяет, изменился
+    ли файл, без чтения его заголовков; совпадение inode у исчезнувшего
+    и нового пути означает переименование.
+
+    Attributes:
+        id: Уникальный идентификатор (UUID)
+        folder_id: ID наблюдаемого каталога
+        relative_path: Путь относительно каталога (через "/")
+        size: Размер файла в байтах
+        mtime_ns: Время изменения, наносекунды
+        inode: Номер inode
+        audio_file_id: ID AudioFile (None, если файл не удалось прочитать)
+    """
+
+    __tablename__ = 'watched_files'
+    __table_args__ = (UniqueConstraint('folder_id', 'relative_path'),)
+
+    id = Column(
+        GUID,
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        nullable=False
+    )
+
+    folder_id = Column(
+        GUID,
+        ForeignKey('watched_folders.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+
+    relative_path = Column(String(1000), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    mtime_ns = Column(BigInteger, nullable=False)
+    inode = Column(BigInteger, nullable=False)
+
+    audio_file_id = Column(
+        GUID,
+        ForeignKey('audio_files.id', ondelete='SET NULL'),
+        nullable=True
+    )
+
+    def __repr__(self):
+        """Строковое представление модели."""
+        return f"<WatchedFile(relative_path='{self.relative_path}', size={self.size})>"
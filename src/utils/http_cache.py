@@ -0,0 +1,145 @@
+"""
+HTTP валидаторы кэша для потоковых и производных ресурсов.
+
+ETag строится детерминированно из идентичности исходного файла
+(inode, размер, mtime) и, для производных ресурсов, параметров запроса.
+Проверка If-None-Match / If-Modified-Since выполняется до декодирования
+аудио, поэтому повторные запросы браузера обходятся одним stat().
+
+Если в запросе передан параметр v, совпадающий с текущей версией файла,
+URL считается версионированным и ответ помечается Cache-Control: immutable.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from flask import Response, request
+from werkzeug.http import is_resource_modified, parse_if_range_header, unquote_etag
+
+# Версионированный URL не меняет содержимое - браузер может не перепроверять его год
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Неверсионированный URL - браузер хранит ответ, но перепроверяет его по ETag
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+VERSION_PARAM = 'v'
+
+
+def get_file_version(file_path: str) -> str:
+    """
+    Токен версии файла из inode, размера и mtime.
+
+    Args:
+        file_path: Путь к файлу
+
+    Returns:
+        str: Например "1a2b-5f3e00-17c9d2a4b8e0f000"
+    """
+    stat = os.stat(file_path)
+    return f'{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}'
+
+
+def get_last_modified(file_path: str) -> datetime:
+    """Время изменения файла (UTC) для заголовка Last-Modified."""
+    return datetime.fromtimestamp(os.stat(file_path).st_mtime, tz=timezone.utc)
+
+
+def make_etag(file_path: str, params: Optional[Dict] = None) -> str:
+    """
+    Строгий ETag файла или производного от него ресурса.
+
+    Args:
+        file_path: Путь к исходному файлу
+        params: Параметры, влияющие на содержимое ответа (None - сам файл)
+
+    Returns:
+        str: ETag без кавычек
+    """
+    version = get_file_version(file_path)
+    if params is None:
+        return version
+    payload = json.dumps({'version': version, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def is_versioned_request(file_path: str) -> bool:
+    """Передан ли в запросе параметр v, совпадающий с текущей версией файла."""
+    requested = request.args.get(VERSION_PARAM)
+    return requested is not None and requested == get_file_version(file_path)
+
+
+def get_validators(file_path: str, params: Optional[Dict] = None) -> Tuple[str, datetime, bool]:
+    """
+    Валидаторы ответа для файла или производного ресурса.
+
+    Returns:
+        Tuple (etag, last_modified, immutable)
+    """
+    return (
+        make_etag(file_path, params),
+        get_last_modified(file_path),
+        is_versioned_request(file_path),
+    )
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Можно ли ответить 304 по If-None-Match / If-Modified-Since текущего запроса."""
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+
+def if_range_matches(etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Проверяет If-Range: можно ли отдать запрошенный диапазон.
+
+    Returns:
+        bool: True, если If-Range нет или он совпадает с текущей версией;
+              False - нужно игнорировать Range и отдать файл целиком
+    """
+    header = request.headers.get('If-Range')
+    if not header:
+        return True
+
+    if_range = parse_if_range_header(header)
+    if if_range.etag is not None:
+        # If-Range требует строгого сравнения - слабые ETag не совпадают
+        value, weak = unquote_etag(header.strip())
+        return not weak and value == etag
+    if if_range.date is not None and last_modified is not None:
+        return last_modified.replace(microsecond=0) == if_range.date
+    return False
+
+
+def apply_cache_headers(
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    immutable: bool = False
+) -> Response:
+    """
+    Устанавливает ETag, Last-Modified и Cache-Control.
+
+    Args:
+        response: Ответ Flask
+        etag: ETag без кавычек
+        last_modified: Время изменения исходного файла
+        immutable: URL версионирован и содержимое по нему не изменится
+
+    Returns:
+        Response: Тот же ответ
+    """
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = (
+        IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+    )
+    return response
+
+
+def not_modified_response(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    immutable: bool = False
+) -> Response:
+    """Пустой ответ 304 Not Modified с валидаторами."""
+    return apply_cache_headers(Response(status=304), etag, last_modified, immutable)
@@ -0,0 +1,46 @@
+"""
+Расположение производных данных приложения на диске.
+
+Производные файлы (пирамиды peaks и т.п.) хранятся рядом с SQLite БД
+в подкаталогах по назначению. Корень можно переопределить переменной
+окружения AUDIO_DATA_DIR.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+
+def get_data_root() -> Path:
+    """
+    Получить корневой каталог для производных данных.
+
+    Returns:
+        Path: AUDIO_DATA_DIR, каталог файла SQLite БД
+              или временный каталог для БД в памяти
+    """
+    env_root = os.getenv('AUDIO_DATA_DIR')
+    if env_root:
+        return Path(env_root)
+
+    from src.models import get_db
+
+    database = get_db().engine.url.database
+    if database and database != ':memory:':
+        return Path(database).resolve().parent
+
+    return Path(tempfile.gettempdir()) / 'audio_annotation'
+
+
+def get_data_dir(name: str) -> Path:
+    """
+    Получить (и создать при необходимости) подкаталог производных данных.
+
+    Args:
+        name: Имя подкаталога, например "peaks"
+
+    Returns:
+        Path: Путь к подкаталогу
+    """
+    path = get_data_root() / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -8,6 +8,7 @@
  * - Кнопки Edit и Delete для каждой аннотации
  * - Цветовая кодировка по типу события
  * - Счетчик аннотаций
+ * - Миниатюры спектрограмм всех аннотаций одним запросом (спрайт)
  * - Динамическое обновление после CRUD операций
  */
 
@@ -15,6 +16,11 @@
 let annotationListCurrentAudioFileId = null;
 let annotations = [];
 let annotationRegions = {}; // Маппинг annotation_id -> region
+let annotationThumbnailsRequest = 0; // Номер последнего запроса миниатюр
+
+// Размер миниатюры спектрограммы в списке
+const ANNOTATION_THUMBNAIL_WIDTH = 200;
+const ANNOTATION_THUMBNAIL_HEIGHT = 48;
 
 function getAnnotationRegionsPlugin() {
     if (typeof window.getWaveSurferRegionsPlugin === 'function') {
@@ -150,6 +156,62 @@ function renderAnnotationsList() {
         const annotationItem = createAnnotationItem(annotation);
         annotationsList.appendChild(annotationItem);
     });
+
+    loadAnnotationThumbnails();
+}
+
+/**
+ * Загрузка миниатюр спектрограмм всех аннотаций одним запросом
+ *
+ * Сервер возвращает спрайт PNG и смещение каждой миниатюры в нём;
+ * миниатюра показывается как фон со смещением (CSS sprite).
+ */
+function loadAnnotationThumbnails() {
+    if (!annotationListCurrentAudioFileId || annotations.length === 0) {
+        return;
+    }
+
+    const requestId = ++annotationThumbnailsRequest;
+    const audioFileId = annotationListCurrentAudioFileId;
+
+    fetch(`/api/audio/${audioFileId}/spectrogram/batch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            intervals: annotations.map(annotation => ({
+                id: annotation.id,
+                start_time: annotation.start_time,
+                end_time: annotation.end_time
+            })),
+            width: ANNOTATION_THUMBNAIL_WIDTH,
+            height: ANNOTATION_THUMBNAIL_HEIGHT
+        })
+    })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            // Список мог смениться, пока миниатюры генерировались
+            if (requestId !== annotationThumbnailsRequest) {
+                return;
+            }
+            data.items.forEach(item => {
+                const thumbnail = document.querySelector(
+                    `.annotation-item[data-annotation-id="${item.id}"] .annotation-thumbnail`
+                );
+                if (!thumbnail) return;
+                thumbnail.style.backgroundImage = `url(${data.sprite})`;
+                thumbnail.style.backgroundPosition = `-${item.x}px -${item.y}px`;
+                thumbnail.style.width = `${item.width}px`;
+                thumbnail.style.height = `${item.height}px`;
+            });
+        })
+        .catch(error => {
+            console.error('Ошибка загрузки миниатюр спектрограмм:', error);
+        });
 }
 
 /**
@@ -187,6 +249,7 @@ function createAnnotationItem(annotation) {
         <div class="annotation-item-body">
             <div class="annotation-event-label">${escapeHtml(eventLabel)}</div>
             <div class="annotation-confidence">Confidence: ${confidence}</div>
+            <div class="annotation-thumbnail"></div>
         </div>
     `;
 
@@ -20,6 +20,7 @@ let importFolderPathInput = null;
 let importFolderSuccessMessage = null;
 let importFolderErrorMessage = null;
 let importFolderSubmitButton = null;
+let importFolderProgressMessage = null;
 
 document.addEventListener('DOMContentLoaded', () => {
     initAudioFileManager();
@@ -54,6 +55,7 @@ function initImportFolderModal() {
     importFolderSuccessMessage = document.getElementById('import-folder-success');
     importFolderErrorMessage = document.getElementById('import-folder-error');
     importFolderSubmitButton = document.getElementById('import-folder-submit');
+    importFolderProgressMessage = document.getElementById('import-folder-progress');
 
     const importFolderButton = document.querySelector('[data-action="import-folder"]');
     if (importFolderButton) {
@@ -111,23 +113,35 @@ async function handleImportFolderSubmit(event) {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
+                'Accept': 'application/x-ndjson',
             },
-            body: JSON.stringify({ path: folderPath }),
+            body: JSON.stringify(getImportFolderOptions(folderPath)),
         });
 
-        const data = await response.json().catch(() => ({}));
-
         if (!response.ok) {
+            const data = await response.json().catch(() => ({}));
             throw new Error(data.error || 'Failed to import folder');
         }
 
-        showImportFolderSuccess(`Successfully imported ${data.imported_count} files.`);
+        const summary = await readImportEvents(response);
+        showImportFolderProgress('');
+        const message = `Successfully imported ${summary.imported} files ` +
+            `(${summary.skipped} already added, ${summary.duplicates} copies of known recordings).`;
+        if (summary.failures.length) {
+            showImportFolderError(
+                `${message} Failed ${summary.failures.length}: ${summary.failures.slice(0, 5).join('; ')}`
+            );
+        } else {
+            showImportFolderSuccess(message);
+        }
         await loadAudioFiles();
 
-        setTimeout(() => {
-            closeImportFolderModal();
-            resetImportFolderForm();
-        }, 1500);
+        if (!summary.failures.length) {
+            setTimeout(() => {
+                closeImportFolderModal();
+                resetImportFolderForm();
+            }, 1500);
+        }
 
     } catch (error) {
         console.error('Error importing folder:', error);
@@ -140,6 +154,82 @@ async function handleImportFolderSubmit(event) {
     }
 }
 
+/**
+ * Параметры импорта из формы
+ */
+function getImportFolderOptions(folderPath) {
+    const splitPatterns = (id) => (document.getElementById(id)?.value || '')
+        .split(',')
+        .map((pattern) => pattern.trim())
+        .filter(Boolean);
+
+    const options = {
+        path: folderPath,
+        recursive: Boolean(document.getElementById('import-folder-recursive')?.checked),
+        include: splitPatterns('import-folder-include'),
+        exclude: splitPatterns('import-folder-exclude'),
+    };
+    const maxDepth = document.getElementById('import-folder-max-depth')?.value;
+    if (options.recursive && maxDepth !== undefined && maxDepth !== '') {
+        options.max_depth = parseInt(maxDepth, 10);
+    }
+    return options;
+}
+
+/**
+ * Чтение потока событий импорта (NDJSON) с обновлением прогресса
+ */
+async function readImportEvents(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const failures = [];
+    let buffer = '';
+    let summary = null;
+
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+        const event = JSON.parse(line);
+        if (event.event === 'error') {
+            failures.push(`${event.file}: ${event.error}`);
+        } else if (event.event === 'aborted') {
+            throw new Error(event.error || 'Import aborted');
+        } else {
+            showImportFolderProgress(
+                `Found ${event.discovered} · imported ${event.imported} · ` +
+                `copies ${event.duplicates} · skipped ${event.skipped} · failed ${event.failed} · ` +
+                `${event.rate} files/s`
+            );
+            if (event.event === 'done') {
+                summary = event;
+            }
+        }
+    };
+
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffer + decoder.decode());
+
+    if (!summary) {
+        throw new Error('Import stopped before completion');
+    }
+    return { ...summary, failures };
+}
+
+/**
+ * Показ прогресса импорта
+ */
+function showImportFolderProgress(message) {
+    if (!importFolderProgressMessage) return;
+    importFolderProgressMessage.textContent = message;
+    importFolderProgressMessage.classList.toggle('active', Boolean(message));
+}
+
 /**
  * Показ сообщения об успехе импорта
  */
@@ -181,6 +271,7 @@ function resetImportFolderForm() {
     }
     showImportFolderSuccess('');
     showImportFolderError('');
+    showImportFolderProgress('');
 }
 
 /**
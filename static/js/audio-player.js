@@ -8,6 +8,7 @@
  * - Перемотка кликом по waveform
  * - Регионы для выделения интервалов
  * - Zoom in/out для waveform
+ * - Спектрограмма из серверных тайлов под waveform (SpectrogramTiles)
  */
 
 // Глобальная переменная для wavesurfer instance
@@ -15,6 +16,7 @@ let wavesurfer = null;
 let currentZoom = 0;
 let currentlyLoadingAudioId = null;
 let lastLoadedAudioId = null;
+let spectrogramTiles = null;
 
 /**
  * Поиск доступного плагина wavesurfer независимо от пространства имён.
@@ -105,39 +107,6 @@ function buildWaveSurferPlugins() {
     console.warn("WaveSurfer minimap plugin недоступен, миникарта отключена.");
   }
 
-  // Spectrogram Plugin (Conditional)
-  const showSpectrogram = window.appSettings ? window.appSettings.get('showMainSpectrogram') : false;
-  const spectrogramHeight = window.appSettings ? window.appSettings.get('mainSpectrogramHeight') : 256;
-  const showLabels = window.appSettings ? window.appSettings.get('showSpectrogramLabels') : true;
-
-  if (showSpectrogram) {
-    const spectrogramFactory = resolveWaveSurferPlugin(
-      () => WaveSurfer.spectrogram,
-      () => WaveSurfer.Spectrogram,
-      () => WaveSurfer.plugins && WaveSurfer.plugins.spectrogram,
-      () => WaveSurfer.plugins && WaveSurfer.plugins.Spectrogram,
-      () => window.WaveSurferSpectrogram
-    );
-    
-    if (spectrogramFactory) {
-      plugins.push(
-        spectrogramFactory.create({
-          container: "#waveform", // Render into the same container
-          labels: showLabels,
-          height: spectrogramHeight,
-          colorMap: 'roseus',
-          splitChannels: false,
-          scale: 'linear',
-          frequencyMin: 0,
-          fftSamples: 1024,
-          labelsBackground: 'rgba(0, 0, 0, 0.7)',
-          labelsColor: '#ffffff',
-          labelsHzColor: '#ffffff'
-        })
-      );
-    }
-  }
-
   return plugins;
 }
 
@@ -228,7 +197,8 @@ function initWaveSurfer(audioUrl) {
   isAdjustingRegion = false;
 
   // Создаём новый instance wavesurfer
-  // WaveSurfer v7 по умолчанию использует HTML5 audio (не AudioContext)
+  // WaveSurfer v7 воспроизводит через собственный HTML5 audio элемент (Range запросы),
+  // а waveform рисуется по peaks с сервера без декодирования файла в браузере
   // Не передаем собственный media элемент, чтобы события работали правильно
   wavesurfer = WaveSurfer.create({
     container: "#waveform",
@@ -298,6 +268,11 @@ function setupAudioEventHandlers() {
     setupRegionOverlapPrevention();
   });
 
+  // Спектрограмма следует за прокруткой и масштабом waveform
+  wavesurfer.on("scroll", updateSpectrogramTiles);
+  wavesurfer.on("zoom", updateSpectrogramTiles);
+  wavesurfer.on("redrawcomplete", updateSpectrogramTiles);
+
   // Событие decode (альтернативное для Web Audio API backend)
   wavesurfer.on("decode", () => {
     notifyRegionsPluginReady();
@@ -592,6 +567,72 @@ function hideLoadingIndicator() {
   }
 }
 
+/**
+ * Получение peaks и длительности файла с сервера.
+ * Возвращает null, если peaks недоступны (тогда WaveSurfer декодирует файл сам).
+ */
+async function fetchAudioPeaks(audioFileId) {
+  try {
+    const response = await fetch(`/api/audio/${audioFileId}/peaks?format=f32`);
+    if (!response.ok) {
+      return null;
+    }
+    const duration = parseFloat(response.headers.get("X-Audio-Duration"));
+    const buffer = await response.arrayBuffer();
+    if (!isFinite(duration) || duration <= 0) {
+      return null;
+    }
+    return { peaks: [new Float32Array(buffer)], duration: duration };
+  } catch (error) {
+    console.warn("Не удалось получить peaks, используется декодирование в браузере:", error);
+    return null;
+  }
+}
+
+/**
+ * Загрузка уровней тайлов спектрограммы для файла (если она включена в настройках).
+ */
+function loadSpectrogramTiles(audioFileId) {
+  const container = document.getElementById("waveform-spectrogram");
+  const showSpectrogram = window.appSettings ? window.appSettings.get('showMainSpectrogram') : false;
+  if (!container || typeof SpectrogramTiles === "undefined") {
+    return;
+  }
+  if (!showSpectrogram) {
+    container.style.display = "none";
+    return;
+  }
+
+  container.style.display = "";
+  if (!spectrogramTiles) {
+    const height = window.appSettings ? window.appSettings.get('mainSpectrogramHeight') : 256;
+    spectrogramTiles = new SpectrogramTiles(container, height);
+  }
+  spectrogramTiles
+    .load(audioFileId)
+    .then(updateSpectrogramTiles)
+    .catch((error) => console.warn("Спектрограмма недоступна:", error));
+}
+
+/**
+ * Синхронизация тайлов спектрограммы с масштабом и прокруткой waveform.
+ */
+function updateSpectrogramTiles() {
+  if (!spectrogramTiles || !wavesurfer) {
+    return;
+  }
+  const duration = wavesurfer.getDuration();
+  const wrapper = wavesurfer.getWrapper();
+  if (!duration || !wrapper) {
+    return;
+  }
+  spectrogramTiles.update(
+    wrapper.scrollWidth / duration,
+    wavesurfer.getScroll(),
+    wavesurfer.getWidth()
+  );
+}
+
 /**
  * Загрузка аудио файла по ID в wavesurfer
  */
@@ -609,10 +650,18 @@ function loadAudioFile(audioFileId) {
 
   // Очищаем все регионы перед загрузкой нового файла
   clearRegions();
+  loadSpectrogramTiles(audioFileId);
 
-  const audioUrl = `/api/audio/${audioFileId}/stream`;
+  // Для больших файлов сервер отдаёт сжатый proxy (или исходный файл, если proxy нет);
+  // длительность proxy совпадает с исходной, поэтому peaks и аннотации не сдвигаются
+  const audioUrl = `/api/audio/${audioFileId}/stream?quality=proxy`;
 
-  const loadPromise = wavesurfer.load(audioUrl);
+  // С готовыми peaks и длительностью WaveSurfer не скачивает файл целиком
+  const loadPromise = fetchAudioPeaks(audioFileId).then((peaksData) =>
+    peaksData
+      ? wavesurfer.load(audioUrl, peaksData.peaks, peaksData.duration)
+      : wavesurfer.load(audioUrl)
+  );
   if (loadPromise && typeof loadPromise.then === "function") {
     loadPromise
       .then(() => {
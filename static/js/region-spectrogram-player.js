@@ -7,7 +7,8 @@
  * Функциональность:
  * - Создание второго wavesurfer instance для региона
  * - Извлечение ТОЛЬКО выбранного региона из основного AudioBuffer
- * - Отображение интерактивной спектрограммы (wavesurfer.js spectrogram plugin)
+ * - Спектрограмма региона на canvas из сырых данных сервера (SpectrogramCanvas):
+ *   контраст меняется локально, без повторных запросов
  * - Независимые controls для воспроизведения региона
  * - Синхронизация с изменениями границ региона
  */
@@ -15,7 +16,7 @@
 class RegionSpectrogramPlayer {
     constructor() {
         this.wavesurfer = null;
-        this.spectrogramPlugin = null;
+        this.spectrogramCanvas = null;
         this.currentAudioFileId = null;
         this.currentRegion = null;
         this.isPlaying = false;
@@ -23,7 +24,9 @@ class RegionSpectrogramPlayer {
         // DOM elements
         this.container = document.getElementById('region-player-container');
         this.waveformContainer = document.getElementById('region-waveform');
-        // this.spectrogramContainer = document.getElementById('region-spectrogram'); // Removed as per user request
+        this.spectrogramContainer = document.getElementById('region-spectrogram');
+        this.floorInput = document.getElementById('region-spectrogram-floor');
+        this.ceilingInput = document.getElementById('region-spectrogram-ceiling');
         this.playPauseBtn = document.getElementById('region-play-pause');
         this.playIcon = document.getElementById('region-play-icon');
         this.timeDisplay = document.getElementById('region-time-display');
@@ -48,6 +51,25 @@ class RegionSpectrogramPlayer {
                 this.togglePlayPause();
             });
         }
+
+        // Контраст применяется к уже загруженной матрице
+        [this.floorInput, this.ceilingInput].forEach((input) => {
+            if (input) {
+                input.addEventListener('input', () => this.applyContrast());
+            }
+        });
+    }
+
+    /**
+     * Применение контраста из controls к спектрограмме
+     */
+    applyContrast() {
+        if (!this.spectrogramCanvas || !this.floorInput || !this.ceilingInput) return;
+
+        this.spectrogramCanvas.setContrast(
+            parseFloat(this.floorInput.value),
+            parseFloat(this.ceilingInput.value)
+        );
     }
 
     /**
@@ -82,11 +104,14 @@ class RegionSpectrogramPlayer {
                 this.wavesurfer = null;
             }
 
+            if (this.spectrogramCanvas) {
+                this.spectrogramCanvas.destroy();
+                this.spectrogramCanvas = null;
+            }
+
             // Get settings
             const height = window.appSettings ? window.appSettings.get('spectrogramHeight') : 512;
             const showLabels = window.appSettings ? window.appSettings.get('showSpectrogramLabels') : true;
-            // Always use default colormap 'roseus'
-            const colorMap = 'roseus';
 
             // Создаём новый wavesurfer instance
             this.wavesurfer = WaveSurfer.create({
@@ -100,26 +125,20 @@ class RegionSpectrogramPlayer {
                 mediaControls: false
             });
 
-            // Инициализируем spectrogram plugin с настройками для биоакустики
-            // Используем основной контейнер, так как отдельный div был удален
-            this.spectrogramPlugin = this.wavesurfer.registerPlugin(
-                WaveSurfer.Spectrogram.create({
-                    container: this.container, // Use the main container
-                    labels: showLabels,
+            // Спектрограмма: линейная шкала до Nyquist, как нужно для биоакустики
+            if (this.spectrogramContainer) {
+                this.spectrogramCanvas = new SpectrogramCanvas(this.spectrogramContainer, {
                     height: height,
-                    colorMap: colorMap,
-                    scale: 'linear',  // Linear scale для биоакустики - показывает ВСЕ частоты
-                    frequencyMin: 0,
-                    frequencyMax: sampleRate / 2,  // До Nyquist frequency для ультразвука
-                    fftSamples: 2048,
-                    labelsBackground: 'rgba(0, 0, 0, 0.7)',
-                    labelsColor: '#ffffff',
-                    labelsHzColor: '#ffffff'
-                })
-            );
-
-            // Загружаем аудио региона (извлекаем из основного buffer)
-            await this.loadRegionAudio(audioFileId, start, end);
+                    labels: showLabels
+                });
+                this.applyContrast();
+            }
+
+            // Аудио и данные спектрограммы региона загружаются параллельно
+            await Promise.all([
+                this.loadRegionAudio(audioFileId, start, end),
+                this.loadRegionSpectrogram(audioFileId, start, end)
+            ]);
             
             // Mute region player as we will use main player for playback
             if (this.wavesurfer) {
@@ -195,109 +214,33 @@ class RegionSpectrogramPlayer {
 
 
     /**
-     * Загрузка аудио для региона - извлечение из основного wavesurfer AudioBuffer
+     * Загрузка аудио для региона - сервер отдаёт WAV ровно этого интервала
      * 
      * @param {string} audioFileId - UUID аудио файла
      * @param {number} start - Начало региона в секундах
      * @param {number} end - Конец региона в секундах
      */
     async loadRegionAudio(audioFileId, start, end) {
-        const mainWavesurfer = window.wavesurfer;
-        if (!mainWavesurfer) {
-            throw new Error('Main wavesurfer instance not found');
-        }
-
-        const decodedData = mainWavesurfer.getDecodedData();
-        if (!decodedData) {
-            throw new Error('Audio data not decoded yet');
-        }
-
-        const sampleRate = decodedData.sampleRate;
-        const startSample = Math.floor(start * sampleRate);
-        const endSample = Math.floor(end * sampleRate);
-        const length = endSample - startSample;
-
-        if (length <= 0) {
+        if (end <= start) {
             throw new Error('Invalid region length');
         }
 
-        // Create a new AudioBuffer for the region
-        const audioContext = new (window.AudioContext || window.webkitAudioContext)();
-        const regionBuffer = audioContext.createBuffer(
-            decodedData.numberOfChannels,
-            length,
-            sampleRate
-        );
-
-        // Copy channel data
-        for (let i = 0; i < decodedData.numberOfChannels; i++) {
-            const channelData = decodedData.getChannelData(i);
-            const regionChannelData = regionBuffer.getChannelData(i);
-            
-            // Copy the segment
-            const actualEndSample = Math.min(endSample, channelData.length);
-            const actualLength = actualEndSample - startSample;
-            
-            if (actualLength > 0) {
-                const slice = channelData.subarray(startSample, actualEndSample);
-                regionChannelData.set(slice);
-            }
-        }
-
-        // Convert to WAV and load
-        const blob = this.audioBufferToWav(regionBuffer);
-        const url = URL.createObjectURL(blob);
-        
-        await this.wavesurfer.load(url);
+        const segmentUrl = `/api/audio/${audioFileId}/segment?start=${start}&end=${end}`;
+        await this.wavesurfer.load(segmentUrl);
     }
 
     /**
-     * Конвертация AudioBuffer в WAV Blob
-     * 
-     * @param {AudioBuffer} buffer - AudioBuffer для конвертации
-     * @returns {Blob} WAV Blob
+     * Загрузка данных спектрограммы региона: столбец на пиксель ширины
+     *
+     * @param {string} audioFileId - UUID аудио файла
+     * @param {number} start - Начало региона в секундах
+     * @param {number} end - Конец региона в секундах
      */
-    audioBufferToWav(buffer) {
-        const numberOfChannels = buffer.numberOfChannels;
-        const sampleRate = buffer.sampleRate;
-        const length = buffer.length * numberOfChannels * 2; // 16-bit samples
-        const arrayBuffer = new ArrayBuffer(44 + length);
-        const view = new DataView(arrayBuffer);
-
-        // Helper function to write string
-        const writeString = (offset, string) => {
-            for (let i = 0; i < string.length; i++) {
-                view.setUint8(offset + i, string.charCodeAt(i));
-            }
-        };
+    async loadRegionSpectrogram(audioFileId, start, end) {
+        if (!this.spectrogramCanvas) return;
 
-        // WAV header
-        writeString(0, 'RIFF');
-        view.setUint32(4, 36 + length, true);
-        writeString(8, 'WAVE');
-        writeString(12, 'fmt ');
-        view.setUint32(16, 16, true); // fmt chunk size
-        view.setUint16(20, 1, true); // PCM format
-        view.setUint16(22, numberOfChannels, true);
-        view.setUint32(24, sampleRate, true);
-        view.setUint32(28, sampleRate * numberOfChannels * 2, true); // byte rate
-        view.setUint16(32, numberOfChannels * 2, true); // block align
-        view.setUint16(34, 16, true); // bits per sample
-        writeString(36, 'data');
-        view.setUint32(40, length, true);
-
-        // Write interleaved PCM samples
-        const offset = 44;
-        let index = 0;
-        for (let i = 0; i < buffer.length; i++) {
-            for (let channel = 0; channel < numberOfChannels; channel++) {
-                const sample = Math.max(-1, Math.min(1, buffer.getChannelData(channel)[i]));
-                view.setInt16(offset + index, sample < 0 ? sample * 0x8000 : sample * 0x7FFF, true);
-                index += 2;
-            }
-        }
-
-        return new Blob([arrayBuffer], { type: 'audio/wav' });
+        const width = this.spectrogramContainer.clientWidth || 1024;
+        await this.spectrogramCanvas.load(audioFileId, start, end, width);
     }
 
     /**
@@ -568,8 +511,11 @@ class RegionSpectrogramPlayer {
             this.wavesurfer = null;
         }
 
-        // Очищаем plugin
-        this.spectrogramPlugin = null;
+        // Удаляем спектрограмму
+        if (this.spectrogramCanvas) {
+            this.spectrogramCanvas.destroy();
+            this.spectrogramCanvas = null;
+        }
 
         // Скрываем container
         if (this.container) {
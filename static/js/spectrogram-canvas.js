@@ -0,0 +1,204 @@
+/**
+ * Spectrogram Canvas
+ *
+ * Спектрограмма региона, нарисованная на canvas из сырых данных
+ * (GET /api/audio/{id}/spectrogram/data).
+ *
+ * Функциональность:
+ * - Загрузка матрицы dBFS интервала (uint8 + scale/offset или float16)
+ * - Раскраска палитрой на клиенте через LUT на 256 цветов
+ * - Контраст (нижняя и верхняя граница dB) и частотный диапазон
+ *   меняются локально, без повторных запросов к серверу
+ * - Линейная шкала частот до Nyquist и подписи частот (опционально)
+ */
+
+// Опорные точки палитры viridis (равномерно от 0 до 1)
+const SPECTROGRAM_PALETTE_STOPS = [
+    [68, 1, 84], [72, 40, 120], [62, 74, 137], [49, 104, 142], [38, 130, 142],
+    [31, 158, 137], [53, 183, 121], [109, 205, 89], [180, 222, 44], [253, 231, 37]
+];
+
+class SpectrogramCanvas {
+    /**
+     * @param {HTMLElement} container - Контейнер canvas
+     * @param {Object} options - { height: высота в пикселях, labels: подписи частот }
+     */
+    constructor(container, options = {}) {
+        this.container = container;
+        this.height = options.height || 256;
+        this.labels = options.labels !== false;
+        this.data = null;
+        this.minDb = -90;
+        this.maxDb = 0;
+        this.minFreq = 0;
+        this.maxFreq = null;
+        this.lut = SpectrogramCanvas.buildLut(SPECTROGRAM_PALETTE_STOPS);
+
+        this.canvas = document.createElement('canvas');
+        this.canvas.className = 'spectrogram-canvas';
+        this.canvas.height = this.height;
+        this.container.appendChild(this.canvas);
+    }
+
+    /**
+     * LUT на 256 цветов: линейная интерполяция между опорными точками
+     *
+     * @param {Array<Array<number>>} stops - RGB опорные точки
+     * @returns {Uint8Array} 256 * 3 компонент
+     */
+    static buildLut(stops) {
+        const lut = new Uint8Array(256 * 3);
+        for (let i = 0; i < 256; i++) {
+            const position = (i / 255) * (stops.length - 1);
+            const index = Math.min(Math.floor(position), stops.length - 2);
+            const t = position - index;
+            for (let c = 0; c < 3; c++) {
+                lut[i * 3 + c] = Math.round(stops[index][c] * (1 - t) + stops[index + 1][c] * t);
+            }
+        }
+        return lut;
+    }
+
+    /**
+     * Загрузка матрицы интервала
+     *
+     * @param {string} audioFileId - UUID аудио файла
+     * @param {number} start - Начало интервала в секундах
+     * @param {number} end - Конец интервала в секундах
+     * @param {number} width - Количество столбцов (ширина canvas)
+     */
+    async load(audioFileId, start, end, width) {
+        const params = new URLSearchParams({
+            start_time: start,
+            end_time: end,
+            width: Math.max(1, Math.min(5000, Math.round(width))),
+            format: 'uint8'
+        });
+        const response = await fetch(`/api/audio/${audioFileId}/spectrogram/data?${params.toString()}`);
+        if (!response.ok) {
+            throw new Error(`Не удалось получить данные спектрограммы: ${response.status}`);
+        }
+
+        const header = (name) => response.headers.get(`X-Spectrogram-${name}`);
+        const bins = parseInt(header('Bins'), 10);
+        const columns = parseInt(header('Columns'), 10);
+        const scale = parseFloat(header('Scale'));
+        const offset = parseFloat(header('Offset'));
+        const raw = new Uint8Array(await response.arrayBuffer());
+
+        // Переводим uint8 обратно в dBFS один раз, дальше работаем с float
+        const values = new Float32Array(raw.length);
+        for (let i = 0; i < raw.length; i++) {
+            values[i] = offset + raw[i] * scale;
+        }
+
+        this.data = {
+            bins,
+            columns,
+            values,
+            freqStep: parseFloat(header('Freq-Step')),
+            sampleRate: parseInt(header('Sample-Rate'), 10),
+            startTime: parseFloat(header('Start-Time')),
+            endTime: parseFloat(header('End-Time'))
+        };
+        this.render();
+    }
+
+    /**
+     * Установка контраста
+     *
+     * @param {number} minDb - Значение dBFS, соответствующее началу палитры
+     * @param {number} maxDb - Значение dBFS, соответствующее концу палитры
+     */
+    setContrast(minDb, maxDb) {
+        this.minDb = minDb;
+        this.maxDb = Math.max(maxDb, minDb + 1);
+        this.render();
+    }
+
+    /**
+     * Установка отображаемого частотного диапазона
+     *
+     * @param {number} minFreq - Нижняя частота в Гц
+     * @param {number|null} maxFreq - Верхняя частота в Гц (null - до Nyquist)
+     */
+    setFrequencyRange(minFreq, maxFreq) {
+        this.minFreq = Math.max(0, minFreq);
+        this.maxFreq = maxFreq;
+        this.render();
+    }
+
+    /**
+     * Отрисовка матрицы: столбец данных - пиксель по горизонтали,
+     * строки canvas выбирают ближайший частотный бин
+     */
+    render() {
+        if (!this.data) {
+            return;
+        }
+
+        const { bins, columns, values, freqStep } = this.data;
+        const height = this.height;
+        this.canvas.width = columns;
+        this.canvas.height = height;
+
+        const nyquist = (bins - 1) * freqStep;
+        const maxFreq = Math.min(this.maxFreq || nyquist, nyquist);
+        const minFreq = Math.min(this.minFreq, maxFreq);
+        const firstBin = minFreq / freqStep;
+        const binSpan = (maxFreq - minFreq) / freqStep;
+        const range = this.maxDb - this.minDb;
+
+        const context = this.canvas.getContext('2d');
+        const image = context.createImageData(columns, height);
+        const pixels = image.data;
+
+        for (let y = 0; y < height; y++) {
+            // Верхняя строка canvas - верхняя частота
+            const bin = Math.min(bins - 1, Math.round(firstBin + (1 - (y + 0.5) / height) * binSpan));
+            const row = bin * columns;
+            for (let x = 0; x < columns; x++) {
+                const level = (values[row + x] - this.minDb) / range;
+                const color = Math.max(0, Math.min(255, Math.round(level * 255))) * 3;
+                const pixel = (y * columns + x) * 4;
+                pixels[pixel] = this.lut[color];
+                pixels[pixel + 1] = this.lut[color + 1];
+                pixels[pixel + 2] = this.lut[color + 2];
+                pixels[pixel + 3] = 255;
+            }
+        }
+        context.putImageData(image, 0, 0);
+
+        if (this.labels) {
+            this.drawLabels(context, minFreq, maxFreq);
+        }
+    }
+
+    /**
+     * Подписи частот по левому краю (5 отметок, линейная шкала)
+     */
+    drawLabels(context, minFreq, maxFreq) {
+        const ticks = 5;
+        context.font = '10px monospace';
+        context.textBaseline = 'middle';
+        for (let i = 0; i < ticks; i++) {
+            const freq = minFreq + (maxFreq - minFreq) * (i + 0.5) / ticks;
+            const y = this.height * (1 - (i + 0.5) / ticks);
+            const text = freq >= 1000 ? `${(freq / 1000).toFixed(1)} kHz` : `${Math.round(freq)} Hz`;
+            context.fillStyle = 'rgba(0, 0, 0, 0.7)';
+            context.fillRect(0, y - 7, context.measureText(text).width + 6, 14);
+            context.fillStyle = '#ffffff';
+            context.fillText(text, 3, y);
+        }
+    }
+
+    /**
+     * Удаление canvas
+     */
+    destroy() {
+        this.data = null;
+        this.canvas.remove();
+    }
+}
+
+window.SpectrogramCanvas = SpectrogramCanvas;
@@ -0,0 +1,142 @@
+/**
+ * Spectrogram Tiles
+ *
+ * Спектрограмма основного плеера, собранная из серверных тайлов
+ * (GET /api/audio/{id}/spectrogram/tiles/{zoom}/{index}.png).
+ *
+ * Функциональность:
+ * - Выбор уровня тайлов, ближайшего к текущему масштабу wavesurfer
+ * - Загрузка только видимых тайлов (с запасом в один тайл по краям)
+ * - Синхронизация со скроллом и zoom основного waveform
+ * - Версия файла в URL: тайлы кэшируются браузером как immutable
+ */
+
+class SpectrogramTiles {
+    /**
+     * @param {HTMLElement} container - Контейнер слоя спектрограммы
+     * @param {number} height - Высота тайлов в пикселях
+     */
+    constructor(container, height) {
+        this.container = container;
+        this.height = height;
+        this.info = null;
+        this.tiles = new Map();
+        this.currentZoom = null;
+
+        this.strip = document.createElement('div');
+        this.strip.className = 'spectrogram-tiles-strip';
+        this.container.style.height = `${height}px`;
+        this.container.appendChild(this.strip);
+    }
+
+    /**
+     * Загрузка описания уровней для аудио файла
+     *
+     * @param {string} audioFileId - UUID аудио файла
+     */
+    async load(audioFileId) {
+        this.clear();
+        const response = await fetch(`/api/audio/${audioFileId}/spectrogram/tiles`);
+        if (!response.ok) {
+            throw new Error(`Не удалось получить уровни тайлов: ${response.status}`);
+        }
+        this.info = await response.json();
+    }
+
+    /**
+     * Удаление всех тайлов
+     */
+    clear() {
+        this.tiles.forEach((img) => img.remove());
+        this.tiles.clear();
+        this.currentZoom = null;
+        this.info = null;
+    }
+
+    /**
+     * Самый грубый уровень, тайлы которого не растягиваются больше чем вдвое
+     *
+     * @param {number} pxPerSec - Текущий масштаб waveform
+     */
+    selectZoom(pxPerSec) {
+        const levels = this.info.levels;
+        for (const level of levels) {
+            if (this.info.tile_width / level.seconds_per_tile >= pxPerSec) {
+                return level;
+            }
+        }
+        return levels[levels.length - 1];
+    }
+
+    /**
+     * Обновление видимых тайлов
+     *
+     * @param {number} pxPerSec - Пикселей на секунду в waveform
+     * @param {number} scrollLeft - Прокрутка waveform в пикселях
+     * @param {number} viewportWidth - Видимая ширина в пикселях
+     */
+    update(pxPerSec, scrollLeft, viewportWidth) {
+        if (!this.info || !(pxPerSec > 0)) {
+            return;
+        }
+
+        const level = this.selectZoom(pxPerSec);
+        if (level.zoom !== this.currentZoom) {
+            this.tiles.forEach((img) => img.remove());
+            this.tiles.clear();
+            this.currentZoom = level.zoom;
+        }
+
+        const tilePx = level.seconds_per_tile * pxPerSec;
+        const first = Math.max(0, Math.floor(scrollLeft / tilePx) - 1);
+        const last = Math.min(level.tiles - 1, Math.floor((scrollLeft + viewportWidth) / tilePx) + 1);
+
+        // Тайлы вне видимой области удаляем, чтобы DOM не рос при прокрутке
+        this.tiles.forEach((img, index) => {
+            if (index < first || index > last) {
+                img.remove();
+                this.tiles.delete(index);
+            }
+        });
+
+        for (let index = first; index <= last; index++) {
+            let img = this.tiles.get(index);
+            if (!img) {
+                img = document.createElement('img');
+                img.className = 'spectrogram-tile';
+                img.alt = '';
+                img.draggable = false;
+                img.src = this.tileUrl(level.zoom, index);
+                this.strip.appendChild(img);
+                this.tiles.set(index, img);
+            }
+            const start = index * level.seconds_per_tile;
+            const end = Math.min(start + level.seconds_per_tile, this.info.duration);
+            img.style.left = `${start * pxPerSec}px`;
+            img.style.width = `${(end - start) * pxPerSec}px`;
+        }
+
+        this.strip.style.transform = `translateX(${-scrollLeft}px)`;
+    }
+
+    /**
+     * URL тайла с версией файла
+     */
+    tileUrl(zoom, index) {
+        const url = this.info.url_template
+            .replace('{zoom}', zoom)
+            .replace('{index}', index);
+        const params = new URLSearchParams({ height: this.height, v: this.info.version });
+        return `${url}?${params.toString()}`;
+    }
+
+    /**
+     * Удаление слоя
+     */
+    destroy() {
+        this.clear();
+        this.strip.remove();
+    }
+}
+
+window.SpectrogramTiles = SpectrogramTiles;
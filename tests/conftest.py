@@ -0,0 +1,16 @@
+"""
+Общая настройка тестов.
+
+Тесты подменяют модули и каталоги данных через monkeypatch, поэтому
+отрисовка выполняется в потоке запроса, а не в процессах пула.
+Задачи импорта и отрисовки из рабочей БД при импорте приложения не возобновляются,
+наблюдение inotify за каталогами не запускается, отпечатки содержимого
+в фоне не дозаполняются.
+"""
+import os
+
+os.environ.setdefault('RENDER_POOL_PROCESSES', '0')
+os.environ.setdefault('IMPORT_JOBS_RESUME', 'false')
+os.environ.setdefault('RENDER_JOBS_RESUME', 'false')
+os.environ.setdefault('LIVE_WATCH_ENABLED', 'false')
+os.environ.setdefault('FINGERPRINT_BACKFILL', 'false')
@@ -0,0 +1,42 @@
+Feature: Быстрое чтение метаданных аудио
+  Как пользователь, импортирующий большие коллекции записей
+  Я хочу, чтобы длительность читалась из заголовка без декодирования
+  Чтобы импорт и отрисовка не разбирали файлы повторно
+
+  Background:
+    Given кэш метаданных очищен
+
+  Scenario: Длительность WAV из числа фреймов заголовка
+    Given WAV файл длительностью 2.5 секунд с частотой 22050 Гц
+    When я извлекаю метаданные без librosa
+    Then длительность должна быть 2.5 секунд
+    And частота дискретизации должна быть 22050 Гц
+
+  Scenario: Длительность MP3 из заголовка Xing и тега LAME
+    Given MP3 файл длительностью 12 секунд с частотой 44100 Гц
+    When я извлекаю метаданные без декодирования MP3
+    Then длительность должна быть 12 секунд
+    And частота дискретизации должна быть 44100 Гц
+
+  Scenario: MP3 без заголовка Xing с тегом ID3v2 считается по фреймам
+    Given MP3 файл длительностью 12 секунд с частотой 44100 Гц без заголовка Xing и с тегом ID3v2
+    When я извлекаю метаданные без декодирования MP3
+    Then длительность должна отличаться от 12 секунд не больше чем на 0.1
+    And частота дискретизации должна быть 44100 Гц
+
+  Scenario: Повторное извлечение берётся из кэша до изменения файла
+    Given WAV файл длительностью 1 секунд с частотой 16000 Гц
+    When я извлекаю метаданные 3 раза
+    Then файл должен быть разобран 1 раз
+    When файл перезаписывается длительностью 2 секунды
+    And я извлекаю метаданные 1 раз
+    Then файл должен быть разобран 2 раза
+    And длительность должна быть 2 секунд
+
+  Scenario: Спектрограмма проверяет интервал по длительности из БД
+    Given Flask приложение запущено
+    And в БД существует AudioFile длительностью 1.0 для файла на 2 секунды
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?start_time=1.5&width=32&height=16"
+    Then ответ должен иметь статус 400
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?start_time=0.5&width=32&height=16"
+    Then ответ должен иметь статус 200
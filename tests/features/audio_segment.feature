@@ -0,0 +1,61 @@
+Feature: Получение временного интервала аудио-файла
+  Как пользователь API
+  Я хочу получать WAV ровно нужного интервала
+  Чтобы воспроизведение региона начиналось сразу, независимо от длины файла
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует стерео AudioFile длительностью 5 секунд с частотой 44100
+
+  Scenario: Интервал отдаётся как корректный WAV
+    When я отправляю GET запрос на "/api/audio/{id}/segment?start=1&end=3"
+    Then ответ должен иметь статус 200
+    And заголовок "Content-Type" должен содержать "audio/wav"
+    And ответ должен быть WAV с 2 каналами и частотой 44100
+    And WAV должен содержать 88200 фреймов
+    And сэмплы WAV должны совпадать с исходным файлом с 1 секунды
+    And заголовок "Content-Length" должен совпадать с размером тела
+
+  Scenario: Сведение в моно
+    When я отправляю GET запрос на "/api/audio/{id}/segment?start=0&end=1&channels=1"
+    Then ответ должен иметь статус 200
+    And ответ должен быть WAV с 1 каналами и частотой 44100
+    And сэмплы WAV должны совпадать с моно миксом исходного файла
+
+  Scenario: Понижение частоты дискретизации
+    When я отправляю GET запрос на "/api/audio/{id}/segment?start=0.5&end=2.5&sr=16000"
+    Then ответ должен иметь статус 200
+    And ответ должен быть WAV с 2 каналами и частотой 16000
+    And WAV должен содержать 32000 фреймов
+    And основная частота WAV должна быть 440 Гц
+
+  Scenario: Интервал в формате FLAC
+    When я отправляю GET запрос на "/api/audio/{id}/segment?start=4&format=flac"
+    Then ответ должен иметь статус 200
+    And заголовок "Content-Type" должен содержать "audio/flac"
+    And ответ должен быть FLAC с 44100 фреймами
+
+  Scenario: Повторный запрос интервала получает 304
+    When я отправляю GET запрос на "/api/audio/{id}/segment?start=1&end=2"
+    And я повторяю запрос с заголовком If-None-Match из ответа
+    Then ответ должен иметь статус 304
+
+  Scenario Outline: Ошибки валидации параметров
+    When я отправляю GET запрос на "<endpoint>"
+    Then ответ должен иметь статус 400
+    And ответ должен содержать JSON с полем "error"
+
+    Examples:
+      | endpoint                                         |
+      | /api/audio/{id}/segment?start=-1                 |
+      | /api/audio/{id}/segment?start=3&end=2            |
+      | /api/audio/{id}/segment?start=10                 |
+      | /api/audio/{id}/segment?sr=96000                 |
+      | /api/audio/{id}/segment?channels=3               |
+      | /api/audio/{id}/segment?format=mp3               |
+      | /api/audio/not-a-uuid/segment                    |
+
+  Scenario: Несуществующий AudioFile
+    When я отправляю GET запрос на "/api/audio/00000000-0000-0000-0000-000000000000/segment"
+    Then ответ должен иметь статус 404
@@ -0,0 +1,38 @@
+Feature: Массовый импорт каталога
+  Как пользователь, импортирующий большие коллекции записей
+  Я хочу, чтобы импорт читал метаданные параллельно и вставлял строки пачками
+  Чтобы каталог из десятков тысяч файлов импортировался за минуты
+
+  Background:
+    Given Flask приложение запущено
+
+  Scenario: Уже добавленные файлы определяются одним запросом
+    Given каталог с 6 WAV файлами
+    And 2 файла каталога уже импортированы
+    When я импортирую каталог с пачками по 10 строк
+    Then должно быть импортировано 4 файла
+    And пропущено 2 файла
+    And к таблице audio_files должен быть выполнен 1 SELECT
+
+  Scenario: Строки вставляются пачками
+    Given каталог с 5 WAV файлами
+    When я импортирую каталог с пачками по 2 строк
+    Then должно быть импортировано 5 файла
+    And должно быть выполнено 3 INSERT в audio_files
+    And в БД должно быть 5 AudioFile со статусом loaded
+
+  Scenario: Метаданные извлекаются в пуле процессов
+    Given каталог с 4 WAV файлами
+    And в каталоге есть повреждённый файл "broken.wav"
+    When я импортирую каталог в 2 процессах
+    Then должно быть импортировано 4 файла
+    And ошибка импорта указывает файл "broken.wav"
+    And длительности импортированных файлов совпадают с исходными
+
+  Scenario: API возвращает ошибки по отдельным файлам
+    Given каталог с 2 WAV файлами
+    And в каталоге есть повреждённый файл "broken.wav"
+    When я отправляю POST запрос на импорт каталога
+    Then ответ должен иметь статус 200
+    And ответ должен содержать imported_count равный 2
+    And ответ должен содержать ошибку для файла "broken.wav"
@@ -0,0 +1,69 @@
+Feature: Поиск копий записей по отпечатку содержимого
+  Как пользователь, у которого одни и те же записи лежат на разных дисках
+  Я хочу, чтобы импорт узнавал копии по содержимому, а не по пути
+  Чтобы аннотации записи были общими для всех её копий
+
+  Background:
+    Given Flask приложение запущено
+
+  Scenario: Копии в импортируемом каталоге не создают новых записей
+    Given каталог с записями "a/take.wav", "b/take.wav" и "c/other.wav", где "b/take.wav" копия "a/take.wav"
+    When я импортирую каталог рекурсивно
+    Then ответ должен иметь статус 200
+    And должно быть импортировано 2 записи
+    And "b/take.wav" должен быть копией записи "a/take.wav"
+    And в БД должно быть 3 отпечатка
+    When я импортирую каталог рекурсивно
+    Then должно быть импортировано 0 записи
+    And копий в ответе нет
+
+  Scenario: Копия на другом диске получает аннотации записи
+    Given каталог с записями "a/take.wav", "b/take.wav" и "c/other.wav", где "b/take.wav" копия "a/take.wav"
+    And импортирован только каталог "a"
+    And у записи "a/take.wav" есть аннотация
+    When я импортирую каталог "b"
+    Then "take.wav" должен быть копией записи "a/take.wav"
+    And аннотации копии "b/take.wav" совпадают с аннотациями записи
+
+  Scenario: Копия файла, добавленного через /add, узнаётся при импорте
+    Given каталог с записями "a/take.wav", "b/take.wav" и "c/other.wav", где "b/take.wav" копия "a/take.wav"
+    When я добавляю файл "a/take.wav" через POST "/api/audio/add"
+    And я импортирую каталог "b"
+    Then "take.wav" должен быть копией записи "a/take.wav"
+
+  Scenario: Записи без отпечатка дозаполняются
+    Given каталог с записями "a/take.wav", "b/take.wav" и "c/other.wav", где "b/take.wav" копия "a/take.wav"
+    And в БД есть запись "a/take.wav" без отпечатка
+    When отпечатки записей без них дозаполнены
+    And я импортирую каталог "b"
+    Then "take.wav" должен быть копией записи "a/take.wav"
+
+  Scenario: Быстрый отпечаток не читает файл целиком
+    Given отпечатки считаются блоками по 1024 байт
+    When я вычисляю быстрый отпечаток записи длиной 60 секунд
+    Then прочитано не больше 3072 байт
+
+  Scenario: Полный хэш отделяет копию с другим содержимым
+    Given отпечатки считаются блоками по 1024 байт
+    And каталог с записью "a/take.wav" и её изменённой в середине копией "b/take.wav"
+    When я импортирую каталог рекурсивно
+    Then "b/take.wav" должен быть копией записи "a/take.wav"
+    When в фоне вычислены полные хэши
+    Then в БД должно быть 2 AudioFile со статусом "loaded"
+    And "b/take.wav" должен быть отдельной записью
+
+  Scenario: Задача импорта учитывает копии в skipped
+    Given каталог с записями "a/take.wav", "b/take.wav" и "c/other.wav", где "b/take.wav" копия "a/take.wav"
+    When я выполняю задачу импорта каталога
+    Then задача импорта должна иметь imported 2 и skipped 1
+    And в БД должно быть 2 AudioFile со статусом "loaded"
+    And в БД должно быть 0 AudioFile со статусом "pending"
+
+  Scenario: Наблюдаемый каталог переходит на копию исчезнувшей записи
+    Given каталог с записями "a/take.wav", "b/take.wav" и "c/other.wav", где "b/take.wav" копия "a/take.wav"
+    And каталог наблюдается и просканирован
+    Then в БД должно быть 2 AudioFile со статусом "loaded"
+    And итог сканирования должен содержать copies 1
+    When файл "a/take.wav" удалён и каталог пересканирован
+    Then в БД должно быть 2 AudioFile со статусом "loaded"
+    And запись "a/take.wav" должна указывать на "b/take.wav"
@@ -0,0 +1,73 @@
+Feature: HTTP валидаторы кэша для потоковой загрузки и изображений
+  Как пользователь браузера
+  Я хочу чтобы аудио и изображения не скачивались повторно
+  Чтобы повторные визиты не нагружали сервер
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile с тестовым сигналом
+
+  Scenario: Stream отдаёт строгий ETag и Last-Modified
+    When я отправляю GET запрос на "/api/audio/{id}/stream"
+    Then ответ должен иметь статус 200
+    And ответ должен иметь строгий ETag
+    And ответ должен иметь заголовок "Last-Modified"
+    And заголовок "Cache-Control" должен быть равен "no-cache"
+
+  Scenario Outline: Повторный запрос с If-None-Match получает 304
+    When я отправляю GET запрос на "<endpoint>"
+    And я повторяю запрос с заголовком If-None-Match из ответа
+    Then ответ должен иметь статус 304
+    And тело ответа должно быть пустым
+
+    Examples:
+      | endpoint                                                     |
+      | /api/audio/{id}/stream                                       |
+      | /api/audio/{id}/waveform?width=300&height=80                 |
+      | /api/audio/{id}/spectrogram?start_time=0&end_time=1&width=64 |
+      | /api/audio/{id}/peaks?format=json                            |
+
+  Scenario: Повторный запрос с If-Modified-Since получает 304
+    When я отправляю GET запрос на "/api/audio/{id}/stream"
+    And я повторяю запрос с заголовком If-Modified-Since из ответа
+    Then ответ должен иметь статус 304
+
+  Scenario: 304 для изображения не требует декодирования аудио
+    When я отправляю GET запрос на "/api/audio/{id}/waveform?width=300&height=80"
+    And исходный аудио-файл становится нечитаемым без изменения mtime
+    And я повторяю запрос с заголовком If-None-Match из ответа
+    Then ответ должен иметь статус 304
+
+  Scenario: Разные параметры изображения дают разные ETag
+    When я отправляю GET запросы на waveform шириной 300 и 301
+    Then ETag ответов должны различаться
+
+  Scenario: Изменение файла меняет ETag
+    When я отправляю GET запрос на "/api/audio/{id}/stream"
+    And исходный файл перезаписывается другим сигналом
+    And я повторяю запрос с заголовком If-None-Match из ответа
+    Then ответ должен иметь статус 200
+
+  Scenario: Range с совпадающим If-Range отдаёт 206
+    When я отправляю GET запрос на "/api/audio/{id}/stream"
+    And я запрашиваю диапазон "bytes=0-99" с If-Range из ETag ответа
+    Then ответ должен иметь статус 206
+    And ответ должен содержать ровно 100 байт данных
+
+  Scenario: Range с устаревшим If-Range отдаёт файл целиком
+    When я отправляю GET запрос на "/api/audio/{id}/stream"
+    And я запрашиваю диапазон "bytes=0-99" с If-Range "\"stale-etag\""
+    Then ответ должен иметь статус 200
+    And ответ должен содержать весь файл
+
+  Scenario: Версионированный URL помечается immutable
+    When я получаю версию AudioFile через API
+    And я отправляю GET запрос на "/api/audio/{id}/waveform?width=300&v={version}"
+    Then ответ должен иметь статус 200
+    And заголовок "Cache-Control" должен содержать "immutable"
+
+  Scenario: Устаревшая версия в URL не помечается immutable
+    When я отправляю GET запрос на "/api/audio/{id}/waveform?width=300&v=outdated"
+    Then ответ должен иметь статус 200
+    And заголовок "Cache-Control" должен быть равен "no-cache"
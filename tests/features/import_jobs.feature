@@ -0,0 +1,56 @@
+Feature: Фоновые задачи импорта с возобновлением
+  Как пользователь, импортирующий большие коллекции записей
+  Я хочу, чтобы импорт выполнялся в фоне и продолжался после перезапуска сервера
+  Чтобы прерванный импорт не начинался заново
+
+  Background:
+    Given Flask приложение запущено
+    And каталог импорта с 5 записями
+    And задачи импорта обрабатывают пачки по 2 файла
+
+  Scenario: Задача импортирует каталог в фоне
+    When я отправляю POST запрос на создание задачи импорта
+    Then ответ должен иметь статус 202
+    And заголовок Location должен указывать на задачу импорта
+    When задача импорта завершилась
+    And я запрашиваю состояние задачи импорта
+    Then задача импорта должна иметь статус "done"
+    And задача импорта должна иметь imported 5, skipped 0 и failed 0
+    And курсор задачи должен быть "take_04.wav"
+    And в БД должно быть 5 AudioFile со статусом "loaded"
+
+  Scenario: Повреждённый файл получает статус ERROR
+    Given в каталоге импорта есть повреждённый файл "take_02b.wav"
+    When я отправляю POST запрос на создание задачи импорта
+    And задача импорта завершилась
+    And я запрашиваю состояние задачи импорта
+    Then задача импорта должна иметь imported 5, skipped 0 и failed 1
+    And ошибки задачи должны указывать файл "take_02b.wav"
+    And в БД должно быть 1 AudioFile со статусом "error"
+
+  Scenario: Прерванная задача продолжается с курсора
+    Given задача импорта прервана остановкой сервера во второй пачке
+    Then задача импорта в БД должна иметь статус "running"
+    And в БД должно быть 2 AudioFile со статусом "loaded"
+    And в БД должно быть 2 AudioFile со статусом "pending"
+    When сервер возобновляет незавершённые задачи импорта
+    Then задача импорта в БД должна иметь статус "done"
+    And в БД должно быть 5 AudioFile со статусом "loaded"
+    And метаданные файлов первой пачки повторно не читались
+
+  Scenario: Отмена выполняемой задачи после текущей пачки
+    Given задача импорта отменяется во время первой пачки
+    Then задача импорта в БД должна иметь статус "cancelled"
+    And в БД должно быть 2 AudioFile со статусом "loaded"
+
+  Scenario: Отмена завершённой задачи отклоняется
+    When я отправляю POST запрос на создание задачи импорта
+    And задача импорта завершилась
+    And я отправляю POST запрос на отмену задачи импорта
+    Then ответ должен иметь статус 409
+
+  Scenario: Неизвестная задача
+    When я запрашиваю задачу импорта "00000000-0000-0000-0000-000000000000"
+    Then ответ должен иметь статус 404
+    When я запрашиваю задачу импорта "not-a-uuid"
+    Then ответ должен иметь статус 400
@@ -0,0 +1,50 @@
+Feature: Кэш декодированного PCM для сжатых форматов
+  Как пользователь API
+  Я хочу чтобы MP3 и OGG файлы декодировались один раз
+  Чтобы спектрограммы и интервалы середины длинных записей открывались быстро
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile "signal.mp3"
+
+  Scenario: Сжатый файл декодируется один раз для разных запросов
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?start_time=0.5&end_time=1.5&width=200&height=100"
+    And я отправляю GET запрос на "/api/audio/{id}/segment?start=1&end=1.5"
+    Then метрики PCM кэша должны показывать 1 промахов и 2 попаданий
+
+  Scenario: Интервал MP3 отдаётся как WAV
+    When я отправляю GET запрос на "/api/audio/{id}/segment?start=0.5&end=1"
+    Then ответ должен содержать WAV длиной 11025 фреймов
+
+  Scenario: Произвольное чтение совпадает с полным декодированием
+    When я читаю фреймы с 30000 по 31000 через AudioReader
+    Then прочитанные данные должны совпадать с полным декодированием файла
+
+  Scenario: Изменение исходного файла даёт новую запись кэша
+    When я отправляю GET запрос на "/api/audio/{id}/segment?start=0&end=0.5"
+    And исходный файл перезаписывается другим сигналом
+    And я отправляю GET запрос на "/api/audio/{id}/segment?start=0&end=0.5"
+    Then метрики PCM кэша должны показывать 2 промахов и 2 попаданий
+
+  Scenario: WAV файлы читаются без кэша PCM
+    Given в БД существует AudioFile "signal.wav"
+    When я отправляю GET запрос на "/api/audio/{id}/waveform?width=300"
+    Then метрики PCM кэша должны показывать 0 промахов и 0 попаданий
+
+  Scenario: Вытеснение LRU при превышении бюджета
+    Given кэш PCM с бюджетом на одну запись
+    When я декодирую файлы "first.ogg" и "second.ogg"
+    Then запись "first.ogg" должна быть вытеснена
+    And счётчик вытеснений PCM кэша должен быть равен 1
+
+  Scenario: Ошибка декодирования не оставляет временный файл
+    Given кэш PCM с бюджетом на одну запись
+    And декодирование PCM завершается ошибкой
+    When я декодирую файл с ошибкой
+    Then в кэше PCM не должно остаться файлов
+
+  Scenario: Удаление AudioFile удаляет запись кэша PCM
+    When я отправляю GET запрос на "/api/audio/{id}/segment?start=0&end=0.5"
+    And я отправляю DELETE запрос на "/api/audio/{id}"
+    Then в кэше PCM не должно остаться записей файла
@@ -0,0 +1,48 @@
+Feature: API peaks для отрисовки waveform без декодирования в браузере
+  Как фронтенд
+  Я хочу получать min/max пары интервала аудио-файла
+  Чтобы WaveSurfer рисовал waveform сразу, а аудио воспроизводилось через Range запросы
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And добавлен стерео аудио-файл длительностью 10 секунд
+
+  Scenario: Получение Float32 peaks по умолчанию
+    When я отправляю GET запрос на "/api/audio/{id}/peaks?samples_per_pixel=1000"
+    Then ответ должен иметь статус 200
+    And ответ должен содержать 221 пар min/max в формате f32
+    And заголовок "X-Audio-Duration" должен быть равен длительности файла
+
+  Scenario: Получение Int16 peaks интервала
+    When я отправляю GET запрос на "/api/audio/{id}/peaks?samples_per_pixel=2205&start=2&end=4&format=i16"
+    Then ответ должен иметь статус 200
+    And ответ должен содержать 20 пар min/max в формате i16
+
+  Scenario: Получение peaks в JSON для отладки
+    When я отправляю GET запрос на "/api/audio/{id}/peaks?samples_per_pixel=4410&format=json"
+    Then ответ должен иметь статус 200
+    And JSON ответ должен содержать 50 пар min/max
+    And каждый min должен быть не больше соответствующего max
+
+  Scenario: Peaks отдельного канала отличаются от другого канала
+    When я запрашиваю JSON peaks каналов 0 и 1
+    Then амплитуда канала 0 должна быть больше амплитуды канала 1
+
+  Scenario: Ошибка при неверном формате
+    When я отправляю GET запрос на "/api/audio/{id}/peaks?format=xml"
+    Then ответ должен иметь статус 400
+
+  Scenario: Ошибка при несуществующем канале
+    When я отправляю GET запрос на "/api/audio/{id}/peaks?channel=5"
+    Then ответ должен иметь статус 400
+
+  Scenario: Ошибка для несуществующего AudioFile
+    When я отправляю GET запрос на "/api/audio/00000000-0000-0000-0000-000000000000/peaks"
+    Then ответ должен иметь статус 404
+
+  Scenario: Плеер передаёт peaks и длительность в WaveSurfer
+    Given файл audio-player.js загружен
+    Then плеер должен запрашивать "/peaks" перед загрузкой аудио
+    And плеер должен вызывать wavesurfer.load с peaks и длительностью
+    And WaveSurfer должен воспроизводить через встроенный HTML5 audio без опции backend
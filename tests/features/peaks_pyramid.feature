@@ -0,0 +1,47 @@
+Feature: Многоуровневая пирамида peaks для аудио-файла
+  Как пользователь API
+  Я хочу чтобы waveform строился по заранее посчитанной пирамиде peaks
+  Чтобы запросы waveform стоили O(пикселей), а не O(сэмплов)
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And существует тестовый аудио-файл длительностью 30 секунд
+
+  Scenario: Пирамида строится при добавлении файла
+    When я добавляю файл через POST "/api/audio/add"
+    Then ответ должен иметь статус 201
+    And для AudioFile должна существовать пирамида peaks
+    And пирамида должна содержать уровни 256, 1024, 4096, 16384 сэмплов на бин
+
+  Scenario: Огибающая из пирамиды совпадает с огибающей по файлу
+    When я добавляю файл через POST "/api/audio/add"
+    And я читаю огибающую на 200 бинов из пирамиды
+    Then огибающая из пирамиды должна совпадать с огибающей по файлу
+
+  Scenario: Моно огибающая из пирамиды совпадает с моно огибающей по файлу
+    When я добавляю файл через POST "/api/audio/add"
+    And я читаю моно огибающую на 200 бинов из пирамиды
+    Then моно огибающая из пирамиды должна совпадать с моно огибающей по файлу
+
+  Scenario: Пирамида становится неактуальной при изменении файла
+    When я добавляю файл через POST "/api/audio/add"
+    And исходный файл перезаписывается
+    Then пирамида peaks не должна загружаться
+
+  Scenario: Waveform интервала строится по пирамиде
+    When я добавляю файл через POST "/api/audio/add"
+    And я отправляю GET запрос на "/api/audio/{id}/waveform?width=600&start_time=5&end_time=25"
+    Then ответ должен иметь статус 200
+    And ответ должен содержать PNG изображение
+
+  Scenario: Ошибка при некорректном интервале waveform
+    When я добавляю файл через POST "/api/audio/add"
+    And я отправляю GET запрос на "/api/audio/{id}/waveform?start_time=10&end_time=5"
+    Then ответ должен иметь статус 400
+
+  Scenario: Пирамида удаляется вместе с AudioFile
+    When я добавляю файл через POST "/api/audio/add"
+    And я отправляю DELETE запрос на "/api/audio/{id}"
+    Then ответ должен иметь статус 200
+    And для AudioFile не должна существовать пирамида peaks
@@ -0,0 +1,78 @@
+Feature: Proxy для воспроизведения больших несжатых записей
+  Как аннотатор
+  Я хочу проигрывать сжатую копию многоканальной записи
+  Чтобы воспроизведение не останавливалось при загрузке гигабайтных WAV по сети
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And существует 4-канальный WAV на 96000 Гц длительностью 4 секунды со щелчком на 1.5 секунде
+
+  Scenario: Proxy строится в фоне при добавлении большого файла
+    Given порог размера для proxy равен 1 байту
+    When я добавляю файл через POST "/api/audio/add"
+    And построение proxy завершено
+    Then GET "/api/audio/{id}/proxy" должен вернуть статус "ready"
+    And proxy должен быть моно с частотой 48000
+
+  Scenario: Маленький файл не получает proxy
+    Given порог размера для proxy равен 1000000000 байт
+    When я добавляю файл через POST "/api/audio/add"
+    Then GET "/api/audio/{id}/proxy" должен вернуть 404
+
+  Scenario: Proxy выровнен по времени с исходным файлом
+    Given файл добавлен и для него построен proxy в формате "opus"
+    Then длительность proxy должна совпадать с исходной
+    And щелчок в proxy должен быть на 1.5 секунде с точностью 5 мс
+
+  Scenario Outline: Stream отдаёт proxy по запросу quality=proxy
+    Given файл добавлен и для него построен proxy в формате "<format>"
+    When я отправляю GET запрос на "/api/audio/{id}/stream?quality=proxy"
+    Then ответ должен иметь статус 200
+    And заголовок "X-Playback-Quality" должен быть равен "proxy"
+    And заголовок "Content-Type" должен содержать "<mimetype>"
+    And тело ответа должно быть меньше исходного файла
+
+    Examples:
+      | format | mimetype   |
+      | opus   | audio/ogg  |
+      | vorbis | audio/ogg  |
+      | flac   | audio/flac |
+
+  Scenario: Без готового proxy stream отдаёт исходный файл
+    Given порог размера для proxy равен 1000000000 байт
+    When я добавляю файл через POST "/api/audio/add"
+    And я отправляю GET запрос на "/api/audio/{id}/stream?quality=proxy"
+    Then ответ должен иметь статус 200
+    And заголовок "X-Playback-Quality" должен быть равен "original"
+    And заголовок "Content-Type" должен содержать "wav"
+
+  Scenario: Устаревший proxy не используется после изменения файла
+    Given файл добавлен и для него построен proxy в формате "flac"
+    When исходный файл перезаписывается
+    And я отправляю GET запрос на "/api/audio/{id}/stream?quality=proxy"
+    Then заголовок "X-Playback-Quality" должен быть равен "original"
+
+  Scenario: Ручной запуск построения proxy
+    Given порог размера для proxy равен 1000000000 байт
+    When я добавляю файл через POST "/api/audio/add"
+    And я отправляю POST запрос на "/api/audio/{id}/proxy" с форматом "vorbis"
+    Then ответ должен иметь статус 202
+    When построение proxy завершено
+    Then GET "/api/audio/{id}/proxy" должен вернуть статус "ready"
+
+  Scenario: Неверное значение quality
+    Given файл добавлен и для него построен proxy в формате "flac"
+    When я отправляю GET запрос на "/api/audio/{id}/stream?quality=best"
+    Then ответ должен иметь статус 400
+
+  Scenario: Удаление AudioFile удаляет proxy
+    Given файл добавлен и для него построен proxy в формате "flac"
+    When я отправляю DELETE запрос на "/api/audio/{id}"
+    Then файл proxy должен быть удалён
+    And запись PlaybackProxy должна быть удалена
+
+  Scenario: Ошибка кодирования не оставляет временный файл
+    Given кодирование proxy завершается ошибкой
+    When я перекодирую файл в proxy с ошибкой
+    Then рядом с proxy не должно остаться временных файлов
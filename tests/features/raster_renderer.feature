@@ -0,0 +1,44 @@
+Feature: Растровый рендерер waveform и спектрограмм без matplotlib
+  Как пользователь API
+  Я хочу получать PNG изображения точно запрошенного размера
+  Чтобы изображения генерировались быстро без построения фигур matplotlib
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile с тестовым сигналом
+
+  Scenario: Waveform имеет точно запрошенный размер
+    When я отправляю GET запрос на "/api/audio/{id}/waveform?width=640&height=160"
+    Then ответ должен иметь статус 200
+    And PNG изображение должно иметь размер 640x160
+
+  Scenario: Waveform рисуется цветом из параметра
+    When я отправляю GET запрос на "/api/audio/{id}/waveform?width=300&height=100&color=FF0000"
+    Then ответ должен иметь статус 200
+    And изображение должно содержать пиксели цвета "FF0000"
+
+  Scenario: Спектрограмма имеет точно запрошенный размер
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?start_time=0&end_time=2&width=333&height=111"
+    Then ответ должен иметь статус 200
+    And PNG изображение должно иметь размер 333x111
+
+  Scenario: Рендерер matplotlib остаётся доступным
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?end_time=1&renderer=matplotlib"
+    Then ответ должен иметь статус 200
+
+  Scenario: Ошибка при неизвестном рендерере
+    When я отправляю GET запрос на "/api/audio/{id}/waveform?renderer=svg"
+    Then ответ должен иметь статус 400
+
+  Scenario: Ошибка при неизвестной палитре
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?end_time=1&color_map=unknown_map"
+    Then ответ должен иметь статус 400
+
+  Scenario: Палитра спектрограммы - предвычисленная LUT на 256 цветов
+    When я получаю LUT палитры "viridis" дважды
+    Then LUT должна иметь 256 RGBA записей
+    And повторный запрос должен вернуть тот же объект LUT
+
+  Scenario: Модули генерации не импортируют matplotlib при загрузке
+    Then модули waveform.py и spectrogram.py не должны импортировать matplotlib на уровне модуля
@@ -0,0 +1,49 @@
+Feature: Дисковый кэш отрисованных waveform и спектрограмм
+  Как пользователь API
+  Я хочу чтобы повторные запросы одинаковых изображений не пересчитывались
+  Чтобы зум и перезагрузка страницы не нагружали сервер
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile с тестовым сигналом
+
+  Scenario: Повторный запрос waveform обслуживается из кэша
+    When я дважды отправляю GET запрос на "/api/audio/{id}/waveform?width=400&height=100"
+    Then оба ответа должны иметь статус 200 и одинаковое содержимое
+    And метрики кэша должны показывать 1 попаданий и 1 промахов
+
+  Scenario: Повторный запрос спектрограммы обслуживается из кэша
+    When я дважды отправляю GET запрос на "/api/audio/{id}/spectrogram?start_time=0&end_time=1&width=200&height=100"
+    Then оба ответа должны иметь статус 200 и одинаковое содержимое
+    And метрики кэша должны показывать 1 попаданий и 1 промахов
+
+  Scenario: Разные параметры дают разные записи кэша
+    When я отправляю GET запросы на waveform шириной 300 и 301
+    Then метрики кэша должны показывать 0 попаданий и 2 промахов
+
+  Scenario: Изменение исходного файла делает запись кэша недействительной
+    When я отправляю GET запрос на "/api/audio/{id}/waveform?width=400"
+    And исходный файл перезаписывается другим сигналом
+    And я отправляю GET запрос на "/api/audio/{id}/waveform?width=400"
+    Then метрики кэша должны показывать 0 попаданий и 2 промахов
+
+  Scenario: Вытеснение LRU при превышении бюджета
+    Given кэш с бюджетом 250 байт
+    When я сохраняю записи "a", "b" по 100 байт
+    And я читаю запись "a"
+    And я сохраняю запись "c" размером 100 байт
+    Then запись "b" должна быть вытеснена
+    And записи "a" и "c" должны остаться в кэше
+    And счётчик вытеснений должен быть равен 1
+
+  Scenario: Индекс кэша восстанавливается после перезапуска
+    Given кэш с бюджетом 1000 байт
+    When я сохраняю записи "a", "b" по 100 байт
+    And кэш создаётся заново для того же каталога
+    Then записи "a" и "b" должны остаться в кэше
+
+  Scenario: Удаление AudioFile удаляет его записи кэша
+    When я отправляю GET запросы на waveform шириной 300 и 301
+    And я отправляю DELETE запрос на "/api/audio/{id}"
+    Then в кэше отрисовок не должно остаться записей файла
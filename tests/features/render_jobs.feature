@@ -0,0 +1,69 @@
+Feature: Фоновые задачи отрисовки
+  Как пользователь, готовящий постер длинной записи
+  Я хочу ставить большую отрисовку в очередь и следить за прогрессом
+  Чтобы не упираться в таймаут HTTP запроса
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile длительностью 60 секунд
+
+  Scenario: Задача спектрограммы выполняется и скачивается
+    When я создаю задачу "spectrogram" с параметрами {"width": 3000, "height": 200, "scale": "mel"}
+    Then ответ должен иметь статус 202
+    And ответ должен содержать задачу в статусе "pending" с заголовком Location
+    When задача завершается
+    And я запрашиваю состояние задачи
+    Then задача должна быть в статусе "done" с прогрессом 100
+    When я скачиваю результат задачи
+    Then ответ должен иметь статус 200
+    And результат должен быть PNG размером 3000x200
+    And результат должен совпадать с синхронной отрисовкой
+
+  Scenario: Задача waveform выполняется
+    When я создаю задачу "waveform" с параметрами {"width": 8000, "height": 300, "color": "#ff0000"}
+    And задача завершается
+    And я скачиваю результат задачи
+    Then ответ должен иметь статус 200
+    And результат должен быть PNG размером 8000x300
+
+  Scenario: Расчёт сообщает прогресс по блокам
+    When я отрисовываю "spectrogram" с записью прогресса
+    Then прогресс должен расти от блока к блоку и закончиться на 1.0
+    When я отрисовываю "waveform" с записью прогресса
+    Then прогресс должен расти от блока к блоку и закончиться на 1.0
+
+  Scenario: Незавершённую задачу нельзя скачать
+    Given в БД существует задача в статусе "running" с прогрессом 42
+    When я скачиваю результат задачи
+    Then ответ должен иметь статус 409
+    And ответ должен содержать прогресс 42
+
+  Scenario: Прерванная перезапуском задача выполняется заново
+    Given в БД существует задача в статусе "running" с прогрессом 42
+    When сервер возобновляет прерванные задачи отрисовки
+    And задача завершается
+    And я запрашиваю состояние задачи
+    Then задача должна быть в статусе "done" с прогрессом 100
+
+  Scenario: Ошибка отрисовки сохраняется в задаче
+    When я создаю задачу "spectrogram" с параметрами {"color_map": "no-such-map"}
+    And задача завершается
+    And я запрашиваю состояние задачи
+    Then задача должна быть в статусе "error" с сообщением об ошибке
+
+  Scenario Outline: Неверные параметры задачи
+    When я создаю задачу "<kind>" с параметрами <params>
+    Then ответ должен иметь статус 400
+
+    Examples:
+      | kind        | params                  |
+      | poster      | {}                      |
+      | spectrogram | {"width": 100000}       |
+      | spectrogram | {"scale": "bark"}       |
+      | waveform    | {"color": "zzz"}        |
+      | waveform    | {"start_time": "abc"}   |
+
+  Scenario: Неизвестная задача
+    When я запрашиваю состояние задачи "00000000-0000-0000-0000-000000000000"
+    Then ответ должен иметь статус 404
@@ -0,0 +1,44 @@
+Feature: Пул процессов отрисовки
+  Как оператор сервера
+  Я хочу выполнять отрисовку в ограниченном пуле процессов
+  Чтобы тяжёлые запросы не блокировали сервер и перегрузка отклонялась быстро
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile с тоном 440 Гц
+
+  Scenario: Спектрограмма в процессе пула совпадает с отрисовкой в потоке
+    Given пул отрисовки из 1 процесса
+    When я рисую спектрограмму файла в пуле и в потоке запроса
+    Then PNG должны совпадать
+    And счётчик завершённых задач пула должен быть 1
+
+  Scenario: Сжатый файл декодирует и учитывает только основной процесс
+    Given пул отрисовки из 1 процесса
+    And в БД существует сжатый AudioFile
+    When я дважды рисую спектрограмму сжатого файла в пуле
+    Then кэш PCM основного процесса должен декодировать файл один раз
+    And построение STFT должно быть поставлено в основном процессе
+
+  Scenario: Заполненная очередь отклоняет задачу сразу
+    Given пул отрисовки из 1 процесса без очереди
+    When процесс пула занят долгой задачей
+    Then новая задача должна быть отклонена без ожидания
+    And счётчик отклонённых задач пула должен быть 1
+
+  Scenario: Задача дольше таймаута
+    Given пул отрисовки из 1 процесса с таймаутом 0.3 секунды
+    When я запускаю задачу на 1.5 секунды
+    Then должна возникнуть ошибка таймаута отрисовки
+
+  Scenario: Перегруженный пул отвечает 503 с Retry-After
+    Given глобальный пул отрисовки заполнен
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?width=64&height=32"
+    Then ответ должен иметь статус 503
+    And заголовок Retry-After должен быть "2"
+
+  Scenario: Счётчики пула в метриках
+    When я отправляю GET запрос на "/api/metrics"
+    Then ответ должен иметь статус 200
+    And метрики должны содержать счётчики пула отрисовки
@@ -0,0 +1,39 @@
+Feature: Объединение одинаковых одновременных отрисовок
+  Как пользователь, открывающий файл в нескольких компонентах и вкладках
+  Я хочу, чтобы одинаковые одновременные запросы отрисовки считались один раз
+  Чтобы сервер не декодировал и не рисовал один и тот же интервал несколько раз
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile с тоном 440 Гц
+
+  Scenario: Одновременные вызовы с одним ключом вычисляются один раз
+    When 5 потоков одновременно запрашивают один ключ
+    Then вычисление должно выполниться 1 раз
+    And все потоки должны получить один и тот же результат
+    And счётчик объединённых запросов должен быть 4
+
+  Scenario: Ошибка вычисления получают все ожидающие
+    When 3 потока одновременно запрашивают ключ с ошибкой вычисления
+    Then вычисление должно выполниться 1 раз
+    And все потоки должны получить ValueError
+
+  Scenario: Разные ключи не объединяются
+    When 3 потока одновременно запрашивают разные ключи
+    Then вычисление должно выполниться 3 раза
+
+  Scenario: Одновременные одинаковые запросы спектрограммы рисуются один раз
+    When 4 клиента одновременно запрашивают "/api/audio/{id}/spectrogram?width=64&height=32"
+    Then все ответы должны иметь статус 200 и одинаковое тело
+    And спектрограмма должна быть отрисована 1 раз
+
+  Scenario: Одновременные одинаковые запросы данных спектрограммы считаются один раз
+    When 4 клиента одновременно запрашивают "/api/audio/{id}/spectrogram/data?width=16"
+    Then все ответы должны иметь статус 200 и одинаковое тело
+    And данные спектрограммы должны быть посчитаны 1 раз
+
+  Scenario: Счётчики объединения в метриках
+    When я отправляю GET запрос на "/api/metrics"
+    Then ответ должен иметь статус 200
+    And метрики должны содержать счётчики объединения запросов
@@ -0,0 +1,37 @@
+Feature: Пакетные миниатюры спектрограмм для списка аннотаций
+  Как пользователь списка аннотаций
+  Я хочу получать превью всех аннотаций одним запросом
+  Чтобы не открывать файл заново для каждой аннотации
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile длительностью 6 секунд
+
+  Scenario: Спрайт с картой смещений
+    When я запрашиваю миниатюры интервалов "4-5, 0-1, 2-3.5" размером 120x40
+    Then ответ должен иметь статус 200
+    And спрайт должен быть PNG 360x40
+    And смещения должны идти по порядку интервалов запроса
+    And каждая миниатюра должна совпадать с отдельной спектрограммой интервала
+
+  Scenario: Файл открывается один раз на все интервалы
+    Given чтение аудио подсчитывается
+    When я запрашиваю миниатюры интервалов "5-6, 0-0.5, 1-2, 3-4, 0.5-1" размером 50x20
+    Then ответ должен иметь статус 200
+    And аудио должно быть открыто 1 раз
+
+  Scenario: ZIP с миниатюрами и manifest
+    When я запрашиваю миниатюры интервалов "0-1, 2-3" размером 64x32 в формате "zip"
+    Then ответ должен иметь статус 200
+    And архив должен содержать 2 PNG 64x32 и manifest.json
+
+  Scenario Outline: Неверные интервалы
+    When я запрашиваю миниатюры интервалов "<intervals>" размером 50x20
+    Then ответ должен иметь статус 400
+
+    Examples:
+      | intervals |
+      |           |
+      | 2-1       |
+      | 7-8       |
@@ -0,0 +1,36 @@
+Feature: Данные спектрограммы для отрисовки на клиенте
+  Как пользователь плеера региона
+  Я хочу получать матрицу dB интервала вместо PNG
+  Чтобы менять палитру и контраст без повторных запросов к серверу
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile с тоном 1000 Гц амплитудой 0.5
+
+  Scenario: Квантованная матрица uint8 с осями
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram/data?start_time=0.5&end_time=1.5&width=20"
+    Then ответ должен иметь статус 200
+    And матрица должна иметь 1025 бинов и 20 столбцов формата "uint8"
+    And оси должны описывать интервал от 0.5 до 1.5 секунд и шаг частоты 7.8125 Гц
+    And максимум спектра должен быть на частоте 1000 Гц около -6 dBFS
+
+  Scenario: uint8 совпадает с float16 с точностью квантования
+    When я запрашиваю данные интервала в форматах uint8 и float16
+    Then восстановленные значения uint8 должны совпадать с float16 с точностью до шага квантования
+
+  Scenario: Повторный запрос с ETag
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram/data?width=50"
+    And я повторяю запрос с полученным ETag
+    Then ответ должен иметь статус 304
+
+  Scenario Outline: Неверные параметры
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram/data?<query>"
+    Then ответ должен иметь статус 400
+
+    Examples:
+      | query                 |
+      | format=png            |
+      | width=0               |
+      | pooling=median        |
+      | start_time=5          |
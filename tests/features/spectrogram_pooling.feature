@@ -0,0 +1,36 @@
+Feature: Потоковая STFT со свёрткой кадров в столбцы изображения
+  Как пользователь API
+  Я хочу получать спектрограмму многочасовых интервалов
+  Чтобы память сервера не зависела от длины интервала
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile длительностью 120 секунд
+
+  Scenario Outline: Свёртка блоками совпадает со свёрткой целиком
+    Given матрица из 1000 кадров
+    When я сворачиваю её в 37 столбцов методом "<method>" блоками по 64 кадра
+    Then результат должен совпадать со свёрткой целиком
+
+    Examples:
+      | method |
+      | max    |
+      | mean   |
+
+  Scenario: Max свёртка сохраняет короткое событие
+    Given матрица из 1000 кадров с одним громким кадром
+    When я сворачиваю её в 10 столбцов методом "max" блоками по 64 кадра
+    Then громкость события должна сохраниться в своём столбце
+
+  Scenario: Память не зависит от длины интервала
+    When я считаю свёрнутую STFT всего файла блоками по 128 кадров
+    Then пиковое потребление памяти должно быть меньше четверти полной матрицы
+
+  Scenario: Метод свёртки выбирается в запросе
+    When я запрашиваю спектрограмму всего файла шириной 200 с pooling "max" и "mean"
+    Then оба ответа должны быть PNG 200x100 с разным содержимым
+
+  Scenario: Неизвестный метод свёртки
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?pooling=median"
+    Then ответ должен иметь статус 400
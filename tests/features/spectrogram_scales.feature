@@ -0,0 +1,46 @@
+Feature: Частотные шкалы спектрограммы
+  Как разметчик птиц и речи
+  Я хочу спектрограммы в mel, log и cqt шкалах с диапазоном частот
+  Чтобы изображение не тратилось на пустые высокие частоты
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile с тоном 1000 Гц
+
+  Scenario Outline: Тон попадает в полосу своей частоты
+    When я считаю кадры интервала в шкале "<scale>" с fmin <fmin> и fmax <fmax>
+    Then количество полос должно быть <bands>
+    And максимальная полоса должна быть около 1000 Гц
+
+    Examples:
+      | scale  | fmin | fmax | bands |
+      | linear | 500  | 2000 | 193   |
+      | mel    | 0    | 8000 | 128   |
+      | log    | 0    | 8000 | 128   |
+      | cqt    | 125  | 4000 | 121   |
+
+  Scenario: Матрица фильтров кэшируется
+    When я дважды запрашиваю фильтры mel для 16000 Гц
+    Then оба раза должна вернуться одна и та же матрица
+
+  Scenario: Узкая полоса считается только по своим бинам
+    When я считаю кадры STFT с обрезкой бинов 64..257
+    Then результат должен совпадать со срезом полной STFT
+
+  Scenario: Спектрограмма в mel шкале с другим размером окна
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?scale=mel&n_fft=1024&hop_length=256&fmax=4000&width=100&height=64"
+    Then ответ должен иметь статус 200
+    And ответ должен быть PNG 100x64
+
+  Scenario Outline: Неверные параметры шкалы
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?<query>"
+    Then ответ должен иметь статус 400
+
+    Examples:
+      | query                  |
+      | scale=bark             |
+      | n_fft=1000             |
+      | hop_length=4096        |
+      | fmin=3000&fmax=1000    |
+      | scale=mel&fmin=9000    |
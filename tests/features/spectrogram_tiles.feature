@@ -0,0 +1,43 @@
+Feature: Тайлы спектрограммы
+  Как пользователь интерфейса
+  Я хочу листать спектрограмму длинных записей как карту
+  Чтобы повторные просмотры обслуживались кэшем, а не новой отрисовкой
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile длительностью 5 секунд
+
+  Scenario: Описание уровней тайлов
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram/tiles"
+    Then ответ должен иметь статус 200
+    And уровень 10 должен содержать 5 тайлов по 1.0 секунде
+    And ответ должен содержать версию файла и шаблон URL тайла
+
+  Scenario: Полный и последний тайлы имеют ширину по своей длительности
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram/tiles/9/0.png?height=64"
+    Then ответ должен содержать PNG размером 256x64
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram/tiles/9/2.png?height=64"
+    Then ответ должен содержать PNG размером 128x64
+
+  Scenario: Тайл с версией файла кэшируется как immutable
+    When я отправляю GET запрос на тайл 10/1 с версией файла
+    Then ответ должен иметь статус 200
+    And заголовок Cache-Control должен содержать "immutable"
+
+  Scenario: Повторный запрос тайла обслуживается из кэша отрисовок
+    When я дважды запрашиваю тайл "/api/audio/{id}/spectrogram/tiles/10/3.png"
+    Then метрики кэша отрисовок должны показывать 1 попаданий
+
+  Scenario: Тайлы раскрашиваются в общей шкале
+    Given тишина в первой секунде файла
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram/tiles/10/0.png?height=32"
+    Then тайл должен быть раскрашен одним цветом
+
+  Scenario: Тайл вне длительности файла
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram/tiles/10/5.png"
+    Then ответ должен иметь статус 404
+
+  Scenario: Недопустимый уровень
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram/tiles/15/0.png"
+    Then ответ должен иметь статус 404
@@ -0,0 +1,48 @@
+Feature: Хранилище предвычисленной STFT матрицы
+  Как пользователь API
+  Я хочу чтобы STFT файла считалась один раз
+  Чтобы панорамирование спектрограммы не пересчитывало FFT на каждый запрос
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile с тестовым сигналом
+
+  Scenario: Первый запрос спектрограммы запускает построение матрицы
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?start_time=0.5&end_time=1.5&width=200&height=100"
+    And фоновое построение STFT завершилось
+    Then STFT матрица файла должна существовать и покрывать весь сигнал
+
+  Scenario: Спектрограмма из матрицы совпадает с прямым расчётом
+    When я отправляю GET запрос на "/api/audio/{id}/spectrogram?start_time=0.5&end_time=1.5&width=200&height=100"
+    And фоновое построение STFT завершилось
+    And кэш отрисовок очищен и прямой расчёт STFT запрещён
+    And я повторяю последний запрос
+    Then оба изображения должны совпадать побайтно
+
+  Scenario: Изменение исходного файла делает матрицу недействительной
+    Given для файла построена STFT матрица
+    When исходный файл перезаписывается другим сигналом
+    Then STFT матрица файла не должна загружаться
+
+  Scenario: Матрица больше бюджета не строится
+    Given бюджет хранилища STFT 1000 байт
+    When я строю STFT матрицу файла
+    Then STFT матрица файла не должна загружаться
+
+  Scenario: Ошибка построения не оставляет временный файл
+    Given расчёт STFT завершается ошибкой
+    When я строю STFT матрицу файла с ошибкой
+    Then в хранилище STFT не должно остаться временных файлов
+
+  Scenario: Неудачное построение не повторяется, пока файл не изменился
+    Given расчёт STFT завершается ошибкой
+    When я ставлю построение STFT в очередь и оно завершается ошибкой
+    Then повторное построение STFT не должно ставиться в очередь
+    When исходный файл перезаписывается другим сигналом
+    Then повторное построение STFT должно ставиться в очередь
+
+  Scenario: Удаление AudioFile удаляет матрицу
+    Given для файла построена STFT матрица
+    When я отправляю DELETE запрос на "/api/audio/{id}"
+    Then файл STFT матрицы должен быть удалён
@@ -0,0 +1,35 @@
+Feature: Отдача Range запросов без копирования через Python
+  Как пользователь API
+  Я хочу чтобы диапазоны аудио отдавались через wsgi.file_wrapper
+  Чтобы десятки аннотаторов могли одновременно прокручивать большие файлы
+
+  Background:
+    Given Flask приложение запущено
+    And база данных инициализирована
+    And в БД существует AudioFile с тестовым сигналом
+
+  Scenario: Range отдаётся через wsgi.file_wrapper сервера
+    When я запрашиваю диапазон "bytes=1000-1099" у сервера с wsgi.file_wrapper
+    Then ответ должен иметь статус 206
+    And заголовок "Content-Length" должен быть равен "100"
+    And тело должно быть отдано через file_wrapper с позиции 1000
+    And первые 100 байт тела должны совпадать с файлом с позиции 1000
+
+  Scenario: Без wsgi.file_wrapper используется генератор
+    When я запрашиваю диапазон "bytes=1000-1099" у сервера без wsgi.file_wrapper
+    Then ответ должен иметь статус 206
+    And тело ответа должно совпадать с файлом с позиции 1000 длиной 100
+
+  Scenario: Метрики учитывают способ отдачи и пропускную способность
+    When я запрашиваю диапазон "bytes=0-4095" у сервера с wsgi.file_wrapper
+    And я запрашиваю диапазон "bytes=0-4095" у сервера без wsgi.file_wrapper
+    Then метрики streaming должны показывать по одному ответу каждого способа
+    And метрики streaming должны показывать 0 активных соединений
+    And метрики streaming должны учитывать 8192 отправленных байт
+
+  Scenario: Ответ, отданный sendfile, учитывается без объёма
+    When я запрашиваю диапазон "bytes=0-4095" у сервера с sendfile
+    Then ответ должен иметь статус 206
+    And первые 4096 байт тела должны совпадать с файлом с позиции 0
+    And метрики streaming должны показывать 1 ответ без учёта объёма
+    And метрики streaming должны учитывать 0 отправленных байт
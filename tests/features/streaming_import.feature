@@ -0,0 +1,42 @@
+Feature: Рекурсивный импорт с потоком событий прогресса
+  Как пользователь, импортирующий большое дерево каталогов
+  Я хочу видеть прогресс импорта по мере работы
+  Чтобы импорт не выглядел зависшим и не упирался в таймаут запроса
+
+  Background:
+    Given Flask приложение запущено
+    And дерево каталогов с записями
+
+  Scenario: Без recursive импортируется только верхний каталог
+    When я импортирую дерево с параметрами {}
+    Then импортированы файлы "skip_old.wav, top.flac, top.wav"
+
+  Scenario: Рекурсивный импорт с ограничением глубины
+    When я импортирую дерево с параметрами {"recursive": true, "max_depth": 2}
+    Then импортированы файлы "2024/b.wav, 2024/day1/c.wav, skip_old.wav, tmp/t.wav, top.flac, top.wav"
+
+  Scenario: Фильтры include и exclude
+    When я импортирую дерево с параметрами {"recursive": true, "include": ["*.wav"], "exclude": ["tmp", "*_old.*"]}
+    Then импортированы файлы "2024/b.wav, 2024/day1/c.wav, 2024/day1/deep/d.wav, top.wav"
+
+  Scenario: Неверная глубина отклоняется
+    When я импортирую дерево с параметрами {"recursive": true, "max_depth": -1}
+    Then ответ должен иметь статус 400
+
+  Scenario: События NDJSON
+    Given в дереве есть повреждённый файл "2024/broken.wav"
+    When я импортирую дерево с параметрами {"recursive": true, "stream": "ndjson"}
+    Then ответ должен иметь тип "application/x-ndjson"
+    And последнее событие "done" с imported 7 и failed 1
+    And среди событий есть ошибка для файла "2024/broken.wav"
+    And события progress содержат discovered, imported, skipped, failed и rate
+
+  Scenario: Server-Sent Events по заголовку Accept
+    When я импортирую дерево с заголовком Accept "text/event-stream"
+    Then ответ должен иметь тип "text/event-stream"
+    And поток SSE заканчивается событием "done"
+
+  Scenario: Прогресс приходит до окончания импорта
+    When я читаю события импорта с пачками по 2 строк
+    Then первое событие progress приходит до вставки всех файлов
+    And повторный импорт пропускает 7 файлов
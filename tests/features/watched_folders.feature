@@ -0,0 +1,77 @@
+Feature: Наблюдаемые каталоги с инкрементальным пересканированием
+  Как пользователь, каждую ночь импортирующий каталоги рекордеров
+  Я хочу повторно сканировать только изменившиеся файлы
+  Чтобы пересканирование большого каталога без изменений занимало секунды
+
+  Background:
+    Given Flask приложение запущено
+    And наблюдаемый каталог с 4 записями
+
+  Scenario: Добавление каталога импортирует файлы
+    When я отправляю POST запрос на добавление наблюдаемого каталога
+    Then ответ должен иметь статус 201
+    When первое сканирование завершилось
+    Then в БД должно быть 4 AudioFile со статусом "loaded"
+    And в манифесте каталога должно быть 4 записей
+    When я запрашиваю наблюдаемый каталог
+    Then каталог должен содержать file_count 4 и итог сканирования с new 4
+
+  Scenario: Пересканирование без изменений не пишет в БД и не читает файлы
+    Given каталог просканирован
+    When я пересканирую каталог
+    Then ответ должен иметь статус 200
+    And итог пересканирования должен быть new 0, changed 0, moved 0, vanished 0, unchanged 4
+    And пересканирование не выполняло INSERT, DELETE и UPDATE файлов
+    And метаданные файлов не читались
+
+  Scenario: Изменённый файл перечитывается
+    Given каталог просканирован
+    And файл "take_01.wav" перезаписан записью длиной 2 секунды
+    When я пересканирую каталог
+    Then итог пересканирования должен быть new 0, changed 1, moved 0, vanished 0, unchanged 3
+    And длительность AudioFile "take_01.wav" должна быть 2 секунды
+    And метаданные прочитаны только у "take_01.wav"
+
+  Scenario: Исчезнувший файл получает статус MISSING
+    Given каталог просканирован
+    And файл "take_02.wav" удалён
+    When я пересканирую каталог
+    Then итог пересканирования должен быть new 0, changed 0, moved 0, vanished 1, unchanged 3
+    And в БД должно быть 1 AudioFile со статусом "missing"
+    And в манифесте каталога должно быть 3 записей
+
+  Scenario: Переименованный файл сохраняет AudioFile
+    Given каталог просканирован
+    And файл "take_03.wav" переименован в "archive/take_03.wav"
+    When я пересканирую каталог
+    Then итог пересканирования должен быть new 0, changed 0, moved 1, vanished 0, unchanged 3
+    And AudioFile "take_03.wav" должен указывать на "archive/take_03.wav"
+    And метаданные файлов не читались
+
+  Scenario: Уже импортированные файлы связываются без чтения метаданных
+    Given каталог импортирован обычным импортом
+    When я добавляю каталог и жду первое сканирование
+    Then в БД должно быть 4 AudioFile со статусом "loaded"
+    And в манифесте каталога должно быть 4 записей
+    And метаданные файлов не читались
+
+  Scenario: Повторное добавление и удаление каталога
+    When я отправляю POST запрос на добавление наблюдаемого каталога
+    And первое сканирование завершилось
+    And я отправляю POST запрос на добавление наблюдаемого каталога
+    Then ответ должен иметь статус 409
+    When я удаляю наблюдаемый каталог
+    Then ответ должен иметь статус 200
+    And в манифесте каталога должно быть 0 записей
+    And в БД должно быть 4 AudioFile со статусом "loaded"
+
+  Scenario: Неизвестный каталог
+    When я пересканирую каталог "00000000-0000-0000-0000-000000000000"
+    Then ответ должен иметь статус 404
+    When я пересканирую каталог "not-a-uuid"
+    Then ответ должен иметь статус 400
+
+  Scenario: Live-наблюдение пересканирует каталог после записи файла
+    Given каталог просканирован с live-наблюдением
+    When в каталоге записан файл "take_09.wav"
+    Then live-наблюдение должно добавить "take_09.wav" в манифест
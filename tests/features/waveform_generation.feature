@@ -59,6 +59,8 @@ Feature: Генерация waveform визуализации
     And ответ должен содержать PNG изображение
     And генерация должна использовать downsampling
 
-
-
-
+  Scenario: Огибающая waveform вычисляется блочным чтением файла
+    Given в БД существует AudioFile с id
+    And файл существует по пути из AudioFile
+    When я вычисляю огибающую на 100 бинов блоками по 1000 фреймов
+    Then огибающая должна совпадать с эталонной min/max/RMS по бинам
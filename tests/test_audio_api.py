@@ -345,10 +345,11 @@ def create_directory_with_files(context, path, count):
     sample_rate = 44100
     duration = 0.1
     t = np.linspace(0, duration, int(sample_rate * duration))
-    signal = np.sin(2 * np.pi * 440 * t)
-    stereo_signal = np.column_stack([signal, signal])
     
     for i in range(count):
+        # Разная частота тона: одинаковые файлы импорт считает копиями
+        signal = np.sin(2 * np.pi * (440 + 10 * i) * t)
+        stereo_signal = np.column_stack([signal, signal])
         file_path = tmp_dir / f"audio_{i}.wav"
         sf.write(str(file_path), stereo_signal, sample_rate)
     
@@ -0,0 +1,215 @@
+"""Step definitions для тестирования быстрого чтения метаданных."""
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/audio_metadata.feature')
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {'parses': 0}
+
+
+def tone(duration, sample_rate):
+    """Синус 440 Гц."""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    return 0.3 * np.sin(2 * np.pi * 440 * t)
+
+
+@given('кэш метаданных очищен')
+def clear_cache():
+    """Сбрасываем lru_cache метаданных."""
+    from src.audio import metadata
+
+    metadata._cached_audio_info.cache_clear()
+
+
+@given(parsers.parse('WAV файл длительностью {duration:g} секунд с частотой {sample_rate:d} Гц'))
+def create_wav(context, tmp_path, duration, sample_rate):
+    """Создаём WAV."""
+    file_path = tmp_path / 'tone.wav'
+    sf.write(str(file_path), tone(duration, sample_rate), sample_rate)
+    context['file_path'] = str(file_path)
+    context['sample_rate'] = sample_rate
+
+
+@given(parsers.parse('MP3 файл длительностью {duration:d} секунд с частотой {sample_rate:d} Гц'))
+def create_mp3(context, tmp_path, duration, sample_rate):
+    """Создаём MP3 (LAME пишет заголовок Xing/Info с тегом LAME)."""
+    file_path = tmp_path / 'tone.mp3'
+    sf.write(str(file_path), tone(duration, sample_rate), sample_rate)
+    context['file_path'] = str(file_path)
+
+
+@given(parsers.parse(
+    'MP3 файл длительностью {duration:d} секунд с частотой {sample_rate:d} Гц без заголовка Xing и с тегом ID3v2'
+))
+def create_mp3_without_xing(context, tmp_path, duration, sample_rate):
+    """Убираем первый фрейм с Xing и добавляем тег ID3v2 в начало."""
+    from src.audio.mp3_header import parse_frame_header
+
+    source = tmp_path / 'source.mp3'
+    sf.write(str(source), tone(duration, sample_rate), sample_rate)
+    data = source.read_bytes()
+    first = parse_frame_header(data, 0)
+    assert first is not None and (b'Xing' in data[:first.length] or b'Info' in data[:first.length])
+
+    id3_body = b'TIT2' + (6).to_bytes(4, 'big') + b'\x00\x00' + b'\x00title' + b'\x00' * 200
+    id3 = b'ID3\x03\x00\x00' + bytes([0, 0, (len(id3_body) >> 7) & 0x7F, len(id3_body) & 0x7F])
+    file_path = tmp_path / 'tagged.mp3'
+    file_path.write_bytes(id3 + id3_body + data[first.length:])
+    context['file_path'] = str(file_path)
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подменяем глобальную БД тестовой."""
+    from src.audio import stft_store
+    from src.models import database
+
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given(parsers.parse('в БД существует AudioFile длительностью {duration:g} для файла на {seconds:d} секунды'))
+def create_audio_file(context, tmp_path, duration, seconds):
+    """Запись AudioFile с длительностью, отличной от реальной."""
+    from src.models.audio_file import AudioFile
+
+    file_path = tmp_path / 'long.wav'
+    sf.write(str(file_path), tone(seconds, 16000), 16000)
+    session = context['db'].get_session()
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='long.wav',
+        duration=duration,
+        sample_rate=16000,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    session.add(audio_file)
+    session.commit()
+    context['audio_file_id'] = str(audio_file.id)
+    session.close()
+
+
+def forbid(monkeypatch, module, name):
+    """Запрещаем медленный путь чтения."""
+    def fail(*args, **kwargs):
+        raise AssertionError(f'{name} must not be called')
+    monkeypatch.setattr(module, name, fail)
+
+
+@when('я извлекаю метаданные без librosa')
+def extract_without_librosa(context, monkeypatch):
+    """Длительность должна браться из заголовка soundfile."""
+    from src.audio import metadata
+
+    forbid(monkeypatch, metadata.librosa, 'get_duration')
+    context['metadata'] = metadata.extract_metadata(context['file_path'])
+
+
+@when('я извлекаю метаданные без декодирования MP3')
+def extract_without_decoding(context, monkeypatch):
+    """MP3 разбирается только по заголовкам фреймов."""
+    from src.audio import metadata
+
+    forbid(monkeypatch, metadata.librosa, 'get_duration')
+    forbid(monkeypatch, metadata.sf, 'info')
+    context['metadata'] = metadata.extract_metadata(context['file_path'])
+
+
+@when(parsers.parse('я извлекаю метаданные {count:d} раз'))
+@when(parsers.parse('я извлекаю метаданные {count:d} раза'))
+def extract_many(context, monkeypatch, count):
+    """Считаем фактические разборы файла."""
+    from src.audio import metadata
+
+    if 'original' not in context:
+        context['original'] = metadata.read_audio_info
+
+        def counted(file_path):
+            context['parses'] += 1
+            return context['original'](file_path)
+        monkeypatch.setattr(metadata, 'read_audio_info', counted)
+
+    for _ in range(count):
+        context['metadata'] = metadata.extract_metadata(context['file_path'])
+
+
+@when(parsers.parse('файл перезаписывается длительностью {duration:d} секунды'))
+def rewrite_file(context, duration):
+    """Новый размер и mtime файла."""
+    sf.write(context['file_path'], tone(duration, context['sample_rate']), context['sample_rate'])
+    stat = os.stat(context['file_path'])
+    os.utime(context['file_path'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['response'] = client.get(endpoint.replace('{id}', context['audio_file_id']))
+
+
+@then(parsers.parse('длительность должна быть {duration:g} секунд'))
+def check_duration(context, duration):
+    """Проверяем длительность."""
+    assert context['metadata']['duration'] == pytest.approx(duration, abs=1e-6)
+
+
+@then(parsers.parse('длительность должна отличаться от {duration:g} секунд не больше чем на {tolerance:g}'))
+def check_duration_close(context, duration, tolerance):
+    """Проверяем длительность с точностью до фрейма и задержки энкодера."""
+    assert abs(context['metadata']['duration'] - duration) <= tolerance
+
+
+@then(parsers.parse('частота дискретизации должна быть {sample_rate:d} Гц'))
+def check_sample_rate(context, sample_rate):
+    """Проверяем частоту дискретизации."""
+    assert context['metadata']['sample_rate'] == sample_rate
+    assert context['metadata']['channels'] == 1
+
+
+@then(parsers.parse('файл должен быть разобран {count:d} раз'))
+@then(parsers.parse('файл должен быть разобран {count:d} раза'))
+def check_parses(context, count):
+    """Проверяем число разборов файла."""
+    assert context['parses'] == count
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем HTTP статус."""
+    assert context['response'].status_code == status, context['response'].get_data(as_text=True)
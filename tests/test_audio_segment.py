@@ -0,0 +1,185 @@
+"""Step definitions для тестирования выдачи интервала аудио-файла."""
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/audio_segment.feature')
+
+# Точность PCM 16 бит
+PCM16_TOLERANCE = 1.0 / 32767 + 1e-6
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой."""
+    from src.models import database
+
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse(
+    'в БД существует стерео AudioFile длительностью {seconds:d} секунд с частотой {sample_rate:d}'
+))
+def create_audio_file(context, tmp_path, seconds, sample_rate):
+    """Создаём стерео WAV: 440 Гц слева, 660 Гц справа."""
+    from src.models.audio_file import AudioFile
+
+    t = np.arange(seconds * sample_rate) / sample_rate
+    signal = np.column_stack([
+        0.5 * np.sin(2 * np.pi * 440 * t),
+        0.3 * np.sin(2 * np.pi * 660 * t),
+    ]).astype(np.float32)
+    file_path = tmp_path / 'segment_source.wav'
+    sf.write(str(file_path), signal, sample_rate, subtype='FLOAT')
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='segment_source.wav',
+        duration=float(seconds),
+        sample_rate=sample_rate,
+        channels=2,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['signal'] = signal
+    context['sample_rate'] = sample_rate
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['endpoint'] = endpoint.replace('{id}', context['audio_file_id'])
+    context['first_response'] = client.get(context['endpoint'])
+    context['response'] = context['first_response']
+
+
+@when('я повторяю запрос с заголовком If-None-Match из ответа')
+def repeat_with_if_none_match(context, client):
+    """Повторяем запрос с ETag первого ответа."""
+    etag = context['first_response'].headers['ETag']
+    context['response'] = client.get(context['endpoint'], headers={'If-None-Match': etag})
+
+
+def _read_body(context, **kwargs):
+    """Декодируем тело ответа через soundfile."""
+    data, sample_rate = sf.read(io.BytesIO(context['response'].get_data()), always_2d=True, **kwargs)
+    return data, sample_rate
+
+
+@then(parsers.parse('ответ должен иметь статус {status_code:d}'))
+def check_status_code(context, status_code):
+    """Проверяем статус код."""
+    assert context['response'].status_code == status_code
+
+
+@then(parsers.parse('заголовок "{header}" должен содержать "{value}"'))
+def check_header_contains(context, header, value):
+    """Заголовок содержит значение."""
+    assert value in context['response'].headers.get(header, '')
+
+
+@then(parsers.parse('ответ должен быть WAV с {channels:d} каналами и частотой {sample_rate:d}'))
+def check_wav_format(context, channels, sample_rate):
+    """Формат WAV."""
+    info = sf.info(io.BytesIO(context['response'].get_data()))
+    assert info.format == 'WAV'
+    assert info.channels == channels
+    assert info.samplerate == sample_rate
+
+
+@then(parsers.parse('WAV должен содержать {frames:d} фреймов'))
+def check_wav_frames(context, frames):
+    """Количество фреймов."""
+    data, _ = _read_body(context)
+    assert len(data) == frames
+
+
+@then(parsers.parse('сэмплы WAV должны совпадать с исходным файлом с {second:d} секунды'))
+def check_samples_match(context, second):
+    """Сэмплы совпадают с точностью PCM 16."""
+    data, _ = _read_body(context)
+    start = second * context['sample_rate']
+    expected = context['signal'][start:start + len(data)]
+    assert np.max(np.abs(data - expected)) <= PCM16_TOLERANCE
+
+
+@then('сэмплы WAV должны совпадать с моно миксом исходного файла')
+def check_mono_mix(context):
+    """Моно = среднее каналов."""
+    data, _ = _read_body(context)
+    expected = context['signal'][:len(data)].mean(axis=1, keepdims=True)
+    assert np.max(np.abs(data - expected)) <= PCM16_TOLERANCE
+
+
+@then('заголовок "Content-Length" должен совпадать с размером тела')
+def check_content_length(context):
+    """Потоковый WAV с точным Content-Length."""
+    response = context['response']
+    assert int(response.headers['Content-Length']) == len(response.get_data())
+
+
+@then(parsers.parse('основная частота WAV должна быть {frequency:d} Гц'))
+def check_dominant_frequency(context, frequency):
+    """Ресемплинг сохраняет частоту сигнала левого канала."""
+    data, sample_rate = _read_body(context)
+    spectrum = np.abs(np.fft.rfft(data[:, 0]))
+    peak = np.fft.rfftfreq(len(data), 1 / sample_rate)[np.argmax(spectrum)]
+    assert abs(peak - frequency) < 2
+
+
+@then(parsers.parse('ответ должен быть FLAC с {frames:d} фреймами'))
+def check_flac(context, frames):
+    """FLAC декодируется и имеет нужную длину."""
+    info = sf.info(io.BytesIO(context['response'].get_data()))
+    assert info.format == 'FLAC'
+    assert info.frames == frames
+
+
+@then(parsers.parse('ответ должен содержать JSON с полем "{field}"'))
+def check_json_field(context, field):
+    """JSON ошибка."""
+    assert field in context['response'].get_json()
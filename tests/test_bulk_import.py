@@ -0,0 +1,216 @@
+"""Step definitions для тестирования массового импорта каталога."""
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+from sqlalchemy import event
+
+# Связываем сценарии из feature файла
+scenarios('features/bulk_import.feature')
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подключаем тестовую БД, фоновое построение STFT отключаем."""
+    from src.audio import stft_store
+    from src.models import database
+
+    database._db_instance = test_db
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    context['db'] = test_db
+
+
+@given(parsers.parse('каталог с {count:d} WAV файлами'))
+def create_folder(context, tmp_path, count):
+    """WAV файлы разной длительности."""
+    folder = tmp_path / 'survey'
+    folder.mkdir()
+    durations = {}
+    for index in range(count):
+        path = folder / f'take_{index:02d}.wav'
+        duration = 0.5 + 0.25 * index
+        sf.write(str(path), np.zeros(int(duration * 8000)), 8000)
+        durations[str(path)] = duration
+    (folder / 'notes.txt').write_text('не аудио')
+    context['folder'] = str(folder)
+    context['durations'] = durations
+
+
+def _audio_file(path):
+    """AudioFile для пути без чтения метаданных."""
+    from src.models import AudioFile, AudioFileStatus
+
+    return AudioFile(
+        file_path=path, filename=path.rsplit('/', 1)[-1], duration=1.0,
+        sample_rate=8000, channels=1, file_size=1, status=AudioFileStatus.LOADED
+    )
+
+
+@given(parsers.parse('{count:d} файла каталога уже импортированы'))
+def import_some(context, count):
+    """Добавляем часть файлов в БД заранее."""
+    from src.audio.importer import list_audio_files
+
+    paths = list_audio_files(context['folder'])[:count]
+    session = context['db'].get_session()
+    try:
+        for path in paths:
+            session.add(_audio_file(path))
+        session.commit()
+    finally:
+        session.close()
+
+
+@given(parsers.parse('в каталоге есть повреждённый файл "{filename}"'))
+def create_broken(context, filename):
+    """Файл с расширением WAV без аудио данных."""
+    with open(f"{context['folder']}/{filename}", 'wb') as f:
+        f.write(b'not a wave file')
+
+
+def _run_import(context, **kwargs):
+    """Импорт с подсчётом SQL запросов к audio_files."""
+    from src.audio.folder_import import import_folder
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, execution_context, executemany):
+        if 'audio_files' in statement:
+            statements.append(statement.lstrip().split()[0].upper())
+
+    engine = context['db'].engine
+    event.listen(engine, 'before_cursor_execute', record)
+    session = context['db'].get_session()
+    try:
+        context['result'] = import_folder(session, context['folder'], **kwargs)
+    finally:
+        session.close()
+        event.remove(engine, 'before_cursor_execute', record)
+    context['statements'] = statements
+
+
+@when(parsers.parse('я импортирую каталог с пачками по {batch_size:d} строк'))
+def import_in_batches(context, batch_size):
+    """Импорт без пула процессов."""
+    _run_import(context, workers=0, batch_size=batch_size)
+
+
+@when(parsers.parse('я импортирую каталог в {workers:d} процессах'))
+def import_in_pool(context, workers, monkeypatch):
+    """Импорт с пулом процессов даже для маленького каталога."""
+    from src.audio import import_probe
+
+    monkeypatch.setattr(import_probe, 'PARALLEL_IMPORT_MIN_FILES', 1)
+    _run_import(context, workers=workers)
+
+
+@when('я отправляю POST запрос на импорт каталога')
+def post_import(client, context):
+    """POST /api/audio/import."""
+    context['response'] = client.post('/api/audio/import', json={'path': context['folder']})
+
+
+@then(parsers.parse('должно быть импортировано {count:d} файла'))
+def check_imported(context, count):
+    """Проверяем число вставленных строк."""
+    assert context['result'].imported_count == count
+
+
+@then(parsers.parse('пропущено {count:d} файла'))
+def check_skipped(context, count):
+    """Проверяем число пропущенных файлов."""
+    assert context['result'].skipped == count
+
+
+@then(parsers.parse('к таблице audio_files должен быть выполнен {count:d} SELECT'))
+def check_selects(context, count):
+    """Проверяем, что существующие пути прочитаны одним запросом."""
+    assert context['statements'].count('SELECT') == count
+
+
+@then(parsers.parse('должно быть выполнено {count:d} INSERT в audio_files'))
+def check_inserts(context, count):
+    """Каждая пачка - один executemany."""
+    assert context['statements'].count('INSERT') == count
+
+
+@then(parsers.parse('в БД должно быть {count:d} AudioFile со статусом loaded'))
+def check_rows(context, count):
+    """Проверяем строки в БД."""
+    from src.models import AudioFile, AudioFileStatus
+
+    session = context['db'].get_session()
+    try:
+        files = session.query(AudioFile).all()
+        assert len(files) == count
+        assert all(f.status == AudioFileStatus.LOADED for f in files)
+        assert all(f.created_at is not None for f in files)
+    finally:
+        session.close()
+
+
+@then(parsers.parse('ошибка импорта указывает файл "{filename}"'))
+def check_error(context, filename):
+    """Повреждённый файл попадает в список ошибок."""
+    errors = context['result'].errors
+    assert [error['file'] for error in errors] == [filename]
+    assert errors[0]['error']
+
+
+@then('длительности импортированных файлов совпадают с исходными')
+def check_durations(context):
+    """Метаданные из процессов пула совпадают с записанными файлами."""
+    imported = {row['file_path']: row['duration'] for row in context['result'].imported}
+    assert imported.keys() == context['durations'].keys()
+    for path, duration in context['durations'].items():
+        assert imported[path] == pytest.approx(duration)
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем HTTP статус."""
+    assert context['response'].status_code == status
+
+
+@then(parsers.parse('ответ должен содержать imported_count равный {count:d}'))
+def check_response_count(context, count):
+    """Проверяем число импортированных файлов в ответе."""
+    assert context['response'].get_json()['imported_count'] == count
+
+
+@then(parsers.parse('ответ должен содержать ошибку для файла "{filename}"'))
+def check_response_error(context, filename):
+    """Проверяем ошибку по отдельному файлу в ответе."""
+    errors = context['response'].get_json()['errors']
+    assert [error['file'] for error in errors] == [filename]
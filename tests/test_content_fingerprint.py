@@ -0,0 +1,366 @@
+"""Step definitions для тестирования поиска копий по отпечатку содержимого."""
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/content_fingerprint.feature')
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подключаем тестовую БД, метаданные читаем без пула процессов."""
+    from src.audio import import_jobs, stft_store, watch
+    from src.models import database
+
+    database._db_instance = test_db
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    monkeypatch.setattr(import_jobs, 'IMPORT_WORKERS', 0)
+    monkeypatch.setattr(watch, 'IMPORT_WORKERS', 0)
+    context['db'] = test_db
+
+
+def _tone(frequency, seconds=0.5, sample_rate=8000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return 0.5 * np.sin(2 * np.pi * frequency * t)
+
+
+@given(parsers.parse(
+    'каталог с записями "{first}", "{second}" и "{other}", где "{copy}" копия "{original}"'
+))
+def create_copies(context, tmp_path, first, second, other, copy, original):
+    """Две одинаковые записи в разных каталогах и одна другая."""
+    root = tmp_path / 'drives'
+    for relative, frequency in ((original, 440), (copy, 440), (other, 660)):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sf.write(str(path), _tone(frequency), 8000)
+    context['root'] = root
+
+
+@given(parsers.parse('каталог с записью "{original}" и её изменённой в середине копией "{copy}"'))
+def create_false_copy(context, tmp_path, original, copy):
+    """Копия отличается одним байтом между проверяемыми блоками."""
+    root = tmp_path / 'drives'
+    for relative in (original, copy):
+        (root / relative).parent.mkdir(parents=True, exist_ok=True)
+    sf.write(str(root / original), _tone(440, seconds=2), 8000)
+    data = bytearray((root / original).read_bytes())
+    data[len(data) // 4] ^= 0xFF
+    (root / copy).write_bytes(bytes(data))
+    context['root'] = root
+
+
+@given(parsers.parse('отпечатки считаются блоками по {size:d} байт'))
+def small_blocks(monkeypatch, size):
+    """Маленькие блоки, чтобы короткие тестовые файлы были больше трёх блоков."""
+    from src.audio import fingerprint
+
+    monkeypatch.setattr(fingerprint, 'FINGERPRINT_BLOCK_SIZE', size)
+
+
+@given(parsers.parse('импортирован только каталог "{folder}"'))
+def import_subfolder(client, context, folder):
+    """Первый диск импортирован раньше."""
+    response = client.post('/api/audio/import', json={'path': str(context['root'] / folder)})
+    assert response.status_code == 200
+    assert response.get_json()['imported_count'] == 1
+
+
+@given(parsers.parse('у записи "{relative}" есть аннотация'))
+def annotate(client, context, relative):
+    """Аннотация на исходной записи."""
+    audio_file_id = _audio_file_id(context, relative)
+    response = client.post('/api/annotations', json={
+        'audio_file_id': audio_file_id,
+        'start_time': 0.1,
+        'end_time': 0.2,
+        'event_label': 'speech',
+    })
+    assert response.status_code == 201
+
+
+@given(parsers.parse('в БД есть запись "{relative}" без отпечатка'))
+def create_legacy_record(context, relative):
+    """Запись, добавленная до появления отпечатков."""
+    from src.audio.metadata import extract_metadata
+    from src.models import AudioFile, AudioFileStatus
+
+    file_path = str(context['root'] / relative)
+    session = context['db'].get_session()
+    try:
+        session.add(AudioFile(
+            file_path=file_path,
+            filename=relative.split('/')[-1],
+            status=AudioFileStatus.LOADED,
+            **extract_metadata(file_path)
+        ))
+        session.commit()
+    finally:
+        session.close()
+
+
+@given('каталог наблюдается и просканирован')
+def watch_folder(client, context):
+    """Наблюдаемый каталог с первым сканированием."""
+    from src.audio.watch import wait_for_rescan
+
+    response = client.post('/api/watched-folders', json={'path': str(context['root']), 'recursive': True})
+    assert response.status_code == 201
+    context['folder_id'] = response.get_json()['id']
+    context['scan'] = wait_for_rescan(context['folder_id'], timeout=60).to_dict()
+
+
+@when('я импортирую каталог рекурсивно')
+def import_root(client, context):
+    """POST /api/audio/import всего дерева."""
+    context['response'] = client.post('/api/audio/import', json={'path': str(context['root']), 'recursive': True})
+
+
+@when(parsers.parse('я импортирую каталог "{folder}"'))
+def import_folder(client, context, folder):
+    """POST /api/audio/import второго диска."""
+    context['response'] = client.post('/api/audio/import', json={'path': str(context['root'] / folder)})
+
+
+@when(parsers.parse('я добавляю файл "{relative}" через POST "{endpoint}"'))
+def add_file(client, context, relative, endpoint):
+    """Файл добавлен по одному, вне импорта каталога."""
+    response = client.post(endpoint, json={'file_path': str(context['root'] / relative)})
+    assert response.status_code == 201
+
+
+@when('отпечатки записей без них дозаполнены')
+def backfill(context):
+    """Фоновое дозаполнение (в тестах вызывается напрямую)."""
+    from src.audio.fingerprint import backfill_fingerprints
+
+    assert backfill_fingerprints() == 1
+    assert backfill_fingerprints() == 0
+
+
+@when(parsers.parse('я вычисляю быстрый отпечаток записи длиной {seconds:d} секунд'))
+def quick_fingerprint_of_long_file(context, tmp_path, monkeypatch, seconds):
+    """Считаем байты, прочитанные при вычислении отпечатка."""
+    from src.audio import fingerprint
+
+    path = tmp_path / 'long.wav'
+    sf.write(str(path), _tone(440, seconds=seconds), 8000)
+    context['read_bytes'] = 0
+
+    class CountingFile:
+        def __init__(self, file):
+            self.file = file
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            self.file.close()
+
+        def read(self, size=-1):
+            data = self.file.read(size)
+            context['read_bytes'] += len(data)
+            return data
+
+        def __getattr__(self, name):
+            return getattr(self.file, name)
+
+    monkeypatch.setattr(fingerprint, 'open', lambda *args: CountingFile(open(*args)), raising=False)
+    assert fingerprint.quick_fingerprint(str(path))
+    assert path.stat().st_size > 100 * 1024
+
+
+@when('в фоне вычислены полные хэши')
+def compute_full_hashes(context):
+    """Фоновая проверка полных хэшей (в тестах вызывается напрямую)."""
+    from src.audio.fingerprint import verify_fingerprints
+    from src.models import AudioFingerprint
+
+    session = context['db'].get_session()
+    try:
+        ids = [fingerprint_id for (fingerprint_id,) in session.query(AudioFingerprint.id)]
+    finally:
+        session.close()
+    assert verify_fingerprints(ids) == 2
+
+
+@when('я выполняю задачу импорта каталога')
+def run_job(context):
+    """Задача импорта в текущем потоке."""
+    from src.audio.import_jobs import run_import_job
+    from src.models import ImportJob
+
+    session = context['db'].get_session()
+    try:
+        job = ImportJob(root_path=str(context['root']), options='{"recursive": true}')
+        session.add(job)
+        session.commit()
+        job_id = job.id
+    finally:
+        session.close()
+    context['job'] = run_import_job(job_id).to_dict()
+
+
+@when(parsers.parse('файл "{relative}" удалён и каталог пересканирован'))
+def remove_and_rescan(client, context, relative):
+    """Исходный путь записи исчезает."""
+    (context['root'] / relative).unlink()
+    response = client.post(f"/api/watched-folders/{context['folder_id']}/rescan")
+    assert response.status_code == 200
+    assert response.get_json()['vanished'] == 1
+
+
+def _audio_file_id(context, relative):
+    """ID записи по исходному пути."""
+    from src.models import AudioFile
+
+    session = context['db'].get_session()
+    try:
+        return str(session.query(AudioFile).filter_by(file_path=str(context['root'] / relative)).one().id)
+    finally:
+        session.close()
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем HTTP статус."""
+    assert context['response'].status_code == status
+
+
+@then(parsers.parse('должно быть импортировано {count:d} записи'))
+def check_imported(context, count):
+    """Копии не импортируются как новые записи."""
+    assert context['response'].get_json()['imported_count'] == count
+
+
+@then(parsers.parse('"{copy}" должен быть копией записи "{original}"'))
+def check_duplicate(context, copy, original):
+    """Копия указывает на существующую запись."""
+    duplicates = context['response'].get_json()['duplicates']
+    assert duplicates == [{'file': copy, 'duplicate_of': _audio_file_id(context, original)}]
+
+
+@then('копий в ответе нет')
+def check_no_duplicates(context):
+    """Пути копий уже известны и пропускаются."""
+    assert context['response'].get_json()['duplicates'] == []
+
+
+@then(parsers.parse('в БД должно быть {count:d} отпечатка'))
+def check_fingerprints(context, count):
+    """Отпечаток на каждый путь."""
+    from src.models import AudioFingerprint
+
+    session = context['db'].get_session()
+    try:
+        assert session.query(AudioFingerprint).count() == count
+    finally:
+        session.close()
+
+
+@then(parsers.parse('аннотации копии "{copy}" совпадают с аннотациями записи'))
+def check_shared_annotations(client, context, copy):
+    """Копия - ещё один путь той же записи, аннотации общие."""
+    from src.models import AudioFingerprint
+
+    session = context['db'].get_session()
+    try:
+        owner = session.query(AudioFingerprint).filter_by(file_path=str(context['root'] / copy)).one().audio_file_id
+    finally:
+        session.close()
+    response = client.get(f'/api/annotations?audio_file_id={owner}')
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
+
+
+@then(parsers.parse('прочитано не больше {limit:d} байт'))
+def check_read_bytes(context, limit):
+    """Читаются только начальный, средний и конечный блоки."""
+    assert 0 < context['read_bytes'] <= limit
+
+
+@then(parsers.parse('в БД должно быть {count:d} AudioFile со статусом "{status}"'))
+def check_files(context, count, status):
+    """Статусы AudioFile."""
+    from src.models import AudioFile, AudioFileStatus
+
+    session = context['db'].get_session()
+    try:
+        assert session.query(AudioFile).filter_by(status=AudioFileStatus(status)).count() == count
+    finally:
+        session.close()
+
+
+@then(parsers.parse('"{copy}" должен быть отдельной записью'))
+def check_split(context, copy):
+    """Копия с другим содержимым получила свой AudioFile."""
+    from src.models import AudioFingerprint
+
+    copy_id = _audio_file_id(context, copy)
+    session = context['db'].get_session()
+    try:
+        fingerprint = session.query(AudioFingerprint).filter_by(file_path=str(context['root'] / copy)).one()
+        assert str(fingerprint.audio_file_id) == copy_id
+    finally:
+        session.close()
+
+
+@then(parsers.parse('задача импорта должна иметь imported {imported:d} и skipped {skipped:d}'))
+def check_job(context, imported, skipped):
+    """Счётчики задачи."""
+    assert (context['job']['imported'], context['job']['skipped']) == (imported, skipped)
+    assert context['job']['status'] == 'done'
+
+
+@then(parsers.parse('итог сканирования должен содержать copies {count:d}'))
+def check_scan_copies(context, count):
+    """Копия связана с записью при сканировании."""
+    assert context['scan']['copies'] == count
+
+
+@then(parsers.parse('запись "{original}" должна указывать на "{copy}"'))
+def check_moved_to_copy(context, original, copy):
+    """Исчезнувший путь записи заменён оставшейся копией."""
+    from src.models import AudioFile
+
+    session = context['db'].get_session()
+    try:
+        paths = {audio_file.file_path for audio_file in session.query(AudioFile)}
+    finally:
+        session.close()
+    assert str(context['root'] / original) not in paths
+    assert str(context['root'] / copy) in paths
@@ -0,0 +1,223 @@
+"""Step definitions для тестирования ETag / Last-Modified / 304."""
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/http_caching.feature')
+
+SAMPLE_RATE = 22050
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+def _write_signal(file_path, seconds, frequency):
+    """Записываем синус заданной длительности."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    sf.write(str(file_path), 0.5 * np.sin(2 * np.pi * frequency * t), SAMPLE_RATE)
+
+
+def _format_endpoint(context, endpoint):
+    """Подставляем id и версию в endpoint."""
+    endpoint = endpoint.replace('{id}', context['audio_file_id'])
+    return endpoint.replace('{version}', context.get('version', ''))
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой."""
+    from src.models import database
+
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given('в БД существует AudioFile с тестовым сигналом')
+def create_audio_file(context, tmp_path):
+    """Создаём WAV и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    file_path = tmp_path / 'http_cache.wav'
+    _write_signal(file_path, 2, 440)
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='http_cache.wav',
+        duration=2.0,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['file_path'] = file_path
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['endpoint'] = _format_endpoint(context, endpoint)
+    context['first_response'] = client.get(context['endpoint'])
+    context['response'] = context['first_response']
+
+
+@when('я повторяю запрос с заголовком If-None-Match из ответа')
+def repeat_with_if_none_match(context, client):
+    """Повторяем запрос с ETag первого ответа."""
+    etag = context['first_response'].headers['ETag']
+    context['response'] = client.get(context['endpoint'], headers={'If-None-Match': etag})
+
+
+@when('я повторяю запрос с заголовком If-Modified-Since из ответа')
+def repeat_with_if_modified_since(context, client):
+    """Повторяем запрос с Last-Modified первого ответа."""
+    last_modified = context['first_response'].headers['Last-Modified']
+    context['response'] = client.get(
+        context['endpoint'], headers={'If-Modified-Since': last_modified}
+    )
+
+
+@when('исходный аудио-файл становится нечитаемым без изменения mtime')
+def corrupt_source_keep_identity(context):
+    """Портим содержимое, сохраняя размер и mtime - декодирование упадёт."""
+    file_path = context['file_path']
+    stat = file_path.stat()
+    with open(file_path, 'r+b') as f:
+        f.write(b'\x00' * 64)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+@when('исходный файл перезаписывается другим сигналом')
+def rewrite_source(context):
+    """Меняем содержимое и размер файла."""
+    _write_signal(context['file_path'], 3, 880)
+
+
+@when(parsers.parse('я отправляю GET запросы на waveform шириной {first:d} и {second:d}'))
+def send_different_widths(context, client, first, second):
+    """Запросы с разными параметрами."""
+    context['responses'] = [
+        client.get(f"/api/audio/{context['audio_file_id']}/waveform?width={width}")
+        for width in (first, second)
+    ]
+
+
+@when(parsers.parse('я запрашиваю диапазон "{byte_range}" с If-Range из ETag ответа'))
+def request_range_with_current_etag(context, client, byte_range):
+    """Range с актуальным If-Range."""
+    etag = context['first_response'].headers['ETag']
+    context['response'] = client.get(
+        context['endpoint'], headers={'Range': byte_range, 'If-Range': etag}
+    )
+
+
+@when(parsers.parse('я запрашиваю диапазон "{byte_range}" с If-Range "{if_range}"'))
+def request_range_with_stale_etag(context, client, byte_range, if_range):
+    """Range с устаревшим If-Range."""
+    context['response'] = client.get(
+        context['endpoint'],
+        headers={'Range': byte_range, 'If-Range': if_range.replace('\\"', '"')}
+    )
+
+
+@when('я получаю версию AudioFile через API')
+def fetch_version(context, client):
+    """Получаем version из метаданных."""
+    response = client.get(f"/api/audio/{context['audio_file_id']}")
+    assert response.status_code == 200
+    context['version'] = response.get_json()['version']
+    assert context['version']
+
+
+@then(parsers.parse('ответ должен иметь статус {status_code:d}'))
+def check_status_code(context, status_code):
+    """Проверяем статус код."""
+    assert context['response'].status_code == status_code
+
+
+@then('ответ должен иметь строгий ETag')
+def check_strong_etag(context):
+    """ETag присутствует и не слабый."""
+    etag = context['response'].headers.get('ETag')
+    assert etag and not etag.startswith('W/')
+
+
+@then(parsers.parse('ответ должен иметь заголовок "{header}"'))
+def check_header_present(context, header):
+    """Заголовок присутствует."""
+    assert header in context['response'].headers
+
+
+@then(parsers.parse('заголовок "{header}" должен быть равен "{value}"'))
+def check_header_equals(context, header, value):
+    """Заголовок равен значению."""
+    assert context['response'].headers.get(header) == value
+
+
+@then(parsers.parse('заголовок "{header}" должен содержать "{value}"'))
+def check_header_contains(context, header, value):
+    """Заголовок содержит значение."""
+    assert value in context['response'].headers.get(header, '')
+
+
+@then('тело ответа должно быть пустым')
+def check_empty_body(context):
+    """304 без тела."""
+    assert context['response'].get_data() == b''
+
+
+@then('ETag ответов должны различаться')
+def check_different_etags(context):
+    """ETag зависят от параметров."""
+    first, second = context['responses']
+    assert first.headers['ETag'] != second.headers['ETag']
+
+
+@then(parsers.parse('ответ должен содержать ровно {size:d} байт данных'))
+def check_body_size(context, size):
+    """Размер тела."""
+    assert len(context['response'].get_data()) == size
+
+
+@then('ответ должен содержать весь файл')
+def check_full_file(context):
+    """Тело совпадает с файлом."""
+    assert context['response'].get_data() == context['file_path'].read_bytes()
@@ -0,0 +1,265 @@
+"""Step definitions для тестирования фоновых задач импорта."""
+import threading
+import uuid
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/import_jobs.feature')
+
+
+class ServerStopped(BaseException):
+    """Имитация остановки процесса сервера посреди задачи."""
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {'probed': []}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подключаем тестовую БД, фоновое построение STFT отключаем."""
+    from src.audio import import_probe, stft_store
+    from src.models import database
+
+    database._db_instance = test_db
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+
+    original_probe = import_probe.probe_file
+
+    def counted_probe(file_path):
+        context['probed'].append(file_path)
+        return original_probe(file_path)
+
+    monkeypatch.setattr(import_probe, 'probe_file', counted_probe)
+    context['db'] = test_db
+
+
+@given(parsers.parse('каталог импорта с {count:d} записями'))
+def create_folder(context, tmp_path, count):
+    """Короткие WAV файлы."""
+    folder = tmp_path / 'dump'
+    folder.mkdir()
+    for index in range(count):
+        sf.write(str(folder / f'take_{index:02d}.wav'), np.full(800, index / 100), 8000)
+    context['folder'] = folder
+
+
+@given(parsers.parse('задачи импорта обрабатывают пачки по {batch_size:d} файла'))
+def small_batches(monkeypatch, batch_size):
+    """Маленькие пачки, чтобы курсор сохранялся несколько раз."""
+    from src.audio import import_jobs
+
+    monkeypatch.setattr(import_jobs, 'IMPORT_JOB_BATCH_SIZE', batch_size)
+    monkeypatch.setattr(import_jobs, 'IMPORT_WORKERS', 0)
+
+
+@given(parsers.parse('в каталоге импорта есть повреждённый файл "{filename}"'))
+def create_broken(context, filename):
+    """Файл с расширением WAV без аудио данных."""
+    (context['folder'] / filename).write_bytes(b'not a wave file')
+
+
+def _create_job(context):
+    """Задача в БД без постановки в очередь."""
+    from src.models import ImportJob
+
+    session = context['db'].get_session()
+    try:
+        job = ImportJob(root_path=str(context['folder']), options='{"recursive": true}')
+        session.add(job)
+        session.commit()
+        context['job_id'] = str(job.id)
+    finally:
+        session.close()
+
+
+@given('задача импорта прервана остановкой сервера во второй пачке')
+def interrupted_job(context, monkeypatch):
+    """Вторая пачка вставлена как PENDING, метаданные не дочитаны."""
+    from src.audio import import_jobs
+
+    original_probe = import_jobs._JobRunner._probe
+    calls = []
+
+    def stopping_probe(runner, paths):
+        calls.append(paths)
+        if len(calls) == 2:
+            raise ServerStopped()
+        return original_probe(runner, paths)
+
+    _create_job(context)
+    with monkeypatch.context() as patch:
+        patch.setattr(import_jobs._JobRunner, '_probe', stopping_probe)
+        with pytest.raises(ServerStopped):
+            import_jobs.run_import_job(uuid.UUID(context['job_id']))
+    context['first_batch'] = [str(context['folder'] / 'take_00.wav'), str(context['folder'] / 'take_01.wav')]
+    context['probed'].clear()
+
+
+@given('задача импорта отменяется во время первой пачки')
+def cancelled_job(context, monkeypatch):
+    """Отмена приходит из другой сессии, пока задача обрабатывает пачку."""
+    from src.audio import import_jobs
+
+    def cancel_once(rows):
+        # Сессии привязаны к потоку: отмена приходит из потока другого запроса
+        if rows:
+            thread = threading.Thread(target=import_jobs.cancel_import_job, args=(uuid.UUID(context['job_id']),))
+            thread.start()
+            thread.join()
+
+    _create_job(context)
+    monkeypatch.setattr(import_jobs, 'prepare_playback', cancel_once)
+    import_jobs.run_import_job(uuid.UUID(context['job_id']))
+
+
+@when('я отправляю POST запрос на создание задачи импорта')
+def post_job(client, context):
+    """POST /api/import-jobs."""
+    response = client.post('/api/import-jobs', json={'path': str(context['folder']), 'recursive': True})
+    context['response'] = response
+    if response.status_code == 202:
+        context['job_id'] = response.get_json()['id']
+
+
+@when('задача импорта завершилась')
+def wait_job(context):
+    """Ждём фоновый поток."""
+    from src.audio.import_jobs import wait_for_import_job
+
+    wait_for_import_job(context['job_id'], timeout=60)
+
+
+@when('я запрашиваю состояние задачи импорта')
+def get_job(client, context):
+    """GET /api/import-jobs/{id}."""
+    context['response'] = client.get(f"/api/import-jobs/{context['job_id']}")
+
+
+@when(parsers.parse('я запрашиваю задачу импорта "{job_id}"'))
+def get_job_by_id(client, context, job_id):
+    """GET /api/import-jobs/{id} для произвольного ID."""
+    context['response'] = client.get(f'/api/import-jobs/{job_id}')
+
+
+@when('я отправляю POST запрос на отмену задачи импорта')
+def post_cancel(client, context):
+    """POST /api/import-jobs/{id}/cancel."""
+    context['response'] = client.post(f"/api/import-jobs/{context['job_id']}/cancel")
+
+
+@when('сервер возобновляет незавершённые задачи импорта')
+def resume_jobs(context):
+    """Запуск сервера возобновляет задачи PENDING и RUNNING."""
+    from src.audio.import_jobs import resume_import_jobs, wait_for_import_job
+
+    assert resume_import_jobs() == [context['job_id']]
+    wait_for_import_job(context['job_id'], timeout=60)
+
+
+def _job(context):
+    """Задача из БД в виде словаря."""
+    from src.models import ImportJob
+
+    session = context['db'].get_session()
+    try:
+        return ImportJob.get_by_id(session, uuid.UUID(context['job_id'])).to_dict()
+    finally:
+        session.close()
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем HTTP статус."""
+    assert context['response'].status_code == status
+
+
+@then('заголовок Location должен указывать на задачу импорта')
+def check_location(context):
+    """Location ведёт на состояние задачи."""
+    assert context['response'].headers['Location'] == f"/api/import-jobs/{context['job_id']}"
+
+
+@then(parsers.parse('задача импорта должна иметь статус "{status}"'))
+def check_job_status(context, status):
+    """Статус в ответе API."""
+    assert context['response'].status_code == 200
+    assert context['response'].get_json()['status'] == status
+
+
+@then(parsers.parse('задача импорта должна иметь imported {imported:d}, skipped {skipped:d} и failed {failed:d}'))
+def check_counts(context, imported, skipped, failed):
+    """Счётчики в ответе API."""
+    job = context['response'].get_json()
+    assert (job['imported'], job['skipped'], job['failed']) == (imported, skipped, failed)
+    assert job['discovered'] == imported + skipped + failed
+
+
+@then(parsers.parse('курсор задачи должен быть "{cursor}"'))
+def check_cursor(context, cursor):
+    """Курсор - последний обработанный путь."""
+    assert context['response'].get_json()['cursor'] == cursor
+
+
+@then(parsers.parse('ошибки задачи должны указывать файл "{filename}"'))
+def check_errors(context, filename):
+    """Последние ошибки хранятся в задаче."""
+    errors = context['response'].get_json()['errors']
+    assert [error['file'] for error in errors] == [filename]
+
+
+@then(parsers.parse('задача импорта в БД должна иметь статус "{status}"'))
+def check_db_status(context, status):
+    """Статус задачи в БД."""
+    assert _job(context)['status'] == status
+
+
+@then(parsers.parse('в БД должно быть {count:d} AudioFile со статусом "{status}"'))
+def check_files(context, count, status):
+    """Статусы AudioFile."""
+    from src.models import AudioFile, AudioFileStatus
+
+    session = context['db'].get_session()
+    try:
+        assert session.query(AudioFile).filter_by(status=AudioFileStatus(status)).count() == count
+    finally:
+        session.close()
+
+
+@then('метаданные файлов первой пачки повторно не читались')
+def check_not_reprobed(context):
+    """Продолжение после курсора не трогает обработанные файлы."""
+    assert context['probed']
+    assert not set(context['first_batch']) & set(context['probed'])
+    assert len(context['probed']) == 3
@@ -0,0 +1,220 @@
+"""Step definitions для тестирования кэша декодированного PCM."""
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/pcm_cache.feature')
+
+SAMPLE_RATE = 22050
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+def _write_signal(file_path, frequency, seconds=2):
+    """Записываем синус в формате по расширению файла."""
+    t = np.arange(SAMPLE_RATE * seconds) / SAMPLE_RATE
+    sf.write(str(file_path), 0.5 * np.sin(2 * np.pi * frequency * t), SAMPLE_RATE)
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подменяем глобальную БД тестовой."""
+    from src.audio import stft_store
+    from src.models import database
+
+    # Фоновое построение STFT матрицы тоже читает PCM и сбивало бы счётчики
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('в БД существует AudioFile "{filename}"'))
+def create_audio_file(context, tmp_path, filename):
+    """Создаём аудио-файл и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    file_path = tmp_path / filename
+    _write_signal(file_path, 440)
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename=filename,
+        duration=2.0,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['file_path'] = file_path
+
+
+@given('кэш PCM с бюджетом на одну запись')
+def create_small_cache(context, tmp_path):
+    """Отдельный кэш: одна запись 2 с моно int16 = 88200 байт."""
+    from src.audio.pcm_cache import PcmCache
+
+    context['cache'] = PcmCache(tmp_path / 'small_pcm_cache', max_bytes=100000)
+
+
+@given('декодирование PCM завершается ошибкой')
+def failing_decode(monkeypatch):
+    """Декодер падает после первого блока."""
+    from src.audio import pcm_cache
+
+    def blocks():
+        yield np.zeros((1024, 1), dtype=np.float32)
+        raise OSError('ошибка декодирования')
+
+    monkeypatch.setattr(pcm_cache, '_iter_decoded', lambda file_path: (SAMPLE_RATE, 1, blocks()))
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    endpoint = endpoint.replace('{id}', context['audio_file_id'])
+    response = client.get(endpoint)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    # Потоковое тело читается сразу, чтобы чтение аудио произошло внутри шага
+    response.get_data()
+    context['response'] = response
+
+
+@when(parsers.parse('я отправляю DELETE запрос на "{endpoint}"'))
+def send_delete_request(context, client, endpoint):
+    """Отправляем DELETE запрос."""
+    response = client.delete(endpoint.replace('{id}', context['audio_file_id']))
+    assert response.status_code == 200
+
+
+@when('исходный файл перезаписывается другим сигналом')
+def rewrite_source(context):
+    """Меняем содержимое и размер файла."""
+    _write_signal(context['file_path'], 880, seconds=3)
+
+
+@when(parsers.parse('я читаю фреймы с {start:d} по {stop:d} через AudioReader'))
+def read_frames(context, start, stop):
+    """Читаем интервал из середины файла."""
+    from src.audio.reader import get_audio_reader
+
+    with get_audio_reader(str(context['file_path'])) as reader:
+        context['frames'] = reader.read(start, stop)
+    context['interval'] = (start, stop)
+
+
+@when(parsers.parse('я декодирую файлы "{first}" и "{second}"'))
+def decode_files(context, tmp_path, first, second):
+    """Декодируем два файла в маленький кэш."""
+    for index, filename in enumerate((first, second)):
+        file_path = tmp_path / filename
+        _write_signal(file_path, 220 * (index + 1))
+        context['cache'].get_or_decode(str(file_path))
+    context['first_path'] = tmp_path / first
+
+
+@when('я декодирую файл с ошибкой')
+def decode_failing(context):
+    """Декодирование должно пробросить ошибку."""
+    with pytest.raises(OSError):
+        context['cache'].get_or_decode(str(context['file_path']))
+
+
+@then(parsers.parse('метрики PCM кэша должны показывать {misses:d} промахов и {hits:d} попаданий'))
+def check_pcm_metrics(client, misses, hits):
+    """Проверяем счётчики через API метрик."""
+    stats = client.get('/api/metrics').get_json()['pcm_cache']
+    assert stats['misses'] == misses, stats
+    assert stats['hits'] == hits, stats
+
+
+@then(parsers.parse('ответ должен содержать WAV длиной {frames:d} фреймов'))
+def check_wav_frames(context, frames):
+    """Разбираем WAV ответа."""
+    data, sample_rate = sf.read(io.BytesIO(context['response'].get_data()))
+    assert sample_rate == SAMPLE_RATE
+    assert len(data) == frames
+
+
+@then('прочитанные данные должны совпадать с полным декодированием файла')
+def check_random_access(context):
+    """Интервал из memmap совпадает с тем же интервалом полного декодирования."""
+    start, stop = context['interval']
+    full, _ = sf.read(str(context['file_path']), dtype='int16', always_2d=True)
+    expected = full[start:stop].astype(np.float32) / 32768.0
+    assert context['frames'].dtype == np.float32
+    np.testing.assert_array_equal(context['frames'], expected)
+
+
+@then(parsers.parse('запись "{filename}" должна быть вытеснена'))
+def check_evicted(context, filename):
+    """Файлы вытесненной записи удалены с диска."""
+    from src.audio.pcm_cache import make_pcm_key
+
+    cache = context['cache']
+    key = make_pcm_key(str(context['first_path']))
+    assert not (cache.directory / f'{key}.pcm').exists()
+    assert cache.stats()['entries'] == 1
+
+
+@then(parsers.parse('счётчик вытеснений PCM кэша должен быть равен {count:d}'))
+def check_evictions(context, count):
+    """Проверяем счётчик вытеснений."""
+    assert context['cache'].stats()['evictions'] == count
+
+
+@then('в кэше PCM не должно остаться файлов')
+def check_no_pcm_files(context):
+    """Ни записи, ни временного файла."""
+    cache = context['cache']
+    assert not list(cache.directory.iterdir())
+    assert cache.stats()['entries'] == 0
+
+
+@then('в кэше PCM не должно остаться записей файла')
+def check_pcm_entry_removed(context):
+    """Запись файла удалена с диска и из индекса."""
+    from src.audio.pcm_cache import get_pcm_cache, pcm_key_prefix
+
+    cache = get_pcm_cache()
+    assert not list(cache.directory.glob(f'{pcm_key_prefix(str(context["file_path"]))}*'))
+    assert cache.stats()['entries'] == 0
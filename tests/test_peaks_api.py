@@ -0,0 +1,172 @@
+"""Step definitions для тестирования API peaks."""
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/peaks_api.feature')
+
+SAMPLE_RATE = 22050
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой."""
+    from src.models import database
+
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('добавлен стерео аудио-файл длительностью {duration:d} секунд'))
+def add_stereo_audio(context, client, tmp_path, duration):
+    """Создаём WAV (громкий левый и тихий правый канал) и добавляем через API."""
+    t = np.arange(SAMPLE_RATE * duration) / SAMPLE_RATE
+    left = 0.8 * np.sin(2 * np.pi * 440 * t)
+    right = 0.1 * np.sin(2 * np.pi * 220 * t)
+    file_path = tmp_path / 'peaks_api.wav'
+    sf.write(str(file_path), np.column_stack([left, right]), SAMPLE_RATE)
+
+    response = client.post('/api/audio/add', json={'file_path': str(file_path)})
+    assert response.status_code == 201
+    context['audio_file'] = response.get_json()
+    context['audio_file_id'] = context['audio_file']['id']
+
+
+@given('файл audio-player.js загружен')
+def load_audio_player_js(context):
+    """Читаем исходный код плеера."""
+    path = Path(__file__).parent.parent / 'static' / 'js' / 'audio-player.js'
+    context['js_content'] = path.read_text(encoding='utf-8')
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    endpoint = endpoint.replace('{id}', context['audio_file_id'])
+    context['response'] = client.get(endpoint)
+
+
+@when(parsers.parse('я запрашиваю JSON peaks каналов {first:d} и {second:d}'))
+def request_channel_peaks(context, client, first, second):
+    """Запрашиваем peaks двух каналов."""
+    base = f"/api/audio/{context['audio_file_id']}/peaks?format=json&samples_per_pixel=4410"
+    context['channels'] = {
+        channel: client.get(f'{base}&channel={channel}').get_json()
+        for channel in (first, second)
+    }
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_response_status(context, status):
+    """Проверяем статус ответа."""
+    actual_status = context['response'].status_code
+    assert actual_status == status, f"Ожидался статус {status}, получен {actual_status}"
+
+
+@then(parsers.parse('ответ должен содержать {pairs:d} пар min/max в формате {fmt}'))
+def check_binary_pairs(context, pairs, fmt):
+    """Проверяем длину бинарного ответа и заголовки."""
+    response = context['response']
+    dtype = {'f32': '<f4', 'i16': '<i2'}[fmt]
+    data = np.frombuffer(response.get_data(), dtype=dtype)
+    assert len(data) == pairs * 2
+    assert response.headers['X-Peaks-Format'] == fmt
+    assert int(response.headers['X-Peaks-Length']) == pairs
+    assert np.all(data[0::2] <= data[1::2])
+
+
+@then(parsers.parse('заголовок "{header}" должен быть равен длительности файла'))
+def check_duration_header(context, header):
+    """Проверяем длительность в заголовке."""
+    value = float(context['response'].headers[header])
+    assert value == pytest.approx(context['audio_file']['duration'])
+
+
+@then(parsers.parse('JSON ответ должен содержать {pairs:d} пар min/max'))
+def check_json_pairs(context, pairs):
+    """Проверяем JSON ответ."""
+    payload = context['response'].get_json()
+    assert payload['length'] == pairs
+    assert len(payload['data']) == pairs * 2
+    assert payload['sample_rate'] == SAMPLE_RATE
+    context['json_data'] = payload['data']
+
+
+@then('каждый min должен быть не больше соответствующего max')
+def check_min_le_max(context):
+    """Проверяем порядок значений в парах."""
+    data = context['json_data']
+    assert all(low <= high for low, high in zip(data[0::2], data[1::2]))
+
+
+@then(parsers.parse('амплитуда канала {loud:d} должна быть больше амплитуды канала {quiet:d}'))
+def check_channel_amplitude(context, loud, quiet):
+    """Сравниваем максимальные амплитуды каналов."""
+    loud_peak = max(context['channels'][loud]['data'])
+    quiet_peak = max(context['channels'][quiet]['data'])
+    assert loud_peak == pytest.approx(0.8, abs=0.01)
+    assert quiet_peak == pytest.approx(0.1, abs=0.01)
+    assert loud_peak > quiet_peak
+
+
+@then(parsers.parse('плеер должен запрашивать "{path}" перед загрузкой аудио'))
+def check_player_fetches_peaks(context, path):
+    """Проверяем что плеер запрашивает peaks."""
+    content = context['js_content']
+    assert path in content, f'audio-player.js не запрашивает {path}'
+    assert 'fetchAudioPeaks(audioFileId)' in content
+
+
+@then('плеер должен вызывать wavesurfer.load с peaks и длительностью')
+def check_player_passes_peaks(context):
+    """Проверяем вызов load с peaks."""
+    assert 'wavesurfer.load(audioUrl, peaksData.peaks, peaksData.duration)' in context['js_content']
+
+
+@then('WaveSurfer должен воспроизводить через встроенный HTML5 audio без опции backend')
+def check_media_element_backend(context):
+    """Опция backend из v6 в v7 игнорируется и не передаётся."""
+    options = context['js_content'].split('WaveSurfer.create(', 1)[1].split('});', 1)[0]
+    assert 'backend:' not in options
+    assert 'media:' not in options
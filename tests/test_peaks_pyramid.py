@@ -0,0 +1,203 @@
+"""Step definitions для тестирования пирамиды peaks."""
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+from PIL import Image
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/peaks_pyramid.feature')
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой."""
+    from src.models import database
+
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('существует тестовый аудио-файл длительностью {duration:d} секунд'))
+def create_test_audio(context, tmp_path, duration):
+    """Создаём стерео WAV с разным сигналом в каналах."""
+    sample_rate = 22050
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    envelope = 0.2 + 0.7 * np.abs(np.sin(2 * np.pi * 0.1 * t))
+    left = envelope * np.sin(2 * np.pi * 440 * t)
+    right = 0.5 * np.sin(2 * np.pi * 97 * t)
+    file_path = tmp_path / 'peaks_test.wav'
+    sf.write(str(file_path), np.column_stack([left, right]), sample_rate)
+    context['test_file_path'] = str(file_path)
+
+
+@when(parsers.parse('я добавляю файл через POST "{endpoint}"'))
+def add_audio_file(context, client, endpoint):
+    """Добавляем файл через API и ждём фоновое построение пирамиды."""
+    from src.audio.peaks import wait_for_peaks
+
+    response = client.post(endpoint, json={'file_path': context['test_file_path']})
+    context['response'] = response
+    if response.status_code == 201:
+        context['audio_file_id'] = response.get_json()['id']
+        wait_for_peaks(context['audio_file_id'], timeout=30)
+
+
+@when(parsers.parse('я читаю огибающую на {bins:d} бинов из пирамиды'))
+def read_pyramid_envelope(context, bins):
+    """Читаем огибающую через пирамиду."""
+    from src.audio.peaks import load_peaks
+
+    pyramid = load_peaks(context['audio_file_id'], context['test_file_path'])
+    assert pyramid is not None, 'Пирамида не загрузилась'
+    context['bins'] = bins
+    context['pyramid_envelope'] = pyramid.read_envelope(bins, mono=False)
+
+
+@when(parsers.parse('я читаю моно огибающую на {bins:d} бинов из пирамиды'))
+def read_pyramid_mono_envelope(context, bins):
+    """Читаем моно сведение из пирамиды."""
+    from src.audio.peaks import load_peaks
+
+    pyramid = load_peaks(context['audio_file_id'], context['test_file_path'])
+    assert pyramid is not None, 'Пирамида не загрузилась'
+    context['bins'] = bins
+    context['pyramid_envelope'] = pyramid.read_envelope(bins, mono=True)
+
+
+@when('исходный файл перезаписывается')
+def rewrite_source_file(context):
+    """Перезаписываем файл другим содержимым."""
+    sf.write(context['test_file_path'], np.zeros((1000, 2)), 22050)
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    endpoint = endpoint.replace('{id}', context['audio_file_id'])
+    context['response'] = client.get(endpoint)
+
+
+@when(parsers.parse('я отправляю DELETE запрос на "{endpoint}"'))
+def send_delete_request(context, client, endpoint):
+    """Отправляем DELETE запрос."""
+    endpoint = endpoint.replace('{id}', context['audio_file_id'])
+    context['response'] = client.delete(endpoint)
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_response_status(context, status):
+    """Проверяем статус ответа."""
+    actual_status = context['response'].status_code
+    assert actual_status == status, f"Ожидался статус {status}, получен {actual_status}"
+
+
+@then('для AudioFile должна существовать пирамида peaks')
+def check_pyramid_exists(context):
+    """Проверяем наличие файла пирамиды рядом с БД."""
+    from src.audio.peaks import get_peaks_path
+
+    assert get_peaks_path(context['audio_file_id']).exists()
+
+
+@then('для AudioFile не должна существовать пирамида peaks')
+def check_pyramid_removed(context):
+    """Проверяем что файл пирамиды удалён."""
+    from src.audio.peaks import get_peaks_path
+
+    assert not get_peaks_path(context['audio_file_id']).exists()
+
+
+@then(parsers.parse('пирамида должна содержать уровни {levels} сэмплов на бин'))
+def check_pyramid_levels(context, levels):
+    """Проверяем набор уровней и их размеры."""
+    from src.audio.peaks import load_peaks
+
+    expected = [int(level) for level in levels.split(', ')]
+    pyramid = load_peaks(context['audio_file_id'], context['test_file_path'])
+    assert [level.samples_per_bin for level in pyramid.levels] == expected
+    for level in pyramid.levels:
+        # Два канала и моно сведение
+        assert level.data.shape == (-(-pyramid.frames // level.samples_per_bin), 3, 3)
+
+
+@then('огибающая из пирамиды должна совпадать с огибающей по файлу')
+def check_pyramid_matches_file(context):
+    """Сравниваем огибающую из пирамиды с огибающей по файлу с учётом квантования."""
+    from src.audio.envelope import compute_envelope
+
+    reference = compute_envelope(context['test_file_path'], context['bins'], mono=False)
+    envelope = context['pyramid_envelope']
+    assert envelope.mins.shape == reference.mins.shape
+    # Границы бинов пирамиды не совпадают с границами пикселей, поэтому
+    # допускаем расхождение на величину изменения сигнала внутри одного бина уровня
+    np.testing.assert_allclose(envelope.mins, reference.mins, atol=0.05)
+    np.testing.assert_allclose(envelope.maxs, reference.maxs, atol=0.05)
+    np.testing.assert_allclose(envelope.rms, reference.rms, atol=0.05)
+
+
+@then('моно огибающая из пирамиды должна совпадать с моно огибающей по файлу')
+def check_pyramid_mono_matches_file(context):
+    """Каналы сводятся до свёртки в обоих путях, а не усредняются их min/max."""
+    from src.audio.envelope import compute_envelope
+
+    reference = compute_envelope(context['test_file_path'], context['bins'], mono=True)
+    envelope = context['pyramid_envelope']
+    assert envelope.mins.shape == reference.mins.shape == (context['bins'], 1)
+    np.testing.assert_allclose(envelope.mins, reference.mins, atol=0.05)
+    np.testing.assert_allclose(envelope.maxs, reference.maxs, atol=0.05)
+    np.testing.assert_allclose(envelope.rms, reference.rms, atol=0.05)
+
+
+@then('пирамида peaks не должна загружаться')
+def check_pyramid_stale(context):
+    """Проверяем что устаревшая пирамида не используется."""
+    from src.audio.peaks import load_peaks
+
+    assert load_peaks(context['audio_file_id'], context['test_file_path']) is None
+
+
+@then('ответ должен содержать PNG изображение')
+def check_response_is_png(context):
+    """Проверяем что ответ содержит PNG."""
+    data = context['response'].get_data()
+    assert Image.open(io.BytesIO(data)).format == 'PNG'
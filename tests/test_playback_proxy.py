@@ -0,0 +1,253 @@
+"""Step definitions для тестирования proxy воспроизведения."""
+import io
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/playback_proxy.feature')
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой."""
+    from src.models import database
+
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse(
+    'существует {channels:d}-канальный WAV на {sample_rate:d} Гц длительностью {seconds:d} секунды '
+    'со щелчком на {click:f} секунде'
+))
+def create_source(context, tmp_path, channels, sample_rate, seconds, click):
+    """Тихий шум и короткий щелчок во всех каналах."""
+    rng = np.random.RandomState(0)
+    signal = (0.01 * rng.randn(sample_rate * seconds, channels)).astype(np.float32)
+    click_frame = int(click * sample_rate)
+    signal[click_frame:click_frame + sample_rate // 1000] = 0.9
+    file_path = tmp_path / 'field_recording.wav'
+    sf.write(str(file_path), signal, sample_rate)
+    context['file_path'] = file_path
+    context['click'] = click
+    context['duration'] = float(seconds)
+
+
+@given(parsers.parse('порог размера для proxy равен {size:d} байту'))
+@given(parsers.parse('порог размера для proxy равен {size:d} байт'))
+def set_proxy_threshold(monkeypatch, size):
+    """Меняем порог размера файла для построения proxy."""
+    from src.audio import proxy
+
+    monkeypatch.setattr(proxy, 'PLAYBACK_PROXY_MIN_BYTES', size)
+
+
+@given(parsers.parse('файл добавлен и для него построен proxy в формате "{proxy_format}"'))
+def add_file_with_proxy(context, client, monkeypatch, proxy_format):
+    """Добавляем файл и синхронно строим proxy."""
+    from src.audio import proxy
+
+    monkeypatch.setattr(proxy, 'PLAYBACK_PROXY_MIN_BYTES', 10 ** 12)
+    add_file(context, client)
+    result = proxy.build_proxy(context['audio_file_id'], proxy_format)
+    assert result.status.value == 'ready', result.error_message
+    context['proxy_path'] = result.file_path
+
+
+@given('кодирование proxy завершается ошибкой')
+def failing_transcode(monkeypatch):
+    """Кодирование падает после открытия временного файла."""
+    from src.audio import proxy
+
+    def fail(*args, **kwargs):
+        raise OSError('ошибка чтения')
+        yield
+
+    monkeypatch.setattr(proxy, 'iter_segment_blocks', fail)
+
+
+@when('я добавляю файл через POST "/api/audio/add"')
+def add_file(context, client):
+    """Добавляем файл через API."""
+    response = client.post('/api/audio/add', json={'file_path': str(context['file_path'])})
+    assert response.status_code == 201
+    context['audio_file_id'] = response.get_json()['id']
+
+
+@when('построение proxy завершено')
+def wait_proxy(context):
+    """Ждём фоновую задачу."""
+    from src.audio.proxy import wait_for_proxy
+
+    wait_for_proxy(context['audio_file_id'], timeout=60)
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['response'] = client.get(endpoint.replace('{id}', context['audio_file_id']))
+
+
+@when(parsers.parse('я отправляю POST запрос на "{endpoint}" с форматом "{proxy_format}"'))
+def send_post_request(context, client, endpoint, proxy_format):
+    """Запускаем построение вручную."""
+    context['response'] = client.post(
+        endpoint.replace('{id}', context['audio_file_id']), json={'format': proxy_format}
+    )
+
+
+@when(parsers.parse('я отправляю DELETE запрос на "{endpoint}"'))
+def send_delete_request(context, client, endpoint):
+    """Удаляем AudioFile."""
+    context['response'] = client.delete(endpoint.replace('{id}', context['audio_file_id']))
+    assert context['response'].status_code == 200
+
+
+@when('исходный файл перезаписывается')
+def rewrite_source(context):
+    """Меняем размер и mtime исходного файла."""
+    data, sample_rate = sf.read(str(context['file_path']))
+    sf.write(str(context['file_path']), data[: len(data) // 2], sample_rate)
+
+
+@when('я перекодирую файл в proxy с ошибкой')
+def transcode_failing(context, tmp_path):
+    """Перекодирование должно пробросить ошибку."""
+    from src.audio.proxy import transcode_proxy
+
+    context['proxy_path'] = tmp_path / 'proxy' / 'field_recording.flac'
+    context['proxy_path'].parent.mkdir()
+    with pytest.raises(OSError):
+        transcode_proxy(str(context['file_path']), context['proxy_path'], 'flac')
+
+
+@then(parsers.parse('GET "/api/audio/{{id}}/proxy" должен вернуть статус "{status}"'))
+def check_proxy_status(context, client, status):
+    """Статус proxy через API."""
+    response = client.get(f"/api/audio/{context['audio_file_id']}/proxy")
+    assert response.status_code == 200
+    context['proxy'] = response.get_json()
+    assert context['proxy']['status'] == status, context['proxy']
+
+
+@then('GET "/api/audio/{id}/proxy" должен вернуть 404')
+def check_no_proxy(context, client):
+    """Proxy не создавался."""
+    assert client.get(f"/api/audio/{context['audio_file_id']}/proxy").status_code == 404
+
+
+@then(parsers.parse('proxy должен быть моно с частотой {sample_rate:d}'))
+def check_proxy_format(context, sample_rate):
+    """Параметры proxy."""
+    assert context['proxy']['channels'] == 1
+    assert context['proxy']['sample_rate'] == sample_rate
+
+
+@then('длительность proxy должна совпадать с исходной')
+def check_proxy_duration(context):
+    """Длительность совпадает с точностью до фрейма."""
+    info = sf.info(context['proxy_path'])
+    assert abs(info.frames / info.samplerate - context['duration']) <= 1 / info.samplerate
+
+
+@then(parsers.parse('щелчок в proxy должен быть на {seconds:f} секунде с точностью {tolerance:d} мс'))
+def check_click_alignment(context, seconds, tolerance):
+    """Временные метки исходного файла и proxy совпадают."""
+    data, sample_rate = sf.read(context['proxy_path'])
+    position = np.argmax(np.abs(data)) / sample_rate
+    assert abs(position - seconds) <= tolerance / 1000
+
+
+@then(parsers.parse('ответ должен иметь статус {status_code:d}'))
+def check_status_code(context, status_code):
+    """Проверяем статус код."""
+    assert context['response'].status_code == status_code
+
+
+@then(parsers.parse('заголовок "{header}" должен быть равен "{value}"'))
+def check_header_equals(context, header, value):
+    """Заголовок равен значению."""
+    assert context['response'].headers.get(header) == value
+
+
+@then(parsers.parse('заголовок "{header}" должен содержать "{value}"'))
+def check_header_contains(context, header, value):
+    """Заголовок содержит значение."""
+    assert value in context['response'].headers.get(header, '')
+
+
+@then('тело ответа должно быть меньше исходного файла')
+def check_smaller(context):
+    """Proxy компактнее исходного файла и декодируется."""
+    body = context['response'].get_data()
+    assert len(body) < context['file_path'].stat().st_size
+    assert sf.info(io.BytesIO(body)).channels == 1
+
+
+@then('файл proxy должен быть удалён')
+def check_proxy_file_removed(context):
+    """Файл proxy удалён с диска."""
+    assert not os.path.exists(context['proxy_path'])
+
+
+@then('запись PlaybackProxy должна быть удалена')
+def check_proxy_row_removed(context):
+    """Запись удалена каскадно."""
+    import uuid
+
+    from src.models import PlaybackProxy
+
+    session = context['db'].get_session()
+    try:
+        proxy = PlaybackProxy.get_by_audio_file(session, uuid.UUID(context['audio_file_id']))
+        assert proxy is None
+    finally:
+        session.close()
+
+
+@then('рядом с proxy не должно остаться временных файлов')
+def check_no_proxy_tmp(context):
+    """Ни proxy, ни временного файла."""
+    assert not context['proxy_path'].exists()
+    assert not list(context['proxy_path'].parent.iterdir())
@@ -0,0 +1,148 @@
+"""Step definitions для тестирования растрового рендерера."""
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+from PIL import Image
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/raster_renderer.feature')
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой."""
+    from src.models import database
+
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given('в БД существует AudioFile с тестовым сигналом')
+def create_audio_file(context, tmp_path):
+    """Создаём WAV и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    sample_rate = 22050
+    t = np.arange(sample_rate * 3) / sample_rate
+    signal = 0.6 * np.sin(2 * np.pi * 440 * t)
+    file_path = tmp_path / 'raster.wav'
+    sf.write(str(file_path), signal, sample_rate)
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='raster.wav',
+        duration=3.0,
+        sample_rate=sample_rate,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    endpoint = endpoint.replace('{id}', context['audio_file_id'])
+    context['response'] = client.get(endpoint)
+
+
+@when(parsers.parse('я получаю LUT палитры "{color_map}" дважды'))
+def get_lut_twice(context, color_map):
+    """Запрашиваем LUT два раза."""
+    from src.audio.raster import get_colormap_lut
+
+    context['luts'] = [get_colormap_lut(color_map), get_colormap_lut(color_map)]
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_response_status(context, status):
+    """Проверяем статус ответа."""
+    actual_status = context['response'].status_code
+    assert actual_status == status, f"Ожидался статус {status}, получен {actual_status}"
+
+
+@then(parsers.parse('PNG изображение должно иметь размер {width:d}x{height:d}'))
+def check_image_size(context, width, height):
+    """Проверяем точный размер изображения."""
+    image = Image.open(io.BytesIO(context['response'].get_data()))
+    assert image.format == 'PNG'
+    assert image.size == (width, height)
+
+
+@then(parsers.parse('изображение должно содержать пиксели цвета "{color}"'))
+def check_image_color(context, color):
+    """Проверяем что контур waveform нарисован запрошенным цветом."""
+    image = np.array(Image.open(io.BytesIO(context['response'].get_data())).convert('RGB'))
+    rgb = [int(color[i:i + 2], 16) for i in range(0, 6, 2)]
+    assert np.any(np.all(image == rgb, axis=-1)), f'Нет пикселей цвета {color}'
+
+
+@then(parsers.parse('LUT должна иметь {entries:d} RGBA записей'))
+def check_lut_shape(context, entries):
+    """Проверяем размер LUT."""
+    lut = context['luts'][0]
+    assert lut.shape == (entries, 4)
+    assert lut.dtype == np.uint8
+
+
+@then('повторный запрос должен вернуть тот же объект LUT')
+def check_lut_cached(context):
+    """LUT считается один раз."""
+    first, second = context['luts']
+    assert first is second
+
+
+@then('модули waveform.py и spectrogram.py не должны импортировать matplotlib на уровне модуля')
+def check_no_module_level_matplotlib():
+    """Импорт matplotlib допустим только внутри функций рендеринга через matplotlib."""
+    audio_dir = Path(__file__).parent.parent / 'src' / 'audio'
+    for name in ('waveform.py', 'spectrogram.py', 'raster.py'):
+        lines = (audio_dir / name).read_text(encoding='utf-8').splitlines()
+        top_level = [
+            line for line in lines
+            if line.startswith(('import matplotlib', 'from matplotlib', 'import librosa.display'))
+        ]
+        assert not top_level, f'{name} импортирует matplotlib на уровне модуля: {top_level}'
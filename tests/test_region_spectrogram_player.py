@@ -71,22 +71,21 @@ def check_region_audio_logic(context):
 @then('под отдельной waveform отображается спектрограмма')
 def check_region_spectrogram_element(context):
     """Проверяем наличие элемента для спектрограммы."""
-    # Спектрограмма рисуется внутри контейнера, проверяем контейнер
-    # assert context['html'].find(id='region-spectrogram') is not None
-    # Так как div удален, проверяем что плагин инициализируется
+    # Спектрограмма рисуется на canvas внутри отдельного контейнера
+    assert context['html'].find(id='region-spectrogram') is not None
     script_path = Path('static/js/region-spectrogram-player.js')
     if script_path.exists():
         content = script_path.read_text(encoding='utf-8')
-        assert 'WaveSurfer.Spectrogram.create' in content
+        assert 'new SpectrogramCanvas' in content
 
 
 @then('спектрограмма визуализирует частотный спектр региона')
 def check_spectrogram_plugin_init(context):
-    """Проверяем инициализацию плагина спектрограммы."""
-    script_path = Path('static/js/region-spectrogram-player.js')
+    """Проверяем загрузку данных спектрограммы региона."""
+    script_path = Path('static/js/spectrogram-canvas.js')
     if script_path.exists():
         content = script_path.read_text(encoding='utf-8')
-        assert 'WaveSurfer.Spectrogram.create' in content
+        assert '/spectrogram/data' in content
 
 
 @given('пользователь выделил регион на waveform')
@@ -227,11 +226,11 @@ def given_spectrogram_visible(context, client):
 
 @then('спектрограмма использует colorMap по умолчанию')
 def check_colormap(context):
-    """Проверяем colorMap."""
-    script_path = Path('static/js/region-spectrogram-player.js')
+    """Проверяем палитру: раскраска на клиенте через LUT."""
+    script_path = Path('static/js/spectrogram-canvas.js')
     if script_path.exists():
         content = script_path.read_text(encoding='utf-8')
-        assert 'colorMap' in content
+        assert 'buildLut' in content
 
 
 @then('спектрограмма отображает frequency labels')
@@ -256,10 +255,10 @@ def check_height(context):
 @then('используется mel или linear scale для частот')
 def check_scale(context):
     """Проверяем scale."""
-    script_path = Path('static/js/region-spectrogram-player.js')
+    script_path = Path('static/js/spectrogram-canvas.js')
     if script_path.exists():
         content = script_path.read_text(encoding='utf-8')
-        assert 'scale:' in content
+        assert 'setFrequencyRange' in content
 
 
 @given('region player воспроизводит аудио')
@@ -0,0 +1,204 @@
+"""Step definitions для тестирования дискового кэша отрисовок."""
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/render_cache.feature')
+
+SAMPLE_RATE = 22050
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+def _write_signal(file_path, frequency):
+    """Записываем 2 секунды синуса."""
+    t = np.arange(SAMPLE_RATE * 2) / SAMPLE_RATE
+    sf.write(str(file_path), 0.5 * np.sin(2 * np.pi * frequency * t), SAMPLE_RATE)
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой."""
+    from src.models import database
+
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given('в БД существует AudioFile с тестовым сигналом')
+def create_audio_file(context, tmp_path):
+    """Создаём WAV и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    file_path = tmp_path / 'cached.wav'
+    _write_signal(file_path, 440)
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='cached.wav',
+        duration=2.0,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['file_path'] = file_path
+
+
+@given(parsers.parse('кэш с бюджетом {max_bytes:d} байт'))
+def create_small_cache(context, tmp_path, max_bytes):
+    """Создаём отдельный экземпляр кэша."""
+    from src.audio.render_cache import RenderCache
+
+    context['cache_dir'] = tmp_path / 'small_cache'
+    context['cache'] = RenderCache(context['cache_dir'], max_bytes=max_bytes)
+
+
+@when(parsers.parse('я дважды отправляю GET запрос на "{endpoint}"'))
+def send_request_twice(context, client, endpoint):
+    """Отправляем одинаковый запрос два раза."""
+    endpoint = endpoint.replace('{id}', context['audio_file_id'])
+    context['responses'] = [client.get(endpoint), client.get(endpoint)]
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    endpoint = endpoint.replace('{id}', context['audio_file_id'])
+    response = client.get(endpoint)
+    assert response.status_code == 200
+
+
+@when(parsers.parse('я отправляю GET запросы на waveform шириной {first:d} и {second:d}'))
+def send_different_widths(context, client, first, second):
+    """Запросы с разными параметрами."""
+    for width in (first, second):
+        response = client.get(f"/api/audio/{context['audio_file_id']}/waveform?width={width}")
+        assert response.status_code == 200
+
+
+@when(parsers.parse('я отправляю DELETE запрос на "{endpoint}"'))
+def send_delete_request(context, client, endpoint):
+    """Отправляем DELETE запрос."""
+    response = client.delete(endpoint.replace('{id}', context['audio_file_id']))
+    assert response.status_code == 200
+
+
+@when('исходный файл перезаписывается другим сигналом')
+def rewrite_source(context):
+    """Меняем содержимое и размер файла."""
+    t = np.arange(SAMPLE_RATE * 3) / SAMPLE_RATE
+    sf.write(str(context['file_path']), 0.9 * np.sin(2 * np.pi * 880 * t), SAMPLE_RATE)
+
+
+@when(parsers.parse('я сохраняю записи "{first}", "{second}" по {size:d} байт'))
+def put_two_entries(context, first, second, size):
+    """Сохраняем две записи."""
+    for key in (first, second):
+        context['cache'].put(key * 64, b'x' * size)
+
+
+@when(parsers.parse('я сохраняю запись "{key}" размером {size:d} байт'))
+def put_entry(context, key, size):
+    """Сохраняем одну запись."""
+    context['cache'].put(key * 64, b'x' * size)
+
+
+@when(parsers.parse('я читаю запись "{key}"'))
+def read_entry(context, key):
+    """Читаем запись, обновляя её позицию в LRU."""
+    assert context['cache'].get(key * 64) is not None
+
+
+@when('кэш создаётся заново для того же каталога')
+def recreate_cache(context):
+    """Создаём новый экземпляр кэша, как после перезапуска."""
+    from src.audio.render_cache import RenderCache
+
+    context['cache'] = RenderCache(context['cache_dir'], max_bytes=1000)
+
+
+@then('оба ответа должны иметь статус 200 и одинаковое содержимое')
+def check_same_responses(context):
+    """Ответы совпадают побайтно."""
+    first, second = context['responses']
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.get_data() == second.get_data()
+
+
+@then(parsers.parse('метрики кэша должны показывать {hits:d} попаданий и {misses:d} промахов'))
+def check_cache_metrics(context, client, hits, misses):
+    """Проверяем счётчики через API метрик."""
+    stats = client.get('/api/metrics').get_json()['render_cache']
+    assert stats['hits'] == hits, stats
+    assert stats['misses'] == misses, stats
+
+
+@then(parsers.parse('запись "{key}" должна быть вытеснена'))
+def check_evicted(context, key):
+    """Запись отсутствует в кэше и на диске."""
+    cache = context['cache']
+    assert cache.get(key * 64) is None
+    assert not cache._path_for(key * 64).exists()
+
+
+@then(parsers.parse('записи "{first}" и "{second}" должны остаться в кэше'))
+def check_entries_present(context, first, second):
+    """Записи доступны."""
+    for key in (first, second):
+        assert context['cache'].get(key * 64) == b'x' * 100
+
+
+@then(parsers.parse('счётчик вытеснений должен быть равен {count:d}'))
+def check_evictions(context, count):
+    """Проверяем счётчик вытеснений."""
+    assert context['cache'].stats()['evictions'] == count
+
+
+@then('в кэше отрисовок не должно остаться записей файла')
+def check_file_entries_removed(context):
+    """Записи файла удалены с диска и из индекса."""
+    from src.audio.render_cache import file_key_prefix, get_render_cache
+
+    cache = get_render_cache()
+    prefix = file_key_prefix(str(context['file_path']))
+    assert not list(cache.directory.glob(f'*/{prefix}*'))
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,238 @@
+"""Step definitions для тестирования фоновых задач отрисовки."""
+import io
+import json
+import uuid
+
+import numpy as np
+import pytest
+import soundfile as sf
+from PIL import Image
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/render_jobs.feature')
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подменяем глобальную БД тестовой."""
+    from src.audio import stft_store
+    from src.models import database
+
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('в БД существует AudioFile длительностью {duration:d} секунд'))
+def create_audio_file(context, tmp_path, duration):
+    """Создаём WAV с нарастающим тоном и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    t = np.arange(SAMPLE_RATE * duration) / SAMPLE_RATE
+    signal = 0.5 * np.sin(2 * np.pi * (200 + 50 * t) * t)
+    file_path = tmp_path / 'long.wav'
+    sf.write(str(file_path), signal, SAMPLE_RATE)
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='long.wav',
+        duration=float(duration),
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['file_path'] = str(file_path)
+
+
+@given(parsers.parse('в БД существует задача в статусе "{status}" с прогрессом {progress:d}'))
+def create_job_record(context, status, progress):
+    """Запись задачи без запуска в очереди."""
+    from src.models import RenderJob, RenderJobStatus
+
+    job = RenderJob(
+        audio_file_id=uuid.UUID(context['audio_file_id']),
+        kind='spectrogram',
+        params='{}',
+        status=RenderJobStatus(status),
+        progress=float(progress),
+    )
+    context['session'].add(job)
+    context['session'].commit()
+    context['job_id'] = str(job.id)
+
+
+@when(parsers.parse('я создаю задачу "{kind}" с параметрами {params}'))
+def create_job(context, client, kind, params):
+    """POST /api/render-jobs."""
+    response = client.post('/api/render-jobs', json={
+        'audio_file_id': context['audio_file_id'],
+        'kind': kind,
+        'params': json.loads(params),
+    })
+    context['response'] = response
+    context['kind'] = kind
+    context['params'] = json.loads(params)
+    if response.status_code == 202:
+        context['job_id'] = response.get_json()['id']
+
+
+@when('задача завершается')
+def wait_job(context):
+    """Ждём фоновый поток задачи."""
+    from src.audio.render_jobs import wait_for_render_job
+
+    wait_for_render_job(context['job_id'], timeout=60)
+
+
+@when('сервер возобновляет прерванные задачи отрисовки')
+def resume_jobs(context):
+    """Запуск сервера ставит незавершённые задачи в очередь."""
+    from src.audio.render_jobs import resume_render_jobs
+
+    assert resume_render_jobs() == [context['job_id']]
+
+
+@when('я запрашиваю состояние задачи')
+def get_job(context, client):
+    """GET /api/render-jobs/{id}."""
+    context['response'] = client.get(f"/api/render-jobs/{context['job_id']}")
+
+
+@when(parsers.parse('я запрашиваю состояние задачи "{job_id}"'))
+def get_unknown_job(context, client, job_id):
+    """GET /api/render-jobs/{id} для произвольного ID."""
+    context['response'] = client.get(f'/api/render-jobs/{job_id}')
+
+
+@when('я скачиваю результат задачи')
+def download_job(context, client):
+    """GET /api/render-jobs/{id}/download."""
+    context['response'] = client.get(f"/api/render-jobs/{context['job_id']}/download")
+
+
+@when(parsers.parse('я отрисовываю "{kind}" с записью прогресса'))
+def render_with_progress(context, kind):
+    """Вызываем функцию отрисовки задачи напрямую и записываем прогресс."""
+    from src.audio.render_jobs import normalize_job_params, render_job_image
+
+    # Мелкий hop даёт несколько блоков STFT по BUILD_CHUNK_FRAMES кадров
+    params = {'width': 2000, 'hop_length': 128} if kind == 'spectrogram' else {'width': 2000}
+    fractions = []
+    render_job_image(
+        kind, context['file_path'], normalize_job_params(kind, params),
+        progress=fractions.append
+    )
+    context['fractions'] = fractions
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем HTTP статус."""
+    assert context['response'].status_code == status, context['response'].get_data(as_text=True)
+
+
+@then(parsers.parse('ответ должен содержать задачу в статусе "{status}" с заголовком Location'))
+def check_created(context, status):
+    """Проверяем тело ответа POST."""
+    data = context['response'].get_json()
+    assert data['status'] in (status, 'running', 'done')
+    assert data['kind'] == context['kind']
+    assert data['params']['width'] == context['params']['width']
+    assert context['response'].headers['Location'] == f"/api/render-jobs/{data['id']}"
+
+
+@then(parsers.parse('задача должна быть в статусе "{status}" с прогрессом {progress:d}'))
+def check_job_status(context, status, progress):
+    """Проверяем статус и прогресс задачи."""
+    data = context['response'].get_json()
+    assert data['status'] == status
+    assert data['progress'] == progress
+    assert data['file_size'] > 0
+
+
+@then(parsers.parse('задача должна быть в статусе "{status}" с сообщением об ошибке'))
+def check_job_error(context, status):
+    """Проверяем ошибку задачи."""
+    data = context['response'].get_json()
+    assert data['status'] == status
+    assert data['error_message']
+
+
+@then(parsers.parse('результат должен быть PNG размером {width:d}x{height:d}'))
+def check_png_size(context, width, height):
+    """Проверяем размер изображения."""
+    assert context['response'].mimetype == 'image/png'
+    assert 'attachment' in context['response'].headers['Content-Disposition']
+    image = Image.open(io.BytesIO(context['response'].data))
+    assert image.size == (width, height)
+
+
+@then('результат должен совпадать с синхронной отрисовкой')
+def check_same_as_sync(context):
+    """Задача использует тот же путь генерации, что и GET /spectrogram."""
+    from src.audio.render_jobs import normalize_job_params
+    from src.audio.spectrogram import SpectrogramParams, generate_spectrogram
+
+    params = SpectrogramParams(**normalize_job_params('spectrogram', context['params']))
+    assert context['response'].data == generate_spectrogram(context['file_path'], params)
+
+
+@then('прогресс должен расти от блока к блоку и закончиться на 1.0')
+def check_progress(context):
+    """Прогресс монотонный, с промежуточными значениями."""
+    fractions = context['fractions']
+    assert len(fractions) > 1
+    assert all(b >= a for a, b in zip(fractions, fractions[1:]))
+    assert 0 < fractions[0] < 1
+    assert fractions[-1] == pytest.approx(1.0)
+
+
+@then(parsers.parse('ответ должен содержать прогресс {progress:d}'))
+def check_conflict_progress(context, progress):
+    """409 сообщает текущее состояние задачи."""
+    data = context['response'].get_json()
+    assert data['progress'] == progress
+    assert data['status'] == 'running'
@@ -0,0 +1,286 @@
+"""Step definitions для тестирования пула процессов отрисовки."""
+import threading
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/render_pool.feature')
+
+SAMPLE_RATE = 16000
+DURATION = 1.0
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    context = {}
+    yield context
+    for thread in context.get('threads', []):
+        thread.join()
+    if 'pool' in context:
+        context['pool'].shutdown()
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подменяем глобальную БД тестовой."""
+    from src.audio import stft_store
+    from src.models import database
+
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('в БД существует AudioFile с тоном {frequency:d} Гц'))
+def create_audio_file(context, tmp_path, frequency):
+    """Создаём WAV с синусом и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    t = np.arange(int(SAMPLE_RATE * DURATION)) / SAMPLE_RATE
+    file_path = tmp_path / 'tone.wav'
+    sf.write(str(file_path), 0.5 * np.sin(2 * np.pi * frequency * t), SAMPLE_RATE)
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='tone.wav',
+        duration=DURATION,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['file_path'] = str(file_path)
+
+
+@given('в БД существует сжатый AudioFile')
+def create_compressed_file(context, tmp_path):
+    """Создаём OGG и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    t = np.arange(int(SAMPLE_RATE * DURATION)) / SAMPLE_RATE
+    file_path = tmp_path / 'tone.ogg'
+    sf.write(str(file_path), 0.5 * np.sin(2 * np.pi * 440 * t), SAMPLE_RATE, format='OGG', subtype='VORBIS')
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='tone.ogg',
+        duration=DURATION,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['ogg_id'] = str(audio_file.id)
+    context['ogg_path'] = str(file_path)
+
+
+@given(parsers.parse('пул отрисовки из {processes:d} процесса'))
+def create_pool(context, processes):
+    """Настоящий пул процессов."""
+    from src.audio.render_pool import RenderPool
+
+    context['pool'] = RenderPool(processes=processes, queue_size=4, timeout=60)
+
+
+@given(parsers.parse('пул отрисовки из {processes:d} процесса без очереди'))
+def create_pool_without_queue(context, processes):
+    """Пул, принимающий задач не больше, чем у него процессов."""
+    from src.audio.render_pool import RenderPool
+
+    context['pool'] = RenderPool(processes=processes, queue_size=0, timeout=60)
+
+
+@given(parsers.parse('пул отрисовки из {processes:d} процесса с таймаутом {timeout:f} секунды'))
+def create_pool_with_timeout(context, processes, timeout):
+    """Пул с коротким таймаутом задачи."""
+    from src.audio.render_pool import RenderPool
+
+    context['pool'] = RenderPool(processes=processes, queue_size=4, timeout=timeout)
+
+
+def occupy(context, seconds):
+    """Занимает пул долгой задачей в фоновом потоке."""
+    pool = context['pool']
+    thread = threading.Thread(target=pool.run, args=(time.sleep, seconds))
+    thread.start()
+    context.setdefault('threads', []).append(thread)
+    deadline = time.monotonic() + 5
+    while pool.stats()['in_flight'] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@given('глобальный пул отрисовки заполнен')
+def saturate_global_pool(context, monkeypatch):
+    """Подменяем глобальный пул занятым пулом без очереди."""
+    from src.audio import render_pool
+
+    context['pool'] = render_pool.RenderPool(processes=1, queue_size=0, timeout=60)
+    monkeypatch.setattr(render_pool, '_render_pool', context['pool'])
+    occupy(context, 1.0)
+
+
+@when('я рисую спектрограмму файла в пуле и в потоке запроса')
+def render_in_pool_and_inline(context):
+    """Одинаковые параметры, разные процессы."""
+    from src.audio.spectrogram import SpectrogramParams, generate_spectrogram
+
+    params = SpectrogramParams(width=64, height=32)
+    context['pooled'] = context['pool'].run(generate_spectrogram, context['file_path'], params)
+    context['inline'] = generate_spectrogram(context['file_path'], SpectrogramParams(width=64, height=32))
+
+
+@when('я дважды рисую спектрограмму сжатого файла в пуле')
+def render_compressed_in_pool(context, monkeypatch):
+    """Запоминаем построения STFT, поставленные основным процессом."""
+    from src.audio import render_pool
+    from src.audio.spectrogram import SpectrogramParams, generate_spectrogram
+
+    context['scheduled'] = []
+    monkeypatch.setattr(render_pool, 'schedule_stft', lambda *args: context['scheduled'].append(args))
+    for _ in range(2):
+        png = context['pool'].run(
+            generate_spectrogram, context['ogg_path'], SpectrogramParams(width=64, height=32), context['ogg_id']
+        )
+        assert png[:8] == b'\x89PNG\r\n\x1a\n'
+
+
+@when('процесс пула занят долгой задачей')
+def occupy_pool(context):
+    """Долгая задача занимает единственный процесс."""
+    occupy(context, 1.0)
+
+
+@when(parsers.parse('я запускаю задачу на {seconds:f} секунды'))
+def run_long_task(context, seconds):
+    """Задача дольше таймаута пула."""
+    try:
+        context['pool'].run(time.sleep, seconds)
+        context['error'] = None
+    except Exception as error:
+        context['error'] = error
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['response'] = client.get(endpoint.replace('{id}', context['audio_file_id']))
+
+
+@then('PNG должны совпадать')
+def check_png_equal(context):
+    """Отрисовка в процессе пула не отличается от отрисовки в потоке."""
+    assert context['pooled'][:8] == b'\x89PNG\r\n\x1a\n'
+    assert context['pooled'] == context['inline']
+
+
+@then(parsers.parse('счётчик завершённых задач пула должен быть {count:d}'))
+def check_completed(context, count):
+    """Проверяем счётчик завершённых задач (колбэк future может отработать после result)."""
+    deadline = time.monotonic() + 5
+    while context['pool'].stats()['in_flight'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert context['pool'].stats()['completed'] == count
+
+
+@then('кэш PCM основного процесса должен декодировать файл один раз')
+def check_pcm_decoded_once(context):
+    """Процесс пула не декодирует сам, его чтения учтены в метриках основного."""
+    from src.audio.pcm_cache import get_pcm_cache
+
+    stats = get_pcm_cache().stats()
+    assert stats['misses'] == 1
+    assert stats['entries'] == 1
+    assert stats['hits'] == 2
+
+
+@then('построение STFT должно быть поставлено в основном процессе')
+def check_stft_scheduled(context):
+    """Отложенные построения процесса пула ставятся основным процессом."""
+    assert context['scheduled'] == [(context['ogg_id'], context['ogg_path'])] * 2
+
+
+@then('новая задача должна быть отклонена без ожидания')
+def check_rejected(context):
+    """RenderPoolBusy возникает сразу, а не после освобождения процесса."""
+    from src.audio.render_pool import RenderPoolBusy
+
+    started = time.monotonic()
+    with pytest.raises(RenderPoolBusy) as error:
+        context['pool'].run(time.sleep, 0)
+    assert time.monotonic() - started < 0.5
+    assert error.value.retry_after > 0
+
+
+@then(parsers.parse('счётчик отклонённых задач пула должен быть {count:d}'))
+def check_rejected_count(context, count):
+    """Проверяем счётчик отклонённых задач."""
+    assert context['pool'].stats()['rejected'] == count
+
+
+@then('должна возникнуть ошибка таймаута отрисовки')
+def check_timeout(context):
+    """Проверяем RenderTimeout и счётчик таймаутов."""
+    from src.audio.render_pool import RenderTimeout
+
+    assert isinstance(context['error'], RenderTimeout)
+    assert context['pool'].stats()['timeouts'] == 1
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем HTTP статус."""
+    assert context['response'].status_code == status, context['response'].get_data(as_text=True)
+
+
+@then(parsers.parse('заголовок Retry-After должен быть "{value}"'))
+def check_retry_after(context, value):
+    """Проверяем заголовок Retry-After."""
+    assert context['response'].headers.get('Retry-After') == value
+    assert 'error' in context['response'].get_json()
+
+
+@then('метрики должны содержать счётчики пула отрисовки')
+def check_metrics(context):
+    """Проверяем блок render_pool в /api/metrics."""
+    stats = context['response'].get_json()['render_pool']
+    for key in ('processes', 'queue_size', 'in_flight', 'submitted', 'completed', 'rejected', 'timeouts'):
+        assert key in stats
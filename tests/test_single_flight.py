@@ -0,0 +1,219 @@
+"""Step definitions для тестирования объединения одинаковых отрисовок."""
+import threading
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/single_flight.feature')
+
+SAMPLE_RATE = 16000
+DURATION = 1.0
+COMPUTE_SECONDS = 0.3  # Достаточно, чтобы все потоки застали вычисление
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {'calls': 0}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подменяем глобальную БД тестовой."""
+    from src.audio import stft_store
+    from src.audio.single_flight import SingleFlight
+    from src.models import database
+
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    database._db_instance = test_db
+    context['db'] = test_db
+    context['flight'] = SingleFlight()
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('в БД существует AudioFile с тоном {frequency:d} Гц'))
+def create_audio_file(context, tmp_path, frequency):
+    """Создаём WAV с синусом и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    t = np.arange(int(SAMPLE_RATE * DURATION)) / SAMPLE_RATE
+    file_path = tmp_path / 'tone.wav'
+    sf.write(str(file_path), 0.5 * np.sin(2 * np.pi * frequency * t), SAMPLE_RATE)
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='tone.wav',
+        duration=DURATION,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+
+
+def run_concurrently(count, target):
+    """Запускает target(index) в count потоках одновременно и собирает результаты."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = target(index)
+        except Exception as error:
+            results[index] = error
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def slow_counted(context, func):
+    """Обёртка, считающая вызовы и замедляющая вычисление."""
+    lock = threading.Lock()
+
+    def wrapper(*args, **kwargs):
+        with lock:
+            context['calls'] += 1
+        time.sleep(COMPUTE_SECONDS)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+@when(parsers.parse('{count:d} потоков одновременно запрашивают один ключ'))
+def same_key(context, count):
+    """Одинаковый ключ во всех потоках."""
+    compute = slow_counted(context, object)
+    context['results'] = run_concurrently(count, lambda _: context['flight'].do('key', compute))
+
+
+@when(parsers.parse('{count:d} потока одновременно запрашивают ключ с ошибкой вычисления'))
+def same_key_error(context, count):
+    """Вычисление ведущего запроса завершается ошибкой."""
+    def fail():
+        raise ValueError('broken')
+    compute = slow_counted(context, fail)
+    context['results'] = run_concurrently(count, lambda _: context['flight'].do('key', compute))
+
+
+@when(parsers.parse('{count:d} потока одновременно запрашивают разные ключи'))
+def different_keys(context, count):
+    """Каждый поток со своим ключом."""
+    compute = slow_counted(context, object)
+    context['results'] = run_concurrently(count, lambda i: context['flight'].do(f'key-{i}', compute))
+
+
+@when(parsers.parse('{count:d} клиента одновременно запрашивают "{endpoint}"'))
+def concurrent_requests(context, app, count, endpoint, monkeypatch):
+    """Одинаковые запросы из нескольких клиентов; рендер замедлен и посчитан."""
+    from src.api import audio_routes, spectrogram_data_routes
+
+    monkeypatch.setattr(
+        audio_routes, 'generate_spectrogram', slow_counted(context, audio_routes.generate_spectrogram)
+    )
+    monkeypatch.setattr(
+        spectrogram_data_routes, 'load_spectrogram_data',
+        slow_counted(context, spectrogram_data_routes.load_spectrogram_data)
+    )
+    url = endpoint.replace('{id}', context['audio_file_id'])
+    context['responses'] = run_concurrently(count, lambda _: app.test_client().get(url))
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['response'] = client.get(endpoint)
+
+
+@then(parsers.parse('вычисление должно выполниться {count:d} раз'))
+@then(parsers.parse('вычисление должно выполниться {count:d} раза'))
+@then(parsers.parse('спектрограмма должна быть отрисована {count:d} раз'))
+@then(parsers.parse('данные спектрограммы должны быть посчитаны {count:d} раз'))
+def check_calls(context, count):
+    """Проверяем число фактических вычислений."""
+    assert context['calls'] == count
+
+
+@then('все потоки должны получить один и тот же результат')
+def check_same_result(context):
+    """Результат ведущего запроса разделяется всеми."""
+    first = context['results'][0]
+    assert all(result is first for result in context['results'])
+
+
+@then(parsers.parse('счётчик объединённых запросов должен быть {count:d}'))
+def check_coalesced(context, count):
+    """Проверяем счётчики группы."""
+    stats = context['flight'].stats()
+    assert stats['coalesced'] == count
+    assert stats['leaders'] == 1
+    assert stats['in_flight'] == 0
+
+
+@then('все потоки должны получить ValueError')
+def check_errors(context):
+    """Исключение ведущего запроса получают все."""
+    assert all(isinstance(result, ValueError) for result in context['results'])
+
+
+@then('все ответы должны иметь статус 200 и одинаковое тело')
+def check_responses(context):
+    """Все клиенты получают один результат."""
+    bodies = set()
+    for response in context['responses']:
+        assert response.status_code == 200, response.get_data(as_text=True)
+        bodies.add(response.data)
+    assert len(bodies) == 1
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем HTTP статус."""
+    assert context['response'].status_code == status
+
+
+@then('метрики должны содержать счётчики объединения запросов')
+def check_metrics(context):
+    """Проверяем блок single_flight в /api/metrics."""
+    stats = context['response'].get_json()['single_flight']
+    for key in ('leaders', 'coalesced', 'in_flight', 'waiting'):
+        assert key in stats
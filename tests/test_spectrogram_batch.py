@@ -0,0 +1,189 @@
+"""Step definitions для тестирования пакетных миниатюр спектрограмм."""
+import base64
+import io
+import json
+import zipfile
+
+import numpy as np
+import pytest
+import soundfile as sf
+from PIL import Image
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/spectrogram_batch.feature')
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подменяем глобальную БД тестовой."""
+    from src.audio import stft_store
+    from src.models import database
+
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('в БД существует AudioFile длительностью {seconds:d} секунд'))
+def create_audio_file(context, tmp_path, seconds):
+    """Создаём WAV с меняющимся тоном и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    t = np.arange(SAMPLE_RATE * seconds) / SAMPLE_RATE
+    signal = 0.5 * np.sin(2 * np.pi * (500 + 500 * t) * t)
+    file_path = tmp_path / 'sweep.wav'
+    sf.write(str(file_path), signal, SAMPLE_RATE)
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='sweep.wav',
+        duration=float(seconds),
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+
+
+@given('чтение аудио подсчитывается')
+def count_audio_reads(context, monkeypatch):
+    """Считаем открытия файла модулем спектрограммы."""
+    from src.audio import spectrogram
+
+    original = spectrogram.get_audio_reader
+    context['opens'] = 0
+
+    def counting_reader(file_path):
+        context['opens'] += 1
+        return original(file_path)
+
+    monkeypatch.setattr(spectrogram, 'get_audio_reader', counting_reader)
+
+
+def parse_intervals(text):
+    """'0-1, 2-3.5' -> список интервалов с id."""
+    intervals = []
+    for index, part in enumerate(filter(None, (p.strip() for p in text.split(',')))):
+        start, end = part.split('-')
+        intervals.append({'id': f'a{index}', 'start_time': float(start), 'end_time': float(end)})
+    return intervals
+
+
+@when(parsers.re(
+    r'я запрашиваю миниатюры интервалов "(?P<text>[^"]*)" размером (?P<width>\d+)x(?P<height>\d+)'
+    r'(?: в формате "(?P<batch_format>\w+)")?'
+))
+def request_batch(context, client, text, width, height, batch_format):
+    """POST запрос пакета миниатюр."""
+    context['intervals'] = parse_intervals(text)
+    context['size'] = (int(width), int(height))
+    payload = {'intervals': context['intervals'], 'width': int(width), 'height': int(height)}
+    if batch_format:
+        payload['format'] = batch_format
+    context['response'] = client.post(
+        f"/api/audio/{context['audio_file_id']}/spectrogram/batch", json=payload
+    )
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем статус ответа."""
+    assert context['response'].status_code == status, context['response'].get_data(as_text=True)
+
+
+@then(parsers.parse('спрайт должен быть PNG {width:d}x{height:d}'))
+def check_sprite(context, width, height):
+    """Декодируем data URL спрайта."""
+    data = context['response'].get_json()
+    prefix = 'data:image/png;base64,'
+    assert data['sprite'].startswith(prefix)
+    sprite = Image.open(io.BytesIO(base64.b64decode(data['sprite'][len(prefix):]))).convert('RGBA')
+    assert sprite.size == (width, height)
+    context['sprite'] = np.asarray(sprite)
+
+
+@then('смещения должны идти по порядку интервалов запроса')
+def check_offsets(context):
+    """Элементы карты соответствуют интервалам запроса."""
+    width, height = context['size']
+    items = context['response'].get_json()['items']
+    assert [item['id'] for item in items] == [i['id'] for i in context['intervals']]
+    assert [(item['x'], item['y']) for item in items] == [(i * width, 0) for i in range(len(items))]
+    assert all((item['width'], item['height']) == (width, height) for item in items)
+
+
+@then('каждая миниатюра должна совпадать с отдельной спектрограммой интервала')
+def check_thumbnails_match(context, client):
+    """Миниатюра в спрайте = /spectrogram того же интервала."""
+    width, height = context['size']
+    for item in context['response'].get_json()['items']:
+        response = client.get(
+            f"/api/audio/{context['audio_file_id']}/spectrogram"
+            f"?start_time={item['start_time']}&end_time={item['end_time']}&width={width}&height={height}"
+        )
+        assert response.status_code == 200
+        single = np.asarray(Image.open(io.BytesIO(response.get_data())).convert('RGBA'))
+        crop = context['sprite'][item['y']:item['y'] + height, item['x']:item['x'] + width]
+        np.testing.assert_array_equal(crop, single)
+
+
+@then(parsers.parse('аудио должно быть открыто {count:d} раз'))
+def check_open_count(context, count):
+    """Один проход по файлу на все интервалы."""
+    assert context['opens'] == count
+
+
+@then(parsers.parse('архив должен содержать {count:d} PNG {width:d}x{height:d} и manifest.json'))
+def check_zip(context, count, width, height):
+    """Содержимое ZIP архива."""
+    response = context['response']
+    assert response.mimetype == 'application/zip'
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        manifest = json.loads(archive.read('manifest.json'))
+        assert len(manifest) == count
+        assert [entry['id'] for entry in manifest] == [i['id'] for i in context['intervals']]
+        for entry in manifest:
+            image = Image.open(io.BytesIO(archive.read(entry['file'])))
+            assert image.size == (width, height)
@@ -0,0 +1,162 @@
+"""Step definitions для тестирования данных спектрограммы."""
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/spectrogram_data.feature')
+
+SAMPLE_RATE = 16000
+DURATION = 2.0
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подменяем глобальную БД тестовой."""
+    from src.audio import stft_store
+    from src.models import database
+
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('в БД существует AudioFile с тоном {frequency:d} Гц амплитудой {amplitude:f}'))
+def create_audio_file(context, tmp_path, frequency, amplitude):
+    """Создаём WAV с синусом и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    t = np.arange(int(SAMPLE_RATE * DURATION)) / SAMPLE_RATE
+    file_path = tmp_path / 'tone.wav'
+    sf.write(str(file_path), amplitude * np.sin(2 * np.pi * frequency * t), SAMPLE_RATE, subtype='FLOAT')
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='tone.wav',
+        duration=DURATION,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+
+
+def decode(response):
+    """Матрица dBFS (bins, columns) из бинарного ответа."""
+    bins = int(response.headers['X-Spectrogram-Bins'])
+    columns = int(response.headers['X-Spectrogram-Columns'])
+    data_format = response.headers['X-Spectrogram-Format']
+    raw = np.frombuffer(response.get_data(), dtype='<f2' if data_format == 'float16' else np.uint8)
+    scale = float(response.headers['X-Spectrogram-Scale'])
+    offset = float(response.headers['X-Spectrogram-Offset'])
+    return (offset + raw.astype(np.float32) * scale).reshape(bins, columns)
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['url'] = endpoint.replace('{id}', context['audio_file_id'])
+    context['response'] = client.get(context['url'])
+
+
+@when('я повторяю запрос с полученным ETag')
+def repeat_with_etag(context, client):
+    """Условный запрос."""
+    etag = context['response'].headers['ETag']
+    context['response'] = client.get(context['url'], headers={'If-None-Match': etag})
+
+
+@when('я запрашиваю данные интервала в форматах uint8 и float16')
+def request_both_formats(context, client):
+    """Один интервал в двух форматах."""
+    base = f"/api/audio/{context['audio_file_id']}/spectrogram/data?start_time=0.2&end_time=1.8&width=64"
+    context['uint8'] = client.get(base + '&format=uint8')
+    context['float16'] = client.get(base + '&format=float16')
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем статус ответа."""
+    assert context['response'].status_code == status, context['response'].get_data(as_text=True)
+
+
+@then(parsers.parse('матрица должна иметь {bins:d} бинов и {columns:d} столбцов формата "{data_format}"'))
+def check_matrix_shape(context, bins, columns, data_format):
+    """Размер тела соответствует заголовкам."""
+    response = context['response']
+    assert response.mimetype == 'application/octet-stream'
+    assert response.headers['X-Spectrogram-Format'] == data_format
+    assert int(response.headers['X-Spectrogram-Bins']) == bins
+    assert int(response.headers['X-Spectrogram-Columns']) == columns
+    assert len(response.get_data()) == bins * columns
+
+
+@then(parsers.parse('оси должны описывать интервал от {start:f} до {end:f} секунд и шаг частоты {step:f} Гц'))
+def check_axes(context, start, end, step):
+    """Оси времени и частоты в заголовках."""
+    headers = context['response'].headers
+    assert float(headers['X-Spectrogram-Start-Time']) == pytest.approx(start)
+    assert float(headers['X-Spectrogram-End-Time']) == pytest.approx(end)
+    assert float(headers['X-Spectrogram-Freq-Step']) == pytest.approx(step)
+    assert int(headers['X-Spectrogram-Sample-Rate']) == SAMPLE_RATE
+
+
+@then(parsers.parse('максимум спектра должен быть на частоте {frequency:d} Гц около {level:d} dBFS'))
+def check_peak(context, frequency, level):
+    """Частота и уровень тона по матрице."""
+    values = decode(context['response'])
+    step = float(context['response'].headers['X-Spectrogram-Freq-Step'])
+    peak_bin = int(np.argmax(values.mean(axis=1)))
+    assert peak_bin * step == pytest.approx(frequency, abs=step)
+    assert values[peak_bin].mean() == pytest.approx(level, abs=1.5)
+
+
+@then('восстановленные значения uint8 должны совпадать с float16 с точностью до шага квантования')
+def check_quantization(context):
+    """Квантование теряет не больше половины шага (плюс точность float16)."""
+    assert context['uint8'].status_code == 200
+    assert context['float16'].status_code == 200
+    quantized = decode(context['uint8'])
+    exact = decode(context['float16'])
+    scale = float(context['uint8'].headers['X-Spectrogram-Scale'])
+    assert np.abs(quantized - exact).max() <= scale / 2 + 0.1
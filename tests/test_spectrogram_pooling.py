@@ -0,0 +1,196 @@
+"""Step definitions для тестирования потоковой STFT со свёрткой."""
+import io
+import tracemalloc
+
+import numpy as np
+import pytest
+import soundfile as sf
+from PIL import Image
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/spectrogram_pooling.feature')
+
+SAMPLE_RATE = 16000
+N_BINS = 1025
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подменяем глобальную БД тестовой."""
+    from src.audio import stft_store
+    from src.models import database
+
+    # Проверяем расчёт по аудио, а не срез предвычисленной матрицы
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('в БД существует AudioFile длительностью {seconds:d} секунд'))
+def create_audio_file(context, tmp_path, seconds):
+    """Создаём WAV с шумом и тонами и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    rng = np.random.default_rng(0)
+    t = np.arange(SAMPLE_RATE * seconds) / SAMPLE_RATE
+    signal = 0.3 * np.sin(2 * np.pi * 1000 * t) * (np.sin(2 * np.pi * 0.05 * t) > 0)
+    signal += 0.02 * rng.standard_normal(len(t))
+    file_path = tmp_path / 'long.wav'
+    sf.write(str(file_path), signal, SAMPLE_RATE)
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='long.wav',
+        duration=float(seconds),
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['file_path'] = file_path
+
+
+@given(parsers.parse('матрица из {frames:d} кадров'))
+def random_matrix(context, frames):
+    """Случайные dB кадры."""
+    rng = np.random.default_rng(1)
+    context['matrix'] = rng.uniform(-100, 40, size=(frames, 16)).astype(np.float16)
+
+
+@given(parsers.parse('матрица из {frames:d} кадров с одним громким кадром'))
+def matrix_with_event(context, frames):
+    """Тихие кадры и одно событие."""
+    matrix = np.full((frames, 16), -90.0, dtype=np.float16)
+    matrix[523] = 20.0
+    context['matrix'] = matrix
+    context['event_frame'] = 523
+
+
+@when(parsers.parse('я сворачиваю её в {columns:d} столбцов методом "{method}" блоками по {chunk:d} кадра'))
+def pool_matrix(context, columns, method, chunk):
+    """Свёртка блоками и целиком."""
+    from src.audio.stft_store import pool_frames
+
+    matrix = context['matrix']
+    chunks = (matrix[i:i + chunk] for i in range(0, len(matrix), chunk))
+    context['columns'] = columns
+    context['pooled'] = pool_frames(chunks, len(matrix), columns, method)
+    context['whole'] = pool_frames([matrix], len(matrix), columns, method)
+
+
+@when(parsers.parse('я считаю свёрнутую STFT всего файла блоками по {chunk:d} кадров'))
+def pool_whole_file(context, chunk):
+    """Замеряем пиковую память потоковой STFT."""
+    from src.audio.reader import get_audio_reader
+    from src.audio.stft_store import iter_stft_db, pool_frames, stft_frame_count
+
+    with get_audio_reader(str(context['file_path'])) as reader:
+        total = stft_frame_count(reader.frames)
+        # Прогрев: ленивые импорты и кэши окон librosa не относятся к интервалу
+        pool_frames(iter_stft_db(reader, 0, chunk, chunk_frames=chunk), chunk, 200)
+        tracemalloc.start()
+        pooled = pool_frames(iter_stft_db(reader, 0, total, chunk_frames=chunk), total, 200)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    assert pooled.shape == (200, N_BINS)
+    context['peak'] = peak
+    context['full_bytes'] = total * N_BINS * 4
+
+
+@when(parsers.parse('я запрашиваю спектрограмму всего файла шириной {width:d} с pooling "{first}" и "{second}"'))
+def request_pooling_methods(context, client, width, first, second):
+    """Два запроса с разными методами свёртки."""
+    context['responses'] = [
+        client.get(
+            f"/api/audio/{context['audio_file_id']}/spectrogram"
+            f"?width={width}&height=100&pooling={method}"
+        )
+        for method in (first, second)
+    ]
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['response'] = client.get(endpoint.replace('{id}', context['audio_file_id']))
+
+
+@then('результат должен совпадать со свёрткой целиком')
+def check_chunked_equals_whole(context):
+    """Блочная свёртка не зависит от границ блоков."""
+    assert context['pooled'].shape == (context['columns'], 16)
+    np.testing.assert_allclose(context['pooled'], context['whole'], rtol=1e-6)
+
+
+@then('громкость события должна сохраниться в своём столбце')
+def check_event_preserved(context):
+    """Max свёртка не размывает короткое событие."""
+    pooled = context['pooled']
+    column = context['event_frame'] * context['columns'] // len(context['matrix'])
+    assert pooled[column].max() == pytest.approx(20.0)
+    assert np.delete(pooled, column, axis=0).max() == pytest.approx(-90.0)
+
+
+@then('пиковое потребление памяти должно быть меньше четверти полной матрицы')
+def check_peak_memory(context):
+    """Память ограничена блоком, а не длиной интервала."""
+    assert context['peak'] < context['full_bytes'] / 4, (context['peak'], context['full_bytes'])
+
+
+@then(parsers.parse('оба ответа должны быть PNG {width:d}x{height:d} с разным содержимым'))
+def check_png_responses(context, width, height):
+    """Методы свёртки дают разные изображения одного размера."""
+    images = []
+    for response in context['responses']:
+        assert response.status_code == 200, response.get_data(as_text=True)
+        image = Image.open(io.BytesIO(response.get_data()))
+        assert image.size == (width, height)
+        images.append(response.get_data())
+    assert images[0] != images[1]
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем статус ответа."""
+    assert context['response'].status_code == status
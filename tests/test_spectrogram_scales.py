@@ -0,0 +1,172 @@
+"""Step definitions для тестирования частотных шкал спектрограммы."""
+import io
+
+import librosa
+import numpy as np
+import pytest
+import soundfile as sf
+from PIL import Image
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/spectrogram_scales.feature')
+
+SAMPLE_RATE = 16000
+DURATION = 2.0
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подменяем глобальную БД тестовой."""
+    from src.audio import stft_store
+    from src.models import database
+
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('в БД существует AudioFile с тоном {frequency:d} Гц'))
+def create_audio_file(context, tmp_path, frequency):
+    """Создаём WAV с синусом и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    t = np.arange(int(SAMPLE_RATE * DURATION)) / SAMPLE_RATE
+    file_path = tmp_path / 'tone.wav'
+    sf.write(str(file_path), 0.5 * np.sin(2 * np.pi * frequency * t), SAMPLE_RATE)
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='tone.wav',
+        duration=DURATION,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['file_path'] = str(file_path)
+
+
+@when(parsers.parse('я считаю кадры интервала в шкале "{scale}" с fmin {fmin:d} и fmax {fmax:d}'))
+def compute_scaled_frames(context, scale, fmin, fmax):
+    """Кадры интервала в заданной шкале."""
+    from src.audio.freq_scale import get_frequency_bands
+    from src.audio.spectrogram import SpectrogramParams, load_stft_frames
+
+    params = SpectrogramParams(
+        start_time=0.5, end_time=1.5, width=16, scale=scale, fmin=float(fmin), fmax=float(fmax)
+    )
+    context['frames'], _ = load_stft_frames(context['file_path'], params)
+    context['bands'] = get_frequency_bands(scale, SAMPLE_RATE, params.n_fft, params.n_mels, float(fmin), float(fmax))
+
+
+@then(parsers.parse('количество полос должно быть {bands:d}'))
+def check_band_count(context, bands):
+    """Ширина результата по частоте."""
+    assert context['frames'].shape[1] == bands
+
+
+@then(parsers.parse('максимальная полоса должна быть около {frequency:d} Гц'))
+def check_peak_band(context, frequency):
+    """Центр самой громкой полосы близок к частоте тона."""
+    bands = context['bands']
+    freqs = librosa.fft_frequencies(sr=SAMPLE_RATE, n_fft=2048)[bands.bins]
+    peak = int(np.argmax(context['frames'].mean(axis=0)))
+    if bands.weights is None:
+        center = freqs[peak]
+    else:
+        center = float(bands.weights[peak] @ freqs)
+    assert center == pytest.approx(frequency, rel=0.08)
+
+
+@when(parsers.parse('я дважды запрашиваю фильтры mel для {sample_rate:d} Гц'))
+def request_filters_twice(context, sample_rate):
+    """Два одинаковых запроса фильтров."""
+    from src.audio.freq_scale import get_frequency_bands
+
+    context['filters'] = [
+        get_frequency_bands('mel', sample_rate, 2048, 128, 0.0, None) for _ in range(2)
+    ]
+
+
+@then('оба раза должна вернуться одна и та же матрица')
+def check_filters_cached(context):
+    """Мемоизация по параметрам шкалы."""
+    first, second = context['filters']
+    assert first is second
+    assert not first.weights.flags.writeable
+
+
+@when(parsers.parse('я считаю кадры STFT с обрезкой бинов {first:d}..{last:d}'))
+def compute_cropped(context, first, last):
+    """Обрезанная и полная STFT одного интервала."""
+    from src.audio.reader import get_audio_reader
+    from src.audio.stft_store import compute_stft_db
+
+    with get_audio_reader(context['file_path']) as reader:
+        context['cropped'] = compute_stft_db(reader, 10, 40, bins=slice(first, last))
+        context['full'] = compute_stft_db(reader, 10, 40)[:, first:last]
+
+
+@then('результат должен совпадать со срезом полной STFT')
+def check_cropped(context):
+    """Обрезка до перевода в dB не меняет значения."""
+    np.testing.assert_array_equal(context['cropped'], context['full'])
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['response'] = client.get(endpoint.replace('{id}', context['audio_file_id']))
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем статус ответа."""
+    assert context['response'].status_code == status, context['response'].get_data(as_text=True)
+
+
+@then(parsers.parse('ответ должен быть PNG {width:d}x{height:d}'))
+def check_png(context, width, height):
+    """Размер изображения."""
+    image = Image.open(io.BytesIO(context['response'].get_data()))
+    assert image.size == (width, height)
@@ -0,0 +1,166 @@
+"""Step definitions для тестирования тайлов спектрограммы."""
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+from PIL import Image
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/spectrogram_tiles.feature')
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой."""
+    from src.models import database
+
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given(parsers.parse('в БД существует AudioFile длительностью {seconds:d} секунд'))
+def create_audio_file(context, tmp_path, seconds):
+    """Создаём WAV с чирпом и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    t = np.arange(SAMPLE_RATE * seconds) / SAMPLE_RATE
+    signal = 0.5 * np.sin(2 * np.pi * (200 + 300 * t) * t)
+    file_path = tmp_path / 'tiles.wav'
+    sf.write(str(file_path), signal, SAMPLE_RATE)
+
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='tiles.wav',
+        duration=float(seconds),
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['file_path'] = file_path
+    context['signal'] = signal
+
+
+@given('тишина в первой секунде файла')
+def silence_first_second(context):
+    """Обнуляем первую секунду с запасом на окно STFT."""
+    signal = context['signal'].copy()
+    signal[:int(SAMPLE_RATE * 1.2)] = 0.0
+    sf.write(str(context['file_path']), signal, SAMPLE_RATE)
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['response'] = client.get(endpoint.replace('{id}', context['audio_file_id']))
+
+
+@when(parsers.parse('я отправляю GET запрос на тайл {zoom:d}/{index:d} с версией файла'))
+def request_versioned_tile(context, client, zoom, index):
+    """Запрашиваем тайл с версией из описания уровней."""
+    base = f"/api/audio/{context['audio_file_id']}/spectrogram/tiles"
+    version = client.get(base).get_json()['version']
+    context['response'] = client.get(f'{base}/{zoom}/{index}.png?v={version}')
+
+
+@when(parsers.parse('я дважды запрашиваю тайл "{endpoint}"'))
+def request_tile_twice(context, client, endpoint):
+    """Один и тот же тайл два раза."""
+    endpoint = endpoint.replace('{id}', context['audio_file_id'])
+    for _ in range(2):
+        assert client.get(endpoint).status_code == 200
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем статус ответа."""
+    assert context['response'].status_code == status, context['response'].get_data(as_text=True)
+
+
+@then(parsers.parse('уровень {zoom:d} должен содержать {tiles:d} тайлов по {seconds:f} секунде'))
+def check_level(context, zoom, tiles, seconds):
+    """Проверяем описание уровня."""
+    level = context['response'].get_json()['levels'][zoom]
+    assert level == {'zoom': zoom, 'seconds_per_tile': seconds, 'tiles': tiles}
+
+
+@then('ответ должен содержать версию файла и шаблон URL тайла')
+def check_version_and_template(context):
+    """Проверяем поля для сборки URL на клиенте."""
+    data = context['response'].get_json()
+    assert data['version']
+    assert data['tile_width'] == 256
+    assert data['url_template'].endswith('/spectrogram/tiles/{zoom}/{index}.png')
+
+
+@then(parsers.parse('ответ должен содержать PNG размером {width:d}x{height:d}'))
+def check_png_size(context, width, height):
+    """Проверяем размер изображения."""
+    response = context['response']
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.mimetype == 'image/png'
+    assert Image.open(io.BytesIO(response.get_data())).size == (width, height)
+
+
+@then(parsers.parse('заголовок Cache-Control должен содержать "{value}"'))
+def check_cache_control(context, value):
+    """Проверяем Cache-Control."""
+    assert value in context['response'].headers['Cache-Control']
+
+
+@then(parsers.parse('метрики кэша отрисовок должны показывать {hits:d} попаданий'))
+def check_render_cache_hits(client, hits):
+    """Проверяем счётчик попаданий."""
+    assert client.get('/api/metrics').get_json()['render_cache']['hits'] == hits
+
+
+@then('тайл должен быть раскрашен одним цветом')
+def check_uniform_tile(context):
+    """Тишина в абсолютной шкале - нижний цвет палитры, без растяжения контраста."""
+    response = context['response']
+    assert response.status_code == 200
+    pixels = np.asarray(Image.open(io.BytesIO(response.get_data())).convert('RGB'))
+    assert len(np.unique(pixels.reshape(-1, 3), axis=0)) == 1
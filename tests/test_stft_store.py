@@ -0,0 +1,253 @@
+"""Step definitions для тестирования хранилища STFT матриц."""
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/stft_store.feature')
+
+SAMPLE_RATE = 22050
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+def _write_signal(file_path, frequency, seconds=2):
+    """Записываем синус с шумом."""
+    rng = np.random.default_rng(frequency)
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    signal = 0.5 * np.sin(2 * np.pi * frequency * t) + 0.05 * rng.standard_normal(len(t))
+    sf.write(str(file_path), signal, SAMPLE_RATE)
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой."""
+    from src.models import database
+
+    database._db_instance = test_db
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given('в БД существует AudioFile с тестовым сигналом')
+def create_audio_file(context, tmp_path):
+    """Создаём WAV и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    file_path = tmp_path / 'stft.wav'
+    _write_signal(file_path, 440)
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='stft.wav',
+        duration=2.0,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = audio_file.id
+    context['file_path'] = file_path
+
+
+@given('для файла построена STFT матрица')
+@when('я строю STFT матрицу файла')
+def build_matrix(context):
+    """Строим матрицу синхронно."""
+    from src.audio.stft_store import build_stft
+
+    context['built'] = build_stft(context['audio_file_id'], str(context['file_path']))
+
+
+@given(parsers.parse('бюджет хранилища STFT {max_bytes:d} байт'))
+def small_budget(monkeypatch, max_bytes):
+    """Уменьшаем бюджет хранилища."""
+    from src.audio import stft_store
+
+    monkeypatch.setattr(stft_store, 'STFT_STORE_MAX_BYTES', max_bytes)
+
+
+@given('расчёт STFT завершается ошибкой')
+def failing_stft(monkeypatch):
+    """Расчёт падает после записи заголовка."""
+    from src.audio import stft_store
+
+    def fail(*args, **kwargs):
+        raise OSError('ошибка чтения')
+        yield
+
+    monkeypatch.setattr(stft_store, 'iter_stft_db', fail)
+
+
+@when('я строю STFT матрицу файла с ошибкой')
+def build_matrix_failing(context):
+    """Построение должно пробросить ошибку."""
+    from src.audio.stft_store import build_stft
+
+    with pytest.raises(OSError):
+        build_stft(context['audio_file_id'], str(context['file_path']))
+
+
+@when(parsers.parse('я отправляю GET запрос на "{endpoint}"'))
+def send_get_request(context, client, endpoint):
+    """Отправляем GET запрос."""
+    context['endpoint'] = endpoint.replace('{id}', str(context['audio_file_id']))
+    response = client.get(context['endpoint'])
+    assert response.status_code == 200, response.get_data(as_text=True)
+    context['images'] = [response.get_data()]
+
+
+@when(parsers.parse('я отправляю DELETE запрос на "{endpoint}"'))
+def send_delete_request(context, client, endpoint):
+    """Отправляем DELETE запрос."""
+    response = client.delete(endpoint.replace('{id}', str(context['audio_file_id'])))
+    assert response.status_code == 200
+
+
+@when('фоновое построение STFT завершилось')
+def wait_for_build(context):
+    """Ждём фоновую задачу."""
+    from src.audio.stft_queue import wait_for_stft
+
+    assert wait_for_stft(context['audio_file_id'], timeout=30) is not None
+
+
+@when('я ставлю построение STFT в очередь и оно завершается ошибкой')
+def schedule_failing_build(context):
+    """Фоновое построение падает; ждём, пока очередь его забудет."""
+    from src.audio import stft_queue
+
+    future = stft_queue.schedule_stft(context['audio_file_id'], str(context['file_path']))
+    with pytest.raises(OSError):
+        future.result(timeout=30)
+    deadline = time.monotonic() + 5
+    while str(context['audio_file_id']) in stft_queue._futures and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@when('кэш отрисовок очищен и прямой расчёт STFT запрещён')
+def forbid_direct_stft(monkeypatch):
+    """Следующий запрос может получить данные только из матрицы."""
+    from src.audio import spectrogram
+    from src.audio.render_cache import get_render_cache
+
+    def fail(*args, **kwargs):
+        raise AssertionError('STFT должна читаться из хранилища')
+
+    get_render_cache().clear()
+    monkeypatch.setattr(spectrogram, 'iter_stft_db', fail)
+
+
+@when('я повторяю последний запрос')
+def repeat_request(context, client):
+    """Повторяем запрос."""
+    response = client.get(context['endpoint'])
+    assert response.status_code == 200, response.get_data(as_text=True)
+    context['images'].append(response.get_data())
+
+
+@when('исходный файл перезаписывается другим сигналом')
+def rewrite_source(context):
+    """Меняем содержимое и размер файла."""
+    _write_signal(context['file_path'], 880, seconds=3)
+
+
+@then('STFT матрица файла должна существовать и покрывать весь сигнал')
+def check_matrix(context):
+    """Проверяем размеры матрицы."""
+    from src.audio.stft_store import HOP_LENGTH, N_FFT, load_stft
+
+    matrix = load_stft(context['audio_file_id'], str(context['file_path']))
+    assert matrix is not None
+    assert matrix.data.dtype == np.float16
+    assert matrix.data.shape == (1 + 2 * SAMPLE_RATE // HOP_LENGTH, 1 + N_FFT // 2)
+    assert matrix.duration == pytest.approx(2.0)
+
+
+@then('оба изображения должны совпадать побайтно')
+def check_same_images(context):
+    """Срез матрицы и прямой расчёт дают одно и то же изображение."""
+    first, second = context['images']
+    assert first == second
+
+
+@then('STFT матрица файла не должна загружаться')
+def check_not_loaded(context):
+    """Матрица отсутствует или устарела."""
+    from src.audio.stft_store import load_stft
+
+    assert load_stft(context['audio_file_id'], str(context['file_path'])) is None
+
+
+@then('файл STFT матрицы должен быть удалён')
+def check_removed(context):
+    """Файл матрицы удалён с диска."""
+    from src.audio.stft_store import get_stft_path
+
+    assert not get_stft_path(context['audio_file_id']).exists()
+
+
+@then('в хранилище STFT не должно остаться временных файлов')
+def check_no_tmp(context):
+    """Ни матрицы, ни временного файла."""
+    from src.audio.stft_store import get_stft_path
+
+    stft_path = get_stft_path(context['audio_file_id'])
+    assert not stft_path.exists()
+    assert not list(stft_path.parent.glob('*.tmp'))
+
+
+@then('повторное построение STFT не должно ставиться в очередь')
+def check_not_rescheduled(context):
+    """Файл не менялся - неудачное построение не повторяется."""
+    from src.audio.stft_queue import schedule_stft
+
+    assert schedule_stft(context['audio_file_id'], str(context['file_path'])) is None
+
+
+@then('повторное построение STFT должно ставиться в очередь')
+def check_rescheduled(context):
+    """Файл изменился - построение снова ставится в очередь."""
+    from src.audio.stft_queue import schedule_stft
+
+    future = schedule_stft(context['audio_file_id'], str(context['file_path']))
+    assert future is not None
+    with pytest.raises(OSError):
+        future.result(timeout=30)
@@ -0,0 +1,195 @@
+"""Step definitions для тестирования отдачи Range через wsgi.file_wrapper."""
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+from werkzeug.wsgi import FileWrapper
+
+# Связываем сценарии из feature файла
+scenarios('features/stream_sendfile.feature')
+
+SAMPLE_RATE = 22050
+
+
+class RecordingFileWrapper(FileWrapper):
+    """wsgi.file_wrapper, запоминающий позицию файла при создании."""
+
+    instances = []
+
+    def __init__(self, file, buffer_size=8192):
+        super().__init__(file, buffer_size)
+        self.start_position = file.tell()
+        RecordingFileWrapper.instances.append(self)
+
+
+class SendfileFileWrapper(RecordingFileWrapper):
+    """wsgi.file_wrapper, передающий данные по дескриптору, как os.sendfile()."""
+
+    def __iter__(self):
+        fd = self.file.fileno()
+        yield os.pread(fd, os.fstat(fd).st_size, self.start_position)
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    RecordingFileWrapper.instances.clear()
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context):
+    """Подменяем глобальную БД тестовой и сбрасываем метрики."""
+    from src.audio import streaming
+    from src.models import database
+
+    database._db_instance = test_db
+    streaming.stream_metrics.reset()
+    context['db'] = test_db
+
+
+@given('база данных инициализирована')
+def database_initialized(context):
+    """Инициализируем БД."""
+    context['session'] = context['db'].get_session()
+
+
+@given('в БД существует AudioFile с тестовым сигналом')
+def create_audio_file(context, tmp_path):
+    """Создаём WAV и запись AudioFile."""
+    from src.models.audio_file import AudioFile
+
+    file_path = tmp_path / 'sendfile.wav'
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    sf.write(str(file_path), 0.5 * np.sin(2 * np.pi * 440 * t), SAMPLE_RATE)
+    audio_file = AudioFile(
+        file_path=str(file_path),
+        filename='sendfile.wav',
+        duration=1.0,
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        file_size=file_path.stat().st_size
+    )
+    context['session'].add(audio_file)
+    context['session'].commit()
+    context['audio_file_id'] = str(audio_file.id)
+    context['file_bytes'] = file_path.read_bytes()
+
+
+def _request_range(context, client, byte_range, environ_overrides):
+    """Range запрос; тело читается и ответ закрывается, как это сделал бы сервер."""
+    response = client.get(
+        f"/api/audio/{context['audio_file_id']}/stream",
+        headers={'Range': byte_range},
+        environ_overrides=environ_overrides
+    )
+    context['body'] = response.get_data()
+    response.close()
+    context['response'] = response
+
+
+@when(parsers.parse('я запрашиваю диапазон "{byte_range}" у сервера с wsgi.file_wrapper'))
+def request_with_file_wrapper(context, client, byte_range):
+    """Сервер предоставляет wsgi.file_wrapper."""
+    _request_range(context, client, byte_range, {'wsgi.file_wrapper': RecordingFileWrapper})
+
+
+@when(parsers.parse('я запрашиваю диапазон "{byte_range}" у сервера с sendfile'))
+def request_with_sendfile(context, client, byte_range):
+    """Сервер отдаёт файл по дескриптору, минуя read()."""
+    _request_range(context, client, byte_range, {'wsgi.file_wrapper': SendfileFileWrapper})
+
+
+@when(parsers.parse('я запрашиваю диапазон "{byte_range}" у сервера без wsgi.file_wrapper'))
+def request_without_file_wrapper(context, client, byte_range):
+    """Dev-сервер без wsgi.file_wrapper."""
+    _request_range(context, client, byte_range, {})
+
+
+@then(parsers.parse('ответ должен иметь статус {status_code:d}'))
+def check_status_code(context, status_code):
+    """Проверяем статус код."""
+    assert context['response'].status_code == status_code
+
+
+@then(parsers.parse('заголовок "{header}" должен быть равен "{value}"'))
+def check_header_equals(context, header, value):
+    """Заголовок равен значению."""
+    assert context['response'].headers.get(header) == value
+
+
+@then(parsers.parse('тело должно быть отдано через file_wrapper с позиции {position:d}'))
+def check_file_wrapper_used(context, position):
+    """Сервер получил файл, спозиционированный на начало диапазона."""
+    assert len(RecordingFileWrapper.instances) == 1
+    wrapper = RecordingFileWrapper.instances[0]
+    assert wrapper.start_position == position
+    assert hasattr(wrapper.file, 'fileno')
+
+
+@then(parsers.parse('первые {size:d} байт тела должны совпадать с файлом с позиции {position:d}'))
+def check_body_prefix(context, size, position):
+    """Сервер обрезает тело по Content-Length, поэтому проверяем префикс."""
+    assert context['body'][:size] == context['file_bytes'][position:position + size]
+
+
+@then(parsers.parse('тело ответа должно совпадать с файлом с позиции {position:d} длиной {size:d}'))
+def check_body_exact(context, position, size):
+    """Генератор отдаёт ровно диапазон."""
+    assert context['body'] == context['file_bytes'][position:position + size]
+
+
+@then('метрики streaming должны показывать по одному ответу каждого способа')
+def check_modes(context, client):
+    """Счётчики по способам отдачи."""
+    stats = client.get('/api/metrics').get_json()['streaming']
+    assert stats['responses'] == {'file_wrapper': 1, 'generator': 1}
+    assert stats['recent_connections'] == 2
+    assert stats['throughput_mbps_max'] > 0
+
+
+@then(parsers.parse('метрики streaming должны показывать {count:d} активных соединений'))
+def check_active(context, client, count):
+    """Все ответы закрыты."""
+    assert client.get('/api/metrics').get_json()['streaming']['active'] == count
+
+
+@then(parsers.parse('метрики streaming должны учитывать {size:d} отправленных байт'))
+def check_bytes(context, client, size):
+    """Суммарный объём."""
+    assert client.get('/api/metrics').get_json()['streaming']['bytes_sent'] == size
+
+
+@then(parsers.parse('метрики streaming должны показывать {count:d} ответ без учёта объёма'))
+def check_unmeasured(context, client, count):
+    """Объём, переданный sendfile, не выдумывается."""
+    stats = client.get('/api/metrics').get_json()['streaming']
+    assert stats['unmeasured'] == count
+    assert stats['recent_connections'] == 0
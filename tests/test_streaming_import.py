@@ -0,0 +1,214 @@
+"""Step definitions для тестирования рекурсивного импорта с потоком событий."""
+import json
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/streaming_import.feature')
+
+TREE_FILES = (
+    'top.wav',
+    'top.flac',
+    'skip_old.wav',
+    '2024/b.wav',
+    '2024/day1/c.wav',
+    '2024/day1/deep/d.wav',
+    'tmp/t.wav',
+)
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подключаем тестовую БД, фоновое построение STFT отключаем."""
+    from src.audio import folder_import, stft_store
+    from src.models import database
+
+    database._db_instance = test_db
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    monkeypatch.setattr(folder_import, 'PROGRESS_INTERVAL', 0.0)
+    context['db'] = test_db
+
+
+@given('дерево каталогов с записями')
+def create_tree(context, tmp_path):
+    """Короткие записи на разной глубине."""
+    root = tmp_path / 'recorder'
+    for index, relative in enumerate(TREE_FILES):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sf.write(str(path), np.full(800, index / 100), 8000)  # Разное содержимое - не копии
+    (root / 'readme.txt').write_text('не аудио')
+    context['root'] = root
+
+
+@given(parsers.parse('в дереве есть повреждённый файл "{relative}"'))
+def create_broken(context, relative):
+    """Файл с расширением WAV без аудио данных."""
+    (context['root'] / relative).write_bytes(b'not a wave file')
+
+
+@when(parsers.parse('я импортирую дерево с параметрами {params}'))
+def import_tree(client, context, params):
+    """POST /api/audio/import с параметрами обхода."""
+    body = json.loads(params)
+    body['path'] = str(context['root'])
+    context['response'] = client.post('/api/audio/import', json=body)
+
+
+@when(parsers.parse('я импортирую дерево с заголовком Accept "{accept}"'))
+def import_tree_accept(client, context, accept):
+    """Формат потока выбирается заголовком Accept."""
+    context['response'] = client.post(
+        '/api/audio/import', json={'path': str(context['root'])}, headers={'Accept': accept}
+    )
+
+
+@when(parsers.parse('я читаю события импорта с пачками по {batch_size:d} строк'))
+def read_events(context, batch_size):
+    """Читаем события генератора, записывая число строк в БД на момент события."""
+    from src.audio.folder_import import FolderImport
+    from src.audio.importer import ImportOptions
+    from src.models import AudioFile
+
+    session = context['db'].get_session()
+    check = context['db'].get_session()
+    try:
+        task = FolderImport(
+            session, str(context['root']), ImportOptions(recursive=True), workers=0, batch_size=batch_size
+        )
+        context['events'] = [(event, check.query(AudioFile).count()) for event in task.events()]
+    finally:
+        check.close()
+        session.close()
+
+
+def _imported_paths(context):
+    """Пути AudioFile относительно корня дерева."""
+    from src.models import AudioFile
+
+    session = context['db'].get_session()
+    try:
+        root = str(context['root']) + '/'
+        return sorted(f.file_path[len(root):] for f in session.query(AudioFile).all())
+    finally:
+        session.close()
+
+
+def _ndjson_events(context):
+    """События NDJSON ответа."""
+    return [json.loads(line) for line in context['response'].get_data(as_text=True).splitlines()]
+
+
+@then(parsers.parse('импортированы файлы "{files}"'))
+def check_imported(context, files):
+    """Сравниваем импортированные пути относительно корня."""
+    assert context['response'].status_code == 200
+    assert _imported_paths(context) == sorted(files.split(', '))
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем HTTP статус."""
+    assert context['response'].status_code == status
+
+
+@then(parsers.parse('ответ должен иметь тип "{mimetype}"'))
+def check_mimetype(context, mimetype):
+    """Проверяем формат потока."""
+    assert context['response'].status_code == 200
+    assert context['response'].mimetype == mimetype
+
+
+@then(parsers.parse('последнее событие "{name}" с imported {imported:d} и failed {failed:d}'))
+def check_done(context, name, imported, failed):
+    """Итоговое событие содержит счётчики импорта."""
+    done = _ndjson_events(context)[-1]
+    assert done['event'] == name
+    assert done['imported'] == imported
+    assert done['failed'] == failed
+    assert done['discovered'] == imported + failed
+
+
+@then(parsers.parse('среди событий есть ошибка для файла "{relative}"'))
+def check_error_event(context, relative):
+    """Ошибка отдельного файла передаётся отдельным событием."""
+    errors = [e for e in _ndjson_events(context) if e['event'] == 'error']
+    assert [e['file'] for e in errors] == [relative]
+
+
+@then('события progress содержат discovered, imported, skipped, failed и rate')
+def check_progress_fields(context):
+    """Проверяем поля событий прогресса."""
+    progress = [e for e in _ndjson_events(context) if e['event'] == 'progress']
+    assert progress
+    for event in progress:
+        assert {'discovered', 'imported', 'skipped', 'failed', 'rate'} <= event.keys()
+
+
+@then(parsers.parse('поток SSE заканчивается событием "{name}"'))
+def check_sse(context, name):
+    """Сообщения SSE: строки event и data, разделённые пустой строкой."""
+    messages = context['response'].get_data(as_text=True).strip().split('\n\n')
+    event_line, data_line = messages[-1].split('\n')
+    assert event_line == f'event: {name}'
+    assert json.loads(data_line[len('data: '):])['event'] == name
+
+
+@then('первое событие progress приходит до вставки всех файлов')
+def check_early_progress(context):
+    """Генератор отдаёт прогресс, пока импорт ещё идёт."""
+    events = context['events']
+    first_progress, rows_at_event = next((e, rows) for e, rows in events if e['event'] == 'progress')
+    done, _ = events[-1]
+    assert done['event'] == 'done'
+    assert first_progress['imported'] < done['imported']
+    assert rows_at_event < done['imported']
+
+
+@then(parsers.parse('повторный импорт пропускает {count:d} файлов'))
+def check_reimport(context, count):
+    """Повторный импорт не вставляет уже добавленные файлы."""
+    from src.audio.folder_import import import_folder
+    from src.audio.importer import ImportOptions
+
+    session = context['db'].get_session()
+    try:
+        result = import_folder(session, str(context['root']), workers=0, options=ImportOptions(recursive=True))
+    finally:
+        session.close()
+    assert result.skipped == count
+    assert result.imported_count == 0
@@ -0,0 +1,320 @@
+"""Step definitions для тестирования наблюдаемых каталогов."""
+import os
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+from pytest_bdd import given, parsers, scenarios, then, when
+
+# Связываем сценарии из feature файла
+scenarios('features/watched_folders.feature')
+
+
+@pytest.fixture
+def app():
+    """Создаём Flask приложение для тестов."""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Создаём тестовый клиент Flask."""
+    return app.test_client()
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Создаём временную тестовую БД."""
+    from src.models.database import Database
+
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    db.create_all()
+    return db
+
+
+@pytest.fixture
+def context():
+    """Контекст для хранения данных между шагами теста."""
+    return {'probed': []}
+
+
+@given('Flask приложение запущено')
+def flask_app_running(app, test_db, context, monkeypatch):
+    """Подключаем тестовую БД, метаданные читаем без пула процессов."""
+    from src.audio import import_probe, stft_store, watch
+    from src.models import database
+
+    database._db_instance = test_db
+    monkeypatch.setattr(stft_store, 'STFT_STORE_ENABLED', False)
+    monkeypatch.setattr(watch, 'IMPORT_WORKERS', 0)
+
+    original_probe = import_probe.probe_file
+
+    def counted_probe(file_path):
+        context['probed'].append(file_path)
+        return original_probe(file_path)
+
+    monkeypatch.setattr(import_probe, 'probe_file', counted_probe)
+    context['db'] = test_db
+
+
+@given(parsers.parse('наблюдаемый каталог с {count:d} записями'))
+def create_folder(context, tmp_path, count):
+    """Короткие WAV файлы."""
+    folder = tmp_path / 'recorder'
+    folder.mkdir()
+    for index in range(count):
+        sf.write(str(folder / f'take_{index:02d}.wav'), np.full(800, index / 100), 8000)
+    context['folder'] = folder
+
+
+def _add_folder(client, context, **extra):
+    """POST /api/watched-folders."""
+    response = client.post('/api/watched-folders', json={'path': str(context['folder']), 'recursive': True, **extra})
+    context['response'] = response
+    if response.status_code == 201:
+        context['folder_id'] = response.get_json()['id']
+    return response
+
+
+def _wait_first_scan(context):
+    from src.audio.watch import wait_for_rescan
+
+    wait_for_rescan(context['folder_id'], timeout=60)
+
+
+@given('каталог просканирован')
+def scanned_folder(client, context):
+    """Первое сканирование заполняет манифест."""
+    assert _add_folder(client, context).status_code == 201
+    _wait_first_scan(context)
+    context['probed'].clear()
+
+
+@given('каталог просканирован с live-наблюдением')
+def scanned_live_folder(client, context, monkeypatch, request):
+    """Каталог с флагом live и короткой паузой перед пересканированием."""
+    from src.audio import live_watch
+
+    if not live_watch.live_watch_supported():
+        pytest.skip('inotify недоступен')
+    monkeypatch.setattr(live_watch, 'LIVE_WATCH_DEBOUNCE', 0.2)
+    assert _add_folder(client, context, live=True).status_code == 201
+    folder_id = context['folder_id']
+    request.addfinalizer(lambda: live_watch.stop_live_watch(folder_id))
+    _wait_first_scan(context)
+    assert context['response'].get_json()['live_active'] is True
+
+
+@given('каталог импортирован обычным импортом')
+def imported_folder(client, context):
+    """POST /api/audio/import того же каталога."""
+    response = client.post('/api/audio/import', json={'path': str(context['folder'])})
+    assert response.status_code == 200
+    context['probed'].clear()
+
+
+@given(parsers.parse('файл "{filename}" перезаписан записью длиной {seconds:d} секунды'))
+def rewrite_file(context, filename, seconds):
+    """Новая запись под тем же именем: размер и mtime меняются."""
+    sf.write(str(context['folder'] / filename), np.zeros(8000 * seconds), 8000)
+
+
+@given(parsers.parse('файл "{filename}" удалён'))
+def remove_file(context, filename):
+    """Файл исчезает из каталога."""
+    (context['folder'] / filename).unlink()
+
+
+@given(parsers.parse('файл "{filename}" переименован в "{target}"'))
+def rename_file(context, filename, target):
+    """Переименование сохраняет inode, размер и mtime."""
+    destination = context['folder'] / target
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.rename(context['folder'] / filename, destination)
+
+
+@when('я отправляю POST запрос на добавление наблюдаемого каталога')
+def post_folder(client, context):
+    """POST /api/watched-folders."""
+    _add_folder(client, context)
+
+
+@when('первое сканирование завершилось')
+def wait_scan(context):
+    """Ждём фоновый поток."""
+    _wait_first_scan(context)
+
+
+@when('я добавляю каталог и жду первое сканирование')
+def add_and_wait(client, context):
+    """POST /api/watched-folders и ожидание сканирования."""
+    assert _add_folder(client, context).status_code == 201
+    _wait_first_scan(context)
+
+
+@when('я запрашиваю наблюдаемый каталог')
+def get_folder(client, context):
+    """GET /api/watched-folders/{id}."""
+    context['response'] = client.get(f"/api/watched-folders/{context['folder_id']}")
+
+
+@when('я пересканирую каталог')
+def rescan(client, context):
+    """POST /api/watched-folders/{id}/rescan с подсчётом SQL запросов."""
+    from sqlalchemy import event
+
+    engine = context['db'].engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, exec_context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        context['response'] = client.post(f"/api/watched-folders/{context['folder_id']}/rescan")
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    context['statements'] = statements
+
+
+@when(parsers.parse('я пересканирую каталог "{folder_id}"'))
+def rescan_by_id(client, context, folder_id):
+    """POST /api/watched-folders/{id}/rescan для произвольного ID."""
+    context['response'] = client.post(f'/api/watched-folders/{folder_id}/rescan')
+
+
+@when('я удаляю наблюдаемый каталог')
+def delete_folder(client, context):
+    """DELETE /api/watched-folders/{id}."""
+    context['response'] = client.delete(f"/api/watched-folders/{context['folder_id']}")
+
+
+@when(parsers.parse('в каталоге записан файл "{filename}"'))
+def write_file(context, filename):
+    """Рекордер записывает новый файл."""
+    sf.write(str(context['folder'] / filename), np.full(800, 0.5), 8000)
+
+
+def _manifest(context):
+    """Относительные пути манифеста."""
+    from src.models import WatchedFile
+
+    session = context['db'].get_session()
+    try:
+        return sorted(path for (path,) in session.query(WatchedFile.relative_path))
+    finally:
+        session.close()
+
+
+@then(parsers.parse('ответ должен иметь статус {status:d}'))
+def check_status(context, status):
+    """Проверяем HTTP статус."""
+    assert context['response'].status_code == status
+
+
+@then(parsers.parse('в БД должно быть {count:d} AudioFile со статусом "{status}"'))
+def check_files(context, count, status):
+    """Статусы AudioFile."""
+    from src.models import AudioFile, AudioFileStatus
+
+    session = context['db'].get_session()
+    try:
+        assert session.query(AudioFile).filter_by(status=AudioFileStatus(status)).count() == count
+    finally:
+        session.close()
+
+
+@then(parsers.parse('в манифесте каталога должно быть {count:d} записей'))
+def check_manifest(context, count):
+    """Записи WatchedFile."""
+    assert len(_manifest(context)) == count
+
+
+@then(parsers.parse('каталог должен содержать file_count {count:d} и итог сканирования с new {new:d}'))
+def check_folder(context, count, new):
+    """Итог последнего сканирования хранится в каталоге."""
+    folder = context['response'].get_json()
+    assert folder['file_count'] == count
+    assert folder['last_scan']['new'] == new
+    assert folder['last_scan_at'] is not None
+
+
+@then(parsers.parse(
+    'итог пересканирования должен быть new {new:d}, changed {changed:d}, moved {moved:d}, '
+    'vanished {vanished:d}, unchanged {unchanged:d}'
+))
+def check_result(context, new, changed, moved, vanished, unchanged):
+    """Счётчики пересканирования."""
+    result = context['response'].get_json()
+    assert (result['new'], result['changed'], result['moved'], result['vanished'], result['unchanged']) == (
+        new, changed, moved, vanished, unchanged
+    )
+    assert result['failed'] == 0
+
+
+@then('пересканирование не выполняло INSERT, DELETE и UPDATE файлов')
+def check_no_writes(context):
+    """Без изменений обновляется только итог сканирования каталога."""
+    writes = [s for s in context['statements'] if s.lstrip().upper().startswith(('INSERT', 'DELETE', 'UPDATE'))]
+    assert all(s.lstrip().upper().startswith('UPDATE WATCHED_FOLDERS') for s in writes)
+    selects = [s for s in context['statements'] if s.lstrip().upper().startswith('SELECT')]
+    assert len(selects) <= 2
+
+
+@then('метаданные файлов не читались')
+def check_not_probed(context):
+    """Заголовки файлов не читались."""
+    assert context['probed'] == []
+
+
+@then(parsers.parse('метаданные прочитаны только у "{filename}"'))
+def check_probed(context, filename):
+    """Перечитан только изменённый файл."""
+    assert context['probed'] == [str(context['folder'] / filename)]
+
+
+@then(parsers.parse('длительность AudioFile "{filename}" должна быть {seconds:d} секунды'))
+def check_duration(context, filename, seconds):
+    """Метаданные обновлены."""
+    from src.models import AudioFile
+
+    session = context['db'].get_session()
+    try:
+        audio_file = session.query(AudioFile).filter_by(filename=filename).one()
+        assert audio_file.duration == pytest.approx(seconds)
+    finally:
+        session.close()
+
+
+@then(parsers.parse('AudioFile "{filename}" должен указывать на "{target}"'))
+def check_moved(context, filename, target):
+    """Переименование меняет путь, но не ID."""
+    from src.models import AudioFile
+
+    session = context['db'].get_session()
+    try:
+        files = session.query(AudioFile).all()
+        assert len(files) == 4
+        moved = [f for f in files if f.file_path == str(context['folder'] / target)]
+        assert len(moved) == 1
+        assert moved[0].filename == filename
+    finally:
+        session.close()
+    assert _manifest(context) == ['archive/take_03.wav', 'take_00.wav', 'take_01.wav', 'take_02.wav']
+
+
+@then(parsers.parse('live-наблюдение должно добавить "{filename}" в манифест'))
+def check_live(context, filename):
+    """Пересканирование запускается событием inotify."""
+    from src.audio.watch import wait_for_rescan
+
+    deadline = time.monotonic() + 15
+    while filename not in _manifest(context) and time.monotonic() < deadline:
+        time.sleep(0.1)
+        wait_for_rescan(context['folder_id'], timeout=15)
+    assert filename in _manifest(context)
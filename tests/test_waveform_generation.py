@@ -266,3 +266,33 @@ def check_downsampling_used(context):
     # Если изображение создано для большого файла, значит downsampling использован
     assert True  # Детальная проверка downsampling требует логирования, что выходит за рамки теста
 
+
+
+@when(parsers.parse('я вычисляю огибающую на {bins:d} бинов блоками по {block:d} фреймов'))
+def compute_block_envelope(context, bins, block):
+    """Считаем огибающую потоковым движком с маленьким блоком."""
+    from src.audio.envelope import compute_envelope
+
+    context['bins'] = bins
+    context['envelope'] = compute_envelope(
+        context['test_file_path'], bins, block_frames=block
+    )
+
+
+@then('огибающая должна совпадать с эталонной min/max/RMS по бинам')
+def check_envelope_matches_reference(context):
+    """Сравниваем с наивным расчётом по полностью загруженному сигналу."""
+    audio_data, _ = sf.read(context['test_file_path'], dtype='float32', always_2d=True)
+    mono = audio_data.mean(axis=1)
+    bins = context['bins']
+    bin_ids = (np.arange(len(mono)) * bins) // len(mono)
+
+    envelope = context['envelope']
+    assert envelope.mins.shape == (bins, 1)
+    assert envelope.frames == len(mono)
+    for index in range(bins):
+        segment = mono[bin_ids == index]
+        assert envelope.mins[index, 0] == pytest.approx(segment.min(), abs=1e-6)
+        assert envelope.maxs[index, 0] == pytest.approx(segment.max(), abs=1e-6)
+        expected_rms = np.sqrt(np.mean(np.square(segment, dtype=np.float64)))
+        assert envelope.rms[index, 0] == pytest.approx(expected_rms, abs=1e-5)